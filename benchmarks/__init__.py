@@ -0,0 +1,32 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks for m1f and s1f.
+
+Each scenario generates a reproducible synthetic source tree, bundles it with
+m1f and extracts the bundle again with s1f. The time spent in each phase and
+the peak memory of both runs are compared against a stored baseline.
+
+Run ``python -m benchmarks --help`` from the repository root for the options,
+see docs/05_development/57_benchmarks.md for details.
+"""
+
+import sys
+from pathlib import Path
+
+# The tools are imported the same way the scripts in tools/ import them
+TOOLS_DIR = Path(__file__).resolve().parent.parent / "tools"
+if str(TOOLS_DIR) not in sys.path:
+    sys.path.insert(0, str(TOOLS_DIR))
@@ -0,0 +1,299 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Run the m1f and s1f benchmarks and compare them against a baseline.
+
+    python -m benchmarks                      # all scenarios, compared
+                                              # (the first run is the baseline)
+    python -m benchmarks --scale 0.1 --repeat 3 --scenario many-small
+    python -m benchmarks --save-baseline      # store this run as baseline
+
+Exits with 1 if a result regressed beyond the thresholds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from . import TOOLS_DIR  # noqa: F401 (puts the tools on sys.path)
+from .baseline import (
+    DEFAULT_BASELINE,
+    Comparison,
+    Thresholds,
+    check_comparable,
+    compare,
+    load_results,
+    new_results,
+    save_results,
+)
+from .scenarios import DEFAULT_SEED, SCENARIOS, Scenario
+from shared.colors import ColoredHelpFormatter, error, header, info, success, warning
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description=__doc__,
+        formatter_class=ColoredHelpFormatter,
+    )
+    parser.add_argument(
+        "--list", action="store_true", help="List the scenarios and exit"
+    )
+    parser.add_argument(
+        "--scenario",
+        nargs="+",
+        choices=list(SCENARIOS),
+        metavar="NAME",
+        help="Scenarios to run (default: all)",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Multiplies the size of the generated trees (default: 1.0)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=DEFAULT_SEED,
+        help=f"Seed of the generated trees (default: {DEFAULT_SEED})",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Run every scenario N times and take the median times (default: 1)",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help=(
+            "Baseline to compare against, created by the first run "
+            "(default: benchmarks/baseline.json)"
+        ),
+    )
+    parser.add_argument(
+        "--save-baseline",
+        nargs="?",
+        type=Path,
+        const=DEFAULT_BASELINE,
+        metavar="PATH",
+        help="Store the results as baseline instead of comparing them",
+    )
+    parser.add_argument(
+        "--output", type=Path, help="Also write the results to this JSON file"
+    )
+    parser.add_argument(
+        "--workdir",
+        type=Path,
+        help="Generate the trees here and keep them (default: a temporary "
+        "directory that is removed afterwards)",
+    )
+    parser.add_argument(
+        "--time-threshold",
+        type=float,
+        default=Thresholds.time * 100,
+        metavar="PERCENT",
+        help="How much slower than the baseline a time may get (default: 25)",
+    )
+    parser.add_argument(
+        "--memory-threshold",
+        type=float,
+        default=Thresholds.memory * 100,
+        metavar="PERCENT",
+        help="How much the peak memory may grow over the baseline (default: 15)",
+    )
+    return parser
+
+
+def run_worker(tool: str, args: List[str], result_file: Path) -> Dict[str, object]:
+    """Run m1f or s1f in a process of its own and return its timings.
+
+    Raises:
+        RuntimeError: If the run fails
+    """
+    process = subprocess.run(
+        [sys.executable, "-m", "benchmarks.worker", tool, str(result_file), "--"]
+        + args,
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"{tool} failed:\n{process.stderr.strip()}")
+    return json.loads(result_file.read_text(encoding="utf-8"))
+
+
+def combine_runs(runs: List[Dict[str, object]]) -> Dict[str, object]:
+    """The median times and the highest peak memory of repeated runs."""
+    combined = dict(runs[-1])
+    combined["total"] = statistics.median(run["total"] for run in runs)
+    combined["phases"] = {
+        phase: statistics.median(run["phases"][phase] for run in runs)
+        for phase in runs[-1]["phases"]
+        if all(phase in run["phases"] for run in runs)
+    }
+    peaks = [run["peak_rss_mb"] for run in runs if run["peak_rss_mb"] is not None]
+    combined["peak_rss_mb"] = max(peaks) if peaks else None
+    return combined
+
+
+def run_scenario(
+    scenario: Scenario, workdir: Path, scale: float, seed: int, repeat: int
+) -> Dict[str, object]:
+    """Generate the tree of a scenario and bundle and extract it."""
+    directory = workdir / scenario.name
+    if directory.exists():
+        shutil.rmtree(directory)
+    tree = scenario.generate(directory, scale, seed)
+    info(f"  {tree['files']} files, {tree['bytes'] / (1024 * 1024):.1f} MB")
+
+    result: Dict[str, object] = {"tree": tree}
+    for tool, args in (
+        ("m1f", scenario.m1f_args(directory)),
+        ("s1f", scenario.s1f_args(directory)),
+    ):
+        runs = [
+            run_worker(tool, args, directory / f"{tool}-result.json")
+            for _ in range(repeat)
+        ]
+        result[tool] = combine_runs(runs)
+    return result
+
+
+def _format(metric: str, value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    if metric == "peak_rss_mb":
+        return f"{value:.1f} MB"
+    return f"{value:.3f} s"
+
+
+def print_result(
+    scenario: str,
+    result: Dict[str, object],
+    comparisons: Dict[tuple, Comparison],
+) -> None:
+    for tool in ("m1f", "s1f"):
+        tool_result = result[tool]
+        metrics = {"total": tool_result["total"], **tool_result["phases"]}
+        metrics["peak_rss_mb"] = tool_result["peak_rss_mb"]
+        for metric, value in metrics.items():
+            line = f"  {tool} {metric:<14} {_format(metric, value):>12}"
+            comparison = comparisons.get((scenario, tool, metric))
+            if comparison is not None:
+                line += (
+                    f"   baseline {_format(metric, comparison.baseline):>12}"
+                    f" {comparison.change:+7.1%}"
+                )
+                if comparison.regressed:
+                    line += "  REGRESSION"
+            info(line)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    if args.scale <= 0:
+        parser.error("--scale must be positive")
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    if args.list:
+        for scenario in SCENARIOS.values():
+            info(f"{scenario.name:<16} {scenario.description}")
+        return 0
+
+    results = new_results(args.scale, args.seed)
+    baseline = None
+    if args.save_baseline is None and args.baseline.exists():
+        try:
+            baseline = load_results(args.baseline)
+            check_comparable(baseline, results)
+        except (OSError, ValueError) as e:
+            error(f"Cannot compare against {args.baseline}: {e}")
+            return 2
+
+    names = args.scenario or list(SCENARIOS)
+    with tempfile.TemporaryDirectory(prefix="m1f-benchmarks-") as tmp_dir:
+        workdir = args.workdir or Path(tmp_dir)
+        workdir.mkdir(parents=True, exist_ok=True)
+        for name in names:
+            info(f"{name}: {SCENARIOS[name].description}")
+            try:
+                results["scenarios"][name] = run_scenario(
+                    SCENARIOS[name], workdir, args.scale, args.seed, args.repeat
+                )
+            except RuntimeError as e:
+                error(f"{name}: {e}")
+                return 2
+
+    comparisons: List[Comparison] = []
+    if baseline is not None:
+        thresholds = Thresholds(
+            time=args.time_threshold / 100, memory=args.memory_threshold / 100
+        )
+        comparisons, warnings = compare(baseline, results, thresholds)
+        for message in warnings:
+            warning(message)
+
+    by_key = {(c.scenario, c.tool, c.metric): c for c in comparisons}
+    for name, result in results["scenarios"].items():
+        header(name)
+        print_result(name, result, by_key)
+    info("")
+
+    if args.output:
+        save_results(args.output, results)
+        info(f"Results written to {args.output}")
+    if args.save_baseline is not None:
+        save_results(args.save_baseline, results)
+        success(f"Baseline written to {args.save_baseline}")
+        return 0
+    if baseline is None:
+        # Nothing to compare against yet, so this run becomes the baseline
+        save_results(args.baseline, results)
+        info(f"No baseline at {args.baseline} yet, so nothing was compared")
+        success(f"Baseline written to {args.baseline}")
+        return 0
+
+    regressions = [c for c in comparisons if c.regressed]
+    if regressions:
+        error(f"{len(regressions)} result(s) regressed beyond the thresholds:")
+        for c in regressions:
+            error(
+                f"  {c.scenario} {c.tool} {c.metric}: "
+                f"{_format(c.metric, c.baseline)} -> {_format(c.metric, c.current)}"
+                f" ({c.change:+.1%})"
+            )
+        return 1
+    success(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
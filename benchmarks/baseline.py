@@ -0,0 +1,220 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark results and their comparison against a baseline.
+
+Results are stored as JSON:
+
+    {
+      "format": 1,
+      "scale": 1.0,
+      "seed": 1,
+      "python": "3.11.7",
+      "platform": "Linux-6.8.0-x86_64-with-glibc2.39",
+      "scenarios": {
+        "many-small": {
+          "tree": {"files": 5000, "bytes": 5480000, "sha256": "..."},
+          "m1f": {"total": 12.3, "phases": {"gather": 0.4, ...},
+                  "files": 5000, "peak_rss_mb": 95.1},
+          "s1f": {...}
+        }
+      }
+    }
+
+A time or the peak memory regresses if it is more than the threshold above
+the baseline and also more than a minimum amount, so that phases taking a
+few milliseconds don't fail on noise.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Bump whenever the meaning of a result field changes
+BASELINE_FORMAT = 1
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+@dataclass(frozen=True)
+class Thresholds:
+    """How much worse than the baseline a result may get."""
+
+    time: float = 0.25  # Relative increase of a time
+    memory: float = 0.15  # Relative increase of the peak memory
+    min_time: float = 0.05  # Seconds a time must increase by to regress
+    min_memory: float = 5.0  # MB the peak memory must increase by to regress
+
+
+@dataclass
+class Comparison:
+    """One result compared against the baseline."""
+
+    scenario: str
+    tool: str  # m1f or s1f
+    metric: str  # "total", "peak_rss_mb" or the name of a phase
+    baseline: float
+    current: float
+    regressed: bool
+
+    @property
+    def change(self) -> float:
+        """Relative change against the baseline."""
+        if not self.baseline:
+            return 0.0
+        return self.current / self.baseline - 1.0
+
+
+def new_results(scale: float, seed: int) -> Dict[str, object]:
+    """Empty results of a benchmark run on this machine."""
+    return {
+        "format": BASELINE_FORMAT,
+        "scale": scale,
+        "seed": seed,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scenarios": {},
+    }
+
+
+def load_results(path: Path) -> Dict[str, object]:
+    """Load stored results.
+
+    Raises:
+        OSError: If the file can't be read
+        ValueError: If it isn't a results file of this format
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        results = json.load(f)
+    if not isinstance(results, dict) or "scenarios" not in results:
+        raise ValueError(f"{path} is not a benchmark results file")
+    if results.get("format") != BASELINE_FORMAT:
+        raise ValueError(
+            f"{path} has format {results.get('format')}, expected {BASELINE_FORMAT}"
+        )
+    return results
+
+
+def save_results(path: Path, results: Dict[str, object]) -> None:
+    """Write results atomically.
+
+    Raises:
+        OSError: If the file can't be written
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _metrics(result: Dict[str, object]) -> Dict[str, Optional[float]]:
+    metrics = {"total": result["total"], "peak_rss_mb": result.get("peak_rss_mb")}
+    metrics.update(result.get("phases", {}))
+    return metrics
+
+
+def check_comparable(baseline: Dict[str, object], current: Dict[str, object]) -> None:
+    """Check that results were taken with the same trees as the baseline.
+
+    Raises:
+        ValueError: If the results were taken at another scale or seed, which
+            makes all of them incomparable
+    """
+    for key in ("scale", "seed"):
+        if baseline.get(key) != current.get(key):
+            raise ValueError(
+                f"The baseline was taken with {key} {baseline.get(key)}, "
+                f"not {current.get(key)}"
+            )
+
+
+def compare(
+    baseline: Dict[str, object],
+    current: Dict[str, object],
+    thresholds: Thresholds = Thresholds(),
+) -> Tuple[List[Comparison], List[str]]:
+    """Compare results against a baseline.
+
+    Returns the comparisons of all results that are in both, and warnings
+    about what can't be compared.
+
+    Raises:
+        ValueError: If the results were taken at another scale or seed
+    """
+    check_comparable(baseline, current)
+
+    comparisons: List[Comparison] = []
+    warnings: List[str] = []
+    for scenario, result in current["scenarios"].items():
+        expected = baseline["scenarios"].get(scenario)
+        if expected is None:
+            warnings.append(f"{scenario}: not in the baseline")
+            continue
+        if expected.get("tree") != result.get("tree"):
+            warnings.append(
+                f"{scenario}: the generated tree differs from the baseline's"
+            )
+
+        for tool in ("m1f", "s1f"):
+            if tool not in result or tool not in expected:
+                continue
+            if result[tool].get("files") != expected[tool].get("files"):
+                warnings.append(
+                    f"{scenario}: {tool} handled {result[tool].get('files')} "
+                    f"files, {expected[tool].get('files')} in the baseline"
+                )
+            expected_metrics = _metrics(expected[tool])
+            metrics = _metrics(result[tool])
+            missing = [metric for metric in expected_metrics if metric not in metrics]
+            for metric in [*metrics, *missing]:
+                value = metrics.get(metric)
+                baseline_value = expected_metrics.get(metric)
+                if value is None and baseline_value is None:
+                    continue
+                if value is None or baseline_value is None:
+                    # E.g. tokens are only counted with tiktoken installed
+                    measured = "this run" if value is not None else "the baseline"
+                    warnings.append(
+                        f"{scenario}: {tool} {metric} is only measured in {measured}"
+                    )
+                    continue
+
+                if metric == "peak_rss_mb":
+                    relative, minimum = thresholds.memory, thresholds.min_memory
+                else:
+                    relative, minimum = thresholds.time, thresholds.min_time
+                regressed = (
+                    value > baseline_value * (1 + relative)
+                    and value - baseline_value > minimum
+                )
+                comparisons.append(
+                    Comparison(scenario, tool, metric, baseline_value, value, regressed)
+                )
+    return comparisons, warnings
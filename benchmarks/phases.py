@@ -0,0 +1,183 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Timing the phases of m1f and s1f runs.
+
+The methods that do the work of a phase are wrapped to add up the time spent
+in them. m1f runs its phases concurrently: files are read, scanned, processed
+and written in a pipeline, and tokens are counted and the archive is written
+in background threads. A phase's time is therefore the CPU time of the
+threads running it, summed over the threads (waiting for the GIL or another
+thread doesn't count), and the phases don't add up to the total. Phases that
+are coroutines are timed by their wall time instead. Calls of a phase inside
+a call of the same phase are only counted once.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Callable, Dict, Iterator, Set, Union
+
+# Phases in the order they are reported
+M1F_PHASES = [
+    "gather",
+    "security_scan",
+    "read_decode",
+    "presets",
+    "write",
+    "token_count",
+    "archive",
+    "pipeline",  # Wall time of writing the output, which runs most phases
+]
+S1F_PHASES = ["read", "parse", "write"]
+
+
+class PhaseTimer:
+    """Time per phase, summed over all threads."""
+
+    def __init__(self):
+        self.times: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def add(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.times[phase] = self.times.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        """Add the CPU time the current thread spends in a block."""
+        active: Set[str] = self._local.__dict__.setdefault("active", set())
+        if phase in active:
+            yield
+            return
+        active.add(phase)
+        start = time.thread_time()
+        try:
+            yield
+        finally:
+            active.discard(phase)
+            self.add(phase, time.thread_time() - start)
+
+    def timed(self, func: Callable, phase: str) -> Callable:
+        """Wrap a function, coroutine function or generator function."""
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def timed_coroutine(*args, **kwargs):
+                # Coroutines run interleaved on one thread, so their wall
+                # time is taken instead of tracking them as active
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self.add(phase, time.perf_counter() - start)
+
+            return timed_coroutine
+
+        if inspect.isgeneratorfunction(func):
+
+            @functools.wraps(func)
+            def timed_generator(*args, **kwargs):
+                iterator = func(*args, **kwargs)
+                while True:
+                    with self.measure(phase):
+                        try:
+                            item = next(iterator)
+                        except StopIteration:
+                            return
+                    yield item
+
+            return timed_generator
+
+        @functools.wraps(func)
+        def timed_function(*args, **kwargs):
+            with self.measure(phase):
+                return func(*args, **kwargs)
+
+        return timed_function
+
+    def patch(self, owner: Union[type, ModuleType], name: str, phase: str) -> None:
+        """Time a method of a class or a function of a module.
+
+        Raises:
+            RuntimeError: If there is no such method or function, so that
+                renaming it can't silently drop a phase from the results
+        """
+        try:
+            attribute = vars(owner)[name]
+        except KeyError:
+            if isinstance(owner, type):
+                owner_name = f"{owner.__module__}.{owner.__name__}"
+            else:
+                owner_name = owner.__name__
+            raise RuntimeError(f"Cannot time {owner_name}.{name}: not found") from None
+        if isinstance(attribute, classmethod):
+            setattr(owner, name, classmethod(self.timed(attribute.__func__, phase)))
+        else:
+            setattr(owner, name, self.timed(attribute, phase))
+
+
+def instrument_m1f(timer: PhaseTimer) -> None:
+    """Time the phases of m1f runs in this process."""
+    from m1f.archive_creator import ArchiveStream
+    from m1f.encoding_handler import EncodingHandler
+    from m1f.file_processor import FileProcessor
+    from m1f.loaded_file import LoadedFile
+    from m1f.output_writer import OutputWriter
+    from m1f.presets import PresetManager
+    from m1f.security_scanner import SecurityScanner
+    from m1f.token_counter import TokenCounter
+
+    timer.patch(FileProcessor, "gather_files", "gather")
+    timer.patch(SecurityScanner, "_scan_content", "security_scan")
+    timer.patch(LoadedFile, "read", "read_decode")
+    timer.patch(EncodingHandler, "_detect_encoding", "read_decode")
+    timer.patch(EncodingHandler, "_decode_and_convert", "read_decode")
+    timer.patch(PresetManager, "get_preset_for_file", "presets")
+    timer.patch(PresetManager, "process_content", "presets")
+    timer.patch(OutputWriter, "_write_processed_file", "write")
+    timer.patch(OutputWriter, "write_combined_file", "pipeline")
+    timer.patch(TokenCounter, "_encode_batch", "token_count")
+
+    # Files are compressed and added to the archive by its writer thread,
+    # through a function it gets when opening the archive
+    open_archive = ArchiveStream.__dict__.get("_open_archive")
+    if open_archive is None:
+        raise RuntimeError("Cannot time m1f.archive_creator.ArchiveStream entries")
+
+    @contextmanager
+    def timed_open_archive(self):
+        with open_archive(self) as write_entry:
+            yield timer.timed(write_entry, "archive")
+
+    ArchiveStream._open_archive = timed_open_archive
+
+
+def instrument_s1f(timer: PhaseTimer) -> None:
+    """Time the phases of s1f runs in this process."""
+    from s1f.core import FileSplitter
+    from s1f.parsers import CombinedFileParser
+    from s1f.writers import FileWriter
+
+    timer.patch(FileSplitter, "_read_input_file", "read")
+    timer.patch(CombinedFileParser, "parse", "parse")
+    timer.patch(CombinedFileParser, "iter_parse", "parse")
+    timer.patch(FileWriter, "_write_bytes", "write")
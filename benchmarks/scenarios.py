@@ -0,0 +1,338 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Synthetic source trees for the benchmarks.
+
+Every tree is generated from a seeded random generator, so the same scenario,
+scale and seed always give byte-identical files with the same modification
+times. The scale multiplies the number of files (or, for huge files, their
+size); 1.0 is the size the stored baselines are usually taken at.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+DEFAULT_SEED = 1
+
+# Modification time of all generated files (2024-01-01 00:00:00 UTC)
+FILE_MTIME = 1704067200
+
+_WORDS = (
+    "alpha beta gamma delta bundle split config parser writer reader index "
+    "cache token preset archive source target encoding checksum section "
+    "header footer value result option module package import export return "
+    "buffer stream worker queue thread process file path directory tree"
+).split()
+
+# Texts that need the encoding they are written in
+_ENCODED_TEXTS = {
+    "utf-8": "Grüße, naïve café – 日本語のテキスト, Ελληνικά, € 100",
+    "latin-1": "Grüße aus Köln, naïve café, déjà vu, £ 100",
+    "cp1252": "“Smart quotes” – dashes … and € 100",
+    "utf-16": "Unicode text: 中文, русский, ελληνικά, עברית",
+    "shift_jis": "日本語のテキストファイル、カタカナとひらがな",
+    "koi8-r": "Съешь же ещё этих мягких французских булок",
+}
+
+# A hardcoded credential for the security scanner to find
+_SECRET = 'password = "{}"\n'
+
+
+class TreeWriter:
+    """Writes the files of a tree and fingerprints them."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.files = 0
+        self.bytes = 0
+        self._hash = hashlib.sha256()
+
+    def write(self, rel_path: str, data: bytes) -> None:
+        path = self.root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        os.utime(path, (FILE_MTIME, FILE_MTIME + self.files))
+        self.files += 1
+        self.bytes += len(data)
+        self._hash.update(rel_path.encode("utf-8") + b"\0")
+        self._hash.update(hashlib.sha256(data).digest())
+
+    def fingerprint(self) -> Dict[str, object]:
+        """File count, total size and a hash of all paths and contents."""
+        return {
+            "files": self.files,
+            "bytes": self.bytes,
+            "sha256": self._hash.hexdigest(),
+        }
+
+
+def _sentence(rng: random.Random, words: int = 8) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def _name(rng: random.Random) -> str:
+    return f"{rng.choice(_WORDS)}_{rng.randrange(10000)}"
+
+
+def _block(rng: random.Random, extension: str) -> str:
+    """A few lines of source code in the language of ``extension``."""
+    sentence = _sentence(rng)
+    name = _name(rng)
+    number = rng.randrange(1000)
+    if extension == ".py":
+        return (
+            f"# {sentence}\n"
+            f"def {name}(value):\n"
+            f'    """{_sentence(rng)}"""\n'
+            f"    return value + {number}  # {_sentence(rng, 4)}\n\n\n"
+        )
+    if extension == ".js":
+        return (
+            f"// {sentence}\n"
+            f"function {name}(value) {{\n"
+            f"    /* {_sentence(rng)} */\n"
+            f"    return value * {number};\n"
+            "}\n\n"
+        )
+    if extension == ".css":
+        return (
+            f"/* {sentence} */\n"
+            f".{name} {{\n"
+            f"    margin: {number}px;\n"
+            f"    color: #{rng.randrange(0x1000000):06x};\n"
+            "}\n\n"
+        )
+    if extension == ".html":
+        return (
+            f'<div class="{name}">\n'
+            f"  <!-- {sentence} -->\n"
+            f"  <script>var {name} = {number};</script>\n"
+            f"  <p>{_sentence(rng)}</p>\n"
+            "</div>\n\n"
+        )
+    if extension == ".md":
+        return f"## {sentence.title()}\n\n{_sentence(rng, 20)}\n\n\n"
+    return f"{sentence} {number}\n"
+
+
+def _source(rng: random.Random, extension: str, size: int) -> str:
+    """Blocks of source code up to about ``size`` characters."""
+    blocks: List[str] = []
+    length = 0
+    while length < size:
+        block = _block(rng, extension)
+        blocks.append(block)
+        length += len(block)
+    return "".join(blocks)
+
+
+def _count(base: int, scale: float) -> int:
+    return max(1, round(base * scale))
+
+
+def build_many_small(writer: TreeWriter, rng: random.Random, scale: float) -> None:
+    """Thousands of small files in a flat-ish tree."""
+    extensions = [".py", ".js", ".md", ".txt", ".json"]
+    for i in range(_count(5000, scale)):
+        extension = rng.choice(extensions)
+        if extension == ".json":
+            content = f'{{"id": {i}, "name": "{_name(rng)}"}}\n'
+        else:
+            content = _source(rng, extension, rng.randrange(200, 2000))
+        if rng.random() < 0.01:
+            content += _SECRET.format(rng.randbytes(12).hex())
+        writer.write(f"pkg_{i % 50:02d}/module_{i:05d}{extension}", content.encode())
+
+
+def build_few_huge(writer: TreeWriter, rng: random.Random, scale: float) -> None:
+    """Three large files of about 16 MB each."""
+    size = max(1, round(16 * 1024 * 1024 * scale))
+    for rel_path in ("data/records.txt", "src/generated.py", "web/bundle.js"):
+        extension = os.path.splitext(rel_path)[1]
+        # Repeating a pool of blocks keeps generating huge files fast
+        pool = [_block(rng, extension) for _ in range(500)]
+        blocks: List[str] = []
+        length = 0
+        while length < size:
+            block = rng.choice(pool)
+            blocks.append(block)
+            length += len(block)
+        writer.write(rel_path, "".join(blocks).encode())
+
+
+def build_mixed_encodings(writer: TreeWriter, rng: random.Random, scale: float) -> None:
+    """Text files in several encodings, which need detection and conversion."""
+    encodings = list(_ENCODED_TEXTS)
+    for i in range(_count(600, scale)):
+        encoding = rng.choice(encodings)
+        lines = [
+            f"{_ENCODED_TEXTS[encoding]} {_sentence(rng, 4)}"
+            for _ in range(rng.randrange(10, 120))
+        ]
+        content = "\n".join(lines) + "\n"
+        writer.write(
+            f"{encoding.replace('-', '_')}/text_{i:04d}.txt", content.encode(encoding)
+        )
+
+
+def build_deep_nesting(writer: TreeWriter, rng: random.Random, scale: float) -> None:
+    """Chains of directories 40 levels deep with files on every level."""
+    for chain in range(_count(25, scale)):
+        parts = [f"chain_{chain:02d}"]
+        for level in range(40):
+            parts.append(f"level_{level:02d}")
+            directory = "/".join(parts)
+            for extension in (".py", ".md"):
+                content = _source(rng, extension, rng.randrange(100, 600))
+                writer.write(
+                    f"{directory}/file_{level:02d}{extension}", content.encode()
+                )
+
+
+def build_heavy_presets(writer: TreeWriter, rng: random.Random, scale: float) -> None:
+    """Web project files that a preset file with many presets processes."""
+    extensions = [".py", ".js", ".css", ".html", ".md"]
+    for i in range(_count(1500, scale)):
+        extension = rng.choice(extensions)
+        content = _source(rng, extension, rng.randrange(500, 8000))
+        writer.write(f"app_{i % 30:02d}/page_{i:04d}{extension}", content.encode())
+
+
+# Preset file for the heavy-presets scenario: many pattern presets that every
+# file is matched against, and the expensive actions on all file types
+def _heavy_presets_file() -> str:
+    lines = [
+        "benchmark:",
+        '  description: "Presets of the heavy-presets benchmark"',
+        "  enabled: true",
+        "  priority: 10",
+        "  presets:",
+    ]
+    for app in range(30):
+        lines += [
+            f"    app_{app:02d}_styles:",
+            f'      patterns: ["app_{app:02d}/*.css"]',
+            "      actions: [strip_comments, minify]",
+        ]
+    lines += [
+        "    python:",
+        '      extensions: [".py"]',
+        "      actions: [strip_comments, remove_empty_lines]",
+        "    javascript:",
+        '      extensions: [".js"]',
+        "      actions: [strip_comments, minify]",
+        "    html:",
+        '      extensions: [".html"]',
+        "      actions: [strip_tags, compress_whitespace]",
+        '      strip_tags: ["script", "style"]',
+        "    markdown:",
+        '      extensions: [".md"]',
+        "      actions: [remove_empty_lines, join_paragraphs]",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """A synthetic tree and the m1f options it is bundled with."""
+
+    name: str
+    description: str
+    build: Callable[[TreeWriter, random.Random, float], None]
+    options: Tuple[str, ...] = ()  # Additional m1f options
+    presets: str = ""  # Content of a preset file to bundle with
+
+    def generate(
+        self, directory: Path, scale: float = 1.0, seed: int = DEFAULT_SEED
+    ) -> Dict[str, object]:
+        """Generate the tree in ``directory``/source.
+
+        Returns the fingerprint of the tree.
+        """
+        writer = TreeWriter(directory / "source")
+        writer.root.mkdir(parents=True, exist_ok=True)
+        self.build(writer, random.Random(f"{seed}:{self.name}"), scale)
+        if self.presets:
+            preset_path = directory / "benchmark.m1f-presets.yml"
+            preset_path.write_text(self.presets, encoding="utf-8")
+            os.utime(preset_path, (FILE_MTIME, FILE_MTIME))
+        return writer.fingerprint()
+
+    def m1f_args(self, directory: Path) -> List[str]:
+        """Command line arguments of the m1f run."""
+        args = [
+            "--source-directory",
+            str(directory / "source"),
+            "--output-file",
+            str(directory / "bundle.txt"),
+            "--create-archive",
+            "--archive-type",
+            "zip",
+            "--force",
+            "--quiet",
+        ]
+        args += self.options
+        if self.presets:
+            args += ["--preset", str(directory / "benchmark.m1f-presets.yml")]
+        return args
+
+    def s1f_args(self, directory: Path) -> List[str]:
+        """Command line arguments of the s1f run."""
+        return [
+            str(directory / "bundle.txt"),
+            str(directory / "extracted"),
+            "--force",
+        ]
+
+
+# Scanning is by far the slowest phase, so only the scenarios with many small
+# files run it; the huge files would take minutes
+_SECURITY_CHECK = ("--security-check", "warn")
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario(
+            "many-small",
+            "5000 small source files in 50 packages, scanned for secrets",
+            build_many_small,
+            options=_SECURITY_CHECK,
+        ),
+        Scenario("few-huge", "3 files of 16 MB each", build_few_huge),
+        Scenario(
+            "mixed-encodings",
+            "600 text files in 6 encodings, converted to UTF-8",
+            build_mixed_encodings,
+            options=("--convert-to-charset", "utf-8", *_SECURITY_CHECK),
+        ),
+        Scenario(
+            "deep-nesting",
+            "25 chains of directories 40 levels deep",
+            build_deep_nesting,
+        ),
+        Scenario(
+            "heavy-presets",
+            "1500 web project files processed by 34 presets",
+            build_heavy_presets,
+            presets=_heavy_presets_file(),
+        ),
+    ]
+}
@@ -0,0 +1,141 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Runs m1f or s1f once with its phases timed.
+
+Every run is a process of its own, so that its peak memory can be measured
+and nothing is cached from an earlier run:
+
+    python -m benchmarks.worker m1f RESULT_FILE -- M1F_ARGUMENTS...
+    python -m benchmarks.worker s1f RESULT_FILE -- S1F_ARGUMENTS...
+
+The result file gets the total time, the time per phase, the number of files
+and the peak resident set size in MB as JSON.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from . import TOOLS_DIR  # noqa: F401 (puts the tools on sys.path)
+from .phases import M1F_PHASES, S1F_PHASES, PhaseTimer, instrument_m1f, instrument_s1f
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, if it can be measured."""
+    # On Linux ru_maxrss survives exec(), so it would include the memory of
+    # the process that started this one; VmHWM is this process's own peak
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, the other systems kilobytes
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+async def run_m1f(argv: List[str]) -> int:
+    """Bundle the files like m1f does and return the number of files."""
+    from m1f.cli import create_parser, parse_args
+    from m1f.config import Config
+    from m1f.core import FileCombiner
+    from m1f.logging import setup_logging
+
+    config = Config.from_args(parse_args(create_parser(), argv))
+    logger_manager = setup_logging(config)
+    try:
+        result = await FileCombiner(config, logger_manager).run()
+    finally:
+        await logger_manager.cleanup()
+    return result.files_processed
+
+
+async def run_s1f(argv: List[str]) -> int:
+    """Extract a bundle like s1f does and return the number of files."""
+    from s1f.cli import create_argument_parser, validate_args
+    from s1f.config import Config
+    from s1f.core import FileSplitter
+    from s1f.logging import setup_logging
+
+    args = create_argument_parser().parse_args(argv)
+    validate_args(args)
+    config = Config.from_args(args)
+    logger_manager = setup_logging(config)
+    try:
+        result, exit_code = await FileSplitter(config, logger_manager).split_file()
+    finally:
+        await logger_manager.cleanup()
+    if exit_code != 0:
+        raise RuntimeError(f"s1f failed with exit code {exit_code}")
+    return result.files_created
+
+
+def run(tool: str, argv: List[str]) -> Dict[str, object]:
+    """Run a tool in this process and return its timings."""
+    timer = PhaseTimer()
+    if tool == "m1f":
+        instrument_m1f(timer)
+        main, phases = run_m1f, M1F_PHASES
+    else:
+        instrument_s1f(timer)
+        main, phases = run_s1f, S1F_PHASES
+
+    start = time.perf_counter()
+    files = asyncio.run(main(argv))
+    total = time.perf_counter() - start
+
+    return {
+        "total": total,
+        # Phases that didn't run (e.g. token counting without tiktoken)
+        # are left out rather than reported as taking no time
+        "phases": {
+            phase: timer.times[phase] for phase in phases if phase in timer.times
+        },
+        "files": files,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 3 or argv[0] not in ("m1f", "s1f") or argv[2] != "--":
+        print(__doc__, file=sys.stderr)
+        return 2
+
+    result = run(argv[0], argv[3:])
+    Path(argv[1]).write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
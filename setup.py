@@ -57,7 +57,7 @@ setup(
     },
     python_requires=">=3.10",
     install_requires=[
-        "pathspec>=0.11.0",
+        "pathspec>=0.12.0",
         "tiktoken>=0.5.0",
         "colorama>=0.4.6",
     ],
@@ -65,6 +65,7 @@ setup(
         "full": [
             "chardet>=5.0.0",
             "detect-secrets>=1.4.0",
+            "zstandard>=0.22.0",
         ],
     },
     classifiers=[
@@ -0,0 +1,205 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for archives written while the bundle is written."""
+
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from tools.m1f.archive_creator import ArchiveStream
+from tools.m1f.config import (
+    Config,
+    OutputConfig,
+    FilterConfig,
+    EncodingConfig,
+    SecurityConfig,
+    SecurityCheckMode,
+    ArchiveConfig,
+    ArchiveType,
+    LoggingConfig,
+    PresetConfig,
+)
+from tools.m1f.core import FileCombiner
+from tools.m1f.exceptions import ValidationError
+from tools.m1f.loaded_file import LoadedFile
+from tools.m1f.logging import LoggerManager
+
+
+def _make_config(source, output, archive, security=None, **output_options) -> Config:
+    """Create a config that archives the bundled files."""
+    return Config(
+        source_directories=[source],
+        input_file=None,
+        input_include_files=[],
+        output=OutputConfig(output_file=output, force_overwrite=True, **output_options),
+        filter=FilterConfig(),
+        encoding=EncodingConfig(),
+        security=SecurityConfig(security_check=security),
+        archive=archive,
+        logging=LoggingConfig(quiet=True),
+        preset=PresetConfig(),
+    )
+
+
+async def _run(config):
+    return await FileCombiner(config, LoggerManager(config.logging)).run()
+
+
+@pytest.fixture
+def source_tree(temp_dir):
+    """Create a source tree with a few text files, one of them duplicated."""
+    source = temp_dir / "src"
+    (source / "pkg").mkdir(parents=True)
+    files = {
+        "README.md": "# Project\n",
+        "pkg/a.py": "print('a')\n" * 500,
+        "pkg/b.py": "print('b')\n" * 300,
+        "pkg/copy_of_a.py": "print('a')\n" * 500,
+    }
+    for rel_path, content in files.items():
+        (source / rel_path).write_text(content)
+    out_dir = temp_dir / "out"
+    out_dir.mkdir()
+    return source, out_dir / "bundle.txt", files
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("threads", [1, 4])
+async def test_zip_archive_streamed_while_writing(source_tree, threads):
+    """All files (including duplicates) are archived with their content."""
+    source, output, files = source_tree
+    config = _make_config(
+        source,
+        output,
+        ArchiveConfig(create_archive=True, compression_level=9, threads=threads),
+    )
+
+    result = await _run(config)
+
+    assert result.archive_file == output.with_name("bundle_backup.zip")
+    with zipfile.ZipFile(result.archive_file) as zf:
+        assert zf.testzip() is None
+        assert sorted(zf.namelist()) == sorted(files)
+        for rel_path, content in files.items():
+            assert zf.read(rel_path).decode() == content
+            assert zf.getinfo(rel_path).compress_type == zipfile.ZIP_DEFLATED
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "archive_type, mode",
+    [(ArchiveType.TAR_GZ, "r:gz"), (ArchiveType.TAR_XZ, "r:xz")],
+)
+async def test_tar_archives(source_tree, archive_type, mode):
+    """tar.gz and tar.xz archives contain every file."""
+    source, output, files = source_tree
+    config = _make_config(
+        source,
+        output,
+        ArchiveConfig(
+            create_archive=True, archive_type=archive_type, compression_level=1
+        ),
+    )
+
+    result = await _run(config)
+
+    assert result.archive_file.name == f"bundle_backup.{archive_type.value}"
+    with tarfile.open(result.archive_file, mode) as tf:
+        assert sorted(tf.getnames()) == sorted(files)
+        assert tf.extractfile("pkg/b.py").read().decode() == files["pkg/b.py"]
+
+
+@pytest.mark.asyncio
+async def test_tar_zst_archive(source_tree):
+    """tar.zst archives are compressed with zstandard."""
+    zstandard = pytest.importorskip("zstandard")
+    source, output, files = source_tree
+    config = _make_config(
+        source,
+        output,
+        ArchiveConfig(create_archive=True, archive_type=ArchiveType.TAR_ZST, threads=2),
+    )
+
+    result = await _run(config)
+
+    with open(result.archive_file, "rb") as f:
+        data = zstandard.ZstdDecompressor().stream_reader(f).read()
+    with tarfile.open(fileobj=io.BytesIO(data)) as tf:
+        assert sorted(tf.getnames()) == sorted(files)
+
+
+@pytest.mark.asyncio
+async def test_flagged_files_are_not_archived_in_skip_mode(source_tree):
+    """Files withheld by the security check are left out of the archive."""
+    source, output, files = source_tree
+    (source / "settings.py").write_text("password = 'hunter2'\n")
+    config = _make_config(
+        source, output, ArchiveConfig(create_archive=True), SecurityCheckMode.SKIP
+    )
+
+    result = await _run(config)
+
+    with zipfile.ZipFile(result.archive_file) as zf:
+        assert sorted(zf.namelist()) == sorted(files)
+
+
+@pytest.mark.asyncio
+async def test_archive_follows_hashed_output_name(source_tree):
+    """With a content hash in the filename the archive is renamed along."""
+    source, output, _ = source_tree
+    config = _make_config(
+        source, output, ArchiveConfig(create_archive=True), filename_mtime_hash=True
+    )
+
+    result = await _run(config)
+
+    assert result.archive_file.name == f"{result.output_file.stem}_backup.zip"
+    assert result.archive_file.exists()
+    assert not list(output.parent.glob(".*m1f-tmp*"))
+
+
+@pytest.mark.asyncio
+async def test_invalid_compression_level(source_tree):
+    """Levels outside the range of the archive type are rejected."""
+    source, output, _ = source_tree
+    config = _make_config(
+        source, output, ArchiveConfig(create_archive=True, compression_level=12)
+    )
+
+    with pytest.raises(ValidationError):
+        await _run(config)
+
+
+def test_stream_waits_for_the_writer(temp_dir):
+    """Files beyond the pending byte limit wait for the writer thread."""
+    paths = []
+    for i in range(20):
+        path = temp_dir / f"file{i}.txt"
+        path.write_text(f"{i}\n" * 1000)
+        paths.append(path)
+
+    archive_path = temp_dir / "backup.zip"
+    stream = ArchiveStream(
+        archive_path, ArchiveType.ZIP, threads=3, max_pending_bytes=10_000
+    )
+    for path in paths:
+        stream.add(path, path.name, LoadedFile.read(path))
+
+    assert stream.close() == 20
+    with zipfile.ZipFile(archive_path) as zf:
+        assert zf.namelist() == [path.name for path in paths]
+        assert zf.testzip() is None
@@ -0,0 +1,145 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for creating auto-bundles in-process."""
+
+import logging
+import os
+
+import pytest
+
+from tools.m1f import auto_bundle
+from tools.m1f.auto_bundle import AutoBundler
+from tools.m1f.file_operations import DirectoryListingCache, safe_scandir_walk
+from tools.m1f.loaded_file import LoadedFile, LoadedFileCache
+
+CONFIG = """
+bundles:
+  all:
+    output: m1f/all.txt
+    sources:
+      - path: "."
+        include_extensions: [".py", ".md"]
+  code:
+    output: m1f/code.txt
+    sources:
+      - path: "src"
+        include_extensions: [".py"]
+"""
+
+
+@pytest.fixture
+def project(temp_dir):
+    """Create a project with two bundles over overlapping sources."""
+    (temp_dir / "src").mkdir()
+    (temp_dir / "src" / "main.py").write_text("print('main')\n")
+    (temp_dir / "src" / "util.py").write_text("def util():\n    pass\n")
+    (temp_dir / "README.md").write_text("# Project\n")
+    (temp_dir / ".m1f.config.yml").write_text(CONFIG)
+    return temp_dir
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_bundles_share_listings_and_contents(project, monkeypatch, jobs):
+    """Bundles are created in-process and reuse what other bundles read."""
+    caches = {}
+    original = auto_bundle.LoadedFileCache
+
+    def shared_files(max_bytes):
+        caches["files"] = original(max_bytes)
+        return caches["files"]
+
+    monkeypatch.setattr(auto_bundle, "LoadedFileCache", shared_files)
+
+    bundler = AutoBundler(project, quiet=True, jobs=jobs)
+    assert bundler.run()
+
+    all_bundle = (project / "m1f" / "all.txt").read_text()
+    code_bundle = (project / "m1f" / "code.txt").read_text()
+    for content in ("print('main')", "def util():", "# Project"):
+        assert content in all_bundle
+    assert "print('main')" in code_bundle
+    assert "# Project" not in code_bundle
+    if jobs == 1:
+        # The second bundle reads both source files from the shared cache
+        assert caches["files"].hits == 2
+
+
+def test_bundles_keep_the_root_logger(project):
+    """Bundles created in-process leave the host's logging setup alone."""
+    root_logger = logging.getLogger()
+    handler = logging.NullHandler()
+    level = root_logger.level
+    root_logger.addHandler(handler)
+    try:
+        assert AutoBundler(project, quiet=True).run()
+        assert handler in root_logger.handlers
+        assert root_logger.level == level
+    finally:
+        root_logger.removeHandler(handler)
+
+
+def test_failing_bundle_does_not_stop_others(project):
+    """A bundle with invalid options fails without affecting the others."""
+    (project / ".m1f.config.yml").write_text(
+        CONFIG
+        + """
+  broken:
+    output: m1f/broken.txt
+    separator_style: NoSuchStyle
+    sources:
+      - path: "src"
+"""
+    )
+
+    assert not AutoBundler(project, quiet=True).run()
+    assert (project / "m1f" / "all.txt").exists()
+    assert (project / "m1f" / "code.txt").exists()
+    assert not (project / "m1f" / "broken.txt").exists()
+
+
+def test_shared_listings_survive_pruning(temp_dir):
+    """Pruning one walk doesn't change the listings other walks get."""
+    (temp_dir / "a" / "b").mkdir(parents=True)
+    (temp_dir / "a" / "b" / "file.txt").write_text("x")
+    listings = DirectoryListingCache()
+
+    for root, dirs, _ in safe_scandir_walk(temp_dir, listings=listings):
+        dirs.clear()
+    walked = [
+        os.path.relpath(root, temp_dir)
+        for root, _, _ in safe_scandir_walk(temp_dir, listings=listings)
+    ]
+
+    assert walked == [".", "a", os.path.join("a", "b")]
+    assert listings.hits == 1
+
+
+def test_shared_file_cache(temp_dir):
+    """Cached files are dropped when they change or exceed the budget."""
+    path = temp_dir / "file.txt"
+    path.write_text("first")
+    cache = LoadedFileCache(max_bytes=8)
+    cache.put(LoadedFile.read(path))
+    assert cache.get(path).data == b"first"
+
+    path.write_text("second")
+    assert cache.get(path) is None
+
+    other = temp_dir / "other.txt"
+    other.write_text("12345")
+    cache.put(LoadedFile.read(path))
+    cache.put(LoadedFile.read(other))
+    assert len(cache) == 1
+    assert cache.get(other).data == b"12345"
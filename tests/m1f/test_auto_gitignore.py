@@ -307,6 +307,60 @@ class TestAutoGitignore:
             assert len(files) >= 0
 
 
+    @pytest.mark.asyncio
+    async def test_nested_gitignore_files(self):
+        """Test that .gitignore files in subdirectories apply to their subtree."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+
+            (tmpdir / "pkg" / "web").mkdir(parents=True)
+            (tmpdir / ".gitignore").write_text("*.log\n")
+            (tmpdir / "pkg" / ".gitignore").write_text("*.cache\n!keep.log\n")
+            (tmpdir / "pkg" / "web" / ".gitignore").write_text("dist\n")
+
+            (tmpdir / "top.log").write_text("Excluded by the root .gitignore")
+            (tmpdir / "top.cache").write_text("Not ignored outside pkg/")
+            (tmpdir / "pkg" / "data.cache").write_text("Excluded by pkg/.gitignore")
+            (tmpdir / "pkg" / "debug.log").write_text("Still excluded")
+            (tmpdir / "pkg" / "keep.log").write_text("Re-included by negation")
+            (tmpdir / "pkg" / "web" / "dist").write_text("Excluded name")
+            (tmpdir / "pkg" / "web" / "app.js").write_text("Included")
+
+            parser = create_parser()
+            args = parser.parse_args(["-s", str(tmpdir), "-o", str(tmpdir / "output.txt")])
+            config = Config.from_args(args)
+
+            processor = FileProcessor(config, LoggerManager(config.logging))
+            files = await processor.gather_files()
+            rel_paths = sorted(rel for _, rel in files)
+
+            assert rel_paths == ["pkg/keep.log", "pkg/web/app.js", "top.cache"]
+
+    @pytest.mark.asyncio
+    async def test_ignored_subtree_is_pruned(self):
+        """Test that ignored directories are not descended into."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+
+            (tmpdir / "app" / "generated" / "nested").mkdir(parents=True)
+            (tmpdir / "app" / ".gitignore").write_text("generated/\n")
+            (tmpdir / "app" / "main.py").write_text("print('main')")
+            (tmpdir / "app" / "generated" / ".gitignore").write_text("!*\n")
+            (tmpdir / "app" / "generated" / "nested" / "out.py").write_text("x = 1")
+
+            parser = create_parser()
+            args = parser.parse_args(["-s", str(tmpdir), "-o", str(tmpdir / "output.txt")])
+            config = Config.from_args(args)
+
+            processor = FileProcessor(config, LoggerManager(config.logging))
+            files = await processor.gather_files()
+
+            assert [rel for _, rel in files] == ["app/main.py"]
+            # The ignored directory was never listed, so its rules were never loaded
+            assert str(tmpdir / "app") in processor._gitignore_specs
+            assert str(tmpdir / "app" / "generated") not in processor._gitignore_specs
+
+
 class TestAutoGitignoreRegression:
     """Regression tests for specific bugs that were found."""
     
@@ -0,0 +1,139 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for binary file classification."""
+
+import os
+
+import pytest
+
+from tools.m1f import binary_classifier
+from tools.m1f.binary_classifier import (
+    BinaryClassifier,
+    is_binary_data,
+    match_magic_signature,
+)
+
+
+@pytest.mark.parametrize(
+    "head, expected",
+    [
+        (b"", False),
+        (b"print('hello')\n", False),
+        ("Grüße, 你好\n".encode("utf-8"), False),
+        ("Привет\n".encode("koi8-r"), False),
+        (b"\x1b[31mcolored\x1b[0m\ttext\r\n", False),
+        (b"text\x00with a NUL", True),
+        (b"\x89PNG\r\n\x1a\n" + b"x" * 100, True),
+        (b"\x7fELF\x02\x01\x01" + b"y" * 100, True),
+        (b"\x01\x02\x03\x04\x05\x06" * 20, True),
+    ],
+)
+def test_is_binary_data(head, expected):
+    """Content checks: NUL bytes, magic numbers and control byte ratio."""
+    assert is_binary_data(head) is expected
+
+
+@pytest.mark.parametrize(
+    "head",
+    [
+        b"def ftype(x):\n    return x\n",
+        b"var ftypes = [];\n",
+        b"OggS is a format\n",
+        b"wOFF\n",
+        b"wOF2 notes\n",
+        b"%PDF- notes\n",
+        b"GIF87a\n",
+        b"GIF89a is old\n",
+        b"name".ljust(257) + b"ustar\n",
+    ],
+)
+def test_text_starting_with_text_signature(head):
+    """Text files that start like a binary format are still text."""
+    assert is_binary_data(head) is False
+
+
+def test_text_files_starting_with_text_signature(temp_dir):
+    """Source files that start like a binary format are classified as text."""
+    classifier = BinaryClassifier()
+    for name, content in {
+        "video.py": "def ftype(x):\n    return x\n",
+        "media.js": "var ftypes = [];\n",
+        "formats.txt": "OggS is a format\n",
+        "fonts.md": "wOFF\n",
+        "notes.txt": "%PDF- notes\n",
+        "history.txt": "GIF89a is old\n",
+    }.items():
+        text_file = temp_dir / name
+        text_file.write_text(content)
+        assert not classifier.is_binary(text_file), name
+
+
+def test_text_signature_with_control_bytes():
+    """Signatures made of text bytes count when control bytes follow."""
+    assert is_binary_data(b"%PDF-1.7\n\x01\x02stream") is True
+    assert is_binary_data(b"GIF89a\x10\x00\x10") is True
+
+
+def test_magic_signature_at_offset():
+    """Signatures that don't start at offset 0 are recognized too."""
+    tar_head = b"a.txt".ljust(257, b"\x00") + b"ustar"
+    assert match_magic_signature(tar_head) == "TAR archive"
+    assert match_magic_signature(b"\x00\x00\x00\x18ftypmp42") == "MP4/QuickTime video"
+    assert match_magic_signature(b"plain text") is None
+
+
+def test_classifier_uses_extension_and_content(temp_dir):
+    """Known extensions are binary without reading, other files by content."""
+    image = temp_dir / "logo.png"
+    image.write_text("not really an image")
+    executable = temp_dir / "tool"
+    executable.write_bytes(b"\x7fELF" + b"z" * 64)
+    script = temp_dir / "run"
+    script.write_text("#!/bin/sh\necho hi\n")
+
+    classifier = BinaryClassifier()
+
+    assert classifier.is_binary(image)
+    assert classifier.is_binary(executable)
+    assert not classifier.is_binary(script)
+    assert classifier.is_binary(temp_dir / "missing.txt")
+
+
+def test_verdicts_are_cached_per_file_version(temp_dir, monkeypatch):
+    """Unchanged files are not read again; changed files are re-checked."""
+    data_file = temp_dir / "data"
+    data_file.write_text("plain text\n")
+    classifier = BinaryClassifier()
+    reads = []
+    original_read = os.read
+
+    def counting_read(fd, size):
+        reads.append(size)
+        return original_read(fd, size)
+
+    monkeypatch.setattr(binary_classifier.os, "read", counting_read)
+
+    assert not classifier.is_binary(data_file, data_file.stat())
+    assert not classifier.is_binary(data_file, data_file.stat())
+    assert not classifier.is_binary(data_file)
+    assert len(reads) == 1
+
+    data_file.write_bytes(b"now\x00binary")
+    stat_result = data_file.stat()
+    os.utime(data_file, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10**9))
+
+    assert classifier.is_binary(data_file, data_file.stat())
+    assert len(reads) == 2
+    assert len(classifier) == 2
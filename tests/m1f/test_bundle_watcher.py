@@ -0,0 +1,133 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for rebuilding auto-bundles in watch mode."""
+
+import asyncio
+
+import pytest
+
+from tools.m1f.auto_bundle import AutoBundler
+from tools.m1f.bundle_watcher import BundleWatcher, PollingWatcher
+
+CONFIG = """
+bundles:
+  all:
+    output: m1f/all.txt
+    sources:
+      - path: "."
+        include_extensions: [".py", ".md"]
+  code:
+    output: m1f/code.txt
+    sources:
+      - path: "src"
+        include_extensions: [".py"]
+"""
+
+
+@pytest.fixture
+def project(temp_dir):
+    """Create a project with two bundles over overlapping sources."""
+    (temp_dir / "src").mkdir()
+    (temp_dir / "src" / "main.py").write_text("print('main')\n")
+    (temp_dir / "README.md").write_text("# Project\n")
+    (temp_dir / ".m1f.config.yml").write_text(CONFIG)
+    return temp_dir
+
+
+@pytest.mark.asyncio
+async def test_changes_map_to_affected_bundles(project):
+    """Changed paths only affect the bundles that include them."""
+    watcher = BundleWatcher(AutoBundler(project, quiet=True))
+    assert watcher.load()
+    await watcher.build(list(watcher.bundles))
+
+    (project / "src" / "new.py").write_text("x = 1\n")
+    (project / "src" / "notes.txt").write_text("not bundled\n")
+    cases = {
+        project / "src" / "main.py": ["all", "code"],
+        project / "README.md": ["all"],
+        project / "src" / "new.py": ["all", "code"],
+        project / "src" / "notes.txt": [],
+        project / "src" / ".gitignore": ["all", "code"],
+        project / "src": ["all", "code"],
+    }
+    for path, expected in cases.items():
+        assert watcher.affected_bundles([path]) == expected, path
+
+    assert watcher._is_output(project / "m1f" / "all.txt")
+    assert not watcher._is_output(project / "src" / "main.py")
+
+
+@pytest.mark.asyncio
+async def test_only_affected_bundles_are_rebuilt(project):
+    """A change rebuilds the bundles including it, once it has settled."""
+    watcher = BundleWatcher(AutoBundler(project, quiet=True), debounce=0.05)
+    builds = []
+    build = watcher.build
+
+    async def record_build(names):
+        builds.append(sorted(names))
+        await build(names)
+
+    watcher.build = record_build
+    task = asyncio.create_task(watcher.run())
+    try:
+        for _ in range(100):
+            await asyncio.sleep(0.05)
+            if builds:
+                break
+        # Give the watcher time to start watching
+        await asyncio.sleep(0.3)
+
+        readme = project / "README.md"
+        for i in range(3):
+            readme.write_text(f"# Project {i}\n")
+        for _ in range(100):
+            await asyncio.sleep(0.05)
+            if len(builds) > 1:
+                break
+        await asyncio.sleep(0.3)
+    finally:
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert builds == [["all", "code"], ["all"]]
+    assert "# Project 2" in (project / "m1f" / "all.txt").read_text()
+
+
+@pytest.mark.asyncio
+async def test_polling_watcher(temp_dir):
+    """Polling reports created, modified and deleted files."""
+    (temp_dir / "sub").mkdir()
+    kept = temp_dir / "sub" / "kept.txt"
+    removed = temp_dir / "removed.txt"
+    kept.write_text("a")
+    removed.write_text("b")
+
+    watcher = PollingWatcher(interval=0.01)
+    watcher.watch(temp_dir)
+    watcher.start()
+    assert await watcher.changes_after(0) == set()
+
+    kept.write_text("changed")
+    removed.unlink()
+    (temp_dir / "sub" / "new.txt").write_text("c")
+
+    assert await asyncio.wait_for(watcher.wait(), 5) == {
+        kept,
+        removed,
+        temp_dir / "sub" / "new.txt",
+    }
@@ -0,0 +1,144 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the persistent incremental file cache."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from tools.m1f.cli import create_parser, parse_args
+from tools.m1f.config import (
+    Config,
+    OutputConfig,
+    FilterConfig,
+    EncodingConfig,
+    SecurityConfig,
+    SecurityCheckMode,
+    ArchiveConfig,
+    LoggingConfig,
+    PresetConfig,
+    CacheConfig,
+)
+from tools.m1f.core import FileCombiner
+from tools.m1f.logging import LoggerManager
+
+
+def _make_config(source: Path, output: Path, cache_dir: Path, **security) -> Config:
+    """Create a config with the file cache enabled."""
+    return Config(
+        source_directories=[source],
+        input_file=None,
+        input_include_files=[],
+        output=OutputConfig(output_file=output, force_overwrite=True),
+        filter=FilterConfig(),
+        encoding=EncodingConfig(),
+        security=SecurityConfig(**security),
+        archive=ArchiveConfig(),
+        logging=LoggingConfig(quiet=True),
+        preset=PresetConfig(),
+        cache=CacheConfig(enabled=True, cache_dir=cache_dir),
+    )
+
+
+async def _run(config: Config) -> FileCombiner:
+    """Run m1f once and return the combiner."""
+    combiner = FileCombiner(config, LoggerManager(config.logging))
+    await combiner.run()
+    return combiner
+
+
+@pytest.fixture
+def source_tree(temp_dir):
+    """Create a small source tree next to an output directory."""
+    source = temp_dir / "src"
+    source.mkdir()
+    (source / "a.txt").write_text("alpha\n")
+    (source / "b.py").write_text("print('beta')\n")
+    (source / "config.py").write_text("password = 'hunter2'\n")
+    out_dir = temp_dir / "out"
+    out_dir.mkdir()
+    return source, out_dir
+
+
+def test_cli_cache_options():
+    """Test that --cache and --cache-dir populate the cache config."""
+    parser = create_parser()
+    config = Config.from_args(parse_args(parser, ["-s", ".", "-o", "out.txt"]))
+    assert config.cache.enabled is False
+
+    config = Config.from_args(
+        parse_args(parser, ["-s", ".", "-o", "out.txt", "--cache-dir", "cache"])
+    )
+    assert config.cache.enabled is True
+    assert config.cache.cache_dir == Path("cache").resolve()
+
+
+@pytest.mark.asyncio
+async def test_second_run_reuses_cache(source_tree):
+    """Unchanged files are served from the cache and give identical output."""
+    source, out_dir = source_tree
+    cache_dir = out_dir / "cache"
+    config = _make_config(source, out_dir / "bundle.txt", cache_dir)
+
+    first = await _run(config)
+    first_output = config.output.output_file.read_text()
+    assert first.file_cache.misses == 3
+    assert list(cache_dir.glob("*.json"))
+
+    second = await _run(config)
+    assert second.file_cache.hits == 3
+    assert second.file_cache.misses == 0
+    assert config.output.output_file.read_text() == first_output
+
+
+@pytest.mark.asyncio
+async def test_changed_file_invalidates_entry(source_tree):
+    """A modified file is processed again instead of using stale results."""
+    source, out_dir = source_tree
+    config = _make_config(source, out_dir / "bundle.txt", out_dir / "cache")
+    await _run(config)
+
+    changed = source / "a.txt"
+    changed.write_text("alpha changed\n")
+    stat_result = changed.stat()
+    os.utime(changed, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10**9))
+
+    combiner = await _run(config)
+    assert combiner.file_cache.hits == 2
+    assert combiner.file_cache.misses == 1
+    assert "alpha changed" in config.output.output_file.read_text()
+
+
+@pytest.mark.asyncio
+async def test_security_findings_are_cached(source_tree):
+    """Security findings are restored from the cache with the current path."""
+    source, out_dir = source_tree
+    config = _make_config(
+        source,
+        out_dir / "bundle.txt",
+        out_dir / "cache",
+        security_check=SecurityCheckMode.WARN,
+    )
+    first = FileCombiner(config, LoggerManager(config.logging))
+    first_result = await first.run()
+
+    second = FileCombiner(config, LoggerManager(config.logging))
+    second_result = await second.run()
+    assert second.file_cache.hits == 3
+    assert second_result.flagged_files == first_result.flagged_files
+    assert any(
+        finding["path"] == "config.py" for finding in second_result.flagged_files
+    )
@@ -39,6 +39,7 @@ from tools.m1f.file_operations import (
     safe_open,
     safe_mkdir,
     safe_walk,
+    safe_scandir_walk,
     safe_read_text,
     safe_write_text,
     safe_iterdir,
@@ -257,6 +258,43 @@ class TestSafeFileOperations:
             walked_paths = list(safe_walk(temp_dir, logger=mock_logger))
             assert len(walked_paths) > 0
 
+    def test_safe_scandir_walk_matches_os_walk(self, temp_dir, mock_logger):
+        """Test safe_scandir_walk visits directories in os.walk order."""
+        for name in ("b", "a", "a/sub", "c"):
+            (temp_dir / name).mkdir()
+            (temp_dir / name / "file.txt").write_text(name)
+        (temp_dir / "top.txt").write_text("top")
+
+        expected = [
+            (root, sorted(dirs), sorted(files))
+            for root, dirs, files in os.walk(temp_dir)
+        ]
+        walked = [
+            (root, sorted(e.name for e in dirs), sorted(e.name for e in files))
+            for root, dirs, files in safe_scandir_walk(temp_dir, logger=mock_logger)
+        ]
+        assert walked == expected
+
+    def test_safe_scandir_walk_prunes_and_skips_broken_links(
+        self, temp_dir, mock_logger
+    ):
+        """Test pruning the directory list in place and skipping broken symlinks."""
+        (temp_dir / "keep").mkdir()
+        (temp_dir / "keep" / "file.txt").write_text("keep")
+        (temp_dir / "skip").mkdir()
+        (temp_dir / "skip" / "file.txt").write_text("skip")
+        try:
+            (temp_dir / "broken.txt").symlink_to(temp_dir / "missing.txt")
+        except OSError:
+            pytest.skip("Symlinks not supported")
+
+        seen = []
+        for root, dirs, files in safe_scandir_walk(temp_dir, logger=mock_logger):
+            dirs[:] = [entry for entry in dirs if entry.name != "skip"]
+            seen.extend(Path(root, entry.name) for entry in files)
+
+        assert seen == [temp_dir / "keep" / "file.txt"]
+
     def test_safe_read_text_reads_file(self, temp_dir, mock_logger):
         """Test safe_read_text reads file content."""
         test_file = temp_dir / "file.txt"
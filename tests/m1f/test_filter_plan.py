@@ -0,0 +1,98 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the compiled filter plan used while gathering files."""
+
+import pytest
+
+from tools.m1f.cli import create_parser
+from tools.m1f.config import Config
+from tools.m1f.file_processor import FileProcessor
+from tools.m1f.logging import LoggerManager
+
+
+def _make_processor(source, output, *extra_args) -> FileProcessor:
+    """Create a FileProcessor from command line arguments."""
+    args = create_parser().parse_args(
+        ["-s", str(source), "-o", str(output), "-q", *extra_args]
+    )
+    config = Config.from_args(args)
+    return FileProcessor(config, LoggerManager(config.logging))
+
+
+@pytest.fixture
+def source_tree(temp_dir):
+    """Create a small source tree with nested, hidden and excluded paths."""
+    source = temp_dir / "src"
+    (source / "pkg" / "sub").mkdir(parents=True)
+    (source / "node_modules").mkdir()
+    (source / ".hidden").mkdir()
+    (source / "README.md").write_text("# readme\n")
+    (source / "pkg" / "a.py").write_text("a = 1\n")
+    (source / "pkg" / "sub" / "b.py").write_text("b = 2\n")
+    (source / "pkg" / "sub" / "notes.txt").write_text("notes\n")
+    (source / "pkg" / "big.py").write_text("x" * 4096)
+    (source / "node_modules" / "dep.js").write_text("dep\n")
+    (source / ".hidden" / "secret.py").write_text("s = 3\n")
+    return source
+
+
+@pytest.mark.asyncio
+async def test_plan_is_compiled_once_per_gather(source_tree, temp_dir, monkeypatch):
+    """Per-file filtering reuses the plan compiled at the start of the run."""
+    processor = _make_processor(source_tree, temp_dir / "out.txt")
+    compiled = []
+    original = FileProcessor._compile_filter_plan
+
+    def counting_compile(self):
+        compiled.append(True)
+        return original(self)
+
+    monkeypatch.setattr(FileProcessor, "_compile_filter_plan", counting_compile)
+
+    files = await processor.gather_files()
+
+    assert len(compiled) == 1
+    assert [rel for _, rel in files] == [
+        "README.md",
+        "pkg/a.py",
+        "pkg/big.py",
+        "pkg/sub/b.py",
+        "pkg/sub/notes.txt",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_plan_merges_filter_options(source_tree, temp_dir):
+    """Extension, size and dot-path options all apply through the plan."""
+    processor = _make_processor(
+        source_tree,
+        temp_dir / "out.txt",
+        "--include-extensions",
+        ".py",
+        "--max-file-size",
+        "1KB",
+        "--include-dot-paths",
+    )
+
+    files = await processor.gather_files()
+    plan = processor._filter_plan
+
+    assert plan.include_extensions == {".py"}
+    assert plan.max_file_size == 1024
+    assert sorted(rel for _, rel in files) == [
+        ".hidden/secret.py",
+        "pkg/a.py",
+        "pkg/sub/b.py",
+    ]
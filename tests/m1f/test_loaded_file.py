@@ -0,0 +1,121 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for single-pass file loading."""
+
+from collections import Counter
+
+import pytest
+
+from tools.m1f.config import (
+    Config,
+    OutputConfig,
+    FilterConfig,
+    EncodingConfig,
+    SecurityConfig,
+    SecurityCheckMode,
+    ArchiveConfig,
+    LoggingConfig,
+    PresetConfig,
+    SeparatorStyle,
+)
+from tools.m1f.core import FileCombiner
+from tools.m1f.loaded_file import LoadedFile, LoadedFileStore
+from tools.m1f.logging import LoggerManager
+
+
+def _make_config(source, output, **output_options) -> Config:
+    """Create a config with the security scan enabled."""
+    return Config(
+        source_directories=[source],
+        input_file=None,
+        input_include_files=[],
+        output=OutputConfig(output_file=output, force_overwrite=True, **output_options),
+        filter=FilterConfig(),
+        encoding=EncodingConfig(),
+        security=SecurityConfig(security_check=SecurityCheckMode.WARN),
+        archive=ArchiveConfig(),
+        logging=LoggingConfig(quiet=True),
+        preset=PresetConfig(),
+    )
+
+
+@pytest.fixture
+def source_tree(temp_dir):
+    """Create a small source tree next to an output directory."""
+    source = temp_dir / "src"
+    source.mkdir()
+    (source / "a.txt").write_text("alpha\n")
+    (source / "b.py").write_text("print('beta')\n")
+    (source / "settings.py").write_text("password = 'hunter2'\n")
+    out_dir = temp_dir / "out"
+    out_dir.mkdir()
+    return source, out_dir
+
+
+@pytest.mark.asyncio
+async def test_each_file_is_read_once(source_tree, monkeypatch):
+    """The security scan and the writer share a single read per file."""
+    source, out_dir = source_tree
+    reads = Counter()
+    original_read = LoadedFile.read.__func__
+
+    def counting_read(cls, path):
+        reads[path.name] += 1
+        return original_read(cls, path)
+
+    monkeypatch.setattr(LoadedFile, "read", classmethod(counting_read))
+
+    config = _make_config(source, out_dir / "bundle.txt")
+    combiner = FileCombiner(config, LoggerManager(config.logging))
+    result = await combiner.run()
+
+    assert result.files_processed == 3
+    assert result.flagged_files
+    assert reads == {"a.txt": 1, "b.py": 1, "settings.py": 1}
+    assert len(combiner.loaded_files) == 0
+
+
+@pytest.mark.asyncio
+async def test_line_endings_match_text_mode_reads(source_tree):
+    """Decoding the loaded bytes normalizes line endings like text-mode reads."""
+    source, out_dir = source_tree
+    (source / "crlf.txt").write_bytes(b"one\r\ntwo\rthree\n")
+
+    config = _make_config(
+        source, out_dir / "bundle.txt", separator_style=SeparatorStyle.NONE
+    )
+    await FileCombiner(config, LoggerManager(config.logging)).run()
+
+    content = config.output.output_file.read_bytes()
+    assert b"one\ntwo\nthree\n" in content
+    assert b"\r" not in content
+
+
+def test_store_respects_budget(temp_dir):
+    """Files beyond the byte budget are not kept."""
+    first = temp_dir / "first.txt"
+    second = temp_dir / "second.txt"
+    first.write_bytes(b"x" * 60)
+    second.write_bytes(b"y" * 60)
+
+    store = LoadedFileStore(max_bytes=100)
+    assert store.put(LoadedFile.read(first))
+    assert not store.put(LoadedFile.read(second))
+
+    loaded = store.take(first)
+    assert loaded.data == b"x" * 60
+    assert loaded.stat.st_size == 60
+    assert store.take(first) is None
+    assert store.load(second).data == b"y" * 60
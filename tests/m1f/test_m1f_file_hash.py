@@ -205,6 +205,120 @@ class TestM1FFileHash(BaseM1FTest):
 
         assert hash_before != hash_after, "Hash should change when file is modified"
 
+    @pytest.mark.unit
+    def test_filename_mtime_hash_ignores_touch(
+        self, run_m1f, create_test_file, temp_dir
+    ):
+        """Test that only the content, not the mtime, determines the hash."""
+        source_dir = temp_dir / "hash_touch"
+        source_dir.mkdir()
+
+        file1 = create_test_file("hash_touch/file1.txt", "Unchanged content")
+        create_test_file("hash_touch/file2.txt", "Other content")
+
+        hashes = []
+        for run in ("before", "after"):
+            exit_code, _ = run_m1f(
+                [
+                    "--source-directory",
+                    str(source_dir),
+                    "--output-file",
+                    str(temp_dir / f"touch_{run}.txt"),
+                    "--filename-mtime-hash",
+                    "--force",
+                ]
+            )
+            assert exit_code == 0
+
+            output_files = [
+                f
+                for f in temp_dir.glob(f"touch_{run}_*.txt")
+                if not f.name.endswith("_filelist.txt")
+                and not f.name.endswith("_dirlist.txt")
+            ]
+            assert len(output_files) == 1
+            hashes.append(self._get_hash_from_filename(output_files[0].name))
+
+            # Touch the file: new mtime, same content
+            stat = file1.stat()
+            os.utime(file1, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**10))
+
+        assert hashes[0] is not None
+        assert hashes[0] == hashes[1], "Hash should not change when only mtimes change"
+        assert not list(temp_dir.glob(".*m1f-tmp*")), "Temporary output left behind"
+
+    @pytest.mark.unit
+    def test_filename_mtime_hash_covers_settings(
+        self, run_m1f, create_test_file, temp_dir
+    ):
+        """Test that output written with other settings gets another hash."""
+        source_dir = temp_dir / "hash_settings"
+        source_dir.mkdir()
+        create_test_file("hash_settings/file1.txt", "Content 1")
+        create_test_file("hash_settings/file2.txt", "Content 2")
+
+        hashes = []
+        for style in ("Standard", "Markdown"):
+            out_dir = temp_dir / style.lower()
+            out_dir.mkdir()
+            exit_code, _ = run_m1f(
+                [
+                    "--source-directory",
+                    str(source_dir),
+                    "--output-file",
+                    str(out_dir / "styled.txt"),
+                    "--separator-style",
+                    style,
+                    "--filename-mtime-hash",
+                    "--minimal-output",
+                    "--force",
+                ]
+            )
+            assert exit_code == 0
+
+            output_files = list(out_dir.glob("styled_*.txt"))
+            assert len(output_files) == 1
+            hashes.append(self._get_hash_from_filename(output_files[0].name))
+
+        assert hashes[0] is not None
+        assert hashes[0] != hashes[1], "Hash should change with the separator style"
+
+    @pytest.mark.unit
+    def test_filename_mtime_hash_without_output_file(
+        self, run_m1f, create_test_file, temp_dir
+    ):
+        """Test that the hash is the same whether the output is written or not."""
+        source_dir = temp_dir / "hash_skip_output"
+        source_dir.mkdir()
+        create_test_file("hash_skip_output/file1.txt", "Same content")
+        # Deduplicated, so it isn't part of the bundle
+        create_test_file("hash_skip_output/file2.txt", "Same content")
+
+        hashes = []
+        for skip_output in (True, False):
+            out_dir = temp_dir / ("skipped" if skip_output else "written")
+            out_dir.mkdir()
+            args = [
+                "--source-directory",
+                str(source_dir),
+                "--output-file",
+                str(out_dir / "bundle.txt"),
+                "--filename-mtime-hash",
+                "--force",
+            ]
+            if skip_output:
+                args.append("--skip-output-file")
+            exit_code, _ = run_m1f(args)
+            assert exit_code == 0
+
+            # The file list is named after the hashed output file
+            file_lists = list(out_dir.glob("bundle_*_filelist.txt"))
+            assert len(file_lists) == 1
+            hashes.append(file_lists[0].name.split("_")[1])
+
+        assert (out_dir / f"bundle_{hashes[1]}.txt").exists()
+        assert hashes[0] == hashes[1]
+
     @pytest.mark.unit
     def test_filename_mtime_hash_with_file_operations(
         self, run_m1f, create_test_file, temp_dir
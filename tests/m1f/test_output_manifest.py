@@ -0,0 +1,201 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for skipping unchanged runs with the sidecar manifest."""
+
+import os
+from dataclasses import replace
+
+import pytest
+
+from tools.m1f.config import (
+    Config,
+    OutputConfig,
+    FilterConfig,
+    EncodingConfig,
+    SecurityConfig,
+    SecurityCheckMode,
+    ArchiveConfig,
+    LoggingConfig,
+    PresetConfig,
+    SeparatorStyle,
+)
+from tools.m1f.core import FileCombiner
+from tools.m1f.logging import LoggerManager
+from tools.m1f.output_manifest import manifest_path_for
+
+
+def _make_config(source, output, **output_options) -> Config:
+    """Create a config that skips unchanged runs."""
+    return Config(
+        source_directories=[source],
+        input_file=None,
+        input_include_files=[],
+        output=OutputConfig(
+            output_file=output,
+            force_overwrite=True,
+            skip_unchanged=True,
+            **output_options,
+        ),
+        filter=FilterConfig(),
+        encoding=EncodingConfig(),
+        security=SecurityConfig(),
+        archive=ArchiveConfig(),
+        logging=LoggingConfig(quiet=True),
+        preset=PresetConfig(),
+    )
+
+
+async def _run(config):
+    return await FileCombiner(config, LoggerManager(config.logging)).run()
+
+
+def _touch(path, seconds=10):
+    """Move the mtime of a file forward without changing its content."""
+    stat_result = path.stat()
+    os.utime(
+        path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + seconds * 10**9)
+    )
+
+
+@pytest.fixture
+def source_tree(temp_dir):
+    """Create a small source tree and the path of its bundle."""
+    source = temp_dir / "src"
+    source.mkdir()
+    (source / "a.txt").write_text("alpha\n")
+    (source / "b.py").write_text("print('beta')\n")
+    out_dir = temp_dir / "out"
+    out_dir.mkdir()
+    return source, out_dir / "bundle.txt"
+
+
+@pytest.mark.asyncio
+async def test_unchanged_run_keeps_output(source_tree):
+    """A second run without changes doesn't rewrite any file."""
+    source, output = source_tree
+    config = _make_config(source, output)
+
+    first = await _run(config)
+    assert not first.unchanged
+    assert manifest_path_for(output).exists()
+    written = {path: path.stat().st_mtime_ns for path in output.parent.iterdir()}
+
+    second = await _run(config)
+    assert second.unchanged
+    assert second.output_file == output
+    assert second.files_processed == first.files_processed
+    assert {
+        path: path.stat().st_mtime_ns for path in output.parent.iterdir()
+    } == written
+
+
+@pytest.mark.asyncio
+async def test_touched_files_are_compared_by_checksum(source_tree):
+    """Touching a file keeps output without dates, changing its content doesn't."""
+    source, output = source_tree
+    config = _make_config(source, output, separator_style=SeparatorStyle.STANDARD)
+    await _run(config)
+
+    _touch(source / "a.txt")
+    assert (await _run(config)).unchanged
+
+    (source / "a.txt").write_text("ALPHA\n")
+    _touch(source / "a.txt", 20)
+    result = await _run(config)
+    assert not result.unchanged
+    assert "ALPHA" in output.read_text()
+    assert (await _run(config)).unchanged
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("style", [SeparatorStyle.DETAILED, SeparatorStyle.MARKDOWN])
+async def test_touched_files_rewrite_output_with_dates(source_tree, style):
+    """Output that shows the files' dates is rewritten when a file is touched."""
+    source, output = source_tree
+    config = _make_config(source, output, separator_style=style)
+    await _run(config)
+
+    os.utime(source / "a.txt", (978307200, 978307200))  # 2001-01-01
+    result = await _run(config)
+    assert not result.unchanged
+    assert "2001-01-01" in output.read_text()
+    assert (await _run(config)).unchanged
+
+
+@pytest.mark.asyncio
+async def test_changes_that_rewrite_the_output(source_tree):
+    """New files, other settings and modified outputs trigger a rewrite."""
+    source, output = source_tree
+    await _run(_make_config(source, output))
+
+    (source / "c.md").write_text("# gamma\n")
+    assert not (await _run(_make_config(source, output))).unchanged
+
+    other_style = _make_config(source, output, separator_style=SeparatorStyle.MARKDOWN)
+    assert not (await _run(other_style)).unchanged
+    assert (await _run(other_style)).unchanged
+
+    output.unlink()
+    assert not (await _run(other_style)).unchanged
+    assert output.exists()
+
+
+@pytest.mark.asyncio
+async def test_settings_that_keep_the_output(source_tree):
+    """Settings that only change how the run works don't rewrite the output."""
+    source, output = source_tree
+    await _run(_make_config(source, output))
+
+    tuned = _make_config(source, output, workers=2, concurrency=3)
+    assert (await _run(tuned)).unchanged
+
+
+@pytest.mark.asyncio
+async def test_sources_are_recorded_as_they_were_read(source_tree, monkeypatch):
+    """A file changed while the output is written isn't taken as bundled."""
+    source, output = source_tree
+    config = _make_config(source, output)
+    written_files = FileCombiner._written_files
+
+    def change_source(self, *args):
+        (source / "a.txt").write_text("ALPHA, changed while writing\n")
+        _touch(source / "a.txt")
+        return written_files(self, *args)
+
+    monkeypatch.setattr(FileCombiner, "_written_files", change_source)
+    await _run(config)
+    assert "changed while writing" not in output.read_text()
+    monkeypatch.undo()
+
+    assert not (await _run(config)).unchanged
+    assert "changed while writing" in output.read_text()
+
+
+@pytest.mark.asyncio
+async def test_unchanged_run_keeps_security_findings(source_tree):
+    """An unchanged run reports the findings of the output it keeps."""
+    source, output = source_tree
+    (source / "secret.txt").write_text("password = 'supersecret123'\n")
+    config = replace(
+        _make_config(source, output),
+        security=SecurityConfig(security_check=SecurityCheckMode.WARN),
+    )
+
+    first = await _run(config)
+    assert [finding["path"] for finding in first.flagged_files] == ["secret.txt"]
+
+    second = await _run(config)
+    assert second.unchanged
+    assert second.flagged_files == first.flagged_files
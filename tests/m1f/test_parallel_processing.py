@@ -17,6 +17,7 @@
 
 import asyncio
 import gc
+import re
 import sys
 import time
 from pathlib import Path
@@ -60,6 +61,7 @@ from tools.m1f.config import (
     LineEnding,
 )
 from tools.m1f.core import FileCombiner
+from tools.m1f.file_processor import FileProcessor
 from tools.m1f.output_writer import OutputWriter
 from tools.m1f.logging import LoggerManager
 
@@ -381,6 +383,204 @@ class TestParallelProcessing:
         assert sequential_called, "Sequential processing was not used for single file"
         assert not parallel_called, "Parallel processing was used for single file"
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "style",
+        [
+            SeparatorStyle.STANDARD,
+            SeparatorStyle.DETAILED,
+            SeparatorStyle.MARKDOWN,
+            SeparatorStyle.MACHINE_READABLE,
+            SeparatorStyle.NONE,
+        ],
+    )
+    async def test_parallel_matches_sequential_output(
+        self, temp_dir, create_test_files, style
+    ):
+        """Test that the streaming pipeline writes exactly the sequential output."""
+        files = [(path, path.name) for path in create_test_files]
+        outputs = {}
+
+        for parallel in (False, True):
+            config = Config(
+                source_directories=[temp_dir],
+                input_file=None,
+                input_include_files=[],
+                output=OutputConfig(
+                    output_file=temp_dir / f"output_{parallel}.txt",
+                    separator_style=style,
+                    parallel=parallel,
+                ),
+                filter=FilterConfig(),
+                encoding=EncodingConfig(),
+                security=SecurityConfig(),
+                archive=ArchiveConfig(),
+                logging=LoggingConfig(quiet=True),
+                preset=PresetConfig(),
+            )
+            writer = OutputWriter(config, LoggerManager(config.logging))
+            await writer.write_combined_file(config.output.output_file, files)
+            content = config.output.output_file.read_text()
+            # MachineReadable separators contain a random UUID per file
+            outputs[parallel] = re.sub(
+                r"[0-9a-f]{8}(-[0-9a-f]{4}){3}-[0-9a-f]{12}", "UUID", content
+            )
+
+        assert outputs[True] == outputs[False]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("parallel", [False, True])
+    async def test_files_without_separators_are_spaced(self, temp_dir, parallel):
+        """Test that files of the None style are separated by a blank line."""
+        (temp_dir / "a.txt").write_text("a1\na2\n")
+        (temp_dir / "b.txt").write_text("b1\n")
+        files = [(temp_dir / name, name) for name in ("a.txt", "b.txt")]
+        config = Config(
+            source_directories=[temp_dir],
+            input_file=None,
+            input_include_files=[],
+            output=OutputConfig(
+                output_file=temp_dir / "output.txt",
+                separator_style=SeparatorStyle.NONE,
+                parallel=parallel,
+            ),
+            filter=FilterConfig(),
+            encoding=EncodingConfig(),
+            security=SecurityConfig(),
+            archive=ArchiveConfig(),
+            logging=LoggingConfig(quiet=True),
+            preset=PresetConfig(),
+        )
+        writer = OutputWriter(config, LoggerManager(config.logging))
+        await writer.write_combined_file(config.output.output_file, files)
+
+        assert config.output.output_file.read_text() == "a1\na2\n\nb1\n"
+
+    @pytest.mark.asyncio
+    async def test_parallel_respects_buffer_ceiling(self, temp_dir, create_test_files):
+        """Test that a tiny buffer ceiling still writes every file in order."""
+        config = Config(
+            source_directories=[temp_dir],
+            input_file=None,
+            input_include_files=[],
+            output=OutputConfig(
+                output_file=temp_dir / "output.txt",
+                concurrency=4,
+                max_buffer_size=1,
+            ),
+            filter=FilterConfig(),
+            encoding=EncodingConfig(),
+            security=SecurityConfig(),
+            archive=ArchiveConfig(),
+            logging=LoggingConfig(quiet=True),
+            preset=PresetConfig(),
+        )
+        writer = OutputWriter(config, LoggerManager(config.logging))
+        files = [(path, path.name) for path in create_test_files]
+
+        written = await writer.write_combined_file(config.output.output_file, files)
+
+        assert written == len(files)
+        content = config.output.output_file.read_text()
+        positions = [content.find(f"======= {name} ======") for _, name in files]
+        assert -1 not in positions
+        assert positions == sorted(positions)
+
+    @pytest.mark.asyncio
+    async def test_worker_processes_match_in_process_output(self, temp_dir):
+        """Test that --workers gives the same output, including preset processing."""
+        source = temp_dir / "src"
+        source.mkdir()
+        for i in range(6):
+            (source / f"page_{i}.html").write_text(
+                f"<html><body><p>Page {i}</p></body></html>\n"
+            )
+            (source / f"notes_{i}.md").write_text(f"# Notes {i}\n\n\n\nText {i}\n")
+        preset_file = temp_dir / "test.m1f-presets.yml"
+        preset_file.write_text(
+            """
+test:
+  presets:
+    html:
+      extensions: [".html"]
+      actions:
+        - strip_tags
+    md:
+      extensions: [".md"]
+      actions:
+        - remove_empty_lines
+"""
+        )
+        files = sorted((path, path.name) for path in source.iterdir())
+        outputs = {}
+
+        for workers in (0, 2):
+            config = Config(
+                source_directories=[source],
+                input_file=None,
+                input_include_files=[],
+                output=OutputConfig(
+                    output_file=temp_dir / f"output_{workers}.txt",
+                    separator_style=SeparatorStyle.DETAILED,
+                    workers=workers,
+                ),
+                filter=FilterConfig(),
+                encoding=EncodingConfig(),
+                security=SecurityConfig(),
+                archive=ArchiveConfig(),
+                logging=LoggingConfig(quiet=True),
+                preset=PresetConfig(preset_files=[preset_file]),
+            )
+            writer = OutputWriter(config, LoggerManager(config.logging))
+            written = await writer.write_combined_file(config.output.output_file, files)
+            assert written == len(files)
+            assert writer.process_pool is None
+            outputs[workers] = config.output.output_file.read_text()
+
+        assert outputs[2] == outputs[0]
+        assert "<p>" not in outputs[2]
+        assert "Page 3" in outputs[2]
+
+    @pytest.mark.asyncio
+    async def test_parallel_gather_of_multiple_sources(self, temp_dir):
+        """Concurrent walks of several sources merge deterministically."""
+        first = temp_dir / "first"
+        second = temp_dir / "second"
+        for source in (first, second):
+            for sub in ("alpha", "beta", "gamma"):
+                (source / sub / "deep").mkdir(parents=True)
+                (source / sub / "file.txt").write_text(f"{source.name} {sub}")
+                (source / sub / "deep" / "leaf.txt").write_text("leaf")
+            (source / "README.md").write_text(f"# {source.name}")
+
+        gathered = {}
+        for concurrency in (1, 8):
+            config = Config(
+                # The nested source overlaps with the first one
+                source_directories=[first, second, first / "beta"],
+                input_file=None,
+                input_include_files=[],
+                output=OutputConfig(
+                    output_file=temp_dir / "output.txt", concurrency=concurrency
+                ),
+                filter=FilterConfig(),
+                encoding=EncodingConfig(),
+                security=SecurityConfig(),
+                archive=ArchiveConfig(),
+                logging=LoggingConfig(quiet=True),
+                preset=PresetConfig(),
+            )
+            processor = FileProcessor(config, LoggerManager(config.logging))
+            gathered[concurrency] = await processor.gather_files()
+
+        assert gathered[8] == gathered[1]
+        rel_paths = [rel for _, rel in gathered[8]]
+        # Duplicates from the nested source are dropped, README.md comes first
+        assert len(rel_paths) == 14
+        assert rel_paths[:2] == ["README.md", "README.md"]
+        assert rel_paths.count("beta/deep/leaf.txt") == 2
+        assert "deep/leaf.txt" not in rel_paths
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,79 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for matching files against the presets of a group."""
+
+from pathlib import Path
+
+from tools.m1f.presets import FilePreset, GlobalSettings, PresetGroup
+
+
+def _group(**presets) -> PresetGroup:
+    group = PresetGroup(name="test", default_preset=FilePreset(max_lines=1))
+    group.file_presets.update(presets)
+    return group
+
+
+def test_first_matching_preset_wins():
+    """Presets are tried in definition order, by extension or pattern."""
+    group = _group(
+        vendor=FilePreset(patterns=["*/vendor/*"]),
+        minified=FilePreset(patterns=["*.min.js"], extensions=["CSS"]),
+        scripts=FilePreset(extensions=[".js", "ts"]),
+    )
+
+    cases = {
+        "/src/vendor/lib.min.js": "vendor",
+        "/src/app.min.js": "minified",
+        "/src/style.Css": "minified",
+        "/src/app.js": "scripts",
+        "/src/app.TS": "scripts",
+    }
+    for path, name in cases.items():
+        assert group.get_preset_for_file(Path(path)) is group.file_presets[name]
+    assert group.get_preset_for_file(Path("/src/README")) is group.default_preset
+
+
+def test_many_patterns():
+    """Lookups stay correct with hundreds of pattern presets."""
+    group = _group(
+        **{
+            f"p{i}": FilePreset(patterns=[f"*/dir{i}/*", f"*file{i}.*"])
+            for i in range(300)
+        }
+    )
+
+    assert (
+        group.get_preset_for_file(Path("/x/dir299/a.py")) is group.file_presets["p299"]
+    )
+    assert (
+        group.get_preset_for_file(Path("/x/dir7/file3.py")) is group.file_presets["p3"]
+    )
+    assert group.get_preset_for_file(Path("/x/other.py")) is group.default_preset
+
+
+def test_merged_presets_are_reused():
+    """Presets merged with the global extension settings are built once."""
+    group = _group(docs=FilePreset(extensions=[".md", ".txt"]))
+    group.global_settings = GlobalSettings()
+    group.global_settings.extension_settings[".md"] = FilePreset(max_lines=10)
+
+    merged = group.get_preset_for_file(Path("a.md"))
+    assert merged.max_lines == 10
+    assert group.get_preset_for_file(Path("b.md")) is merged
+    assert group.get_preset_for_file(Path("c.txt")) is group.file_presets["docs"]
+
+    group.file_presets["docs"] = FilePreset(extensions=[".md"], max_lines=5)
+    group.clear_index()
+    assert group.get_preset_for_file(Path("a.md")).max_lines == 5
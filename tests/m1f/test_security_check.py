@@ -40,9 +40,14 @@ def _create_test_file(path: Path, content: str) -> None:
     path.write_text(content, encoding="utf-8")
 
 
+M1F_SCRIPT = Path(__file__).parent.parent.parent / "tools" / "m1f.py"
+
+
 def run_m1f(args):
     """Run m1f with given arguments."""
-    cmd = [sys.executable, "-m", "tools.m1f"] + args
+    # Run the script: with "-m tools.m1f" the m1f/ directory at the repository
+    # root shadows the package
+    cmd = [sys.executable, str(M1F_SCRIPT)] + args
     result = subprocess.run(cmd, capture_output=True, text=True)
     return result
 
@@ -238,3 +243,79 @@ def test_security_check_warn():
         # Clean up
         if output_file.exists():
             output_file.unlink()
+
+
+def test_security_check_skip_in_pipeline_matches_pre_pass():
+    """Skipping flagged files inside the write pipeline matches the pre-pass result."""
+    ensure_test_isolation()
+
+    with isolated_test_directory() as (temp_path, source_dir, output_dir):
+        _create_test_file(source_dir / "a_clean.py", "print('hello')\n")
+        _create_test_file(source_dir / "b_clean.txt", "Nothing to see here.\n")
+        # Sorted last, so its verdict decides the end of the output
+        _create_test_file(
+            source_dir / "z_secret.py", 'SECRET_KEY = "super_secret_123"\n'
+        )
+
+        # The pre-pass scans all files first and bundles the ones not flagged
+        flagged = _scan_files_for_sensitive_info(
+            [(path, path.name) for path in sorted(source_dir.iterdir())]
+        )
+        flagged_paths = sorted({finding["path"] for finding in flagged})
+        assert flagged_paths == ["z_secret.py"]
+
+        outputs = {}
+        for name, extra_args in (
+            ("pipeline", ["--security-check", "skip"]),
+            ("pre_pass", ["--excludes", *flagged_paths]),
+        ):
+            run_dir = output_dir / name
+            run_dir.mkdir()
+            result = run_m1f(
+                [
+                    "--source-directory",
+                    str(source_dir),
+                    "--output-file",
+                    str(run_dir / "bundle.txt"),
+                    "--separator-style",
+                    "Standard",
+                    "--force",
+                ]
+                + extra_args
+            )
+            assert result.returncode == 0, result.stderr
+            bundle = run_dir / "bundle.txt"
+            filelist = run_dir / "bundle_filelist.txt"
+            outputs[name] = (bundle.read_text(), filelist.read_text())
+
+        assert outputs["pipeline"] == outputs["pre_pass"]
+        content, filelist = outputs["pipeline"]
+        assert "SECRET_KEY" not in content
+        assert "z_secret.py" not in filelist
+        assert content.endswith("Nothing to see here.\n")
+
+
+def test_security_check_abort_writes_nothing():
+    """Abort mode stops before any output is written."""
+    ensure_test_isolation()
+
+    with isolated_test_directory() as (temp_path, source_dir, output_dir):
+        for i in range(20):
+            _create_test_file(source_dir / f"clean_{i:02d}.txt", f"Clean file {i}\n")
+        _create_test_file(source_dir / "secret.py", 'SECRET_KEY = "super_secret_123"\n')
+
+        output_file = output_dir / "security_abort.txt"
+        result = run_m1f(
+            [
+                "--source-directory",
+                str(source_dir),
+                "--output-file",
+                str(output_file),
+                "--security-check",
+                "abort",
+                "--force",
+            ]
+        )
+
+        assert result.returncode != 0
+        assert not output_file.exists()
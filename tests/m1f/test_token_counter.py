@@ -0,0 +1,266 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for streaming token counting."""
+
+import json
+
+import pytest
+
+tiktoken = pytest.importorskip("tiktoken")
+
+from tools.m1f import token_counter
+from tools.m1f.config import (
+    Config,
+    OutputConfig,
+    FilterConfig,
+    EncodingConfig,
+    SecurityConfig,
+    ArchiveConfig,
+    LoggingConfig,
+    PresetConfig,
+)
+from tools.m1f.core import FileCombiner
+from tools.m1f.logging import LoggerManager
+from tools.m1f.token_counter import TokenCounter, iter_chunks
+
+# Pre-tokenizer of the cl100k_base encoding
+CL100K_PATTERN = (
+    r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+|"""
+    r""" ?[^\s\p{L}\p{N}]++[\r\n]*+|\s++$|\s*[\r\n]|\s+(?!\S)|\s"""
+)
+
+SAMPLE_TEXT = (
+    "import os\n\n\n"
+    "def main():\n"
+    "    # return the answer\n"
+    "    return   42\n"
+    "\n"
+    "class Thing:\n"
+    "        def the(self):  return self\n"
+) * 40
+
+
+@pytest.fixture
+def encoding(monkeypatch):
+    """A small offline encoding with merges across spaces and newlines."""
+    ranks = {bytes([i]): i for i in range(256)}
+    for word in ("\n\n\n", "        ", " return", " def", " self", " the", "import"):
+        data = word.encode()
+        for end in range(2, len(data) + 1):
+            ranks.setdefault(data[:end], len(ranks))
+    test_encoding = tiktoken.Encoding(
+        name="m1f-test",
+        pat_str=CL100K_PATTERN,
+        mergeable_ranks=ranks,
+        special_tokens={},
+    )
+    monkeypatch.setattr(tiktoken, "get_encoding", lambda name: test_encoding)
+    return test_encoding
+
+
+def test_chunks_reassemble_to_the_input():
+    """Chunks cover the text exactly and prefer newline boundaries."""
+    parts = [SAMPLE_TEXT[i : i + 37] for i in range(0, len(SAMPLE_TEXT), 37)]
+    chunks = list(iter_chunks(parts, chunk_size=100))
+
+    assert "".join(chunks) == SAMPLE_TEXT
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    for chunk, following in zip(chunks, chunks[1:]):
+        after_newline = chunk.endswith("\n") and not following[0].isspace()
+        before_word = following[0] == " " and not chunk[-1].isspace()
+        assert after_newline or before_word
+
+
+@pytest.mark.parametrize("threads", [1, 4])
+def test_streamed_count_matches_whole_text(encoding, threads):
+    """Cutting at safe boundaries doesn't change the count, per key or in total."""
+    split = SAMPLE_TEXT.index("class", 1000)
+    first, second = SAMPLE_TEXT[:split], SAMPLE_TEXT[split:]
+    counter = TokenCounter(threads=threads, chunk_size=64, batch_size=512)
+    counter.add([first[i : i + 53] for i in range(0, len(first), 53)], key="first")
+    counter.add(second[:10], key="second")
+    counter.add(second[10:], key="second")
+    total = counter.finish()
+
+    assert total == len(encoding.encode_ordinary(SAMPLE_TEXT))
+    assert counter.counts == {
+        "first": len(encoding.encode_ordinary(first)),
+        "second": len(encoding.encode_ordinary(second)),
+    }
+
+
+def _make_config(source, output, **output_options) -> Config:
+    """Create a config writing ``source`` to ``output``."""
+    return Config(
+        source_directories=[source],
+        input_file=None,
+        input_include_files=[],
+        output=OutputConfig(output_file=output, force_overwrite=True, **output_options),
+        filter=FilterConfig(),
+        encoding=EncodingConfig(),
+        security=SecurityConfig(),
+        archive=ArchiveConfig(),
+        logging=LoggingConfig(quiet=True),
+        preset=PresetConfig(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_bundle_tokens_are_counted_while_writing(encoding, temp_dir):
+    """The bundle is counted per file without reading it back."""
+    source = temp_dir / "src"
+    source.mkdir()
+    (source / "a.py").write_text(SAMPLE_TEXT)
+    (source / "b.txt").write_text("the self\n\n\n        return")
+    output = temp_dir / "out" / "bundle.txt"
+    output.parent.mkdir()
+
+    config = _make_config(source, output)
+    result = await FileCombiner(config, LoggerManager(config.logging)).run()
+
+    bundle = output.read_text(encoding="utf-8")
+    assert result.token_count == len(encoding.encode_ordinary(bundle))
+    assert set(result.file_token_counts) == {"a.py", "b.txt"}
+    assert sum(result.file_token_counts.values()) == result.token_count
+
+
+@pytest.mark.asyncio
+async def test_no_tokens_without_output_file(encoding, temp_dir):
+    """--skip-output-file writes the lists but counts no tokens."""
+    source = temp_dir / "src"
+    source.mkdir()
+    (source / "a.py").write_text(SAMPLE_TEXT)
+    output = temp_dir / "bundle.txt"
+
+    config = _make_config(source, output, skip_output_file=True)
+    result = await FileCombiner(config, LoggerManager(config.logging)).run()
+
+    assert result.files_processed == 1
+    assert result.output_file is None
+    assert result.token_count is None
+    assert result.file_token_counts is None
+    assert not output.exists()
+    assert (temp_dir / "bundle_filelist.txt").exists()
+
+
+@pytest.fixture
+def sized_tree(temp_dir):
+    """Create files of different sizes in nested directories."""
+    source = temp_dir / "src"
+    (source / "pkg" / "sub").mkdir(parents=True)
+    (source / "README.md").write_text("the import\n" * 20)
+    (source / "pkg" / "big.py").write_text(SAMPLE_TEXT)
+    (source / "pkg" / "small.py").write_text("import os\n")
+    (source / "pkg" / "sub" / "mid.py").write_text(SAMPLE_TEXT[:2000])
+    out_dir = temp_dir / "out"
+    out_dir.mkdir()
+    return source, out_dir
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("parallel", [False, True])
+async def test_output_is_split_at_file_boundaries(
+    encoding, sized_tree, parallel, caplog
+):
+    """Each part stays under the budget unless a single file exceeds it."""
+    source, out_dir = sized_tree
+    output = out_dir / "bundle.txt"
+    budget = 1200
+    config = _make_config(
+        source, output, parallel=parallel, token_budget=budget, token_report=True
+    )
+    result = await FileCombiner(config, LoggerManager(config.logging)).run()
+
+    parts = result.output_parts
+    assert parts == [out_dir / f"bundle_part{n}.txt" for n in range(1, len(parts) + 1)]
+    assert not output.exists()
+    assert result.output_file == parts[0]
+
+    report = json.loads((out_dir / "bundle_tokens.json").read_text())
+    assert [part["path"] for part in report["parts"]] == [p.name for p in parts]
+    for part, path in zip(report["parts"], parts):
+        text = path.read_text(encoding="utf-8")
+        assert part["tokens"] == len(encoding.encode_ordinary(text))
+        assert part["bytes"] == path.stat().st_size
+        assert part["tokens"] <= budget or part["files"] == 1
+        # Files are never split across parts
+        assert text.count("======= ") == part["files"]
+
+    # Output that fits the budget keeps its name, stale parts are removed
+    config = _make_config(source, output, token_budget=10**6)
+    result = await FileCombiner(config, LoggerManager(config.logging)).run()
+    assert result.output_parts is None
+    assert output.exists()
+    assert not list(out_dir.glob("bundle_part*.txt"))
+
+
+@pytest.mark.asyncio
+async def test_indexes_follow_the_output_parts(encoding, sized_tree):
+    """Indexes of removed or renamed parts are removed with them."""
+    source, out_dir = sized_tree
+    output = out_dir / "bundle.txt"
+
+    async def run(**options):
+        config = _make_config(source, output, **options)
+        return await FileCombiner(config, LoggerManager(config.logging)).run()
+
+    def indexes():
+        return sorted(path.name for path in out_dir.glob(".*.m1f-index.json"))
+
+    await run(write_index=True)
+    assert indexes() == [".bundle.txt.m1f-index.json"]
+
+    result = await run(write_index=True, token_budget=1200)
+    assert indexes() == sorted(
+        f".{part.name}.m1f-index.json" for part in result.output_parts
+    )
+
+    await run(write_index=True, token_budget=10**6)
+    assert indexes() == [".bundle.txt.m1f-index.json"]
+
+    await run()
+    assert indexes() == []
+
+
+@pytest.mark.asyncio
+async def test_token_report(encoding, sized_tree):
+    """The report breaks tokens and bytes down by file and directory."""
+    source, out_dir = sized_tree
+    output = out_dir / "bundle.txt"
+    config = _make_config(source, output, token_report=True)
+    result = await FileCombiner(config, LoggerManager(config.logging)).run()
+
+    report = json.loads((out_dir / "bundle_tokens.json").read_text())
+    files = {entry["path"]: entry for entry in report["files"]}
+    directories = {entry["path"]: entry for entry in report["directories"]}
+
+    assert list(files) == ["README.md", "pkg/big.py", "pkg/small.py", "pkg/sub/mid.py"]
+    assert report["total"]["tokens"] == result.token_count
+    assert report["total"]["bytes"] == output.stat().st_size
+    assert report["parts"] == [{"path": "bundle.txt", **report["total"]}]
+    assert directories["pkg"] == {
+        "path": "pkg",
+        "files": 3,
+        "tokens": sum(
+            files[f"pkg/{name}"]["tokens"]
+            for name in ("big.py", "small.py", "sub/mid.py")
+        ),
+        "bytes": sum(
+            files[f"pkg/{name}"]["bytes"]
+            for name in ("big.py", "small.py", "sub/mid.py")
+        ),
+    }
+    assert directories["pkg/sub"]["files"] == 1
+    assert list(directories) == ["pkg", "pkg/sub"]
@@ -190,7 +190,7 @@ def run_s1f(monkeypatch, capture_logs):
     test_s1f_dir = str(Path(__file__).parent)
     if test_s1f_dir in sys.path:
         sys.path.remove(test_s1f_dir)
-    
+
     # Add tools directory to the beginning of the path
     if tools_dir in sys.path:
         sys.path.remove(tools_dir)
@@ -312,3 +312,77 @@ def create_m1f_output(temp_dir) -> Callable[[dict[str, str], str], Path]:
         return output_file
 
     return _create_output
+
+
+# Files of the mixed-style bundle and the separator style presets give them
+MIXED_STYLE_FILES = {
+    "README.md": "# Project\n\nSee the guide.\n",
+    "docs/guide.md": "# Guide\n\n- Run the app\n",
+    "src/app.py": "print('app')\n",
+    "src/util.py": "def util():\n    return 1\n",
+    "config/settings.json": '{"debug": true}\n',
+    "config/defaults.json": '{"debug": false}\n',
+    "notes.txt": "Some notes\n",
+    "todo.txt": "Nothing to do\n",
+}
+
+MIXED_STYLE_PRESETS = """
+mixed:
+  presets:
+    docs:
+      extensions: [".md"]
+      separator_style: "Markdown"
+    data:
+      extensions: [".json"]
+      separator_style: "MachineReadable"
+    text:
+      extensions: [".txt"]
+      separator_style: "Detailed"
+"""
+
+
+@pytest.fixture
+def mixed_style_bundle(temp_dir) -> Callable[..., tuple[Path, Path]]:
+    """
+    Create an m1f bundle whose presets give files different separator styles.
+
+    Files without a preset get the Standard style. Additional m1f options
+    can be passed. Returns the source directory and the bundle.
+    """
+
+    def _create(*options: str) -> tuple[Path, Path]:
+        import subprocess
+        import sys
+
+        source_dir = temp_dir / "mixed_source"
+        for filepath, content in MIXED_STYLE_FILES.items():
+            file_path = source_dir / filepath
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_text(content, encoding="utf-8")
+        preset_file = temp_dir / "mixed.m1f-presets.yml"
+        preset_file.write_text(MIXED_STYLE_PRESETS, encoding="utf-8")
+
+        output_file = temp_dir / "mixed_bundle.txt"
+        m1f_script = Path(__file__).parent.parent.parent / "tools" / "m1f.py"
+        subprocess.run(
+            [
+                sys.executable,
+                str(m1f_script),
+                "--source-directory",
+                str(source_dir),
+                "--output-file",
+                str(output_file),
+                "--separator-style",
+                "Standard",
+                "--preset",
+                str(preset_file),
+                "--minimal-output",
+                "--force",
+                "--quiet",
+                *options,
+            ],
+            check=True,
+        )
+        return source_dir, output_file
+
+    return _create
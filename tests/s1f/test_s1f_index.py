@@ -0,0 +1,164 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for extracting single files with the index m1f writes (--index)."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+M1F_SCRIPT = Path(__file__).parent.parent.parent / "tools" / "m1f.py"
+
+TEST_FILES = {
+    "src/app.py": "print('app')\n",
+    "src/util.py": "def util():\n    return 1\n",
+    "docs/guide.md": "# Guide\n\n```\n======= src/fake.py ======\n```\n",
+    "README.md": "# Project\n",
+}
+
+
+@pytest.fixture
+def indexed_bundle(temp_dir):
+    """Create an m1f bundle with an index in the given separator style."""
+
+    def _create(separator_style: str, *options: str) -> Path:
+        source_dir = temp_dir / "source"
+        for path, content in TEST_FILES.items():
+            (source_dir / path).parent.mkdir(parents=True, exist_ok=True)
+            (source_dir / path).write_text(content, encoding="utf-8")
+
+        output_file = temp_dir / f"bundle_{separator_style.lower()}.txt"
+        subprocess.run(
+            [
+                sys.executable,
+                str(M1F_SCRIPT),
+                "--source-directory",
+                str(source_dir),
+                "--output-file",
+                str(output_file),
+                "--separator-style",
+                separator_style,
+                "--index",
+                "--minimal-output",
+                "--force",
+                "--quiet",
+                *options,
+            ],
+            check=True,
+        )
+        assert (temp_dir / f".{output_file.name}.m1f-index.json").exists()
+        return output_file
+
+    return _create
+
+
+def _extracted(directory: Path) -> dict:
+    return {
+        path.relative_to(directory).as_posix(): path.read_text(encoding="utf-8")
+        for path in directory.rglob("*")
+        if path.is_file()
+    }
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize(
+    "separator_style", ["Standard", "Detailed", "Markdown", "MachineReadable"]
+)
+def test_only_reads_indexed_sections(
+    indexed_bundle, run_s1f, s1f_extracted_dir, separator_style
+):
+    """Files extracted through the index are the same as from a full parse."""
+    bundle = indexed_bundle(separator_style)
+    full_dir = s1f_extracted_dir / "full"
+    assert run_s1f([str(bundle), str(full_dir), "--force"])[0] == 0
+
+    only_dir = s1f_extracted_dir / "only"
+    exit_code, log = run_s1f(
+        [str(bundle), str(only_dir), "--force", "--only", "src/*", "-v"]
+    )
+
+    assert exit_code == 0
+    assert "Using index" in log
+    full = _extracted(full_dir)
+    assert _extracted(only_dir) == {
+        path: content for path, content in full.items() if path.startswith("src/")
+    }
+
+
+@pytest.mark.integration
+def test_indexed_sections_with_crlf_line_endings(
+    indexed_bundle, run_s1f, s1f_extracted_dir
+):
+    """Sections of bundles with CRLF line endings are read up to the next file."""
+    bundle = indexed_bundle("Standard", "--line-ending", "crlf")
+    full_dir = s1f_extracted_dir / "full"
+    assert run_s1f([str(bundle), str(full_dir), "--force"])[0] == 0
+
+    only_dir = s1f_extracted_dir / "only"
+    exit_code, log = run_s1f(
+        [str(bundle), str(only_dir), "--force", "--only", "*", "-v"]
+    )
+
+    assert exit_code == 0
+    assert "Using index" in log
+    full = {
+        path.relative_to(full_dir): path.read_bytes()
+        for path in full_dir.rglob("*")
+        if path.is_file()
+    }
+    assert len(full) == len(TEST_FILES)
+    assert {
+        path.relative_to(only_dir): path.read_bytes()
+        for path in only_dir.rglob("*")
+        if path.is_file()
+    } == full
+
+
+@pytest.mark.integration
+def test_outdated_index_falls_back_to_scanning(
+    indexed_bundle, run_s1f, s1f_extracted_dir
+):
+    """An index older than its bundle is ignored."""
+    bundle = indexed_bundle("Standard")
+    stat_result = bundle.stat()
+    os.utime(bundle, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10**9))
+
+    exit_code, log = run_s1f(
+        [str(bundle), str(s1f_extracted_dir), "--force", "--only", "*.md"]
+    )
+
+    assert exit_code == 0
+    assert "Ignoring outdated index" in log
+    assert _extracted(s1f_extracted_dir) == {
+        "README.md": TEST_FILES["README.md"],
+        "docs/guide.md": TEST_FILES["docs/guide.md"],
+    }
+
+
+@pytest.mark.integration
+def test_list_from_index(indexed_bundle, run_s1f, capsys):
+    """--list shows the indexed files without parsing the bundle."""
+    bundle = indexed_bundle("MachineReadable")
+
+    exit_code, _ = run_s1f([str(bundle), "--list", "--only", "src/*"])
+
+    assert exit_code == 0
+    output = capsys.readouterr().out
+    assert "src/app.py" in output and "src/util.py" in output
+    assert "README.md" not in output
@@ -0,0 +1,129 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for finding the separators of a combined file."""
+
+from __future__ import annotations
+
+import logging
+
+import pytest
+
+from tools.s1f.parsers import CombinedFileParser
+
+
+def _parse(content: str):
+    """Parse a bundle from its text and from its bytes."""
+    parser = CombinedFileParser(logging.getLogger(__name__))
+    parsed = parser.parse(content)
+    assert list(parser.iter_parse(content.encode("utf-8"))) == parsed
+    return parsed
+
+
+@pytest.mark.unit
+def test_other_separator_styles_in_content():
+    """Text that only starts like another style's separator doesn't split it."""
+    content = (
+        "======= notes.md ======\n"
+        "# Notes\n"
+        "## not/a/file.md\n"
+        "== FILE: also/not/a/file.txt\n"
+        "======= second.txt ======\n"
+        "second\n"
+    )
+
+    files = _parse(content)
+
+    assert [file.path for file in files] == ["notes.md", "second.txt"]
+    assert "## not/a/file.md" in files[0].content
+
+
+@pytest.mark.unit
+def test_separators_between_many_code_blocks():
+    """Separators inside any of many code blocks are skipped."""
+    blocks = "".join(f"```\n======= hidden{i}.txt ======\n```\n" for i in range(500))
+    content = f"======= first.md ======\n{blocks}======= second.txt ======\nsecond\n"
+
+    files = _parse(content)
+
+    assert [file.path for file in files] == ["first.md", "second.txt"]
+    assert files[0].content.count("hidden") == 500
+
+
+@pytest.mark.unit
+def test_separators_of_different_styles():
+    """Each separator is parsed with the parser of its own style."""
+    content = (
+        "## notes.md\n"
+        "**Date Modified:** 2024-01-01 00:00:00 | **Size:** 8 B | **Type:** .md\n"
+        "\n"
+        "```md\n"
+        "# Notes\n"
+        "```\n"
+        "\n"
+        "======= second.txt ======\n"
+        "second\n"
+    )
+
+    files = _parse(content)
+
+    assert [file.path for file in files] == ["notes.md", "second.txt"]
+    assert files[0].content == "# Notes\n"
+    assert files[1].content == "second\n"
+
+
+@pytest.mark.unit
+def test_other_style_inside_markdown_section():
+    """A Markdown file only ends at its closing fence and the blank line."""
+    content = (
+        "## guide.md\n"
+        "**Date Modified:** 2024-01-01 00:00:00 | **Size:** 8 B | **Type:** .md\n"
+        "\n"
+        "```md\n"
+        "```\n"
+        "======= not/a/file.py ======\n"
+        "```\n"
+        "```\n"
+        "\n"
+        "======= second.txt ======\n"
+        "second\n"
+    )
+
+    files = _parse(content)
+
+    assert [file.path for file in files] == ["guide.md", "second.txt"]
+    assert "======= not/a/file.py ======" in files[0].content
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("stream", [False, True])
+def test_mixed_style_bundle_round_trip(
+    mixed_style_bundle, run_s1f, s1f_extracted_dir, stream
+):
+    """Files that presets give different separator styles are all extracted."""
+    source_dir, bundle = mixed_style_bundle()
+    options = ["--stream"] if stream else []
+
+    exit_code, _ = run_s1f([str(bundle), str(s1f_extracted_dir), "--force", *options])
+
+    assert exit_code == 0
+    assert _files(s1f_extracted_dir) == _files(source_dir)
+
+
+def _files(directory):
+    return {
+        path.relative_to(directory).as_posix(): path.read_text(encoding="utf-8")
+        for path in directory.rglob("*")
+        if path.is_file()
+    }
@@ -0,0 +1,98 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for extracting memory-mapped bundles in stream mode."""
+
+from __future__ import annotations
+
+import logging
+
+import pytest
+
+from tools.s1f.parsers import CombinedFileParser
+
+TEST_FILES = {
+    "src/main.py": "#!/usr/bin/env python3\r\nprint('Hello')\r\n",
+    "docs/guide.md": "# Guide\n\n```\n======= not/a/separator.txt ======\n```\n",
+    "README.md": "# Projekt über alles\n",
+}
+
+
+def _parse_both(path, encoding="utf-8"):
+    """Parse a bundle from its decoded text and from its bytes."""
+    parser = CombinedFileParser(logging.getLogger(__name__))
+    with open(path, encoding=encoding) as f:
+        parsed = parser.parse(f.read())
+    streamed = list(parser.iter_parse(path.read_bytes(), encoding))
+    return parsed, streamed
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "separator_style", ["Standard", "Detailed", "Markdown", "MachineReadable"]
+)
+def test_streamed_files_match_parsed_files(create_combined_file, separator_style):
+    """Parsing the undecoded bundle gives the same files as parsing its text."""
+    combined_file = create_combined_file(TEST_FILES, separator_style)
+
+    parsed, streamed = _parse_both(combined_file)
+
+    assert streamed == parsed
+    # In Markdown bundles the fences of guide.md pair up with the bundle's own
+    if separator_style != "Markdown":
+        assert [file.path for file in streamed] == list(TEST_FILES)
+
+
+@pytest.mark.unit
+def test_streamed_latin1_bundle(temp_dir):
+    """Bundles that aren't UTF-8 are decoded as latin-1 like before."""
+    combined_file = temp_dir / "latin1.txt"
+    combined_file.write_bytes(
+        b"======= a.txt ======\r\ncaf\xe9\r\n======= b.txt ======\r\nend\r\n"
+    )
+
+    parsed, streamed = _parse_both(combined_file, "latin-1")
+
+    assert streamed == parsed
+    assert streamed[0].content == "café"
+
+
+@pytest.mark.integration
+def test_stream_option(run_s1f, create_combined_file, s1f_extracted_dir):
+    """--stream extracts every file from the mapped bundle."""
+    combined_file = create_combined_file(TEST_FILES, "MachineReadable")
+
+    exit_code, _ = run_s1f(
+        [str(combined_file), str(s1f_extracted_dir), "--force", "--stream"]
+    )
+
+    assert exit_code == 0
+    for filepath, content in TEST_FILES.items():
+        extracted = (s1f_extracted_dir / filepath).read_bytes().decode("utf-8")
+        assert extracted == content.replace("\r\n", "\n")
+
+
+@pytest.mark.unit
+def test_streamed_content_ends_at_end_marker(create_combined_file):
+    """A line that looks like a separator doesn't cut a file short."""
+    files = {
+        "notes.txt": "before\n======= x.txt ======\nafter\n",
+        "README.md": "# Readme\n",
+    }
+    combined_file = create_combined_file(files, "MachineReadable")
+
+    parsed, streamed = _parse_both(combined_file)
+
+    assert streamed == parsed
+    assert streamed[0].content.startswith(files["notes.txt"].rstrip("\n"))
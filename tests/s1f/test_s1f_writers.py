@@ -0,0 +1,167 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for writing extracted files."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from tools.s1f.config import Config
+from tools.s1f.models import ExtractedFile, FileMetadata
+from tools.s1f.utils import calculate_sha256
+from tools.s1f.writers import FileWriter
+
+
+def _file(path: str, content: str, checksum: str) -> ExtractedFile:
+    return ExtractedFile(
+        metadata=FileMetadata(
+            path=path, checksum_sha256=checksum, modified=datetime(2024, 1, 2, 3, 4)
+        ),
+        content=content,
+    )
+
+
+@pytest.mark.asyncio
+async def test_checksums_are_verified_without_reading_back(
+    temp_dir, monkeypatch, caplog
+):
+    """Written files are verified from their bytes and get their timestamps."""
+    config = Config(input_file=temp_dir / "unused.txt", destination_directory=temp_dir)
+    writer = FileWriter(config, logging.getLogger("s1f-test"))
+    files = [
+        _file("a/good.txt", "good\n", calculate_sha256(b"good\n")),
+        _file("a/bad.txt", "bad\n", calculate_sha256(b"other\n")),
+    ]
+
+    def no_reading(path, *args, **kwargs):
+        raise AssertionError(f"{path} was read back")
+
+    monkeypatch.setattr(Path, "read_bytes", no_reading)
+    with caplog.at_level(logging.DEBUG, logger="s1f-test"):
+        result = await writer.write_files(files)
+
+    assert result.files_created == 2
+    assert "Checksum VERIFIED for file" in caplog.text
+    assert caplog.text.count("CHECKSUM MISMATCH") == 1
+    modified = datetime(2024, 1, 2, 3, 4).timestamp()
+    assert (temp_dir / "a" / "good.txt").stat().st_mtime == modified
+    assert (temp_dir / "a" / "bad.txt").read_text() == "bad\n"
+
+
+@pytest.mark.asyncio
+async def test_files_are_taken_as_workers_free_up(temp_dir):
+    """Only as many files as queue and workers hold are extracted ahead."""
+    config = Config(
+        input_file=temp_dir / "unused.txt",
+        destination_directory=temp_dir,
+        force_overwrite=True,
+        jobs=2,
+    )
+    writer = FileWriter(config, logging.getLogger("s1f-test"))
+    written = []
+    write_bytes = writer._write_bytes
+
+    def record_write(path, *args):
+        checksum = write_bytes(path, *args)
+        written.append(path)
+        return checksum
+
+    writer._write_bytes = record_write
+    ahead = []
+
+    def extracted_files():
+        for i in range(50):
+            ahead.append(i - len(written))
+            yield _file(f"file{i}.txt", f"{i}\n", None)
+
+    result = await writer.write_files(extracted_files())
+
+    assert result.files_created == 50
+    assert len(written) == 50
+    assert max(ahead) <= 2 * config.jobs
+
+
+@pytest.mark.asyncio
+async def test_overwrites_are_confirmed_one_at_a_time(temp_dir, monkeypatch):
+    """Without force_overwrite a single writer thread asks before overwriting."""
+    for name in ("keep.txt", "replace.txt"):
+        (temp_dir / name).write_text("old\n")
+    config = Config(input_file=temp_dir / "unused.txt", destination_directory=temp_dir)
+    writer = FileWriter(config, logging.getLogger("s1f-test"))
+    threads = set()
+    write_bytes = writer._write_bytes
+
+    def record_thread(*args):
+        threads.add(threading.current_thread().name)
+        return write_bytes(*args)
+
+    writer._write_bytes = record_thread
+    answers = iter(["n", "y"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    files = [
+        _file(name, "new\n", None) for name in ("keep.txt", "replace.txt", "new.txt")
+    ]
+
+    result = await writer.write_files(files)
+
+    assert (result.files_overwritten, result.files_created) == (1, 1)
+    assert (temp_dir / "keep.txt").read_text() == "old\n"
+    assert (temp_dir / "replace.txt").read_text() == "new\n"
+    assert len(threads) == 1 and threads.pop().startswith("s1f-writer")
+
+    # Without a terminal to ask, existing files are kept
+    def no_terminal(prompt):
+        raise EOFError
+
+    monkeypatch.setattr("builtins.input", no_terminal)
+    result = await writer.write_files(files)
+    assert (result.files_overwritten, result.files_failed) == (0, 0)
+
+
+@pytest.mark.integration
+def test_durable_option(run_s1f, create_combined_file, s1f_extracted_dir, monkeypatch):
+    """--durable syncs every extracted file and directory once at the end."""
+    files = {"one.txt": "1\n", "sub/two.txt": "2\n", "sub/dir/three.txt": "3\n"}
+    combined_file = create_combined_file(files, "MachineReadable")
+    synced = []
+    fsync = os.fsync
+
+    def record_fsync(fd):
+        synced.append(os.fstat(fd).st_ino)
+        fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", record_fsync)
+
+    exit_code, _ = run_s1f(
+        [str(combined_file), str(s1f_extracted_dir), "--force", "--durable"]
+    )
+
+    assert exit_code == 0
+    for path, content in files.items():
+        assert (s1f_extracted_dir / path).read_text() == content
+    expected = [s1f_extracted_dir / path for path in files]
+    if hasattr(os, "O_DIRECTORY"):
+        expected += [
+            s1f_extracted_dir,
+            s1f_extracted_dir / "sub",
+            s1f_extracted_dir / "sub" / "dir",
+        ]
+    assert sorted(synced) == sorted(path.stat().st_ino for path in expected)
@@ -0,0 +1,158 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the benchmark suite in benchmarks/."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from benchmarks.baseline import Thresholds, compare, new_results
+from benchmarks.phases import PhaseTimer
+from benchmarks.scenarios import SCENARIOS
+
+REPO_ROOT = Path(__file__).parent.parent
+
+
+def _files(directory: Path) -> dict:
+    return {
+        path.relative_to(directory).as_posix(): (
+            path.read_bytes(),
+            path.stat().st_mtime,
+        )
+        for path in directory.rglob("*")
+        if path.is_file()
+    }
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("name", list(SCENARIOS))
+def test_trees_are_reproducible(tmp_path, name):
+    """The same scale and seed generate the same files."""
+    scenario = SCENARIOS[name]
+
+    first = scenario.generate(tmp_path / "first", scale=0.01)
+    second = scenario.generate(tmp_path / "second", scale=0.01)
+    other_seed = scenario.generate(tmp_path / "other", scale=0.01, seed=2)
+
+    assert first == second
+    assert first["files"] == len(_files(tmp_path / "first" / "source"))
+    assert _files(tmp_path / "first") == _files(tmp_path / "second")
+    assert other_seed["sha256"] != first["sha256"]
+
+
+def _results(total, phases, peak_rss_mb, files=10):
+    results = new_results(scale=1.0, seed=1)
+    tool_result = {
+        "total": total,
+        "phases": phases,
+        "files": files,
+        "peak_rss_mb": peak_rss_mb,
+    }
+    results["scenarios"]["many-small"] = {
+        "tree": {"files": 10, "bytes": 100, "sha256": "abc"},
+        "m1f": tool_result,
+        "s1f": tool_result,
+    }
+    return results
+
+
+@pytest.mark.unit
+def test_compare_thresholds():
+    """Results regress beyond the relative thresholds and minimum amounts."""
+    baseline = _results(2.0, {"gather": 0.01, "write": 1.0, "token_count": 0.5}, 100.0)
+    current = _results(2.4, {"gather": 0.04, "write": 1.3}, 120.0, files=9)
+
+    comparisons, warnings = compare(baseline, current, Thresholds())
+
+    regressed = {(c.tool, c.metric) for c in comparisons if c.regressed}
+    # total +20% is within 25%, gather +300% is only 30 ms
+    assert regressed == {
+        ("m1f", "write"),
+        ("m1f", "peak_rss_mb"),
+        ("s1f", "write"),
+        ("s1f", "peak_rss_mb"),
+    }
+    assert "many-small: m1f token_count is only measured in the baseline" in warnings
+    assert "many-small: m1f handled 9 files, 10 in the baseline" in warnings
+
+    comparisons, _ = compare(baseline, current, Thresholds(time=0.5, memory=0.25))
+    assert not any(c.regressed for c in comparisons)
+
+    other_scale = _results(2.0, {}, 100.0)
+    other_scale["scale"] = 0.5
+    with pytest.raises(ValueError, match="scale"):
+        compare(baseline, other_scale)
+
+
+@pytest.mark.unit
+def test_timer_rejects_unknown_methods():
+    """A renamed method fails the benchmark instead of dropping its phase."""
+
+    class Worker:
+        def work(self):
+            return "done"
+
+    timer = PhaseTimer()
+    timer.patch(Worker, "work", "working")
+
+    assert Worker().work() == "done"
+    assert "working" in timer.times
+    with pytest.raises(RuntimeError, match="Worker.missing"):
+        timer.patch(Worker, "missing", "working")
+
+
+def _run_benchmarks(*args):
+    return subprocess.run(
+        [sys.executable, "-m", "benchmarks", "--scale", "0.01", *args],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+
+
+@pytest.mark.integration
+def test_baseline_round_trip(tmp_path):
+    """The first run stores the baseline and later runs are compared to it."""
+    baseline_path = tmp_path / "baseline.json"
+    scenario = ["--scenario", "heavy-presets"]
+
+    result = _run_benchmarks(*scenario, "--baseline", str(baseline_path))
+    assert result.returncode == 0, result.stderr
+    assert "nothing was compared" in result.stdout
+    baseline = json.loads(baseline_path.read_text())
+    measured = baseline["scenarios"]["heavy-presets"]
+    assert measured["m1f"]["files"] == measured["tree"]["files"]
+    assert {"gather", "read_decode", "presets", "write", "archive"} <= set(
+        measured["m1f"]["phases"]
+    )
+    assert {"read", "parse", "write"} <= set(measured["s1f"]["phases"])
+
+    # Generous thresholds, as only the code paths are tested here
+    thresholds = ["--time-threshold", "1000", "--memory-threshold", "1000"]
+    result = _run_benchmarks(*scenario, "--baseline", str(baseline_path), *thresholds)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "No regressions" in result.stdout
+
+    measured["m1f"]["total"] = 0.001
+    baseline_path.write_text(json.dumps(baseline))
+    result = _run_benchmarks(*scenario, "--baseline", str(baseline_path), *thresholds)
+    assert result.returncode == 1
+    assert "heavy-presets m1f total" in result.stderr
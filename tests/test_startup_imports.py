@@ -0,0 +1,137 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests that the command line tools start without loading what they don't need.
+
+The tools run from git hooks on every commit, so --help, listing a bundle and
+runs with nothing to do must not import the heavy optional dependencies or
+the parts of the tools that do the actual work. The imported modules are
+taken from ``python -X importtime``, which lists every module a run imports.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Set
+
+import pytest
+
+TOOLS_DIR = Path(__file__).parent.parent / "tools"
+
+# Optional dependencies that take long to import
+HEAVY_DEPENDENCIES = {
+    "aiohttp",
+    "bs4",
+    "chardet",
+    "detect_secrets",
+    "pydantic",
+    "rich",
+    "tiktoken",
+}
+
+
+def _imported_modules(args, cwd: Path | None = None) -> Set[str]:
+    """Run a tool and return the names of all modules it imported."""
+    env = dict(os.environ, PYTHONPATH=str(TOOLS_DIR))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+        env=env,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return {
+        line.rsplit("|", 1)[1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and line.count("|") == 2
+    }
+
+
+def _loaded(modules: Set[str], names: Set[str]) -> Set[str]:
+    """The modules of ``modules`` that are one of ``names`` or inside one."""
+    return {
+        module
+        for module in modules
+        if module in names or module.split(".", 1)[0] in names
+    }
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize(
+    "args, not_loaded",
+    [
+        (
+            [str(TOOLS_DIR / "m1f.py"), "--help"],
+            {"asyncio", "yaml", "m1f.core", "m1f.presets"},
+        ),
+        (
+            [str(TOOLS_DIR / "m1f.py"), "auto-bundle", "--help"],
+            {"asyncio", "yaml", "m1f.auto_bundle", "m1f.core"},
+        ),
+        (
+            [str(TOOLS_DIR / "s1f.py"), "--help"],
+            {"asyncio", "aiofiles", "s1f.core"},
+        ),
+        ([str(TOOLS_DIR / "token_counter.py"), "--help"], {"asyncio"}),
+        (["-m", "html2md_tool", "--help"], {"html2md_tool.api"}),
+        (["-m", "scrape_tool", "--help"], {"scrape_tool.crawlers"}),
+    ],
+    ids=["m1f", "m1f-update", "s1f", "token-counter", "html2md", "scrape"],
+)
+def test_help_imports(args, not_loaded):
+    """--help only imports the argument parsing of a tool."""
+    modules = _imported_modules(args)
+
+    assert not _loaded(modules, HEAVY_DEPENDENCIES | not_loaded)
+
+
+@pytest.mark.integration
+def test_list_imports(tmp_path):
+    """Listing a bundle doesn't import m1f's bundling code."""
+    bundle = tmp_path / "bundle.txt"
+    bundle.write_text("======= a.txt ======\nfirst\n======= b.txt ======\nsecond\n")
+
+    modules = _imported_modules([str(TOOLS_DIR / "s1f.py"), str(bundle), "--list"])
+
+    assert "s1f.core" in modules
+    assert not _loaded(
+        modules, HEAVY_DEPENDENCIES | {"m1f.core", "m1f.security_scanner"}
+    )
+
+
+@pytest.mark.integration
+def test_unchanged_update_imports(tmp_path):
+    """m1f-update doesn't load the scanners when no bundle changed."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.py").write_text("print('main')\n")
+    (tmp_path / ".m1f.config.yml").write_text(
+        "bundles:\n"
+        "  src:\n"
+        '    output: "m1f/src.txt"\n'
+        "    sources:\n"
+        '      - path: "src"\n'
+    )
+    update = [str(TOOLS_DIR / "m1f_update.py"), "--quiet"]
+    _imported_modules(update, cwd=tmp_path)
+    assert (tmp_path / "m1f" / "src.txt").exists()
+
+    modules = _imported_modules(update, cwd=tmp_path)
+
+    assert "m1f.core" in modules
+    assert not _loaded(modules, HEAVY_DEPENDENCIES)
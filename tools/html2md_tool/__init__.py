@@ -5,30 +5,51 @@ A powerful, modular tool for converting HTML content to Markdown format,
 optimized for processing entire websites and integration with m1f.
 """
 
-# Get version from package metadata
+# Get version from the shared version file like the other tools, falling
+# back to the package metadata (importlib.metadata is slow to import)
 try:
-    from importlib.metadata import version
+    from _version import __version__, __version_info__
+except ImportError:
+    try:
+        from importlib.metadata import version
 
-    __version__ = version("m1f")
-    __version_info__ = tuple(int(x) for x in __version__.split(".")[:3])
-except Exception:
-    # During development, version might not be available
-    __version__ = "dev"
-    __version_info__ = (0, 0, 0)
+        __version__ = version("m1f")
+        __version_info__ = tuple(int(x) for x in __version__.split(".")[:3])
+    except Exception:
+        # During development, version might not be available
+        __version__ = "dev"
+        __version_info__ = (0, 0, 0)
 
 __author__ = "Franz und Franz (https://franz.agency)"
 
-from html2md_tool.api import Html2mdConverter
-from html2md_tool.config import Config, ConversionOptions
-from html2md_tool.core import HTMLParser, MarkdownConverter
-from html2md_tool.utils import (
-    convert_html,
-    adjust_internal_links,
-    extract_title_from_html,
-)
-
-# Alias for backward compatibility
-HTML2MDConverter = Html2mdConverter
+# The exports are imported on first access, so that running the CLI (e.g.
+# --help) doesn't load the HTML parsers before they are needed
+_LAZY_EXPORTS = {
+    "Html2mdConverter": ("html2md_tool.api", "Html2mdConverter"),
+    # Alias for backward compatibility
+    "HTML2MDConverter": ("html2md_tool.api", "Html2mdConverter"),
+    "Config": ("html2md_tool.config", "Config"),
+    "ConversionOptions": ("html2md_tool.config", "ConversionOptions"),
+    "HTMLParser": ("html2md_tool.core", "HTMLParser"),
+    "MarkdownConverter": ("html2md_tool.core", "MarkdownConverter"),
+    "convert_html": ("html2md_tool.utils", "convert_html"),
+    "adjust_internal_links": ("html2md_tool.utils", "adjust_internal_links"),
+    "extract_title_from_html": ("html2md_tool.utils", "extract_title_from_html"),
+}
+
+
+def __getattr__(name):
+    """Import the exports in _LAZY_EXPORTS when they are first accessed."""
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    import importlib
+
+    module_name, attribute = _LAZY_EXPORTS[name]
+    value = getattr(importlib.import_module(module_name), attribute)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "Html2mdConverter",
@@ -43,9 +43,7 @@ from shared.colors import (
 )
 from shared.cli import CustomArgumentParser
 from html2md_tool import __version__
-from html2md_tool.api import Html2mdConverter
 from html2md_tool.config import Config, OutputFormat
-from html2md_tool.claude_runner import ClaudeRunner
 
 
 def create_parser() -> CustomArgumentParser:
@@ -368,7 +366,10 @@ def handle_convert(args: argparse.Namespace) -> None:
     config.quiet = args.quiet
     config.log_file = args.log_file
 
-    # Create converter
+    # Create converter (the converter loads the HTML parsers, so it is only
+    # imported when something is converted)
+    from html2md_tool.api import Html2mdConverter
+
     extractor = args.extractor if hasattr(args, "extractor") else None
     converter = Html2mdConverter(config, extractor=extractor)
 
@@ -1501,6 +1502,7 @@ def main() -> None:
 
         if args.source_dir and args.destination_dir:
             # Simple conversion mode
+            from html2md_tool.api import Html2mdConverter
             from html2md_tool.config import ConversionOptions
 
             options = ConversionOptions(
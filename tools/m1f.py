@@ -29,10 +29,10 @@ This is a refactored version using modern Python best practices:
 - Structured logging
 """
 
-import asyncio
+import argparse
 import sys
 from pathlib import Path
-from typing import NoReturn
+from typing import List, NoReturn
 import os
 
 # Use unified colorama module
@@ -42,22 +42,18 @@ except ImportError:
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from shared.colors import Colors, ColoredHelpFormatter, warning, error, info
 
-# Try absolute imports first (for module execution), fall back to relative
+# Try absolute imports first (for module execution), fall back to relative.
+# The rest of m1f is imported once the arguments are parsed, so that --help
+# and invalid arguments don't have to wait for it.
 try:
     from m1f.cli import create_parser, parse_args
-    from m1f.config import Config
-    from m1f.core import FileCombiner
+    from m1f.constants import DEFAULT_DEBOUNCE
     from m1f.exceptions import M1FError
-    from m1f.logging import setup_logging, get_logger
-    from m1f.auto_bundle import AutoBundler
 except ImportError:
     # Fallback for direct script execution
     from m1f.cli import create_parser, parse_args
-    from m1f.config import Config
-    from m1f.core import FileCombiner
+    from m1f.constants import DEFAULT_DEBOUNCE
     from m1f.exceptions import M1FError
-    from m1f.logging import setup_logging, get_logger
-    from m1f.auto_bundle import AutoBundler
 
 
 try:
@@ -71,44 +67,87 @@ __author__ = "Franz und Franz (https://franz.agency)"
 __project__ = "https://m1f.dev"
 
 
-async def async_main() -> int:
-    """Async main function for the application."""
+def parse_auto_bundle_args(argv: List[str]) -> argparse.Namespace:
+    """Parse the arguments of the auto-bundle subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="m1f auto-bundle",
+        description="Auto-bundle functionality for m1f",
+        formatter_class=ColoredHelpFormatter,
+    )
+    parser.add_argument(
+        "bundle_name", nargs="?", help="Name of specific bundle to create"
+    )
+    parser.add_argument("--list", action="store_true", help="List available bundles")
+    parser.add_argument(
+        "--group",
+        "-g",
+        type=str,
+        help="Only create bundles from specified group",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Enable verbose output"
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="Suppress all console output"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        metavar="N",
+        help="Number of bundles created at the same time (default: up to 4)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and rebuild bundles whose files change",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        metavar="SECONDS",
+        help=f"Wait for changes to settle before rebuilding (default: {DEFAULT_DEBOUNCE})",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Watch by polling instead of inotify (e.g. on network drives)",
+    )
+
+    args = parser.parse_args(argv)
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.debounce < 0:
+        parser.error("--debounce must not be negative")
+    return args
+
+
+async def async_main(args: argparse.Namespace, auto_bundle: bool = False) -> int:
+    """Async main function for the application.
+
+    Args:
+        args: Parsed command line arguments
+        auto_bundle: Whether these are the arguments of the auto-bundle subcommand
+    """
     try:
-        # Check if we're running auto-bundle command
-        if len(sys.argv) > 1 and sys.argv[1] == "auto-bundle":
-            # Handle auto-bundle subcommand
-            import argparse
-
-            parser = argparse.ArgumentParser(
-                prog="m1f auto-bundle",
-                description="Auto-bundle functionality for m1f",
-                formatter_class=ColoredHelpFormatter,
-            )
-            parser.add_argument(
-                "bundle_name", nargs="?", help="Name of specific bundle to create"
-            )
-            parser.add_argument(
-                "--list", action="store_true", help="List available bundles"
-            )
-            parser.add_argument(
-                "--group",
-                "-g",
-                type=str,
-                help="Only create bundles from specified group",
-            )
-            parser.add_argument(
-                "-v", "--verbose", action="store_true", help="Enable verbose output"
-            )
-            parser.add_argument(
-                "-q", "--quiet", action="store_true", help="Suppress all console output"
+        if auto_bundle:
+            from m1f.auto_bundle import AutoBundler
+
+            # Create and run auto-bundler
+            bundler = AutoBundler(
+                Path.cwd(), verbose=args.verbose, quiet=args.quiet, jobs=args.jobs
             )
+            if args.watch and not args.list:
+                from m1f.bundle_watcher import BundleWatcher
 
-            # Parse auto-bundle args
-            args = parser.parse_args(sys.argv[2:])
+                watcher = BundleWatcher(
+                    bundler, debounce=args.debounce, polling=args.poll
+                )
+                success = await watcher.run(args.bundle_name, args.group)
+                return 0 if success else 1
 
-            # Create and run auto-bundler
-            bundler = AutoBundler(Path.cwd(), verbose=args.verbose, quiet=args.quiet)
-            success = bundler.run(
+            success = await bundler.run_async(
                 bundle_name=args.bundle_name,
                 list_bundles=args.list,
                 bundle_group=args.group,
@@ -116,9 +155,9 @@ async def async_main() -> int:
             return 0 if success else 1
 
         # Regular m1f execution
-        # Parse command line arguments
-        parser = create_parser()
-        args = parse_args(parser)
+        from m1f.config import Config
+        from m1f.core import FileCombiner
+        from m1f.logging import setup_logging, get_logger
 
         # Create configuration from arguments
         try:
@@ -160,12 +199,16 @@ async def async_main() -> int:
 
     except M1FError as e:
         # Our custom exceptions
+        from m1f.logging import get_logger
+
         logger = get_logger(__name__)
         logger.error(f"{e.__class__.__name__}: {e}")
         return e.exit_code
 
     except Exception as e:
         # Unexpected errors
+        from m1f.logging import get_logger
+
         logger = get_logger(__name__)
         logger.critical(f"Unexpected error: {e}", exc_info=True)
         return 1
@@ -173,12 +216,28 @@ async def async_main() -> int:
 
 def main() -> NoReturn:
     """Entry point for the application."""
+    # The arguments are parsed before asyncio and the rest of m1f are
+    # imported, so that --help and invalid arguments return right away
+    auto_bundle = len(sys.argv) > 1 and sys.argv[1] == "auto-bundle"
+    if auto_bundle:
+        args = parse_auto_bundle_args(sys.argv[2:])
+    else:
+        args = parse_args(create_parser())
+
+    import asyncio
+
     # Set Windows-specific event loop policy to avoid debug messages
     if sys.platform.startswith("win"):
         # This prevents "RuntimeError: Event loop is closed" messages on Windows
         asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
-    exit_code = asyncio.run(async_main())
+    try:
+        exit_code = asyncio.run(async_main(args, auto_bundle))
+    except KeyboardInterrupt:
+        # Raised by asyncio.run() when Ctrl+C cancels a running task,
+        # e.g. in watch mode
+        warning("\nOperation cancelled by user.")
+        exit_code = 130
     sys.exit(exit_code)
 
 
@@ -4,31 +4,52 @@ m1f - Make One File
 A modern Python tool to combine multiple text files into a single output file.
 """
 
-# Get version from package metadata
+# Get version from the shared version file like the other tools, falling
+# back to the package metadata (importlib.metadata is slow to import)
 try:
-    from importlib.metadata import version
+    from _version import __version__, __version_info__
+except ImportError:
+    try:
+        from importlib.metadata import version
 
-    __version__ = version("m1f")
-    __version_info__ = tuple(int(x) for x in __version__.split(".")[:3])
-except Exception:
-    # During development, version might not be available
-    __version__ = "dev"
-    __version_info__ = (0, 0, 0)
+        __version__ = version("m1f")
+        __version_info__ = tuple(int(x) for x in __version__.split(".")[:3])
+    except Exception:
+        # During development, version might not be available
+        __version__ = "dev"
+        __version_info__ = (0, 0, 0)
 
 __author__ = "Franz und Franz (https://franz.agency)"
 __project__ = "https://m1f.dev"
 
-# Import classes and functions for test compatibility
-from .config import Config
-from .logging import LoggerManager
-from .security_scanner import SecurityScanner
-from .file_processor import FileProcessor
-
 # Import safe file operations
 from .file_operations import (
     safe_exists,
 )
 
+# Classes kept here for test compatibility. They are imported on first access,
+# so that importing a single submodule (e.g. m1f.file_operations from another
+# tool) doesn't load all of m1f and its optional dependencies.
+_LAZY_ATTRIBUTES = {
+    "Config": ".config",
+    "LoggerManager": ".logging",
+    "SecurityScanner": ".security_scanner",
+    "FileProcessor": ".file_processor",
+}
+
+
+def __getattr__(name):
+    """Import the classes in _LAZY_ATTRIBUTES when they are first accessed."""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    import importlib
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
 
 # Backward compatibility functions for tests
 def _scan_files_for_sensitive_info(files_to_process):
@@ -38,6 +59,7 @@ def _scan_files_for_sensitive_info(files_to_process):
 
     # Create basic config for scanning
     from .config import (
+        Config,
         FilterConfig,
         OutputConfig,
         EncodingConfig,
@@ -47,6 +69,8 @@ def _scan_files_for_sensitive_info(files_to_process):
         SecurityCheckMode,
         PresetConfig,
     )
+    from .logging import LoggerManager
+    from .security_scanner import SecurityScanner
 
     config = Config(
         source_directories=[Path(".")],
@@ -83,6 +107,7 @@ def _detect_symlink_cycles(path):
     """Legacy function for backward compatibility with tests."""
     from pathlib import Path
     from .config import (
+        Config,
         FilterConfig,
         OutputConfig,
         EncodingConfig,
@@ -91,6 +116,8 @@ def _detect_symlink_cycles(path):
         LoggingConfig,
         PresetConfig,
     )
+    from .file_processor import FileProcessor
+    from .logging import LoggerManager
 
     # Create basic config
     config = Config(
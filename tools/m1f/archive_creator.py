@@ -14,120 +14,352 @@
 
 """
 Archive creator module for creating backup archives of processed files.
+
+Archives are filled while the bundle is written: the writer hands every file
+to an ArchiveStream right after it was read, and a background thread adds it
+to the archive. ZIP entries are deflated by that thread as they are written.
+Tar archives are compressed as one stream with gzip, xz or zstd; zstd uses its
+own worker threads.
 """
 
 from __future__ import annotations
 
 import asyncio
+import io
+import os
 import tarfile
+import threading
 import zipfile
+from collections import deque
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import TYPE_CHECKING, Deque, Dict, Iterator, List, Optional, Tuple
 
 from .config import Config, ArchiveType
 from .exceptions import ArchiveError
-from .logging import LoggerManager
-from .file_operations import (
-    safe_exists,
-)
+from .logging import LoggerManager, get_logger
 
+if TYPE_CHECKING:
+    from .loaded_file import LoadedFile
 
-class ArchiveCreator:
-    """Handles creation of backup archives."""
+# Try to import zstandard for .tar.zst archives
+try:
+    import zstandard
 
-    def __init__(self, config: Config, logger_manager: LoggerManager):
-        self.config = config
-        self.logger = logger_manager.get_logger(__name__)
+    ZSTANDARD_AVAILABLE = True
+except ImportError:
+    ZSTANDARD_AVAILABLE = False
 
-    async def create_archive(
-        self, output_path: Path, files_to_process: List[Tuple[Path, str]]
-    ) -> Optional[Path]:
-        """Create an archive of all processed files."""
-        if not self.config.archive.create_archive:
-            return None
+# File name suffix per archive type
+ARCHIVE_SUFFIXES: Dict[ArchiveType, str] = {
+    ArchiveType.ZIP: ".zip",
+    ArchiveType.TAR_GZ: ".tar.gz",
+    ArchiveType.TAR_XZ: ".tar.xz",
+    ArchiveType.TAR_ZST: ".tar.zst",
+}
 
-        if not files_to_process:
-            self.logger.info("No files to archive")
-            return None
+# Valid compression levels per archive type: (lowest, highest, default)
+COMPRESSION_LEVELS: Dict[ArchiveType, Tuple[int, int, int]] = {
+    ArchiveType.ZIP: (0, 9, 6),
+    ArchiveType.TAR_GZ: (0, 9, 9),
+    ArchiveType.TAR_XZ: (0, 9, 6),
+    ArchiveType.TAR_ZST: (1, 22, 3),
+}
 
-        # Determine archive path
-        base_name = output_path.stem
-        archive_suffix = (
-            ".zip" if self.config.archive.archive_type == ArchiveType.ZIP else ".tar.gz"
-        )
-        archive_path = output_path.with_name(f"{base_name}_backup{archive_suffix}")
+# File contents queued for the archive before add() waits for the writer
+MAX_PENDING_BYTES = 64 * 1024 * 1024
 
-        self.logger.info(
-            f"Creating {self.config.archive.archive_type.value} archive at: {archive_path}"
-        )
 
-        try:
-            if self.config.archive.archive_type == ArchiveType.ZIP:
-                await self._create_zip_archive(archive_path, files_to_process)
-            else:
-                await self._create_tar_archive(archive_path, files_to_process)
+def default_archive_threads() -> int:
+    """Number of compression threads used when none are configured."""
+    return min(8, os.cpu_count() or 1)
 
-            self.logger.info(
-                f"Successfully created archive with {len(files_to_process)} file(s)"
-            )
 
-            return archive_path
+# A queued file: path, archive name, queued bytes and the data, if it was
+# already read
+_QueuedFile = Tuple[Path, str, int, Optional[bytes]]
 
-        except Exception as e:
-            raise ArchiveError(f"Failed to create archive: {e}")
 
-    async def _create_zip_archive(
-        self, archive_path: Path, files: List[Tuple[Path, str]]
+class ArchiveStream:
+    """
+    Archive that is written on a background thread while files are added.
+
+    Files are added in the order they should appear in the archive. At most
+    ``max_pending_bytes`` of file contents wait for the writer; add() blocks
+    beyond that. Errors of the writer thread are raised by add() and close().
+    """
+
+    def __init__(
+        self,
+        archive_path: Path,
+        archive_type: ArchiveType,
+        level: Optional[int] = None,
+        threads: int = 0,
+        logger=None,
+        abort_on_error: bool = False,
+        verbose: bool = False,
+        max_pending_bytes: int = MAX_PENDING_BYTES,
+    ):
+        self.archive_path = archive_path
+        self.archive_type = archive_type
+        self.level = level if level is not None else COMPRESSION_LEVELS[archive_type][2]
+        self.threads = threads or default_archive_threads()
+        self.logger = logger or get_logger(__name__)
+        self.abort_on_error = abort_on_error
+        self.verbose = verbose
+        self.max_pending_bytes = max_pending_bytes
+        self.files_added = 0
+
+        self._queue: Deque[_QueuedFile] = deque()
+        self._pending_bytes = 0
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._condition = threading.Condition()
+
+        self._thread = threading.Thread(
+            target=self._run, name="m1f-archive", daemon=True
+        )
+        self._thread.start()
+
+    def add(
+        self, file_path: Path, rel_path: str, loaded: Optional["LoadedFile"] = None
     ) -> None:
-        """Create a ZIP archive."""
+        """Queue a file for the archive.
 
-        def _write_zip():
-            with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as zf:
-                for file_path, rel_path in files:
-                    if self.config.logging.verbose:
-                        self.logger.debug(f"Adding to zip: {file_path} as {rel_path}")
+        Args:
+            file_path: Path of the file
+            rel_path: Name of the file in the archive
+            loaded: The file's content if it was already read, otherwise it
+                is read from disk by the archive threads
+        """
+        data = loaded.data if loaded is not None else None
+        size = len(data) if data is not None else 0
+        with self._condition:
+            while (
+                self._error is None
+                and self._pending_bytes
+                and self._pending_bytes + size > self.max_pending_bytes
+            ):
+                self._condition.wait()
+            self._raise_error()
 
-                    # Skip if file doesn't exist
-                    if not safe_exists(file_path, logger=self.logger):
-                        self.logger.warning(f"File not found, skipping: {file_path}")
-                        continue
+            self._queue.append((file_path, rel_path, size, data))
+            self._pending_bytes += size
+            self._condition.notify_all()
+
+    def close(self) -> int:
+        """Write all queued files, close the archive and return the file count.
+
+        Raises:
+            ArchiveError: If the archive could not be written
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        if self._error is not None:
+            self._remove_archive()
+        self._raise_error()
+        return self.files_added
+
+    def abort(self) -> None:
+        """Stop writing and remove the incomplete archive."""
+        with self._condition:
+            self._closed = True
+            self._queue.clear()
+            self._pending_bytes = 0
+            self._condition.notify_all()
+        self._thread.join()
+        self._remove_archive()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise ArchiveError(f"Failed to create archive: {self._error}")
 
-                    # Add file to archive
+    def _remove_archive(self) -> None:
+        try:
+            self.archive_path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.warning(f"Could not remove archive {self.archive_path}: {e}")
+
+    def _next_file(self) -> Optional[_QueuedFile]:
+        with self._condition:
+            while not self._queue and not self._closed:
+                self._condition.wait()
+            return self._queue.popleft() if self._queue else None
+
+    def _run(self) -> None:
+        """Writer thread: add queued files to the archive in order."""
+        try:
+            with self._open_archive() as write_entry:
+                while True:
+                    queued = self._next_file()
+                    if queued is None:
+                        break
+                    file_path, rel_path, size, data = queued
                     try:
-                        zf.write(file_path, arcname=rel_path)
+                        if self.verbose:
+                            self.logger.debug(
+                                f"Adding to {self.archive_type.value}: "
+                                f"{file_path} as {rel_path}"
+                            )
+                        write_entry(file_path, rel_path, data)
+                        self.files_added += 1
+                    except FileNotFoundError:
+                        self.logger.warning(f"File not found, skipping: {file_path}")
                     except Exception as e:
-                        self.logger.error(f"Error adding {file_path} to zip: {e}")
-                        if self.config.encoding.abort_on_error:
+                        self.logger.error(
+                            f"Error adding {file_path} to "
+                            f"{self.archive_type.value}: {e}"
+                        )
+                        if self.abort_on_error:
                             raise
+                    finally:
+                        with self._condition:
+                            self._pending_bytes -= size
+                            self._condition.notify_all()
+        except BaseException as e:
+            with self._condition:
+                self._error = e
+                self._queue.clear()
+                self._pending_bytes = 0
+                self._condition.notify_all()
 
-        # Run in thread pool to avoid blocking
-        await asyncio.to_thread(_write_zip)
+    @contextmanager
+    def _open_archive(self) -> Iterator:
+        """Open the archive, yielding a function that writes one entry."""
+        if self.archive_type == ArchiveType.ZIP:
+            with zipfile.ZipFile(
+                self.archive_path, "w", zipfile.ZIP_DEFLATED, compresslevel=self.level
+            ) as zf:
 
-    async def _create_tar_archive(
-        self, archive_path: Path, files: List[Tuple[Path, str]]
-    ) -> None:
-        """Create a TAR.GZ archive."""
-
-        def _write_tar():
-            with tarfile.open(archive_path, "w:gz") as tf:
-                for file_path, rel_path in files:
-                    if self.config.logging.verbose:
-                        self.logger.debug(
-                            f"Adding to tar.gz: {file_path} as {rel_path}"
+                def write_zip_entry(file_path, rel_path, data):
+                    # write() streams the file from disk in chunks
+                    if data is None:
+                        zf.write(file_path, arcname=rel_path)
+                    else:
+                        zf.writestr(
+                            zipfile.ZipInfo.from_file(file_path, rel_path),
+                            data,
+                            compress_type=zipfile.ZIP_DEFLATED,
+                            compresslevel=self.level,
                         )
 
-                    # Skip if file doesn't exist
-                    if not safe_exists(file_path, logger=self.logger):
-                        self.logger.warning(f"File not found, skipping: {file_path}")
-                        continue
+                yield write_zip_entry
+            return
 
-                    # Add file to archive
-                    try:
-                        tf.add(file_path, arcname=rel_path)
-                    except Exception as e:
-                        self.logger.error(f"Error adding {file_path} to tar.gz: {e}")
-                        if self.config.encoding.abort_on_error:
-                            raise
+        if self.archive_type == ArchiveType.TAR_ZST:
+            compressor = zstandard.ZstdCompressor(
+                level=self.level, threads=self.threads if self.threads > 1 else 0
+            )
+            with open(self.archive_path, "wb") as raw:
+                with compressor.stream_writer(raw, closefd=False) as compressed:
+                    # Stream mode, the compressed file can't seek
+                    with tarfile.open(fileobj=compressed, mode="w|") as tf:
+                        yield lambda *entry: self._write_tar_entry(tf, *entry)
+            return
+
+        if self.archive_type == ArchiveType.TAR_XZ:
+            tf = tarfile.open(self.archive_path, "w:xz", preset=self.level)
+        else:
+            tf = tarfile.open(self.archive_path, "w:gz", compresslevel=self.level)
+        with tf:
+            yield lambda *entry: self._write_tar_entry(tf, *entry)
+
+    @staticmethod
+    def _write_tar_entry(
+        tf: tarfile.TarFile, file_path: Path, rel_path: str, data: Optional[bytes]
+    ) -> None:
+        # Symlinks are archived as links, like TarFile.add() does
+        tarinfo = tf.gettarinfo(str(file_path), arcname=rel_path)
+        if not tarinfo.isreg():
+            tf.addfile(tarinfo)
+        elif data is None:
+            with open(file_path, "rb") as f:
+                tf.addfile(tarinfo, f)
+        else:
+            tarinfo.size = len(data)
+            tf.addfile(tarinfo, io.BytesIO(data))
+
+
+class ArchiveCreator:
+    """Handles creation of backup archives."""
+
+    def __init__(self, config: Config, logger_manager: LoggerManager):
+        self.config = config
+        self.logger = logger_manager.get_logger(__name__)
+
+    def archive_path_for(self, output_path: Path) -> Path:
+        """Path of the backup archive that belongs to an output file."""
+        suffix = ARCHIVE_SUFFIXES[self.config.archive.archive_type]
+        return output_path.with_name(f"{output_path.stem}_backup{suffix}")
+
+    def open_stream(self, output_path: Path) -> ArchiveStream:
+        """Start an archive that is filled while the output is written."""
+        archive_path = self.archive_path_for(output_path)
+        self.logger.info(
+            f"Creating {self.config.archive.archive_type.value} archive at: {archive_path}"
+        )
+        return ArchiveStream(
+            archive_path,
+            self.config.archive.archive_type,
+            level=self.config.archive.compression_level,
+            threads=self.config.archive.threads,
+            logger=self.logger,
+            abort_on_error=self.config.encoding.abort_on_error,
+            verbose=self.config.logging.verbose,
+        )
 
-        # Run in thread pool to avoid blocking
-        await asyncio.to_thread(_write_tar)
+    async def finish_stream(
+        self, stream: ArchiveStream, archive_path: Optional[Path] = None
+    ) -> Optional[Path]:
+        """Complete an archive started with open_stream().
+
+        Args:
+            stream: The archive to complete
+            archive_path: Final path of the archive, if it differs from the
+                path it was written to (e.g. after a content hash was added
+                to the output filename)
+
+        Returns:
+            Path of the archive, or None if no file was archived
+        """
+        files_added = await asyncio.to_thread(stream.close)
+        if not files_added:
+            self.logger.info("No files to archive")
+            await asyncio.to_thread(stream.abort)
+            return None
+
+        if archive_path is not None and archive_path != stream.archive_path:
+            try:
+                os.replace(stream.archive_path, archive_path)
+            except OSError as e:
+                raise ArchiveError(f"Failed to create archive: {e}")
+        else:
+            archive_path = stream.archive_path
+
+        self.logger.info(f"Successfully created archive with {files_added} file(s)")
+        return archive_path
+
+    async def create_archive(
+        self, output_path: Path, files_to_process: List[Tuple[Path, str]]
+    ) -> Optional[Path]:
+        """Create an archive of all processed files."""
+        if not self.config.archive.create_archive:
+            return None
+
+        if not files_to_process:
+            self.logger.info("No files to archive")
+            return None
+
+        stream = self.open_stream(output_path)
+        try:
+            # Files are read by the compression threads
+            for file_path, rel_path in files_to_process:
+                stream.add(file_path, rel_path)
+        except BaseException:
+            await asyncio.to_thread(stream.abort)
+            raise
+        return await self.finish_stream(stream)
@@ -15,21 +15,32 @@
 """
 Auto-bundle functionality for m1f.
 Handles YAML configuration loading and bundle creation.
+
+Bundles are created in-process with FileCombiner, several at a time. They
+share the directory listings and file contents read by the other bundles,
+so overlapping sources are walked and read only once per update.
 """
 
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Union
+import asyncio
 import logging
 import yaml
 import os
-import subprocess
 import sys
 
+from .cli import create_parser, parse_args
 from .config import Config, OutputConfig, FilterConfig, SeparatorStyle, LineEnding
+from .constants import DEFAULT_SHARED_FILE_CACHE_SIZE
+from .core import FileCombiner
+from .exceptions import M1FError
 from .file_operations import (
+    DirectoryListingCache,
     safe_exists,
     safe_open,
 )
+from .loaded_file import LoadedFileCache
+from .logging import LoggerManager
 
 # Use unified colorama module
 from shared.colors import Colors, info, success, error, warning
@@ -75,10 +86,18 @@ class AutoBundleConfig:
 class AutoBundler:
     """Handles auto-bundling functionality."""
 
-    def __init__(self, project_root: Path, verbose: bool = False, quiet: bool = False):
+    def __init__(
+        self,
+        project_root: Path,
+        verbose: bool = False,
+        quiet: bool = False,
+        jobs: Optional[int] = None,
+    ):
         self.project_root = project_root
         self.verbose = verbose
         self.quiet = quiet
+        # Number of bundles created at the same time
+        self.jobs = jobs or min(4, os.cpu_count() or 1)
         self.config_file = self._find_config_file(project_root)
         self.m1f_dir = project_root / "m1f"
 
@@ -167,10 +186,23 @@ class AutoBundler:
         bundle_config: Dict[str, Any],
         global_config: Dict[str, Any],
     ) -> List[str]:
-        """Build m1f command from bundle configuration."""
+        """Build the equivalent m1f command line for a bundle."""
+        args = self.build_m1f_args(bundle_name, bundle_config, global_config)
+        if not args:
+            return []
+
         # Use direct path to m1f.py script
         m1f_script = self.project_root / "tools" / "m1f.py"
-        cmd_parts = [sys.executable, str(m1f_script)]
+        return [sys.executable, str(m1f_script)] + args
+
+    def build_m1f_args(
+        self,
+        bundle_name: str,
+        bundle_config: Dict[str, Any],
+        global_config: Dict[str, Any],
+    ) -> List[str]:
+        """Build m1f arguments from bundle configuration (empty on error)."""
+        cmd_parts = []
 
         # Handle bundle-level include_files
         if "include_files" in bundle_config:
@@ -319,6 +351,13 @@ class AutoBundler:
         if bundle_config.get("minimal_output", True):
             cmd_parts.append("--minimal-output")
 
+        # Bundles whose sources didn't change are not rewritten
+        if bundle_config.get("skip_unchanged", True):
+            cmd_parts.append("--skip-unchanged")
+
+        if bundle_config.get("index"):
+            cmd_parts.append("--index")
+
         # Always add --quiet and -f
         cmd_parts.append("--quiet")
         cmd_parts.append("-f")
@@ -332,10 +371,41 @@ class AutoBundler:
         global_config: Dict[str, Any],
     ) -> bool:
         """Create a single bundle."""
-        # Check if enabled
+        return asyncio.run(
+            self.create_bundle_async(bundle_name, bundle_config, global_config)
+        )
+
+    async def create_bundle_async(
+        self,
+        bundle_name: str,
+        bundle_config: Dict[str, Any],
+        global_config: Dict[str, Any],
+        directory_listings: Optional[DirectoryListingCache] = None,
+        shared_files: Optional[LoadedFileCache] = None,
+    ) -> bool:
+        """Create a single bundle in this process."""
+        if not self.is_bundle_enabled(bundle_name, bundle_config):
+            return True
+
+        description = bundle_config.get("description", "")
+        self.print_info(f"Creating bundle: {bundle_name} - {description}")
+
+        config = self.parse_bundle_config(bundle_name, bundle_config, global_config)
+        if config is None:
+            return False
+
+        combiner = await self.run_bundle(
+            bundle_name, config, directory_listings, shared_files
+        )
+        return combiner is not None
+
+    def is_bundle_enabled(
+        self, bundle_name: str, bundle_config: Dict[str, Any]
+    ) -> bool:
+        """Check whether a bundle is enabled, reporting skipped bundles."""
         if not bundle_config.get("enabled", True):
             self.print_info(f"Skipping disabled bundle: {bundle_name}")
-            return True
+            return False
 
         # Check conditional enabling
         enabled_if = bundle_config.get("enabled_if_exists", "")
@@ -343,29 +413,100 @@ class AutoBundler:
             self.print_info(
                 f"Skipping bundle {bundle_name} (condition not met: {enabled_if})"
             )
-            return True
+            return False
 
-        description = bundle_config.get("description", "")
-        self.print_info(f"Creating bundle: {bundle_name} - {description}")
+        return True
 
-        # Build and execute command
-        cmd_parts = self.build_m1f_command(bundle_name, bundle_config, global_config)
+    def parse_bundle_config(
+        self,
+        bundle_name: str,
+        bundle_config: Dict[str, Any],
+        global_config: Dict[str, Any],
+    ) -> Optional[Config]:
+        """Build the m1f configuration of a bundle (None if it is invalid)."""
+        # Build the arguments and parse them like the m1f command line would
+        args = self.build_m1f_args(bundle_name, bundle_config, global_config)
+        if not args:
+            return None
 
         if self.verbose:
-            self.print_info(f"Executing: {' '.join(cmd_parts)}")
+            self.print_info(f"Running: m1f {' '.join(args)}")
 
         try:
-            result = subprocess.run(cmd_parts, capture_output=True, text=True)
-            if result.returncode != 0:
-                self.print_error(f"Command failed: {result.stderr}")
-                return False
-            if self.verbose and result.stdout:
-                info(result.stdout)
-            self.print_success(f"Created: {bundle_name}")
-            return True
+            return Config.from_args(parse_args(create_parser(), args))
+        except SystemExit:
+            # argparse has already printed the reason
+            self.print_error(f"Invalid options for bundle: {bundle_name}")
+        except ValueError as e:
+            self.print_error(f"Invalid configuration for bundle {bundle_name}: {e}")
+        return None
+
+    async def run_bundle(
+        self,
+        bundle_name: str,
+        config: Config,
+        directory_listings: Optional[DirectoryListingCache] = None,
+        shared_files: Optional[LoadedFileCache] = None,
+    ) -> Optional[FileCombiner]:
+        """Run FileCombiner for a bundle, returning it or None on failure."""
+        # The root logger belongs to m1f-update (or the watcher)
+        logger_manager = LoggerManager(config.logging, configure_root=False)
+        try:
+            combiner = FileCombiner(
+                config,
+                logger_manager,
+                directory_listings=directory_listings,
+                shared_files=shared_files,
+            )
+            result = await combiner.run()
+        except M1FError as e:
+            self.print_error(f"Bundle {bundle_name} failed: {e}")
+            return None
         except Exception as e:
-            self.print_error(f"Failed to execute command: {e}")
-            return False
+            self.print_error(f"Failed to create bundle {bundle_name}: {e}")
+            return None
+        finally:
+            await logger_manager.cleanup()
+
+        if result.unchanged:
+            self.print_success(f"Unchanged: {bundle_name}")
+        else:
+            self.print_success(f"Created: {bundle_name}")
+        return combiner
+
+    async def create_bundles(
+        self, bundles: Dict[str, Dict[str, Any]], global_config: Dict[str, Any]
+    ) -> bool:
+        """Create bundles concurrently, up to ``jobs`` at a time.
+
+        The bundles share one directory listing cache and one file content
+        cache, so sources used by several bundles are walked and read once.
+        """
+        directory_listings = DirectoryListingCache()
+        shared_files = LoadedFileCache(DEFAULT_SHARED_FILE_CACHE_SIZE)
+        semaphore = asyncio.Semaphore(self.jobs)
+
+        async def create(name: str, bundle_config: Dict[str, Any]) -> bool:
+            async with semaphore:
+                return await self.create_bundle_async(
+                    name,
+                    bundle_config,
+                    global_config,
+                    directory_listings,
+                    shared_files,
+                )
+
+        results = await asyncio.gather(
+            *(create(name, bundle_config) for name, bundle_config in bundles.items())
+        )
+
+        if self.verbose:
+            self.print_info(
+                f"Directory listings: {directory_listings.hits} reused, "
+                f"{directory_listings.misses} read; file contents: "
+                f"{shared_files.hits} reused"
+            )
+        return all(results)
 
     def list_bundles(self, config: AutoBundleConfig):
         """List available bundles."""
@@ -428,40 +569,13 @@ class AutoBundler:
         if "enabled_if_exists" in bundle_config:
             info(f"    Enabled if exists: {bundle_config['enabled_if_exists']}")
 
-    def run(
+    def select_bundles(
         self,
+        config: AutoBundleConfig,
         bundle_name: Optional[str] = None,
-        list_bundles: bool = False,
         bundle_group: Optional[str] = None,
-    ):
-        """Run auto-bundle functionality."""
-        # Check if config exists
-        if not self.check_config_exists():
-            self.print_error("No .m1f.config.yml configuration found!")
-            self.print_info(
-                "Searched from current directory up to root. No config file was found."
-            )
-            self.print_info(
-                "Create a .m1f.config.yml file in your project root to use auto-bundle functionality."
-            )
-            self.print_info("See documentation: docs/01_m1f/06_auto_bundle_guide.md")
-            return False
-
-        # Load config
-        config = self.load_config()
-        if not config:
-            self.print_error("Failed to load auto-bundle configuration")
-            return False
-
-        # List bundles if requested
-        if list_bundles:
-            self.list_bundles(config)
-            return True
-
-        # Setup directories
-        self.setup_directories(config)
-
-        # Filter bundles by group if specified
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Select the bundles to create, reporting unknown names and groups."""
         bundles_to_create = {}
 
         if bundle_group:
@@ -482,7 +596,7 @@ class AutoBundler:
                     )
                 else:
                     self.print_info("No bundle groups defined in configuration")
-                return False
+                return None
         elif bundle_name:
             # Create specific bundle
             bundle_config = config.get_bundle_config(bundle_name)
@@ -491,15 +605,59 @@ class AutoBundler:
                 self.print_info(
                     f"Available bundles: {', '.join(config.get_bundle_names())}"
                 )
-                return False
+                return None
             bundles_to_create[bundle_name] = bundle_config
         else:
             # Create all bundles
             bundles_to_create = config.bundles
 
+        return bundles_to_create
+
+    def run(
+        self,
+        bundle_name: Optional[str] = None,
+        list_bundles: bool = False,
+        bundle_group: Optional[str] = None,
+    ):
+        """Run auto-bundle functionality."""
+        return asyncio.run(self.run_async(bundle_name, list_bundles, bundle_group))
+
+    async def run_async(
+        self,
+        bundle_name: Optional[str] = None,
+        list_bundles: bool = False,
+        bundle_group: Optional[str] = None,
+    ) -> bool:
+        """Run auto-bundle functionality inside a running event loop."""
+        # Check if config exists
+        if not self.check_config_exists():
+            self.print_error("No .m1f.config.yml configuration found!")
+            self.print_info(
+                "Searched from current directory up to root. No config file was found."
+            )
+            self.print_info(
+                "Create a .m1f.config.yml file in your project root to use auto-bundle functionality."
+            )
+            self.print_info("See documentation: docs/01_m1f/06_auto_bundle_guide.md")
+            return False
+
+        # Load config
+        config = self.load_config()
+        if not config:
+            self.print_error("Failed to load auto-bundle configuration")
+            return False
+
+        # List bundles if requested
+        if list_bundles:
+            self.list_bundles(config)
+            return True
+
+        # Setup directories
+        self.setup_directories(config)
+
+        bundles_to_create = self.select_bundles(config, bundle_name, bundle_group)
+        if bundles_to_create is None:
+            return False
+
         # Create the selected bundles
-        success = True
-        for name, bundle_config in bundles_to_create.items():
-            if not self.create_bundle(name, bundle_config, config.global_config):
-                success = False
-        return success
+        return await self.create_bundles(bundles_to_create, config.global_config)
@@ -0,0 +1,342 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Binary file classification for m1f.
+
+Files are classified in three steps, cheapest first:
+
+1. The extension is looked up in a fixed table of binary formats.
+2. The head of the file is checked against magic-number signatures.
+3. The same head buffer is checked for NUL bytes and the share of control
+   characters that don't occur in text.
+
+Verdicts from steps 2 and 3 are cached by (device, inode, mtime, size), so
+files that are checked repeatedly (explicit includes, repeated runs in one
+process) are only read once while unchanged.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, FrozenSet, Optional, Tuple
+
+# Extensions that are always treated as binary
+BINARY_EXTENSIONS: FrozenSet[str] = frozenset(
+    {
+        # Images
+        ".jpg",
+        ".jpeg",
+        ".png",
+        ".gif",
+        ".bmp",
+        ".tiff",
+        ".tif",
+        ".ico",
+        ".webp",
+        ".svgz",
+        # Audio
+        ".mp3",
+        ".wav",
+        ".ogg",
+        ".flac",
+        ".aac",
+        ".wma",
+        ".m4a",
+        # Video
+        ".mp4",
+        ".avi",
+        ".mkv",
+        ".mov",
+        ".wmv",
+        ".flv",
+        ".webm",
+        ".mpeg",
+        ".mpg",
+        # Archives
+        ".zip",
+        ".rar",
+        ".7z",
+        ".tar",
+        ".gz",
+        ".bz2",
+        ".xz",
+        ".jar",
+        ".war",
+        ".ear",
+        # Executables
+        ".exe",
+        ".dll",
+        ".so",
+        ".dylib",
+        ".bin",
+        ".msi",
+        ".pdb",
+        ".lib",
+        ".o",
+        ".obj",
+        ".pyc",
+        ".pyo",
+        ".class",
+        # Documents
+        ".pdf",
+        ".doc",
+        ".ppt",
+        ".xls",
+        # Databases
+        ".db",
+        ".sqlite",
+        ".mdb",
+        ".accdb",
+        ".dbf",
+        ".dat",
+        # Fonts
+        ".ttf",
+        ".otf",
+        ".woff",
+        ".woff2",
+        ".eot",
+        # Others
+        ".iso",
+        ".img",
+        ".vhd",
+        ".vhdx",
+        ".vmdk",
+        ".bak",
+        ".tmp",
+        ".lock",
+        ".swo",
+        ".swp",
+    }
+)
+
+# Magic numbers of binary formats: (offset, bytes, description).
+# Signatures made only of text bytes (e.g. "%PDF-", "OggS") can start a text
+# file too; a match of one of them alone doesn't make a file binary.
+MAGIC_SIGNATURES: Tuple[Tuple[int, bytes, str], ...] = (
+    # Images
+    (0, b"\x89PNG\r\n\x1a\n", "PNG image"),
+    (0, b"\xff\xd8\xff", "JPEG image"),
+    (0, b"GIF87a", "GIF image"),
+    (0, b"GIF89a", "GIF image"),
+    (0, b"II*\x00", "TIFF image"),
+    (0, b"MM\x00*", "TIFF image"),
+    # Documents
+    (0, b"%PDF-", "PDF document"),
+    (0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "MS Office document"),
+    # Archives and compressed data
+    (0, b"PK\x03\x04", "ZIP archive"),
+    (0, b"PK\x05\x06", "Empty ZIP archive"),
+    (0, b"\x1f\x8b\x08", "GZIP data"),
+    (0, b"Rar!\x1a\x07", "RAR archive"),
+    (0, b"7z\xbc\xaf\x27\x1c", "7-Zip archive"),
+    (0, b"\xfd7zXZ\x00", "XZ data"),
+    (0, b"\x28\xb5\x2f\xfd", "Zstandard data"),
+    (257, b"ustar", "TAR archive"),
+    # Executables and object code
+    (0, b"\x7fELF", "ELF binary"),
+    (0, b"\xcf\xfa\xed\xfe", "Mach-O binary"),
+    (0, b"\xce\xfa\xed\xfe", "Mach-O binary"),
+    (0, b"\xca\xfe\xba\xbe", "Mach-O universal binary or Java class"),
+    (0, b"\x00asm", "WebAssembly module"),
+    # Databases
+    (0, b"SQLite format 3\x00", "SQLite database"),
+    # Fonts
+    (0, b"wOFF", "WOFF font"),
+    (0, b"wOF2", "WOFF2 font"),
+    # Media
+    (0, b"OggS", "OGG media"),
+    (0, b"\x1a\x45\xdf\xa3", "Matroska/WebM video"),
+    (4, b"ftyp", "MP4/QuickTime video"),
+)
+
+# Number of bytes read from the start of a file for content checks
+HEAD_SIZE = 8192
+
+# A sample with more than this share of non-text control bytes is binary
+CONTROL_BYTE_RATIO = 0.3
+
+# Number of bytes of the head used for the control byte ratio
+RATIO_SAMPLE_SIZE = 1024
+
+# Bytes that occur in text: printable ASCII, everything >= 0x80 (UTF-8 and
+# legacy encodings) and the usual whitespace/control characters
+_TEXT_BYTES = bytes(
+    {0x07, 0x08, 0x09, 0x0A, 0x0C, 0x0D, 0x1B}
+    | set(range(0x20, 0x7F))
+    | set(range(0x80, 0x100))
+)
+
+
+def _is_text_signature(signature: bytes) -> bool:
+    """Check if a signature consists of text bytes only."""
+    return not signature.translate(None, _TEXT_BYTES)
+
+
+def _group_by_offset(
+    text: bool,
+) -> Tuple[Tuple[int, Tuple[bytes, ...]], ...]:
+    """Group the binary or the text signatures by offset."""
+    signatures = [
+        (offset, signature)
+        for offset, signature, _ in MAGIC_SIGNATURES
+        if _is_text_signature(signature) is text
+    ]
+    return tuple(
+        (offset, tuple(sig for off, sig in signatures if off == offset))
+        for offset in sorted({offset for offset, _ in signatures})
+    )
+
+
+# Signatures grouped by offset for a single startswith() call per offset.
+# A match of a binary signature is enough, one of a text signature needs
+# control bytes in the head as well.
+_SIGNATURES_BY_OFFSET = _group_by_offset(text=False)
+_TEXT_SIGNATURES_BY_OFFSET = _group_by_offset(text=True)
+
+# Upper bound for cached verdicts, the cache is dropped when it is reached
+_MAX_CACHE_ENTRIES = 200_000
+
+_OPEN_FLAGS = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+
+
+def _cache_key(stat_result: os.stat_result) -> Tuple[int, int, int, int]:
+    """Identify a version of a file: (device, inode, mtime, size)."""
+    return (
+        stat_result.st_dev,
+        stat_result.st_ino,
+        stat_result.st_mtime_ns,
+        stat_result.st_size,
+    )
+
+
+def has_binary_extension(file_path: Path) -> bool:
+    """Check if a file has an extension of a known binary format."""
+    return file_path.suffix.lower() in BINARY_EXTENSIONS
+
+
+def match_magic_signature(head: bytes) -> Optional[str]:
+    """Return the description of the binary format ``head`` starts with, if any."""
+    for offset, signature, description in MAGIC_SIGNATURES:
+        if head.startswith(signature, offset):
+            return description
+    return None
+
+
+def is_binary_data(head: bytes) -> bool:
+    """Classify the first bytes of a file as binary or text.
+
+    Args:
+        head: Start of the file content (up to HEAD_SIZE bytes are used)
+
+    Returns:
+        True if the content looks binary
+    """
+    if len(head) > HEAD_SIZE:
+        head = head[:HEAD_SIZE]
+    if not head:
+        return False
+
+    if b"\0" in head:
+        return True
+
+    for offset, signatures in _SIGNATURES_BY_OFFSET:
+        if head.startswith(signatures, offset):
+            return True
+
+    # Deleting all text bytes leaves the control bytes text doesn't contain
+    for offset, signatures in _TEXT_SIGNATURES_BY_OFFSET:
+        if head.startswith(signatures, offset) and head.translate(None, _TEXT_BYTES):
+            return True
+
+    sample = head[:RATIO_SAMPLE_SIZE]
+    control_bytes = len(sample.translate(None, _TEXT_BYTES))
+    return control_bytes > len(sample) * CONTROL_BYTE_RATIO
+
+
+class BinaryClassifier:
+    """Classifies files as binary, caching content verdicts per file version."""
+
+    def __init__(self, max_entries: int = _MAX_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._verdicts: Dict[Tuple[int, int, int, int], bool] = {}
+        self._lock = threading.Lock()
+
+    def is_binary(
+        self, file_path: Path, stat_result: Optional[os.stat_result] = None
+    ) -> bool:
+        """Check if a file is binary.
+
+        Args:
+            file_path: File to classify
+            stat_result: Stat of the file if already known (e.g. from
+                os.scandir), used as cache key
+
+        Returns:
+            True for binary files and for files that can't be read
+        """
+        if has_binary_extension(file_path):
+            return True
+
+        if stat_result is not None:
+            verdict = self._verdicts.get(_cache_key(stat_result))
+            if verdict is not None:
+                return verdict
+
+        # Plain os.read() avoids the buffered file object, which costs more
+        # than the read itself for a single small chunk
+        try:
+            fd = os.open(file_path, _OPEN_FLAGS)
+        except OSError:
+            # If we can't read the file, assume it's binary
+            return True
+        try:
+            if stat_result is None:
+                stat_result = os.fstat(fd)
+                verdict = self._verdicts.get(_cache_key(stat_result))
+                if verdict is not None:
+                    return verdict
+            head = os.read(fd, HEAD_SIZE)
+        except OSError:
+            return True
+        finally:
+            os.close(fd)
+
+        verdict = is_binary_data(head)
+        with self._lock:
+            if len(self._verdicts) >= self.max_entries:
+                self._verdicts.clear()
+            self._verdicts[_cache_key(stat_result)] = verdict
+        return verdict
+
+    def clear(self) -> None:
+        """Drop all cached verdicts."""
+        with self._lock:
+            self._verdicts.clear()
+
+    def __len__(self) -> int:
+        return len(self._verdicts)
+
+
+# Process-wide classifier used by is_binary_file()
+default_classifier = BinaryClassifier()
+
+
+def is_binary_file(
+    file_path: Path, stat_result: Optional[os.stat_result] = None
+) -> bool:
+    """Check if a file is likely binary (see BinaryClassifier.is_binary)."""
+    return default_classifier.is_binary(file_path, stat_result)
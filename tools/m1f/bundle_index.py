@@ -0,0 +1,186 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Sidecar index for random access to the files of a bundle.
+
+With ``--index`` m1f records where each file's section (separators and
+content) starts in the output and how many bytes it takes, together with the
+file's checksum, encoding and size, in a compact JSON file next to the output
+(``.<output name>.m1f-index.json``). m1f-s1f uses it to list a bundle or to
+extract single files (``--only``) by reading just their sections. An index
+whose bundle changed since it was written is ignored.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+from dataclasses import astuple, dataclass, fields
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+# Bump whenever the meaning of an index field changes
+INDEX_FORMAT_VERSION = 1
+
+
+def index_path_for(bundle_path: Path) -> Path:
+    """Path of the index that belongs to a bundle (or a part of one)."""
+    return bundle_path.with_name(f".{bundle_path.name}.m1f-index.json")
+
+
+def remove_index(bundle_path: Path, logger: logging.Logger) -> None:
+    """Remove the index of a bundle that was removed or renamed."""
+    index_path = index_path_for(bundle_path)
+    try:
+        index_path.unlink()
+    except FileNotFoundError:
+        return
+    except OSError as e:
+        logger.warning(f"Could not remove index {index_path}: {e}")
+        return
+    logger.debug(f"Removed index {index_path}")
+
+
+@dataclass
+class IndexEntry:
+    """Location of one file's section in the bundle."""
+
+    path: str
+    offset: int  # Byte offset of the section
+    length: int  # Bytes of the section, without the spacing after it
+    checksum: Optional[str] = None  # SHA256 of the file content
+    encoding: Optional[str] = None  # Original encoding of the file
+    size: Optional[int] = None  # Size of the original file
+
+
+# Entries are stored as lists of these fields
+INDEX_FIELDS = [entry_field.name for entry_field in fields(IndexEntry)]
+
+
+@dataclass
+class BundleIndex:
+    """The sections of one bundle file."""
+
+    bundle_size: int
+    bundle_mtime_ns: int
+    encoding: str  # Encoding of the bundle itself
+    separator_style: str
+    entries: List[IndexEntry]
+
+    @classmethod
+    def for_bundle(
+        cls,
+        bundle_path: Path,
+        entries: Sequence[IndexEntry],
+        encoding: str,
+        separator_style: str,
+    ) -> BundleIndex:
+        """Create the index of a bundle that was just written.
+
+        Raises:
+            OSError: If the bundle can't be accessed
+        """
+        stat_result = os.stat(bundle_path)
+        return cls(
+            stat_result.st_size,
+            stat_result.st_mtime_ns,
+            encoding,
+            separator_style,
+            list(entries),
+        )
+
+    @classmethod
+    def load(cls, bundle_path: Path, logger: logging.Logger) -> Optional[BundleIndex]:
+        """Load the index of a bundle.
+
+        Returns None if there is no index, it can't be read or the bundle
+        changed since it was written.
+        """
+        index_path = index_path_for(bundle_path)
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable index {index_path}: {e}")
+            return None
+
+        try:
+            if data["version"] != INDEX_FORMAT_VERSION:
+                logger.debug(f"Ignoring index {index_path} of another version")
+                return None
+            positions = [data["fields"].index(name) for name in INDEX_FIELDS]
+            index = cls(
+                data["bundle_size"],
+                data["bundle_mtime_ns"],
+                data["encoding"],
+                data["separator_style"],
+                [
+                    IndexEntry(*(values[position] for position in positions))
+                    for values in data["files"]
+                ],
+            )
+        except (KeyError, TypeError, ValueError, IndexError):
+            logger.warning(f"Ignoring malformed index {index_path}")
+            return None
+
+        try:
+            stat_result = os.stat(bundle_path)
+        except OSError:
+            return None
+        if (
+            stat_result.st_size != index.bundle_size
+            or stat_result.st_mtime_ns != index.bundle_mtime_ns
+        ):
+            logger.warning(f"Ignoring outdated index {index_path}")
+            return None
+        return index
+
+    def save(self, bundle_path: Path) -> Path:
+        """Write the index next to the bundle atomically.
+
+        Raises:
+            OSError: If the index can't be written
+        """
+        index_path = index_path_for(bundle_path)
+        data = {
+            "version": INDEX_FORMAT_VERSION,
+            "bundle_size": self.bundle_size,
+            "bundle_mtime_ns": self.bundle_mtime_ns,
+            "encoding": self.encoding,
+            "separator_style": self.separator_style,
+            "fields": INDEX_FIELDS,
+            "files": [list(astuple(entry)) for entry in self.entries],
+        }
+
+        fd, tmp_name = tempfile.mkstemp(
+            dir=index_path.parent, prefix=".tmp_", suffix=".json"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            # Readable by whoever can read the bundle
+            os.chmod(tmp_name, os.stat(bundle_path).st_mode & 0o666)
+            os.replace(tmp_name, index_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+        return index_path
@@ -0,0 +1,552 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Watch mode for auto-bundles (``m1f-update --watch``).
+
+The selected bundles are built once and the files each bundle gathered are
+kept in memory. Changes are reported by inotify on Linux (called through
+libc, no extra package needed) and found by polling elsewhere. Each changed
+path is mapped to the bundles that include it or, for new files, whose
+sources and file filters would include it. Only those bundles are rebuilt,
+once no further change arrived for a short debounce time. Changes to the
+bundle configuration, presets or path files rebuild all bundles.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .config import Config
+from .constants import (
+    DEFAULT_DEBOUNCE,
+    DEFAULT_EXCLUDED_DIRS,
+    DEFAULT_SHARED_FILE_CACHE_SIZE,
+)
+from .file_cache import DEFAULT_CACHE_DIR_NAME
+from .file_operations import DirectoryListingCache, safe_scandir_walk
+from .file_processor import FileProcessor
+from .loaded_file import LoadedFileCache
+
+if TYPE_CHECKING:
+    from .auto_bundle import AutoBundler
+
+# Seconds between two scans when polling
+POLL_INTERVAL = 1.0
+
+# Files whose changes alter what the bundles below them include
+IGNORE_FILE_NAMES = {".gitignore", ".m1fignore"}
+
+# inotify event flags (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+
+# struct inotify_event without the name: wd, mask, cookie, len
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _walk_watch_directories(directory: Path) -> Iterable[Tuple[Path, List[Path]]]:
+    """Walk a tree for watching, skipping the default excluded directories.
+
+    Yields each directory with the paths of the files directly inside it.
+    """
+    for root, dirs, files in safe_scandir_walk(directory):
+        dirs[:] = [entry for entry in dirs if entry.name not in DEFAULT_EXCLUDED_DIRS]
+        yield Path(root), [Path(entry.path) for entry in files]
+
+
+class InotifyWatcher:
+    """Reports changed paths with Linux inotify."""
+
+    name = "inotify"
+
+    def __init__(self):
+        """Create an inotify instance.
+
+        Raises:
+            OSError: If inotify isn't available
+        """
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or libc_name is None:
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [
+            ctypes.c_int,
+            ctypes.c_char_p,
+            ctypes.c_uint32,
+        ]
+
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, os.strerror(error_number))
+        self._fd = fd
+
+        self._directories: Dict[int, Path] = {}
+        self._recursive: Set[int] = set()
+        self._changes: Set[Path] = set()
+        self._overflow = False
+        self._event = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def watch(self, directory: Path, recursive: bool = True) -> None:
+        """Watch a directory and, if ``recursive``, its subdirectories.
+
+        Raises:
+            OSError: If the inotify watch limit is reached
+        """
+        if not recursive:
+            self._add_watch(directory, recursive=False)
+            return
+        for root, _ in _walk_watch_directories(directory):
+            self._add_watch(root, recursive=True)
+
+    def _add_watch(self, directory: Path, recursive: bool) -> None:
+        """Add one inotify watch."""
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            error_number = ctypes.get_errno()
+            if error_number == errno.ENOSPC:
+                raise OSError(
+                    error_number,
+                    "inotify watch limit reached (see fs.inotify.max_user_watches)",
+                )
+            # The directory vanished or can't be read
+            return
+        self._directories[wd] = directory
+        if recursive:
+            self._recursive.add(wd)
+
+    def start(self) -> None:
+        """Start delivering events to wait()."""
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self._fd, self._read_events)
+
+    def _read_events(self) -> None:
+        """Read the pending events and collect the changed paths."""
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                self._overflow = True
+                continue
+            directory = self._directories.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                # The watched directory is gone
+                del self._directories[wd]
+                self._recursive.discard(wd)
+                continue
+
+            path = directory / os.fsdecode(name) if name else directory
+            self._changes.add(path)
+            if (
+                mask & IN_ISDIR
+                and mask & (IN_CREATE | IN_MOVED_TO)
+                and wd in self._recursive
+            ):
+                self._watch_new_directory(path)
+
+        self._event.set()
+
+    def _watch_new_directory(self, directory: Path) -> None:
+        """Watch a new directory; files created before the watch count as changed."""
+        try:
+            for root, files in _walk_watch_directories(directory):
+                self._add_watch(root, recursive=True)
+                self._changes.update(files)
+        except OSError:
+            # Out of watches: let the caller rescan everything
+            self._overflow = True
+
+    async def wait(self) -> Optional[Set[Path]]:
+        """Wait for changed paths; None if events were lost."""
+        await self._event.wait()
+        return self._take_changes()
+
+    async def changes_after(self, delay: float) -> Optional[Set[Path]]:
+        """Return the paths changed within ``delay`` seconds (may be empty)."""
+        await asyncio.sleep(delay)
+        return self._take_changes()
+
+    def _take_changes(self) -> Optional[Set[Path]]:
+        self._event.clear()
+        changes, self._changes = self._changes, set()
+        if self._overflow:
+            self._overflow = False
+            return None
+        return changes
+
+    def close(self) -> None:
+        """Stop watching."""
+        if self._loop is not None:
+            self._loop.remove_reader(self._fd)
+            self._loop = None
+        os.close(self._fd)
+
+    def __len__(self) -> int:
+        return len(self._directories)
+
+
+class PollingWatcher:
+    """Reports changed paths by scanning the watched directories."""
+
+    name = "polling"
+
+    def __init__(self, interval: float = POLL_INTERVAL):
+        self.interval = interval
+        self._roots: Dict[Path, bool] = {}
+        self._snapshot: Dict[Path, Tuple[int, int]] = {}
+
+    def watch(self, directory: Path, recursive: bool = True) -> None:
+        """Watch a directory and, if ``recursive``, its subdirectories."""
+        self._roots[directory] = self._roots.get(directory, False) or recursive
+
+    def start(self) -> None:
+        """Take the snapshot later scans are compared with."""
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        """Record mtime and size of every watched file."""
+        snapshot = {}
+        for root, recursive in self._roots.items():
+            if recursive:
+                listings = _walk_watch_directories(root)
+            else:
+                listings = [
+                    (Path(top), [Path(entry.path) for entry in files])
+                    for top, _, files in _single_listing(root)
+                ]
+            for _, files in listings:
+                for path in files:
+                    try:
+                        stat_result = path.stat()
+                    except OSError:
+                        continue
+                    snapshot[path] = (stat_result.st_mtime_ns, stat_result.st_size)
+        return snapshot
+
+    async def wait(self) -> Optional[Set[Path]]:
+        """Wait until a scan finds changed paths."""
+        while True:
+            changes = await self.changes_after(self.interval)
+            if changes:
+                return changes
+
+    async def changes_after(self, delay: float) -> Optional[Set[Path]]:
+        """Scan after ``delay`` seconds and return the changed paths."""
+        await asyncio.sleep(delay)
+        snapshot = await asyncio.to_thread(self._scan)
+        changes = set(snapshot.keys() ^ self._snapshot.keys())
+        changes.update(
+            path
+            for path, state in snapshot.items()
+            if self._snapshot.get(path, state) != state
+        )
+        self._snapshot = snapshot
+        return changes
+
+    def close(self) -> None:
+        """Stop watching."""
+        self._roots.clear()
+
+    def __len__(self) -> int:
+        return len(self._roots)
+
+
+def _single_listing(directory: Path):
+    """List a single directory like safe_scandir_walk() without descending."""
+    for top, dirs, files in safe_scandir_walk(directory):
+        dirs.clear()
+        yield top, dirs, files
+
+
+@dataclass
+class _WatchedBundle:
+    """A bundle being watched and what its last build gathered."""
+
+    name: str
+    config: Config
+    # Absolute paths of the files gathered by the last build
+    files: Set[str] = field(default_factory=set)
+    # Filters of the last build, to check files that weren't gathered
+    processor: Optional[FileProcessor] = None
+
+
+class BundleWatcher:
+    """Rebuilds auto-bundles whenever their files change."""
+
+    def __init__(
+        self,
+        bundler: AutoBundler,
+        debounce: float = DEFAULT_DEBOUNCE,
+        polling: bool = False,
+    ):
+        self.bundler = bundler
+        self.debounce = debounce
+        self.polling = polling
+
+        self.bundles: Dict[str, _WatchedBundle] = {}
+        # Bundle configuration, presets and path files
+        self.config_paths: Set[str] = set()
+        self.directory_listings = DirectoryListingCache()
+        self.shared_files = LoadedFileCache(DEFAULT_SHARED_FILE_CACHE_SIZE)
+
+    async def run(
+        self, bundle_name: Optional[str] = None, bundle_group: Optional[str] = None
+    ) -> bool:
+        """Build the selected bundles, then rebuild them on changes until cancelled."""
+        if not self.load(bundle_name, bundle_group):
+            return False
+        await self.build(list(self.bundles))
+
+        watcher = self._start_watcher()
+        try:
+            while True:
+                changes = await self._next_changes(watcher)
+                if changes is None:
+                    # Events were lost: everything may have changed
+                    self.directory_listings.clear()
+                    await self.build(list(self.bundles))
+                    continue
+
+                changes = {path for path in changes if not self._is_output(path)}
+                if not changes:
+                    continue
+
+                if any(os.path.abspath(path) in self.config_paths for path in changes):
+                    self.bundler.print_info("Configuration changed, reloading")
+                    watcher.close()
+                    if not self.load(bundle_name, bundle_group):
+                        return False
+                    self.directory_listings.clear()
+                    await self.build(list(self.bundles))
+                    watcher = self._start_watcher()
+                    continue
+
+                for path in changes:
+                    self.directory_listings.invalidate(path)
+                affected = self.affected_bundles(changes)
+                if affected:
+                    await self.build(affected)
+        finally:
+            watcher.close()
+
+    def load(
+        self, bundle_name: Optional[str] = None, bundle_group: Optional[str] = None
+    ) -> bool:
+        """(Re)load the configuration of the selected bundles."""
+        config = self.bundler.load_config()
+        if not config:
+            self.bundler.print_error("Failed to load auto-bundle configuration")
+            return False
+        self.bundler.setup_directories(config)
+
+        selected = self.bundler.select_bundles(config, bundle_name, bundle_group)
+        if selected is None:
+            return False
+
+        self.bundles = {}
+        self.config_paths = {os.path.abspath(self.bundler.config_file)}
+        for name, bundle_config in selected.items():
+            if not self.bundler.is_bundle_enabled(name, bundle_config):
+                continue
+            m1f_config = self.bundler.parse_bundle_config(
+                name, bundle_config, config.global_config
+            )
+            if m1f_config is None:
+                continue
+            self.bundles[name] = _WatchedBundle(name, m1f_config)
+            self.config_paths.update(_config_files(m1f_config))
+        return True
+
+    async def build(self, names: List[str]) -> None:
+        """Build bundles, up to ``jobs`` at a time, and remember their files."""
+        semaphore = asyncio.Semaphore(self.bundler.jobs)
+
+        async def build_one(name: str) -> None:
+            bundle = self.bundles[name]
+            async with semaphore:
+                combiner = await self.bundler.run_bundle(
+                    name, bundle.config, self.directory_listings, self.shared_files
+                )
+            if combiner is not None:
+                bundle.files = {
+                    os.path.abspath(path) for path, _ in combiner.gathered_files
+                }
+                bundle.processor = combiner.file_processor
+
+        await asyncio.gather(*(build_one(name) for name in names))
+
+    def affected_bundles(self, changes: Iterable[Path]) -> List[str]:
+        """Return the bundles that include or would include a changed path."""
+        affected = []
+        for name, bundle in self.bundles.items():
+            for path in changes:
+                if self._affects(bundle, path):
+                    affected.append(name)
+                    break
+        return affected
+
+    def _affects(self, bundle: _WatchedBundle, path: Path) -> bool:
+        """Check whether a changed path can change a bundle."""
+        key = os.path.abspath(path)
+        if key in bundle.files:
+            return True
+
+        sources = bundle.config.source_directories or []
+        in_sources = any(path.is_relative_to(source) for source in sources)
+        if in_sources and path.name in IGNORE_FILE_NAMES:
+            return True
+
+        # A removed or renamed directory that held gathered files
+        prefix = key.rstrip(os.sep) + os.sep
+        if not path.is_file() and any(file.startswith(prefix) for file in bundle.files):
+            return True
+
+        return (
+            in_sources
+            and bundle.processor is not None
+            and bundle.processor.might_include(path)
+        )
+
+    def _is_output(self, path: Path) -> bool:
+        """Check whether a path was written by a bundle build itself.
+
+        Covers the outputs with their hashed names, parts, logs, archives and
+        sidecar files, which all start with the output's stem.
+        """
+        if DEFAULT_CACHE_DIR_NAME in path.parts:
+            return True
+        for bundle in self.bundles.values():
+            output = bundle.config.output.output_file
+            if path.parent != output.parent:
+                continue
+            if path.name.startswith((output.stem, f".{output.stem}", ".tmp_")):
+                return True
+        return False
+
+    def _start_watcher(self) -> Union[InotifyWatcher, PollingWatcher]:
+        """Watch the sources of all bundles, preferring inotify."""
+        watcher: Union[InotifyWatcher, PollingWatcher, None] = None
+        if not self.polling:
+            try:
+                watcher = InotifyWatcher()
+                self._watch_all(watcher)
+            except OSError as e:
+                if watcher is not None:
+                    watcher.close()
+                watcher = None
+                self.bundler.print_warning(f"Falling back to polling: {e}")
+        if watcher is None:
+            watcher = PollingWatcher()
+            self._watch_all(watcher)
+
+        watcher.start()
+        self.bundler.print_info(
+            f"Watching {len(self.bundles)} bundles for changes ({watcher.name}), "
+            "press Ctrl+C to stop"
+        )
+        return watcher
+
+    def _watch_all(self, watcher: Union[InotifyWatcher, PollingWatcher]) -> None:
+        """Watch the source trees, the gathered files and the config files."""
+        roots: Set[Path] = set()
+        single: Set[Path] = set()
+        for bundle in self.bundles.values():
+            for source in bundle.config.source_directories or []:
+                if source.is_dir():
+                    roots.add(source)
+                else:
+                    single.add(source.parent)
+            single.update(Path(file).parent for file in bundle.files)
+        single.update(Path(path).parent for path in self.config_paths)
+
+        for root in roots:
+            watcher.watch(root)
+        for directory in single:
+            if not any(directory.is_relative_to(root) for root in roots):
+                watcher.watch(directory, recursive=False)
+
+    async def _next_changes(
+        self, watcher: Union[InotifyWatcher, PollingWatcher]
+    ) -> Optional[Set[Path]]:
+        """Wait for changes and collect more until they settle."""
+        changes = await watcher.wait()
+        while True:
+            # Not asyncio.wait_for(): it can swallow a cancellation (Ctrl+C)
+            more = await watcher.changes_after(self.debounce)
+            if more is not None and not more:
+                return changes
+            if changes is None or more is None:
+                changes = None
+            else:
+                changes |= more
+
+
+def _config_files(config: Config) -> Set[str]:
+    """Files besides the sources whose changes affect a bundle."""
+    paths: List[Union[str, Path]] = list(config.preset.preset_files)
+    for path_files in (
+        config.filter.exclude_paths_file,
+        config.filter.include_paths_file,
+    ):
+        if isinstance(path_files, (str, Path)):
+            paths.append(path_files)
+        elif path_files:
+            paths.extend(path_files)
+    if config.input_file:
+        paths.append(config.input_file)
+    return {os.path.abspath(path) for path in paths}
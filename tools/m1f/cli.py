@@ -57,7 +57,8 @@ def create_parser() -> CustomArgumentParser:
 ====================
 
 Combines the content of multiple text files into a single output file with metadata.
-Optionally creates a backup archive (zip or tar.gz) of the processed files.
+Optionally creates a backup archive (zip, tar.gz, tar.xz or tar.zst) of the
+processed files.
 
 Perfect for:
 • Providing context to Large Language Models (LLMs)
@@ -157,7 +158,7 @@ Perfect for:
     format_group.add_argument(
         "--filename-mtime-hash",
         action="store_true",
-        help="Add hash of file modification times to output filename",
+        help="Add hash of the bundled file contents to output filename",
     )
 
     # File filtering group
@@ -311,9 +312,25 @@ Perfect for:
 
     archive_group.add_argument(
         "--archive-type",
-        choices=["zip", "tar.gz"],
+        choices=["zip", "tar.gz", "tar.xz", "tar.zst"],
         default="zip",
-        help="Type of archive to create (default: zip)",
+        help="Type of archive to create (default: zip; tar.zst requires zstandard)",
+    )
+
+    archive_group.add_argument(
+        "--archive-level",
+        type=int,
+        metavar="LEVEL",
+        help="Compression level of the archive (0-9 for zip, tar.gz and tar.xz, "
+        "1-22 for tar.zst; default: the format's usual default)",
+    )
+
+    archive_group.add_argument(
+        "--archive-threads",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Threads compressing tar.zst archives (default: one per CPU, up to 8)",
     )
 
     # Output control group
@@ -344,6 +361,35 @@ Perfect for:
         help="Allow files with identical content (disable deduplication)",
     )
 
+    control_group.add_argument(
+        "--token-report",
+        action="store_true",
+        help="Write a JSON report with the tokens and bytes of every file, "
+        "directory and output part (<output>_tokens.json)",
+    )
+
+    control_group.add_argument(
+        "--token-budget",
+        type=int,
+        metavar="TOKENS",
+        help="Split the output into parts (<output>_part1, ...) of at most "
+        "TOKENS tokens each, without splitting files",
+    )
+
+    control_group.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help="Keep the existing output if no file or setting changed since the "
+        "last run (tracked in .<output>.m1f-manifest.json)",
+    )
+
+    control_group.add_argument(
+        "--index",
+        action="store_true",
+        help="Write a sidecar index (.<output>.m1f-index.json) so m1f-s1f can "
+        "list the bundle and extract single files without reading all of it",
+    )
+
     control_group.add_argument(
         "-v", "--verbose", action="store_true", help="Enable verbose output"
     )
@@ -352,6 +398,50 @@ Perfect for:
         "-q", "--quiet", action="store_true", help="Suppress all console output"
     )
 
+    # Performance group
+    performance_group = parser.add_argument_group("Performance Options")
+
+    performance_group.add_argument(
+        "--concurrency",
+        type=int,
+        metavar="N",
+        help="Number of files read and processed at the same time (default: 10)",
+    )
+
+    performance_group.add_argument(
+        "--max-buffer-size",
+        type=str,
+        metavar="SIZE",
+        help="Maximum processed content held in memory while writing in order "
+        "(e.g., 64MB; default: 64MB)",
+    )
+
+    performance_group.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help="Run CPU-bound per-file work (encoding detection, presets, "
+        "checksums) in N worker processes (default: 0, in-process)",
+    )
+
+    # Cache group
+    cache_group = parser.add_argument_group("Cache Options")
+
+    cache_group.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse per-file results (encoding, checksums, security findings) "
+        "from previous runs for unchanged files",
+    )
+
+    cache_group.add_argument(
+        "--cache-dir",
+        type=str,
+        metavar="DIR",
+        help="Directory for the file cache (implies --cache; "
+        "default: .m1f-cache next to the output file)",
+    )
+
     # Preset configuration group
     preset_group = parser.add_argument_group("Preset Configuration")
 
@@ -404,4 +494,19 @@ def parse_args(
     if parsed_args.quiet and parsed_args.verbose:
         parser.error("Cannot use --quiet and --verbose together")
 
+    if parsed_args.concurrency is not None and parsed_args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    if parsed_args.workers is not None and parsed_args.workers < 0:
+        parser.error("--workers must not be negative")
+
+    if parsed_args.archive_threads < 0:
+        parser.error("--archive-threads must not be negative")
+
+    if parsed_args.token_budget is not None:
+        if parsed_args.token_budget < 1:
+            parser.error("--token-budget must be at least 1")
+        if parsed_args.skip_output_file:
+            parser.error("Cannot use --token-budget with --skip-output-file")
+
     return parsed_args
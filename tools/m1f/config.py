@@ -24,6 +24,7 @@ from pathlib import Path
 from typing import Optional, Set, List, Union
 import argparse
 
+from .constants import DEFAULT_CONCURRENCY, DEFAULT_MAX_BUFFER_SIZE
 from .utils import parse_file_size, validate_path_traversal
 
 
@@ -59,6 +60,8 @@ class ArchiveType(Enum):
 
     ZIP = "zip"
     TAR_GZ = "tar.gz"
+    TAR_XZ = "tar.xz"
+    TAR_ZST = "tar.zst"  # Requires zstandard
 
 
 class SecurityCheckMode(Enum):
@@ -92,6 +95,13 @@ class OutputConfig:
     line_ending: LineEnding = LineEnding.LF
     parallel: bool = True  # Default to parallel processing for better performance
     enable_content_deduplication: bool = True  # Enable content deduplication by default
+    concurrency: int = DEFAULT_CONCURRENCY  # Files processed at the same time
+    max_buffer_size: int = DEFAULT_MAX_BUFFER_SIZE  # Bytes held for ordered writing
+    workers: int = 0  # Worker processes for CPU-bound work (0 = in-process)
+    token_report: bool = False  # Write a per-file/per-directory token report
+    token_budget: Optional[int] = None  # Split output into parts of at most N tokens
+    skip_unchanged: bool = False  # Keep the output if no input changed since last run
+    write_index: bool = False  # Write a sidecar index for random access by s1f
 
 
 @dataclass(frozen=True)
@@ -128,6 +138,8 @@ class ArchiveConfig:
 
     create_archive: bool = False
     archive_type: ArchiveType = ArchiveType.ZIP
+    compression_level: Optional[int] = None  # None = default of the archive type
+    threads: int = 0  # Compression threads (0 = one per CPU, up to 8)
 
 
 @dataclass(frozen=True)
@@ -147,6 +159,14 @@ class PresetConfig:
     disable_presets: bool = False
 
 
+@dataclass(frozen=True)
+class CacheConfig:
+    """Configuration for the persistent incremental file cache."""
+
+    enabled: bool = False
+    cache_dir: Optional[Path] = None  # Defaults to .m1f-cache next to the output
+
+
 @dataclass(frozen=True)
 class Config:
     """Main configuration class that combines all settings."""
@@ -161,6 +181,7 @@ class Config:
     archive: ArchiveConfig
     logging: LoggingConfig
     preset: PresetConfig
+    cache: CacheConfig = field(default_factory=CacheConfig)
 
     @classmethod
     def from_args(cls, args: argparse.Namespace) -> Config:
@@ -221,6 +242,14 @@ class Config:
             output_file_path = validate_path_traversal(
                 resolved_path, allow_outside=True
             )
+        # Parse the write buffer ceiling if provided
+        max_buffer_size = DEFAULT_MAX_BUFFER_SIZE
+        if getattr(args, "max_buffer_size", None):
+            try:
+                max_buffer_size = parse_file_size(args.max_buffer_size)
+            except ValueError as e:
+                raise ValueError(f"Invalid --max-buffer-size value: {e}")
+
         output_config = OutputConfig(
             output_file=output_file_path
             or Path("output.txt"),  # Default if not provided
@@ -234,6 +263,13 @@ class Config:
             enable_content_deduplication=not getattr(
                 args, "allow_duplicate_files", False
             ),
+            concurrency=getattr(args, "concurrency", None) or DEFAULT_CONCURRENCY,
+            max_buffer_size=max_buffer_size,
+            workers=getattr(args, "workers", None) or 0,
+            token_report=getattr(args, "token_report", False),
+            token_budget=getattr(args, "token_budget", None),
+            skip_unchanged=getattr(args, "skip_unchanged", False),
+            write_index=getattr(args, "index", False),
         )
 
         # Parse max file size if provided
@@ -287,6 +323,8 @@ class Config:
         archive_config = ArchiveConfig(
             create_archive=getattr(args, "create_archive", False),
             archive_type=ArchiveType(getattr(args, "archive_type", "zip")),
+            compression_level=getattr(args, "archive_level", None),
+            threads=getattr(args, "archive_threads", 0),
         )
 
         # Create logging configuration
@@ -308,6 +346,16 @@ class Config:
             disable_presets=getattr(args, "disable_presets", False),
         )
 
+        # Create cache configuration
+        cache_dir = None
+        if getattr(args, "cache_dir", None):
+            cache_dir = Path(args.cache_dir).resolve()
+
+        cache_config = CacheConfig(
+            enabled=getattr(args, "cache", False) or cache_dir is not None,
+            cache_dir=cache_dir,
+        )
+
         return cls(
             source_directories=source_dirs,
             input_file=input_file,
@@ -319,6 +367,7 @@ class Config:
             archive=archive_config,
             logging=logging_config,
             preset=preset_config,
+            cache=cache_config,
         )
 
     @classmethod
@@ -424,6 +473,13 @@ class Config:
                     else config.output.enable_content_deduplication
                 )
             ),
+            concurrency=config.output.concurrency,  # Keep existing value
+            max_buffer_size=config.output.max_buffer_size,  # Keep existing value
+            workers=config.output.workers,  # Keep existing value
+            token_report=config.output.token_report,  # Keep existing value
+            token_budget=config.output.token_budget,  # Keep existing value
+            skip_unchanged=config.output.skip_unchanged,  # Keep existing value
+            write_index=config.output.write_index,  # Keep existing value
         )
 
         # Create new ArchiveConfig with overrides
@@ -439,6 +495,8 @@ class Config:
                     else ArchiveType.ZIP
                 )
             ),
+            compression_level=config.archive.compression_level,  # Keep existing value
+            threads=config.archive.threads,  # Keep existing value
         )
 
         # Create new LoggingConfig with overrides
@@ -461,6 +519,7 @@ class Config:
             archive=archive_config,
             logging=logging_config,
             preset=config.preset,
+            cache=config.cache,
         )
 
 
@@ -66,6 +66,18 @@ MAX_SYMLINK_DEPTH: int = 40
 # Buffer size for file reading
 READ_BUFFER_SIZE: int = 8192
 
+# Default number of files read and processed concurrently when writing
+DEFAULT_CONCURRENCY: int = 10
+
+# Default ceiling for processed file content buffered while writing in order
+DEFAULT_MAX_BUFFER_SIZE: int = 64 * 1024 * 1024
+
+# Default size of the file contents shared between the bundles of m1f-update
+DEFAULT_SHARED_FILE_CACHE_SIZE: int = 256 * 1024 * 1024
+
+# Seconds without further changes before watched bundles are rebuilt
+DEFAULT_DEBOUNCE: float = 0.2
+
 # Boundary marker prefix for machine-readable format
 MACHINE_READABLE_BOUNDARY_PREFIX: str = "PYMK1F"
 
@@ -20,15 +20,16 @@ from __future__ import annotations
 
 import asyncio
 import gc
-import hashlib
+import json
+import os
 import sys
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple, Optional, Set
+from typing import Dict, List, Tuple, Optional, Set
 from datetime import datetime, timezone
 
-from .config import Config, SeparatorStyle
+from .config import ArchiveType, Config, SeparatorStyle
 from .exceptions import (
     FileNotFoundError,
     PermissionError,
@@ -37,12 +38,27 @@ from .exceptions import (
 )
 from .logging import LoggerManager, get_logger
 from .file_processor import FileProcessor
-from .output_writer import OutputWriter
-from .archive_creator import ArchiveCreator
-from .security_scanner import SecurityScanner
+from .output_writer import OutputWriter, part_path, remove_stale_parts
+from .archive_creator import (
+    COMPRESSION_LEVELS,
+    ZSTANDARD_AVAILABLE,
+    ArchiveCreator,
+)
+from .bundle_index import BundleIndex, IndexEntry, index_path_for, remove_index
+from .file_cache import FileCache
+from .output_manifest import (
+    OutputManifest,
+    compute_settings_fingerprint,
+    manifest_path_for,
+)
+from .file_operations import DirectoryListingCache
+from .loaded_file import LoadedFileCache, LoadedFileStore
+from .security_scanner import SecurityScanner, DETECT_SECRETS_AVAILABLE
+from .encoding_handler import CHARDET_AVAILABLE
+from .token_counter import TIKTOKEN_AVAILABLE, TokenCounter, build_token_report
 from .utils import (
+    ContentHash,
     format_duration,
-    sort_files_by_depth_and_name,
     sort_directories_by_depth_and_name,
 )
 from .file_operations import (
@@ -52,6 +68,21 @@ from .file_operations import (
 )
 
 
+def _temporary_output_path(output_path: Path) -> Path:
+    """Hidden path next to the output file used while it is written."""
+    return output_path.with_name(f".{output_path.stem}.m1f-tmp{output_path.suffix}")
+
+
+def _remove_temporary_output(write_path: Path, logger) -> None:
+    """Remove an output file (and its parts) left by an aborted run."""
+    try:
+        if write_path.exists():
+            write_path.unlink()
+        remove_stale_parts(write_path, 0, logger)
+    except OSError as e:
+        logger.warning(f"Could not remove temporary output {write_path}: {e}")
+
+
 @dataclass
 class ProcessingResult:
     """Result of the file processing operation."""
@@ -63,18 +94,40 @@ class ProcessingResult:
     archive_file: Optional[Path] = None
     token_count: Optional[int] = None
     flagged_files: List[str] = None
+    # Tokens per written file (relative path), if tokens were counted
+    file_token_counts: Optional[Dict[str, int]] = None
+    # Files the output was split into with a token budget
+    output_parts: Optional[List[Path]] = None
+    # True if the output was left as is because no input changed
+    unchanged: bool = False
 
 
 class FileCombiner:
     """Main class that orchestrates the file combination process."""
 
-    def __init__(self, config: Config, logger_manager: LoggerManager):
+    def __init__(
+        self,
+        config: Config,
+        logger_manager: LoggerManager,
+        directory_listings: Optional[DirectoryListingCache] = None,
+        shared_files: Optional[LoadedFileCache] = None,
+    ):
+        """Create a combiner for one run.
+
+        Args:
+            config: Configuration of the run
+            logger_manager: Logger manager of the run
+            directory_listings: Directory listings shared with other runs in
+                this process (e.g. the bundles of m1f-update)
+            shared_files: File contents shared with other runs
+        """
         self.config = config
         self.logger_manager = logger_manager
         self.logger = logger_manager.get_logger(__name__)
 
         # Initialize components
         self.file_processor = FileProcessor(config, logger_manager)
+        self.file_processor.directory_listings = directory_listings
         self.output_writer = OutputWriter(config, logger_manager)
         self.archive_creator = ArchiveCreator(config, logger_manager)
         self.security_scanner = SecurityScanner(config, logger_manager)
@@ -83,14 +136,51 @@ class FileCombiner:
         if self.file_processor.preset_manager:
             self.security_scanner.preset_manager = self.file_processor.preset_manager
 
+        # Files read by the security scan are handed to the writer so they
+        # aren't read from disk twice (bounded by the output buffer size)
+        self.loaded_files = LoadedFileStore(
+            config.output.max_buffer_size, shared=shared_files
+        )
+        self.output_writer.loaded_files = self.loaded_files
+        self.security_scanner.loaded_files = self.loaded_files
+
+        # Persistent file cache, loaded in run() once the output path is known
+        self.file_cache: Optional[FileCache] = None
+
+        # Files found by the last run, before security filtering (used by
+        # the auto-bundle watcher to map changed paths to bundles)
+        self.gathered_files: List[Tuple[Path, str]] = []
+
     async def run(self) -> ProcessingResult:
         """Run the file combination process."""
         start_time = time.time()
+        archive_stream = None
 
         try:
             # Validate configuration
             self._validate_config()
 
+            # Leave the output alone if nothing changed since the last run
+            manifest_path = None
+            previous_manifest = None
+            files_to_process = None
+            self.loaded_files.states = None
+            if self._uses_manifest():
+                # The manifest records the sources as they were read
+                self.loaded_files.states = {}
+                manifest_path = manifest_path_for(self.config.output.output_file)
+                previous_manifest = await asyncio.to_thread(
+                    OutputManifest.load, manifest_path, self.logger_manager
+                )
+                if previous_manifest is not None:
+                    files_to_process = await self.file_processor.gather_files()
+                    self.gathered_files = files_to_process
+                    result = await self._unchanged_result(
+                        previous_manifest, files_to_process, start_time
+                    )
+                    if result is not None:
+                        return result
+
             # Prepare output file path
             output_path = await self._prepare_output_path()
 
@@ -100,8 +190,15 @@ class FileCombiner:
             # Log initial information
             self._log_start_info()
 
+            # Load the persistent file cache if enabled
+            if self.config.cache.enabled:
+                await self._load_file_cache(output_path)
+
             # Gather files to process
-            files_to_process = await self.file_processor.gather_files()
+            if files_to_process is None:
+                files_to_process = await self.file_processor.gather_files()
+            gathered_files = files_to_process
+            self.gathered_files = gathered_files
 
             if not files_to_process:
                 self.logger.warning("No files found matching the criteria")
@@ -116,54 +213,112 @@ class FileCombiner:
                     output_file=output_path,
                 )
 
+            # Files come back sorted by depth and name (README.md first)
             self.logger.info(f"Found {len(files_to_process)} files to process")
 
-            # Sort files by depth and name (README.md first)
-            files_to_process = sort_files_by_depth_and_name(files_to_process)
-            self.logger.debug("Files sorted by depth and name")
-
-            # Security check if enabled
+            # Security check if enabled. It runs as a stage of the write
+            # pipeline unless the verdicts are needed before writing starts.
             flagged_files = []
-            if self.config.security.security_check:
+            scan_in_pipeline = self._scan_in_pipeline()
+            if scan_in_pipeline:
+                self.output_writer.security_scanner = self.security_scanner
+            elif self.config.security.security_check:
                 flagged_files = await self.security_scanner.scan_files(files_to_process)
                 files_to_process = self._handle_security_results(
                     files_to_process, flagged_files
                 )
 
-            # Generate content hash if requested
-            if self.config.output.filename_mtime_hash:
+            # The content hash for the filename is known once the output is
+            # written; without an output file it is taken from the sources
+            hash_filename = self.config.output.filename_mtime_hash
+            if hash_filename and self.config.output.skip_output_file:
                 output_path = await self._add_content_hash_to_filename(
                     output_path, files_to_process
                 )
                 # Update logger with new path
                 self.logger_manager.set_output_file(output_path)
 
-            # Write auxiliary files
-            await self._write_auxiliary_files(output_path, files_to_process)
-
             # Write main output file
             files_processed = 0
+            token_counter = None
+            token_count = None
             if not self.config.output.skip_output_file:
-                files_processed = await self.output_writer.write_combined_file(
-                    output_path, files_to_process
-                )
+                # Tokens are counted while the sections are written
+                token_counter = self._create_token_counter()
+                self.output_writer.token_counter = token_counter
+                if self._wants_token_report() or self.config.output.write_index:
+                    self.output_writer.sections = []
+
+                # With a hashed filename the output is written under a
+                # temporary name and renamed once its content hash is known
+                write_path = output_path
+                if hash_filename:
+                    write_path = _temporary_output_path(output_path)
+                    self.output_writer.content_hash = ContentHash(
+                        self._settings_fingerprint()
+                    )
+
+                # The archive is filled while the output is written
+                if self.config.archive.create_archive:
+                    archive_stream = self.archive_creator.open_stream(write_path)
+                    self.output_writer.archive_stream = archive_stream
+                try:
+                    files_processed = await self.output_writer.write_combined_file(
+                        write_path, files_to_process
+                    )
+                    if hash_filename:
+                        output_path = await self._move_to_hashed_filename(output_path)
+                        self.logger_manager.set_output_file(output_path)
+                except BaseException:
+                    if token_counter is not None:
+                        token_counter.close()
+                    if hash_filename:
+                        _remove_temporary_output(write_path, self.logger)
+                    raise
+
+                if scan_in_pipeline:
+                    flagged_files = self.output_writer.security_findings
+                    self.security_scanner.log_summary(flagged_files)
+                    files_to_process = self._handle_security_results(
+                        files_to_process, flagged_files
+                    )
+
                 self.logger.info(
                     f"Successfully combined {files_processed} files into '{output_path}'"
                 )
 
                 # Count tokens if available
-                token_count = await self._count_tokens(output_path)
+                token_count = await self._count_tokens(token_counter)
                 if token_count:
                     self.logger.info(
                         f"Output file contains approximately {token_count} tokens"
                     )
+                if self._wants_token_report():
+                    await self._write_token_report(
+                        output_path, token_counter if token_count is not None else None
+                    )
+                if self.config.output.write_index:
+                    await self._write_indexes()
+                else:
+                    # An index of an earlier run no longer fits the output
+                    await asyncio.to_thread(
+                        self._remove_indexes, self.output_writer.output_parts
+                    )
             else:
                 files_processed = len(files_to_process)
                 self.logger.info(f"Found {files_processed} files (output file skipped)")
 
+            # Write auxiliary files (after the security verdicts are known)
+            await self._write_auxiliary_files(output_path, files_to_process)
+
             # Create archive if requested
             archive_path = None
-            if self.config.archive.create_archive and files_processed > 0:
+            if archive_stream is not None:
+                stream, archive_stream = archive_stream, None
+                archive_path = await self.archive_creator.finish_stream(
+                    stream, self.archive_creator.archive_path_for(output_path)
+                )
+            elif self.config.archive.create_archive and files_processed > 0:
                 archive_path = await self.archive_creator.create_archive(
                     output_path, files_to_process
                 )
@@ -179,29 +334,243 @@ class FileCombiner:
             # Calculate execution time
             execution_time = format_duration(time.time() - start_time)
 
-            return ProcessingResult(
+            output_parts = self.output_writer.output_parts
+            if len(output_parts) <= 1:
+                output_parts = None
+
+            result = ProcessingResult(
                 files_processed=files_processed,
                 total_files=len(files_to_process),
                 execution_time=execution_time,
                 output_file=(
-                    output_path if not self.config.output.skip_output_file else None
+                    (output_parts[0] if output_parts else output_path)
+                    if not self.config.output.skip_output_file
+                    else None
                 ),
                 archive_file=archive_path,
-                token_count=(
-                    token_count if not self.config.output.skip_output_file else None
-                ),
+                token_count=token_count,
                 flagged_files=flagged_files,
+                file_token_counts=(
+                    token_counter.counts
+                    if token_counter is not None and token_count is not None
+                    else None
+                ),
+                output_parts=output_parts,
             )
 
+            if manifest_path is not None:
+                await self._save_manifest(
+                    manifest_path,
+                    previous_manifest,
+                    gathered_files,
+                    self._written_files(output_path, archive_path),
+                    result,
+                )
+
+            return result
+
         except Exception as e:
             execution_time = format_duration(time.time() - start_time)
             self.logger.error(f"Processing failed after {execution_time}: {e}")
             raise
         finally:
+            self.loaded_files.clear()
+
+            # Don't leave an incomplete archive behind
+            if archive_stream is not None:
+                await asyncio.to_thread(archive_stream.abort)
+
+            # Persist cache entries even if the run was aborted
+            if self.file_cache:
+                await asyncio.to_thread(self.file_cache.save)
+                self.logger.info(
+                    f"File cache: {self.file_cache.hits} unchanged, "
+                    f"{self.file_cache.misses} new or changed files"
+                )
+
             # Ensure garbage collection to release any remaining file handles on Windows
             if sys.platform.startswith("win"):
                 gc.collect()
 
+    def _environment_fingerprint(self) -> Dict[str, bool]:
+        """Optional dependencies that change per-file results."""
+        return {
+            "chardet": CHARDET_AVAILABLE,
+            "detect_secrets": DETECT_SECRETS_AVAILABLE,
+        }
+
+    def _settings_fingerprint(self) -> str:
+        """Hash of the settings that change the output."""
+        return compute_settings_fingerprint(
+            self.config, self._environment_fingerprint()
+        )
+
+    async def _load_file_cache(self, output_path: Path) -> None:
+        """Load the persistent file cache and share it with all components."""
+        self.file_cache = await asyncio.to_thread(
+            FileCache.for_config,
+            self.config,
+            self.logger_manager,
+            output_path,
+            self._environment_fingerprint(),
+        )
+        self.output_writer.file_cache = self.file_cache
+        self.security_scanner.file_cache = self.file_cache
+        self.logger.debug(f"Using file cache: {self.file_cache.cache_path}")
+
+    def _uses_manifest(self) -> bool:
+        """Check if unchanged runs are detected with a sidecar manifest.
+
+        Timestamped output names are new on every run, and without an output
+        file there is nothing to keep.
+        """
+        output = self.config.output
+        return (
+            output.skip_unchanged
+            and not output.add_timestamp
+            and not output.skip_output_file
+        )
+
+    def _manifest_sources(
+        self, files: List[Tuple[Path, str]]
+    ) -> List[Tuple[Path, str]]:
+        """All files whose content ends up in the output."""
+        includes = [
+            (path, f"include:{path}") for path in self.config.input_include_files
+        ]
+        return includes + list(files)
+
+    def _mtimes_in_output(self) -> bool:
+        """Check if the output records the mtimes of the files.
+
+        Presets can give files a separator style with dates, too.
+        """
+        preset = self.config.preset
+        return (
+            self.config.output.separator_style
+            not in (SeparatorStyle.STANDARD, SeparatorStyle.NONE)
+            or self.config.archive.create_archive
+            or (bool(preset.preset_files) and not preset.disable_presets)
+        )
+
+    async def _unchanged_result(
+        self,
+        manifest: OutputManifest,
+        files: List[Tuple[Path, str]],
+        start_time: float,
+    ) -> Optional[ProcessingResult]:
+        """Return the previous result if the output is still up to date."""
+        fingerprint = self._settings_fingerprint()
+        sources = self._manifest_sources(files)
+        if not await asyncio.to_thread(
+            manifest.is_current, sources, fingerprint, self._mtimes_in_output()
+        ):
+            self.logger.debug("Sources or settings changed, writing output")
+            return None
+
+        # Record the new mtimes of touched files so they aren't read again
+        if manifest.dirty:
+            try:
+                await asyncio.to_thread(manifest.save)
+            except OSError as e:
+                self.logger.debug(f"Could not update manifest: {e}")
+
+        previous = manifest.result
+        output_file = Path(previous["output_file"])
+        self.logger.info(f"No changes since the last run, keeping '{output_file}'")
+
+        # The kept output still contains what the last run warned about
+        flagged_files = previous["flagged_files"]
+        if (
+            self.config.security.security_check
+            and self.config.security.security_check.value == "warn"
+            and flagged_files
+        ):
+            self._log_security_warning(flagged_files)
+
+        return ProcessingResult(
+            files_processed=previous["files_processed"],
+            total_files=len(files),
+            execution_time=format_duration(time.time() - start_time),
+            output_file=output_file,
+            archive_file=(
+                Path(previous["archive_file"]) if previous["archive_file"] else None
+            ),
+            token_count=previous["token_count"],
+            flagged_files=flagged_files,
+            output_parts=(
+                [Path(part) for part in previous["output_parts"]]
+                if previous["output_parts"]
+                else None
+            ),
+            unchanged=True,
+        )
+
+    def _written_files(
+        self, output_path: Path, archive_path: Optional[Path]
+    ) -> List[Path]:
+        """Files written by this run."""
+        stem = output_path.stem
+        candidates = list(self.output_writer.output_parts) or [output_path]
+        if not self.config.output.minimal_output:
+            candidates.append(output_path.with_name(f"{stem}_filelist.txt"))
+            candidates.append(output_path.with_name(f"{stem}_dirlist.txt"))
+        if self._wants_token_report():
+            candidates.append(output_path.with_name(f"{stem}_tokens.json"))
+        if self.config.output.write_index:
+            candidates.extend(
+                index_path_for(part)
+                for part in list(self.output_writer.output_parts) or [output_path]
+            )
+        if archive_path:
+            candidates.append(archive_path)
+        return [path for path in candidates if safe_exists(path, self.logger)]
+
+    async def _save_manifest(
+        self,
+        manifest_path: Path,
+        previous: Optional[OutputManifest],
+        files: List[Tuple[Path, str]],
+        outputs: List[Path],
+        result: ProcessingResult,
+    ) -> None:
+        """Record this run so an unchanged next run can be skipped."""
+        fingerprint = self._settings_fingerprint()
+        summary = {
+            "files_processed": result.files_processed,
+            "output_file": str(result.output_file),
+            "output_parts": (
+                [str(part) for part in result.output_parts]
+                if result.output_parts
+                else None
+            ),
+            "archive_file": str(result.archive_file) if result.archive_file else None,
+            "token_count": result.token_count,
+            "flagged_files": result.flagged_files or [],
+        }
+
+        def build_and_save():
+            manifest = OutputManifest.build(
+                manifest_path,
+                fingerprint,
+                self._manifest_sources(files),
+                outputs,
+                summary,
+                previous,
+                self.loaded_files.states,
+            )
+            manifest.save()
+
+        try:
+            await asyncio.to_thread(build_and_save)
+        except OSError as e:
+            # Without a manifest the next run just writes the output again
+            self.logger.warning(f"Could not write manifest {manifest_path}: {e}")
+            try:
+                manifest_path.unlink()
+            except OSError:
+                pass
+
     def _validate_config(self) -> None:
         """Validate the configuration."""
         if not self.config.source_directories and not self.config.input_file:
@@ -217,6 +586,23 @@ class FileCombiner:
         ):
             raise FileNotFoundError(f"Input file not found: {self.config.input_file}")
 
+        if self.config.output.token_budget and not TIKTOKEN_AVAILABLE:
+            raise ValidationError("A token budget requires tiktoken to be installed")
+
+        archive = self.config.archive
+        if archive.create_archive:
+            if archive.archive_type == ArchiveType.TAR_ZST and not ZSTANDARD_AVAILABLE:
+                raise ValidationError(
+                    "tar.zst archives require zstandard to be installed"
+                )
+            lowest, highest, _ = COMPRESSION_LEVELS[archive.archive_type]
+            level = archive.compression_level
+            if level is not None and not lowest <= level <= highest:
+                raise ValidationError(
+                    f"Compression level for {archive.archive_type.value} archives "
+                    f"must be between {lowest} and {highest}"
+                )
+
     async def _prepare_output_path(self) -> Path:
         """Prepare the output file path."""
         output_path = self.config.output.output_file
@@ -307,6 +693,19 @@ class FileCombiner:
         if self.config.filter.include_symlinks:
             self.logger.info("Following symbolic links")
 
+    def _scan_in_pipeline(self) -> bool:
+        """Whether the security scan can run inside the write pipeline.
+
+        Abort mode must see every verdict before anything is written, so it
+        uses the (parallel) pre-pass scan instead.
+        """
+        mode = self.config.security.security_check
+        if not mode or mode.value == "abort":
+            return False
+        if self.config.output.skip_output_file:
+            return False
+        return True
+
     def _handle_security_results(
         self, files: List[Tuple[Path, str]], flagged: List[dict]
     ) -> List[Tuple[Path, str]]:
@@ -339,27 +738,45 @@ class FileCombiner:
     async def _add_content_hash_to_filename(
         self, output_path: Path, files: List[Tuple[Path, str]]
     ) -> Path:
-        """Add content hash to the output filename."""
-        # Generate hash from file names and modification times
-        hash_input = []
-
-        for file_path, rel_path in files:
-            hash_input.append(str(rel_path))
-            try:
-                import os
-
-                mtime = os.path.getmtime(file_path)
-                hash_input.append(str(mtime))
-            except Exception:
-                hash_input.append(f"ERROR_{rel_path}")
-
-        # Sort for consistency
-        hash_input.sort()
+        """Add the content hash of the bundle to the output filename.
+
+        Used when no output file is written; otherwise the hash is built from
+        the checksums computed while writing (see _move_to_hashed_filename).
+        Both hash the processed, deduplicated files, so they give the same
+        name.
+        """
+        self.output_writer.content_hash = ContentHash(self._settings_fingerprint())
+        digest = await self.output_writer.hash_combined_file(files)
+        return self._hashed_output_path(output_path, digest)
+
+    async def _move_to_hashed_filename(self, output_path: Path) -> Path:
+        """Rename the output written under a temporary name to its hashed name.
+
+        Parts of a split output are renamed along with it.
+        """
+        digest = self.output_writer.content_hash.hexdigest()
+        new_path = self._hashed_output_path(output_path, digest)
+
+        def move() -> List[Path]:
+            written = self.output_writer.output_parts
+            if len(written) <= 1:
+                os.replace(written[0], new_path)
+                moved = [new_path]
+            else:
+                moved = [
+                    part_path(new_path, number) for number in range(1, len(written) + 1)
+                ]
+                for source, target in zip(written, moved):
+                    os.replace(source, target)
+            remove_stale_parts(new_path, len(moved), self.logger)
+            return moved
+
+        self.output_writer.output_parts = await asyncio.to_thread(move)
+        return new_path
 
-        # Create hash
-        combined = ";".join(hash_input)
-        hash_obj = hashlib.sha256(combined.encode("utf-8"))
-        content_hash = hash_obj.hexdigest()[:12]
+    def _hashed_output_path(self, output_path: Path, digest: str) -> Path:
+        """Insert the first 12 characters of a content hash into the filename."""
+        content_hash = digest[:12]
 
         # Create new filename
         # If timestamp was already added, we need to extract it and reorder
@@ -481,44 +898,108 @@ class FileCombiner:
         except Exception as e:
             raise PermissionError(f"Cannot create output file: {e}")
 
-    async def _count_tokens(self, output_path: Path) -> Optional[int]:
-        """Count tokens in the output file."""
+    def _create_token_counter(self) -> Optional[TokenCounter]:
+        """Create the counter for the tokens of the output file."""
         if self.config.output.minimal_output:
             return None
 
-        try:
-            import tiktoken
-
-            # Read file content
-            def read_file():
-                content = None
-                with safe_open(output_path, "r", self.logger, encoding="utf-8") as f:
-                    if f is not None:
-                        content = f.read()
-                    else:
-                        self.logger.warning(
-                            f"Cannot read output file for token counting: {output_path}"
-                        )
-                        return None
-                # Explicitly ensure file handle is released
-                f = None
-                return content
-
-            content = await asyncio.to_thread(read_file)
-
-            # Count tokens
-            encoding = tiktoken.get_encoding("cl100k_base")
-            tokens = encoding.encode(content)
+        if not TIKTOKEN_AVAILABLE:
+            self.logger.debug("tiktoken not available for token counting")
+            return None
 
-            return len(tokens)
+        try:
+            return TokenCounter()
+        except Exception as e:
+            self.logger.warning(f"Could not count tokens: {e}")
+            return None
 
-        except ImportError:
-            self.logger.debug("tiktoken not available for token counting")
+    async def _count_tokens(
+        self, token_counter: Optional[TokenCounter]
+    ) -> Optional[int]:
+        """Count the tokens of the sections written to the output file."""
+        if token_counter is None:
             return None
+
+        try:
+            return await asyncio.to_thread(token_counter.finish)
         except Exception as e:
             self.logger.warning(f"Could not count tokens: {e}")
             return None
 
+    def _wants_token_report(self) -> bool:
+        """Check if the per-file token report is written."""
+        return self.config.output.token_report and not self.config.output.minimal_output
+
+    async def _write_token_report(
+        self, output_path: Path, token_counter: Optional[TokenCounter]
+    ) -> None:
+        """Write the per-file/per-directory token report next to the output."""
+        if token_counter is None:
+            self.logger.warning("Token report skipped: tokens could not be counted")
+            return
+
+        report = build_token_report(
+            token_counter.counts,
+            self.output_writer.sections or [],
+            [part.name for part in self.output_writer.output_parts],
+            token_counter.encoding.name,
+            self.config.output.token_budget,
+        )
+        report_path = output_path.with_name(f"{output_path.stem}_tokens.json")
+
+        def write_report():
+            with safe_open(report_path, "w", self.logger, encoding="utf-8") as f:
+                if f is None:
+                    raise PermissionError(f"Cannot write token report to {report_path}")
+                json.dump(report, f, indent=2)
+                f.write("\n")
+
+        await asyncio.to_thread(write_report)
+        self.logger.info(f"Token report written to {report_path}")
+
+    def _remove_indexes(self, outputs: List[Path]) -> None:
+        """Remove the sidecar indexes of output files written without one."""
+        for output in outputs:
+            remove_index(output, self.logger)
+
+    async def _write_indexes(self) -> None:
+        """Write the sidecar index of each written output file (or part)."""
+        style = self.config.output.separator_style
+        if style == SeparatorStyle.NONE:
+            self.logger.warning(
+                "Index skipped: files can't be told apart without separators"
+            )
+            return
+        encoding = self.config.encoding.target_charset or "utf-8"
+        sections = self.output_writer.sections or []
+
+        def write_indexes() -> List[Path]:
+            written = []
+            for number, part in enumerate(self.output_writer.output_parts, 1):
+                entries = [
+                    IndexEntry(
+                        section.rel_path,
+                        section.offset,
+                        section.length,
+                        section.checksum,
+                        section.encoding,
+                        section.file_size,
+                    )
+                    for section in sections
+                    if section.part == number and not section.is_error
+                ]
+                index = BundleIndex.for_bundle(part, entries, encoding, style.value)
+                written.append(index.save(part))
+            return written
+
+        try:
+            index_paths = await asyncio.to_thread(write_indexes)
+        except OSError as e:
+            self.logger.warning(f"Could not write index: {e}")
+            return
+        for index_path in index_paths:
+            self.logger.info(f"Index written to {index_path}")
+
     def _log_security_warning(self, flagged_files: List[dict]) -> None:
         """Log security warning for flagged files."""
         message = "SECURITY WARNING: Sensitive information detected in the following locations:\n"
@@ -19,8 +19,7 @@ Encoding handler module for character encoding detection and conversion.
 from __future__ import annotations
 
 import asyncio
-import gc
-import sys
+import importlib.util
 from pathlib import Path
 from typing import Tuple, Optional
 from dataclasses import dataclass
@@ -28,18 +27,12 @@ from dataclasses import dataclass
 from .config import Config
 from .constants import UTF8_PREFERRED_EXTENSIONS
 from .exceptions import EncodingError
+from .loaded_file import LoadedFile
 from .logging import LoggerManager
-from .file_operations import (
-    safe_open,
-)
 
-# Try to import chardet for encoding detection
-try:
-    import chardet
-
-    CHARDET_AVAILABLE = True
-except ImportError:
-    CHARDET_AVAILABLE = False
+# chardet is used for encoding detection. It is slow to import, so it is
+# only imported when the first file has to be detected.
+CHARDET_AVAILABLE = importlib.util.find_spec("chardet") is not None
 
 
 @dataclass
@@ -63,17 +56,51 @@ class EncodingHandler:
                 "chardet library not available. Encoding detection will be limited."
             )
 
-    async def read_file(self, file_path: Path) -> Tuple[str, EncodingInfo]:
-        """Read a file with encoding detection and optional conversion."""
+    async def read_file(
+        self,
+        file_path: Path,
+        detected_encoding: Optional[str] = None,
+        loaded: Optional[LoadedFile] = None,
+    ) -> Tuple[str, EncodingInfo]:
+        """Read a file with encoding detection and optional conversion.
+
+        Args:
+            file_path: File to read
+            detected_encoding: Previously detected encoding (e.g. from the file
+                cache); skips detection when given
+            loaded: The file's bytes if already loaded by an earlier phase
+
+        Returns:
+            Tuple of (content, encoding info)
+        """
+        # Blocking reads run in a worker thread so several files can be read
+        # concurrently without stalling the event loop
+        return await asyncio.to_thread(
+            self.read_file_sync, file_path, detected_encoding, loaded
+        )
+
+    def read_file_sync(
+        self,
+        file_path: Path,
+        detected_encoding: Optional[str] = None,
+        loaded: Optional[LoadedFile] = None,
+    ) -> Tuple[str, EncodingInfo]:
+        """Synchronous variant of read_file()."""
+        # The file is read from disk once; detection and decoding work on
+        # the same buffer
+        if loaded is None:
+            loaded = LoadedFile.read(file_path)
+
         # Detect encoding
-        detected_encoding = await self._detect_encoding(file_path)
+        if not detected_encoding:
+            detected_encoding = self._detect_encoding(file_path, loaded.data[:65536])
 
         # Determine target encoding
         target_encoding = self.config.encoding.target_charset or detected_encoding
 
-        # Read and convert file
-        content, had_errors = await self._read_and_convert(
-            file_path, detected_encoding, target_encoding
+        # Decode and convert file
+        content, had_errors = self._decode_and_convert(
+            file_path, loaded.data, detected_encoding, target_encoding
         )
 
         # Create encoding info
@@ -87,24 +114,16 @@ class EncodingHandler:
 
         return content, encoding_info
 
-    async def _detect_encoding(self, file_path: Path) -> str:
-        """Detect the encoding of a file."""
+    def _detect_encoding(self, file_path: Path, raw_data: bytes) -> str:
+        """Detect the encoding of a file from its first bytes."""
         # Default to utf-8 if chardet is not available
         if not CHARDET_AVAILABLE:
             self.logger.debug(f"chardet not available, using UTF-8 for {file_path}")
             return "utf-8"
 
         try:
-            # Read file in binary mode with explicit handle cleanup
-            raw_data = None
-            with safe_open(file_path, "rb", logger=self.logger) as f:
-                raw_data = f.read(65536)  # Read up to 64KB
-            # Explicitly ensure file handle is released
-            f = None
-
             if not raw_data:
                 return "utf-8"
-
             # Check for BOM (Byte Order Mark)
             if raw_data.startswith(b"\xff\xfe"):
                 return "utf-16-le"
@@ -132,6 +151,8 @@ class EncodingHandler:
                 pass
 
             # Use chardet for detection
+            import chardet
+
             result = chardet.detect(raw_data)
 
             # If chardet returns None or empty encoding, default to utf-8
@@ -187,10 +208,6 @@ class EncodingHandler:
         except Exception as e:
             self.logger.warning(f"Error detecting encoding for {file_path}: {e}")
             return "utf-8"
-        finally:
-            # Force garbage collection on Windows to ensure file handles are released
-            if sys.platform.startswith("win"):
-                gc.collect()
 
     def _looks_like_utf16(self, data: bytes) -> bool:
         """Check if data looks like UTF-16 encoded text."""
@@ -205,38 +222,27 @@ class EncodingHandler:
 
         return zero_count > 40  # More than 40% of checked bytes are zero
 
-    async def _read_and_convert(
-        self, file_path: Path, source_encoding: str, target_encoding: str
+    def _decode_and_convert(
+        self, file_path: Path, data: bytes, source_encoding: str, target_encoding: str
     ) -> Tuple[str, bool]:
-        """Read a file and convert to target encoding."""
+        """Decode file bytes and convert to target encoding."""
         had_errors = False
 
         try:
-            # Read file with source encoding and explicit handle cleanup
-            content = None
             try:
-                with safe_open(
-                    file_path, "r", encoding=source_encoding, logger=self.logger
-                ) as f:
-                    content = f.read()
-            except UnicodeDecodeError as e:
-                # If initial read fails, try with error handling
+                content = data.decode(source_encoding)
+            except UnicodeDecodeError:
+                # If initial decoding fails, try with error handling
                 self.logger.debug(
                     f"Initial read failed for {file_path} with {source_encoding}, "
                     f"retrying with error replacement"
                 )
-                with safe_open(
-                    file_path,
-                    "r",
-                    encoding=source_encoding,
-                    errors="replace",
-                    logger=self.logger,
-                ) as f:
-                    content = f.read()
+                content = data.decode(source_encoding, errors="replace")
                 had_errors = True
 
-            # Explicitly ensure file handle is released
-            f = None
+            # Same newline translation as reading in text mode
+            if "\r" in content:
+                content = content.replace("\r\n", "\n").replace("\r", "\n")
 
             # If no conversion needed, return as is
             if source_encoding.lower() == target_encoding.lower():
@@ -280,52 +286,22 @@ class EncodingHandler:
                     f"Cannot decode {file_path} with encoding {source_encoding}: {e}"
                 )
 
-            # Last resort: read as binary and decode with replacement
-            try:
-                binary_data = None
-                with safe_open(file_path, "rb", logger=self.logger) as f:
-                    binary_data = f.read()
-                # Explicitly ensure file handle is released
-                f = None
-
-                # Try UTF-8 first, then fallback to latin-1
-                for fallback_encoding in ["utf-8", "latin-1"]:
-                    try:
-                        content = binary_data.decode(
-                            fallback_encoding, errors="replace"
-                        )
-                        self.logger.warning(
-                            f"Failed to decode {file_path} with {source_encoding}, "
-                            f"using {fallback_encoding} fallback"
-                        )
-                        break
-                    except Exception:
-                        continue
-                else:
-                    # Ultimate fallback - decode as latin-1 which accepts all bytes
-                    content = binary_data.decode("latin-1", errors="replace")
-                    self.logger.error(
-                        f"Failed to decode {file_path} properly, using latin-1 fallback"
+            # Last resort: decode with replacement, UTF-8 first, then latin-1
+            for fallback_encoding in ["utf-8", "latin-1"]:
+                try:
+                    content = data.decode(fallback_encoding, errors="replace")
+                    self.logger.warning(
+                        f"Failed to decode {file_path} with {source_encoding}, "
+                        f"using {fallback_encoding} fallback"
                     )
-
-                return content, True
-
-            except Exception as e2:
-                # Final fallback
-                error_content = (
-                    f"[ERROR: Unable to read file {file_path}. Reason: {e2}]"
+                    break
+                except Exception:
+                    continue
+            else:
+                # Ultimate fallback - decode as latin-1 which accepts all bytes
+                content = data.decode("latin-1", errors="replace")
+                self.logger.error(
+                    f"Failed to decode {file_path} properly, using latin-1 fallback"
                 )
-                return error_content, True
 
-        except Exception as e:
-            # Handle other errors (file not found, permissions, etc.)
-            if self.config.encoding.abort_on_error:
-                raise EncodingError(f"Error reading {file_path}: {e}")
-
-            # Return error message as content
-            error_content = f"[ERROR: Unable to read file {file_path}. Reason: {e}]"
-            return error_content, True
-        finally:
-            # Force garbage collection on Windows to ensure file handles are released
-            if sys.platform.startswith("win"):
-                gc.collect()
+            return content, True
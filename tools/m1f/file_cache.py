@@ -0,0 +1,233 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Persistent incremental file cache for m1f.
+
+The cache remembers per-file results (detected encoding, content checksum,
+security findings) between runs. Entries are keyed by the absolute path and
+are only reused while the file's size, mtime_ns and inode are unchanged.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .config import Config
+from .logging import LoggerManager
+
+# Bump whenever the meaning of a cached field changes
+CACHE_FORMAT_VERSION = 1
+
+# Default cache directory, created next to the output file
+DEFAULT_CACHE_DIR_NAME = ".m1f-cache"
+
+
+@dataclass
+class CacheEntry:
+    """Cached per-file results, valid for one (size, mtime_ns, inode) state."""
+
+    size: int
+    mtime_ns: int
+    inode: int
+    encoding_info: Optional[Dict[str, Any]] = None
+    checksum: Optional[str] = None
+    findings: Optional[List[Dict[str, Any]]] = None
+
+    def matches(self, stat_result: os.stat_result) -> bool:
+        """Check whether the entry still describes the given stat result."""
+        return (
+            self.size == stat_result.st_size
+            and self.mtime_ns == stat_result.st_mtime_ns
+            and self.inode == stat_result.st_ino
+        )
+
+    @classmethod
+    def from_stat(cls, stat_result: os.stat_result) -> CacheEntry:
+        """Create an empty entry for the given stat result."""
+        return cls(
+            size=stat_result.st_size,
+            mtime_ns=stat_result.st_mtime_ns,
+            inode=stat_result.st_ino,
+        )
+
+
+class FileCache:
+    """On-disk cache of per-file processing results."""
+
+    def __init__(
+        self, cache_path: Path, fingerprint: str, logger_manager: LoggerManager
+    ):
+        self.cache_path = cache_path
+        self.fingerprint = fingerprint
+        self.logger = logger_manager.get_logger(__name__)
+        self._entries: Dict[str, CacheEntry] = {}
+        self._current: Dict[str, Optional[CacheEntry]] = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_config(
+        cls,
+        config: Config,
+        logger_manager: LoggerManager,
+        output_path: Path,
+        extra_fingerprint: Optional[Dict[str, Any]] = None,
+    ) -> FileCache:
+        """Create the cache for a run, keyed by the settings that affect results."""
+        cache_dir = config.cache.cache_dir or (
+            output_path.parent / DEFAULT_CACHE_DIR_NAME
+        )
+        fingerprint = compute_fingerprint(config, extra_fingerprint)
+        cache = cls(cache_dir / f"{fingerprint[:16]}.json", fingerprint, logger_manager)
+        cache.load()
+        return cache
+
+    def load(self) -> None:
+        """Load cache entries from disk, ignoring missing or stale cache files."""
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable cache {self.cache_path}: {e}")
+            return
+
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != CACHE_FORMAT_VERSION
+            or data.get("fingerprint") != self.fingerprint
+        ):
+            self.logger.debug(f"Discarding outdated cache {self.cache_path}")
+            return
+
+        for path, raw_entry in data.get("entries", {}).items():
+            try:
+                self._entries[path] = CacheEntry(**raw_entry)
+            except TypeError:
+                continue
+
+        self.logger.debug(
+            f"Loaded {len(self._entries)} cache entries from {self.cache_path}"
+        )
+
+    def save(self) -> None:
+        """Write the cache atomically if anything changed."""
+        if not self._dirty:
+            return
+
+        data = {
+            "version": CACHE_FORMAT_VERSION,
+            "fingerprint": self.fingerprint,
+            "entries": {path: asdict(entry) for path, entry in self._entries.items()},
+        }
+
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(
+                dir=self.cache_path.parent, prefix=".tmp_", suffix=".json"
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, separators=(",", ":"))
+                os.replace(tmp_name, self.cache_path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+                raise
+            self._dirty = False
+            self.logger.debug(
+                f"Saved {len(self._entries)} cache entries to {self.cache_path}"
+            )
+        except OSError as e:
+            self.logger.warning(f"Could not write cache {self.cache_path}: {e}")
+
+    def entry_for(
+        self, file_path: Path, stat_result: Optional[os.stat_result] = None
+    ) -> Optional[CacheEntry]:
+        """
+        Return the cache entry for a file, creating an empty one if needed.
+
+        The file is stat'ed once per run; any cached entry whose size, mtime_ns
+        or inode differ from the current state is replaced by an empty entry.
+
+        Args:
+            file_path: Path of the file
+            stat_result: Optional stat result to avoid another stat call
+
+        Returns:
+            The entry to read from and update, or None if the file can't be stat'ed
+        """
+        key = os.path.abspath(file_path)
+        if key in self._current:
+            return self._current[key]
+
+        if stat_result is None:
+            try:
+                stat_result = os.stat(key)
+            except OSError:
+                self._current[key] = None
+                return None
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.matches(stat_result):
+            self.hits += 1
+        else:
+            self.misses += 1
+            entry = CacheEntry.from_stat(stat_result)
+            self._entries[key] = entry
+            self._dirty = True
+
+        self._current[key] = entry
+        return entry
+
+    def mark_dirty(self) -> None:
+        """Record that an entry was updated and the cache needs saving."""
+        self._dirty = True
+
+
+def compute_fingerprint(config: Config, extra: Optional[Dict[str, Any]] = None) -> str:
+    """Hash the settings that influence cached per-file results."""
+    preset_files = []
+    for preset_file in config.preset.preset_files:
+        try:
+            stat_result = os.stat(preset_file)
+            preset_files.append(
+                [str(preset_file), stat_result.st_size, stat_result.st_mtime_ns]
+            )
+        except OSError:
+            preset_files.append([str(preset_file), None, None])
+
+    settings = {
+        "version": CACHE_FORMAT_VERSION,
+        "target_charset": config.encoding.target_charset,
+        "abort_on_error": config.encoding.abort_on_error,
+        "prefer_utf8_for_text_files": config.encoding.prefer_utf8_for_text_files,
+        "remove_scraped_metadata": config.filter.remove_scraped_metadata,
+        "preset_files": preset_files if not config.preset.disable_presets else [],
+        "preset_group": config.preset.preset_group,
+        "extra": extra or {},
+    }
+    encoded = json.dumps(settings, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
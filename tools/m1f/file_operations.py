@@ -23,6 +23,7 @@ from __future__ import annotations
 
 import os
 import stat
+import threading
 from contextlib import contextmanager
 from functools import wraps
 from pathlib import Path
@@ -316,6 +317,142 @@ def safe_walk(
         raise
 
 
+class DirectoryListingCache:
+    """
+    Directory listings shared by several walks over the same tree.
+
+    Runs that walk overlapping sources in one process (e.g. the bundles of
+    m1f-update) list every directory only once. A listing is kept as the
+    (directories, files) split made by safe_scandir_walk(), including the
+    stat information scandir cached on the entries. Listings are not
+    invalidated on their own: a cache should only live as long as one batch
+    of runs, or be told about changed paths (see invalidate()).
+    """
+
+    def __init__(self):
+        self._listings: Dict[str, tuple[list[os.DirEntry], list[os.DirEntry]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str) -> Optional[tuple[list[os.DirEntry], list[os.DirEntry]]]:
+        """Return the cached listing of a directory, or None."""
+        with self._lock:
+            listing = self._listings.get(path)
+            if listing is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return listing
+
+    def put(self, path: str, dirs: list[os.DirEntry], files: list[os.DirEntry]) -> None:
+        """Remember the listing of a directory."""
+        with self._lock:
+            self._listings[path] = (dirs, files)
+
+    def invalidate(self, path: PathLike) -> None:
+        """Forget the listings of a changed path and of its parent directories."""
+        path = Path(os.path.abspath(path))
+        with self._lock:
+            for directory in (path, *path.parents):
+                self._listings.pop(str(directory), None)
+
+    def clear(self) -> None:
+        """Forget all listings."""
+        with self._lock:
+            self._listings.clear()
+
+    def __len__(self) -> int:
+        return len(self._listings)
+
+
+def _scandir_split(
+    top: str, logger: Optional[Any]
+) -> Optional[tuple[list[os.DirEntry], list[os.DirEntry]]]:
+    """List a directory and split it into directories and accessible files."""
+    try:
+        with os.scandir(top) as it:
+            entries = list(it)
+    except PermissionError as e:
+        if logger:
+            logger.warning(f"Permission denied walking directory '{top}': {e}")
+        return None
+    except OSError as e:
+        if logger:
+            logger.debug(f"Skipping unreadable directory '{top}': {e}")
+        return None
+
+    dirs = []
+    files = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+
+        if is_dir:
+            dirs.append(entry)
+            continue
+
+        # Broken or inaccessible symlinks are skipped like in safe_walk();
+        # regular entries returned by scandir exist by definition
+        try:
+            if entry.is_symlink():
+                entry.stat()
+        except OSError:
+            if logger:
+                logger.debug(f"Skipping inaccessible file: {entry.path}")
+            continue
+        files.append(entry)
+
+    return dirs, files
+
+
+def safe_scandir_walk(
+    path: PathLike,
+    logger: Optional[Any] = None,
+    followlinks: bool = False,
+    listings: Optional[DirectoryListingCache] = None,
+) -> Generator[tuple[str, list[os.DirEntry], list[os.DirEntry]], None, None]:
+    """
+    Walk directory tree with os.scandir, skipping inaccessible entries.
+
+    Works like safe_walk() but yields the DirEntry objects instead of names,
+    so callers can use the type and stat information cached by scandir
+    instead of issuing another system call per entry. The traversal order
+    matches os.walk() (top-down, depth-first) and, like os.walk(), the
+    directory list can be modified in place to prune the walk.
+
+    Args:
+        path: Root directory to walk
+        logger: Optional logger for warning messages
+        followlinks: Descend into symlinked directories
+        listings: Cache of directory listings shared with other walks
+
+    Yields:
+        Tuples of (dirpath, dir_entries, file_entries) for accessible directories
+    """
+    stack = [os.fspath(path)]
+    while stack:
+        top = stack.pop()
+        listing = listings.get(top) if listings is not None else None
+        if listing is None:
+            listing = _scandir_split(top, logger)
+            if listing is None:
+                continue
+            if listings is not None:
+                listings.put(top, *listing)
+
+        # Callers prune the directory list in place, so they get copies
+        dirs, files = list(listing[0]), list(listing[1])
+        yield top, dirs, files
+
+        # Push in reverse so directories are visited in listing order
+        for entry in reversed(dirs):
+            if followlinks or not entry.is_symlink():
+                stack.append(entry.path)
+
+
 def safe_read_text(
     path: PathLike, logger: Optional[Any] = None, encoding: str = "utf-8", **kwargs
 ) -> Optional[str]:
@@ -512,6 +649,7 @@ __all__ = [
     "safe_open",
     "safe_mkdir",
     "safe_walk",
+    "safe_scandir_walk",
     "safe_read_text",
     "safe_write_text",
     "safe_iterdir",
@@ -21,8 +21,9 @@ from __future__ import annotations
 import asyncio
 import glob
 import os
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple, Set, Optional
+from typing import Any, Dict, FrozenSet, Iterable, List, Tuple, Set, Optional, Union
 
 import pathspec
 
@@ -31,18 +32,21 @@ from .constants import (
     DEFAULT_EXCLUDED_DIRS,
     DEFAULT_EXCLUDED_FILES,
     DEFAULT_EXCLUDED_PATTERNS,
+    DOCUMENTATION_EXTENSIONS,
     MAX_SYMLINK_DEPTH,
 )
 from .exceptions import FileNotFoundError, ValidationError
 from .logging import LoggerManager
+from .binary_classifier import is_binary_file
 from .utils import (
-    is_binary_file,
     is_hidden_path,
     get_relative_path,
     format_file_size,
+    sort_files_by_depth_and_name,
     validate_path_traversal,
 )
 from .file_operations import (
+    DirectoryListingCache,
     safe_exists,
     safe_is_dir,
     safe_is_file,
@@ -50,11 +54,67 @@ from .file_operations import (
     safe_stat,
     safe_read_text,
     safe_walk,
+    safe_scandir_walk,
     safe_iterdir,
     safe_open,
 )
 
 
+def _path_suffix(name: str) -> str:
+    """Return the suffix of a file name the same way Path.suffix does."""
+    i = name.rfind(".")
+    if 0 < i < len(name) - 1:
+        return name[i:]
+    return ""
+
+
+@dataclass(frozen=True)
+class FilterPlan:
+    """Filter settings compiled once per run from config, presets and ignore files.
+
+    Merging the config with the global preset settings happens here instead of
+    once per file, so per-file filtering is reduced to set lookups.
+    """
+
+    docs_only: bool
+    include_extensions: FrozenSet[str]
+    exclude_extensions: FrozenSet[str]
+    excluded_dirs: FrozenSet[str]
+    excluded_files: FrozenSet[str]
+    exact_includes: FrozenSet[str]
+    exact_excludes: FrozenSet[str]
+    include_spec: Optional[pathspec.PathSpec]
+    exclude_spec: Optional[pathspec.PathSpec]
+    include_dot_paths: bool
+    include_binary_files: bool
+    include_symlinks: bool
+    max_file_size: Optional[int]
+    # Directory pruning and the walk itself only honor the config settings
+    include_dot_dirs: bool
+    follow_symlinks: bool
+
+
+# A gathered file before deduplication: (path, relative path, dedup key).
+# Files listed explicitly in an input file have no dedup key.
+_Candidate = Tuple[Path, str, Optional[str]]
+
+# A .gitignore that applies to a directory: (path of the directory relative to
+# the .gitignore's directory with a trailing slash, compiled rules).
+_IgnoreLayer = Tuple[str, pathspec.PathSpec]
+
+
+@dataclass
+class _WalkDirectory:
+    """Per-directory values shared by all files listed in one directory."""
+
+    path: Path
+    base_dir: Path
+    rel_prefix: str
+    resolved: str
+    hidden: bool
+    ignore_layers: Tuple[_IgnoreLayer, ...] = ()
+
+
 class FileProcessor:
     """Handles file discovery and filtering."""
 
@@ -63,6 +123,15 @@ class FileProcessor:
         self.logger = logger_manager.get_logger(__name__)
         self._symlink_visited: Set[str] = set()
         self._processed_files: Set[str] = set()
+        self._filter_plan: Optional[FilterPlan] = None
+
+        # Compiled .gitignore rules per directory (None: no .gitignore there)
+        self._gitignore_specs: Dict[str, Optional[pathspec.PathSpec]] = {}
+        self._ignore_layers_cache: Dict[Tuple[str, str], Tuple[_IgnoreLayer, ...]] = {}
+        # Ignore files already applied through the global exclude spec
+        self._global_ignore_files: Set[Path] = set()
+        # Directory listings shared with other runs (set by core.py)
+        self.directory_listings: Optional[DirectoryListingCache] = None
 
         # Initialize preset manager for global settings
         self.preset_manager = None
@@ -144,7 +213,7 @@ class FileProcessor:
         self._build_gitignore_spec()
 
     def _auto_load_ignore_files(self) -> None:
-        """Automatically load .m1fignore and .gitignore files from source directories."""
+        """Automatically load .m1fignore files from source directories."""
         # Recursion protection - ensure this is only called once
         if hasattr(self, "_auto_load_ignore_files_called"):
             self.logger.warning("_auto_load_ignore_files called recursively - skipping")
@@ -190,20 +259,10 @@ class FileProcessor:
             except Exception as e:
                 self.logger.warning(f"Error loading .m1fignore: {e}")
 
-            # Load .gitignore unless disabled
-            if not self.config.filter.no_auto_gitignore:
-                gitignore_path = source_dir / ".gitignore"
-                try:
-                    gitignore_resolved = gitignore_path.resolve(strict=False)
-                    if (
-                        safe_exists(gitignore_path, self.logger)
-                        and gitignore_resolved not in loaded_files
-                    ):
-                        self.logger.debug(f"Auto-loading .gitignore from {source_dir}")
-                        self._load_exclude_patterns_from_file(gitignore_path)
-                        loaded_files.add(gitignore_resolved)
-                except Exception as e:
-                    self.logger.warning(f"Error loading .gitignore: {e}")
+        # .gitignore files (including the ones at the top of the source
+        # directories) are applied per directory while walking, see
+        # _ignore_layers(); remember which ignore files are already in use
+        self._global_ignore_files = loaded_files
 
     def _load_exclude_patterns(self) -> None:
         """Load exclusion patterns from file(s)."""
@@ -387,24 +446,88 @@ class FileProcessor:
     async def gather_files(self) -> List[Tuple[Path, str]]:
         """Gather all files to process based on configuration."""
         files_to_process = []
+        self._filter_plan = self._compile_filter_plan()
 
         if self.config.input_file:
             # Process from input file
             input_paths = await self._process_input_file()
             files_to_process = await self._gather_from_paths(input_paths)
         elif self.config.source_directories:
-            # Process from source directories
-            files_to_process = []
-            for source_dir in self.config.source_directories:
-                dir_files = await self._gather_from_directory(source_dir)
-                files_to_process.extend(dir_files)
+            # Process from source directories (walked concurrently)
+            gathered = await self._gather_from_directories(
+                [(source_dir, False) for source_dir in self.config.source_directories]
+            )
+            files_to_process = self._merge_candidates(
+                candidate for candidates in gathered for candidate in candidates
+            )
         else:
             raise ValidationError("No source directory or input file specified")
 
-        # Sort by relative path
-        files_to_process.sort(key=lambda x: x[1].lower())
+        # Sort by depth and name (README.md first)
+        return sort_files_by_depth_and_name(files_to_process)
 
-        return files_to_process
+    def _compile_filter_plan(self) -> FilterPlan:
+        """Merge config and global preset filter settings into a FilterPlan."""
+        filter_config = self.config.filter
+
+        include_dots = filter_config.include_dot_paths
+        if getattr(self, "_global_include_dot_paths", None) is not None:
+            include_dots = include_dots or self._global_include_dot_paths
+
+        include_binary = filter_config.include_binary_files
+        if getattr(self, "_global_include_binary_files", None) is not None:
+            include_binary = include_binary or self._global_include_binary_files
+
+        include_symlinks = filter_config.include_symlinks
+        if getattr(self, "_global_include_symlinks", None) is not None:
+            include_symlinks = include_symlinks or self._global_include_symlinks
+
+        max_size = filter_config.max_file_size
+        if getattr(self, "_global_max_file_size", None) is not None:
+            # Use the smaller of the two limits if both are set
+            if max_size is not None:
+                max_size = min(max_size, self._global_max_file_size)
+            else:
+                max_size = self._global_max_file_size
+
+        # Combine config and global preset extensions
+        include_exts = set(filter_config.include_extensions)
+        exclude_exts = set(filter_config.exclude_extensions)
+        if self.global_settings:
+            if self.global_settings.include_extensions:
+                include_exts.update(
+                    ext.lower() if ext.startswith(".") else f".{ext.lower()}"
+                    for ext in self.global_settings.include_extensions
+                )
+            if self.global_settings.exclude_extensions:
+                exclude_exts.update(
+                    ext.lower() if ext.startswith(".") else f".{ext.lower()}"
+                    for ext in self.global_settings.exclude_extensions
+                )
+
+        return FilterPlan(
+            docs_only=filter_config.docs_only,
+            include_extensions=frozenset(include_exts),
+            exclude_extensions=frozenset(exclude_exts),
+            excluded_dirs=frozenset(self.excluded_dirs),
+            excluded_files=frozenset(self.excluded_files),
+            exact_includes=frozenset(self.exact_includes),
+            exact_excludes=frozenset(self.exact_excludes),
+            include_spec=self.include_gitignore_spec,
+            exclude_spec=self.gitignore_spec,
+            include_dot_paths=include_dots,
+            include_binary_files=include_binary,
+            include_symlinks=include_symlinks,
+            max_file_size=max_size,
+            include_dot_dirs=filter_config.include_dot_paths,
+            follow_symlinks=filter_config.include_symlinks,
+        )
+
+    def _get_filter_plan(self) -> FilterPlan:
+        """Return the filter plan of the current run, compiling it if needed."""
+        if self._filter_plan is None:
+            self._filter_plan = self._compile_filter_plan()
+        return self._filter_plan
 
     async def _process_input_file(self) -> List[Path]:
         """Process input file and return list of paths."""
@@ -488,7 +611,9 @@ class FileProcessor:
 
     async def _gather_from_paths(self, paths: List[Path]) -> List[Tuple[Path, str]]:
         """Gather files from a list of paths."""
-        files = []
+        # Per path: its candidates, or None for a directory walked below
+        parts: List[Optional[List[_Candidate]]] = []
+        directories = []
 
         for path in paths:
             if not safe_exists(path, self.logger):
@@ -500,102 +625,405 @@ class FileProcessor:
                     rel_path = get_relative_path(
                         path, self._get_base_dir_for_path(path)
                     )
-                    files.append((path, rel_path))
+                    parts.append([(path, rel_path, None)])
             elif safe_is_dir(path, self.logger):
-                dir_files = await self._gather_from_directory(
-                    path, explicitly_included=True
+                directories.append((path, True))
+                parts.append(None)
+
+        gathered = iter(await self._gather_from_directories(directories))
+        candidates = []
+        for part in parts:
+            candidates.extend(part if part is not None else next(gathered))
+
+        return self._merge_candidates(candidates)
+
+    async def _gather_from_directories(
+        self, directories: List[Tuple[Path, bool]]
+    ) -> List[List[_Candidate]]:
+        """Walk directories concurrently in worker threads.
+
+        The top level of every directory is listed first; its subdirectories
+        are then walked as separate tasks, so a single large source is spread
+        over several threads as well. Candidates are returned per directory in
+        the order a sequential walk would produce them.
+
+        Args:
+            directories: (directory, explicitly_included) pairs
+
+        Returns:
+            One list of candidates per directory, in input order
+        """
+        if not directories:
+            return []
+
+        plan = self._get_filter_plan()
+        if plan.follow_symlinks:
+            # Symlink cycle detection keeps state across the walk, so walks
+            # that follow symlinks run one after another in a fixed order
+            results = []
+            for directory, explicitly_included in directories:
+                candidates, _ = await asyncio.to_thread(
+                    self._collect_files,
+                    directory,
+                    explicitly_included,
+                    self._ignore_root_for(directory),
+                )
+                results.append(candidates)
+            return results
+
+        semaphore = asyncio.Semaphore(self.config.output.concurrency)
+
+        async def collect(
+            directory: Path,
+            explicitly_included: bool,
+            ignore_root: Path,
+            top_level_only: bool = False,
+        ) -> Tuple[List[_Candidate], List[Path]]:
+            async with semaphore:
+                return await asyncio.to_thread(
+                    self._collect_files,
+                    directory,
+                    explicitly_included,
+                    ignore_root,
+                    top_level_only,
                 )
-                files.extend(dir_files)
 
-        return files
+        ignore_roots = [
+            self._ignore_root_for(directory) for directory, _ in directories
+        ]
+        top_levels = await asyncio.gather(
+            *(
+                collect(
+                    directory, explicitly_included, ignore_root, top_level_only=True
+                )
+                for (directory, explicitly_included), ignore_root in zip(
+                    directories, ignore_roots
+                )
+            )
+        )
+        subtrees = await asyncio.gather(
+            *(
+                asyncio.gather(
+                    *(
+                        collect(subdir, explicitly_included, ignore_root)
+                        for subdir in subdirs
+                    )
+                )
+                for (_, explicitly_included), ignore_root, (_, subdirs) in zip(
+                    directories, ignore_roots, top_levels
+                )
+            )
+        )
+
+        results = []
+        for (candidates, _), subtree_results in zip(top_levels, subtrees):
+            for subtree_candidates, _ in subtree_results:
+                candidates.extend(subtree_candidates)
+            results.append(candidates)
+        return results
 
-    async def _gather_from_directory(
-        self, directory: Path, explicitly_included: bool = False
+    def _merge_candidates(
+        self, candidates: Iterable[_Candidate]
     ) -> List[Tuple[Path, str]]:
-        """Recursively gather files from a directory."""
+        """Drop duplicate files, keeping the first occurrence in walk order."""
         files = []
 
-        # Use safe_walk for efficiency and permission handling
-        for root, dirs, filenames in safe_walk(
-            directory, self.logger, followlinks=self.config.filter.include_symlinks
+        for file_path, rel_path, dedup_key in candidates:
+            if dedup_key is None:
+                files.append((file_path, rel_path))
+            elif dedup_key not in self._processed_files:
+                files.append((file_path, rel_path))
+                self._processed_files.add(dedup_key)
+            else:
+                self.logger.debug(f"Skipping duplicate: {file_path} (key: {dedup_key})")
+
+        return files
+
+    def _collect_files(
+        self,
+        directory: Path,
+        explicitly_included: bool = False,
+        ignore_root: Optional[Path] = None,
+        top_level_only: bool = False,
+    ) -> Tuple[List[_Candidate], List[Path]]:
+        """Recursively collect the files of a directory that pass the filters.
+
+        Runs in a worker thread and doesn't touch the shared duplicate set;
+        deduplication happens when the candidates are merged.
+
+        Args:
+            directory: Directory to walk
+            explicitly_included: Directory was listed in an input file
+            ignore_root: Topmost directory whose .gitignore applies
+                (default: the source directory containing ``directory``)
+            top_level_only: Only list ``directory`` itself and return its
+                remaining subdirectories instead of descending into them
+
+        Returns:
+            The candidates and, with ``top_level_only``, the subdirectories
+            still to walk
+        """
+        candidates = []
+        plan = self._get_filter_plan()
+        if ignore_root is None:
+            ignore_root = self._ignore_root_for(directory)
+
+        # scandir hands out cached type and stat information per entry
+        for root, dir_entries, file_entries in safe_scandir_walk(
+            directory,
+            self.logger,
+            followlinks=plan.follow_symlinks,
+            listings=self.directory_listings,
         ):
             root_path = Path(root)
+            ignore_layers = self._ignore_layers(
+                root_path,
+                ignore_root,
+                has_gitignore=any(entry.name == ".gitignore" for entry in file_entries),
+            )
 
-            # Filter directories
-            dirs[:] = await self._filter_directories(root_path, dirs)
+            # Filter directories (in place, so excluded subtrees are never listed)
+            dir_entries[:] = self._filter_directories(
+                root_path, dir_entries, ignore_layers
+            )
 
-            # Process files
-            for filename in filenames:
-                file_path = root_path / filename
+            if file_entries:
+                walk_dir = self._walk_directory(root_path, ignore_layers)
+                for entry in file_entries:
+                    candidate = self._file_candidate(
+                        plan, walk_dir, entry, explicitly_included
+                    )
+                    if candidate is not None:
+                        candidates.append(candidate)
+
+            if top_level_only:
+                return candidates, [root_path / entry.name for entry in dir_entries]
+
+        return candidates, []
+
+    def _file_candidate(
+        self,
+        plan: FilterPlan,
+        walk_dir: _WalkDirectory,
+        entry: os.DirEntry,
+        explicitly_included: bool,
+    ) -> Optional[_Candidate]:
+        """Filter a directory entry and compute its relative path and dedup key."""
+        file_path = walk_dir.path / entry.name
+        is_symlink = entry.is_symlink()
+
+        if is_symlink:
+            rel_path = get_relative_path(file_path, walk_dir.base_dir)
+        else:
+            rel_path = walk_dir.rel_prefix + entry.name
 
-                if await self._should_include_file(file_path, explicitly_included):
-                    # For symlinks when include_symlinks is True, preserve the symlink path
-                    # instead of resolving it to the target path
-                    if self.config.filter.include_symlinks and file_path.is_symlink():
-                        try:
-                            base_dir = self._get_base_dir_for_path(file_path)
-                            rel_path = file_path.relative_to(base_dir).as_posix()
-                        except ValueError:
-                            # If file is not under base path, use absolute path
-                            rel_path = str(file_path)
-                    else:
-                        rel_path = get_relative_path(
-                            file_path, self._get_base_dir_for_path(file_path)
-                        )
+        # Explicitly included files bypass ignore rules like in _check_file()
+        if not explicitly_included and self._ignored_by_layers(
+            walk_dir.ignore_layers, entry.name
+        ):
+            self.logger.debug(f"File excluded by .gitignore: {file_path}")
+            return None
+
+        if not self._check_file(
+            plan,
+            file_path,
+            entry,
+            rel_path,
+            walk_dir.hidden or entry.name.startswith("."),
+            explicitly_included,
+        ):
+            self.logger.debug(f"File excluded by filter: {file_path}")
+            return None
 
-                    # Check for duplicates with improved symlink handling
-                    if self.config.filter.include_symlinks and file_path.is_symlink():
-                        # If allow_duplicate_files is set (content deduplication disabled),
-                        # always use the symlink path to allow duplicates
-                        if not self.config.output.enable_content_deduplication:
-                            dedup_key = str(file_path)
-                        else:
-                            # Content deduplication is enabled, check if target is internal
-                            target = file_path.resolve()
-                            if self._is_target_within_sources(target):
-                                # Target is internal - use resolved path for deduplication
-                                # This will cause the symlink to be skipped if the target
-                                # is already included
-                                dedup_key = str(target)
-                            else:
-                                # Target is external - use symlink path to ensure it's included
-                                dedup_key = str(file_path)
-                    else:
-                        # Not a symlink or symlinks not included - use resolved path
-                        dedup_key = str(file_path.resolve())
+        if is_symlink and plan.follow_symlinks:
+            # For symlinks when include_symlinks is True, preserve the
+            # symlink path instead of resolving it to the target path
+            try:
+                rel_path = file_path.relative_to(walk_dir.base_dir).as_posix()
+            except ValueError:
+                # If file is not under base path, use absolute path
+                rel_path = str(file_path)
+
+            # If allow_duplicate_files is set (content deduplication
+            # disabled), always use the symlink path to allow duplicates
+            if not self.config.output.enable_content_deduplication:
+                dedup_key = str(file_path)
+            else:
+                # Content deduplication is enabled, check if target is internal
+                target = file_path.resolve()
+                if self._is_target_within_sources(target):
+                    # Target is internal - use resolved path for deduplication
+                    # This will cause the symlink to be skipped if the target
+                    # is already included
+                    dedup_key = str(target)
+                else:
+                    # Target is external - use symlink path to ensure it's included
+                    dedup_key = str(file_path)
+        elif is_symlink:
+            dedup_key = str(file_path.resolve())
+        else:
+            # Not a symlink - the resolved path is the resolved directory
+            dedup_key = os.path.join(walk_dir.resolved, entry.name)
+
+        return file_path, rel_path, dedup_key
+
+    def _walk_directory(
+        self, root: Path, ignore_layers: Tuple[_IgnoreLayer, ...] = ()
+    ) -> _WalkDirectory:
+        """Compute the values shared by all files directly inside ``root``."""
+        # Same base as _get_base_dir_for_path() gives for any file in root
+        base_dir = root
+        for source_dir in self.config.source_directories or []:
+            if root.is_relative_to(source_dir):
+                base_dir = source_dir
+                break
+
+        resolved = root.resolve()
+        try:
+            rel_dir = resolved.relative_to(base_dir.resolve()).as_posix()
+            rel_prefix = "" if rel_dir == "." else f"{rel_dir}/"
+        except ValueError:
+            # Not under the base directory: files get their absolute path
+            rel_prefix = f"{resolved.as_posix().rstrip('/')}/"
+
+        return _WalkDirectory(
+            path=root,
+            base_dir=base_dir,
+            rel_prefix=rel_prefix,
+            resolved=str(resolved),
+            hidden=is_hidden_path(root),
+            ignore_layers=ignore_layers,
+        )
 
-                    if dedup_key not in self._processed_files:
-                        files.append((file_path, rel_path))
-                        self._processed_files.add(dedup_key)
-                    else:
-                        self.logger.debug(
-                            f"Skipping duplicate: {file_path} (key: {dedup_key})"
+    def _ignore_root_for(self, directory: Path) -> Path:
+        """Return the topmost directory whose .gitignore applies to ``directory``."""
+        for source_dir in self.config.source_directories or []:
+            if directory.is_relative_to(source_dir):
+                return source_dir
+        return directory
+
+    def _ignore_layers(
+        self,
+        directory: Path,
+        ignore_root: Path,
+        has_gitignore: Optional[bool] = None,
+    ) -> Tuple[_IgnoreLayer, ...]:
+        """Return the .gitignore rules that apply inside ``directory``.
+
+        Layers are ordered from ``directory`` itself up to ``ignore_root``, so
+        the deepest .gitignore comes first. Results are cached per directory;
+        parent layers are normally cached already when a subdirectory is
+        reached.
+
+        Args:
+            directory: Directory whose entries are being filtered
+            ignore_root: Topmost directory whose .gitignore applies
+            has_gitignore: Whether ``directory`` contains a .gitignore, if
+                already known from its listing
+        """
+        if self.config.filter.no_auto_gitignore:
+            return ()
+
+        key = (str(directory), str(ignore_root))
+        layers = self._ignore_layers_cache.get(key)
+        if layers is not None:
+            return layers
+
+        parent_layers: Tuple[_IgnoreLayer, ...] = ()
+        if directory != ignore_root and directory.is_relative_to(ignore_root):
+            parent_layers = self._ignore_layers(directory.parent, ignore_root)
+
+        layers = tuple(
+            (f"{prefix}{directory.name}/", spec) for prefix, spec in parent_layers
+        )
+        spec = self._directory_gitignore(directory, has_gitignore)
+        if spec is not None:
+            layers = (("", spec),) + layers
+
+        self._ignore_layers_cache[key] = layers
+        return layers
+
+    def _directory_gitignore(
+        self, directory: Path, has_gitignore: Optional[bool] = None
+    ) -> Optional[pathspec.PathSpec]:
+        """Compile the .gitignore of a directory once and cache it."""
+        key = str(directory)
+        if key in self._gitignore_specs:
+            return self._gitignore_specs[key]
+
+        spec = None
+        gitignore_path = directory / ".gitignore"
+        if has_gitignore is None:
+            has_gitignore = safe_is_file(gitignore_path, self.logger)
+
+        if has_gitignore:
+            try:
+                already_loaded = (
+                    gitignore_path.resolve(strict=False) in self._global_ignore_files
+                )
+            except (OSError, RuntimeError):
+                already_loaded = False
+
+            if not already_loaded:
+                content = safe_read_text(gitignore_path, self.logger)
+                if content is not None:
+                    try:
+                        spec = pathspec.PathSpec.from_lines(
+                            "gitwildmatch", content.splitlines()
                         )
-                else:
-                    self.logger.debug(f"File excluded by filter: {file_path}")
+                        self.logger.debug(f"Loaded .gitignore from {directory}")
+                    except Exception as e:
+                        self.logger.warning(f"Error loading {gitignore_path}: {e}")
 
-        return files
+        self._gitignore_specs[key] = spec
+        return spec
+
+    @staticmethod
+    def _ignored_by_layers(layers: Tuple[_IgnoreLayer, ...], path: str) -> bool:
+        """Check a path (relative to the layers' directory) against .gitignore rules.
 
-    async def _filter_directories(self, root: Path, dirs: List[str]) -> List[str]:
-        """Filter directories based on exclusion rules."""
+        The deepest .gitignore with a matching rule decides, so negated rules
+        (``!pattern``) in a subdirectory re-include what a parent ignored.
+        Directory paths must end with a slash.
+        """
+        for prefix, spec in layers:
+            include = spec.check_file(prefix + path).include
+            if include is not None:
+                return include
+        return False
+
+    def _filter_directories(
+        self,
+        root: Path,
+        dirs: List[os.DirEntry],
+        ignore_layers: Tuple[_IgnoreLayer, ...] = (),
+    ) -> List[os.DirEntry]:
+        """Filter directories based on exclusion rules.
+
+        Directories ignored by a .gitignore are dropped here, so their
+        subtrees are never listed.
+        """
+        plan = self._get_filter_plan()
         filtered = []
+        rel_prefix = None
 
-        for dirname in dirs:
+        for entry in dirs:
+            dirname = entry.name
             dir_path = root / dirname
 
             # Check if directory is excluded by name
-            if dirname.lower() in self.excluded_dirs:
+            if dirname.lower() in plan.excluded_dirs:
                 self.logger.debug(f"Directory excluded by name: {dir_path}")
                 continue
 
             # Check dot directories
-            if not self.config.filter.include_dot_paths and dirname.startswith("."):
+            if not plan.include_dot_dirs and dirname.startswith("."):
                 self.logger.debug(f"Dot directory excluded: {dir_path}")
                 continue
 
             # Check symlinks
-            if dir_path.is_symlink():
-                if not self.config.filter.include_symlinks:
+            if entry.is_symlink():
+                if not plan.follow_symlinks:
                     self.logger.debug(f"Symlink directory excluded: {dir_path}")
                     continue
 
@@ -605,36 +1033,48 @@ class FileProcessor:
                     continue
 
             # Check gitignore patterns - this is the critical performance fix!
-            if self.gitignore_spec:
-                # Get relative path from source directory or current root
-                base_dir = (
-                    self.config.source_directories[0]
-                    if self.config.source_directories
-                    else Path.cwd()
-                )
-                try:
-                    rel_path = dir_path.relative_to(base_dir)
-                except ValueError:
-                    # If dir_path is not relative to base_dir, use as is
-                    rel_path = dir_path
-
+            if plan.exclude_spec:
+                if rel_prefix is None:
+                    rel_prefix = self._directory_match_prefix(root)
                 # For directory matching, we need to append a trailing slash
-                # Always use forward slashes for gitignore pattern matching
-                rel_path_str = str(rel_path).replace("\\", "/")
-                if not rel_path_str.endswith("/"):
-                    rel_path_str += "/"
+                rel_path_str = f"{rel_prefix}{dirname}/"
 
                 # Check if directory matches any exclude pattern
-                if self.gitignore_spec.match_file(rel_path_str):
+                if plan.exclude_spec.match_file(rel_path_str):
                     self.logger.debug(
                         f"Directory excluded by gitignore pattern: {dir_path}"
                     )
                     continue
 
-            filtered.append(dirname)
+            # Check .gitignore files of this directory and its parents
+            if ignore_layers and self._ignored_by_layers(ignore_layers, f"{dirname}/"):
+                self.logger.debug(f"Directory excluded by .gitignore: {dir_path}")
+                continue
+
+            filtered.append(entry)
 
         return filtered
 
+    def _directory_match_prefix(self, root: Path) -> str:
+        """Path prefix used to match subdirectories of ``root`` against gitignore."""
+        # Get relative path from source directory or current root
+        base_dir = (
+            self.config.source_directories[0]
+            if self.config.source_directories
+            else Path.cwd()
+        )
+        try:
+            rel_root = root.relative_to(base_dir)
+        except ValueError:
+            # If root is not relative to base_dir, use as is
+            rel_root = root
+
+        # Always use forward slashes for gitignore pattern matching
+        rel_root_str = str(rel_root).replace("\\", "/")
+        if rel_root_str == ".":
+            return ""
+        return rel_root_str.rstrip("/") + "/"
+
     async def _should_include_file(
         self, file_path: Path, explicitly_included: bool = False
     ) -> bool:
@@ -643,27 +1083,74 @@ class FileProcessor:
         if not safe_exists(file_path, self.logger):
             return False
 
-        # Check docs_only filter first (highest priority)
-        if self.config.filter.docs_only:
-            from .constants import DOCUMENTATION_EXTENSIONS
+        return self._check_file(
+            self._get_filter_plan(),
+            file_path,
+            file_path,
+            get_relative_path(file_path, self._get_base_dir_for_path(file_path)),
+            is_hidden_path(file_path),
+            explicitly_included,
+        )
 
-            if file_path.suffix.lower() not in DOCUMENTATION_EXTENSIONS:
-                return False
+    def might_include(self, file_path: Path) -> bool:
+        """Check whether a file that wasn't gathered could be gathered now.
 
-        # If explicitly included (from -i file), skip most filters but still check binary
-        if explicitly_included:
-            # Still check binary files even for explicitly included files
-            include_binary = self.config.filter.include_binary_files
-            if (
-                hasattr(self, "_global_include_binary_files")
-                and self._global_include_binary_files is not None
-            ):
-                include_binary = include_binary or self._global_include_binary_files
+        Only the source directories and the file filters are checked, not
+        .gitignore rules and excluded directories, so a file that passes may
+        still be skipped by gather_files().
+        """
+        sources = self.config.source_directories or []
+        if not any(file_path.is_relative_to(source) for source in sources):
+            return False
+        if not safe_is_file(file_path, self.logger):
+            return False
 
-            if not include_binary and is_binary_file(file_path):
-                return False
+        return self._check_file(
+            self._get_filter_plan(),
+            file_path,
+            file_path,
+            get_relative_path(file_path, self._get_base_dir_for_path(file_path)),
+            is_hidden_path(file_path),
+            False,
+        )
 
-            return True
+    def _check_file(
+        self,
+        plan: FilterPlan,
+        file_path: Path,
+        stat_source: Union[Path, os.DirEntry],
+        rel_path: str,
+        hidden: bool,
+        explicitly_included: bool,
+    ) -> bool:
+        """Apply the filter plan to a single existing file.
+
+        Args:
+            plan: Compiled filter settings of the current run
+            file_path: Path of the file
+            stat_source: Path or DirEntry used for symlink and size checks
+                (a DirEntry answers from the data cached by scandir)
+            rel_path: Path relative to its source directory, for pattern matching
+            hidden: Whether any component of the path is a dot path
+            explicitly_included: File was listed explicitly (e.g. in an input file)
+        """
+        suffix = _path_suffix(file_path.name).lower()
+
+        def binary() -> bool:
+            # The stat (cached by scandir for DirEntry) keys the verdict cache
+            try:
+                stat_result = stat_source.stat()
+            except OSError:
+                stat_result = None
+            return is_binary_file(file_path, stat_result)
+
+        # Check docs_only filter first (highest priority)
+        if plan.docs_only and suffix not in DOCUMENTATION_EXTENSIONS:
+            return False
+
+        # If explicitly included (from -i file), skip most filters but still check binary
+        if explicitly_included:
+            return plan.include_binary_files or not binary()
 
         # Get file-specific settings from presets
         file_settings = {}
@@ -672,109 +1159,54 @@ class FileProcessor:
                 self.preset_manager.get_file_specific_settings(file_path) or {}
             )
 
-        # Check if we have include patterns - if yes, file must match one
-        if self.exact_includes or self.include_gitignore_spec:
-            include_matched = False
-
-            # Check exact includes
-            if str(file_path.resolve()) in self.exact_includes:
-                include_matched = True
-
-            # Check include gitignore patterns
-            if not include_matched and self.include_gitignore_spec:
-                rel_path = get_relative_path(
-                    file_path, self._get_base_dir_for_path(file_path)
-                )
-                # Note: get_relative_path already returns forward slashes via as_posix()
-                if self.include_gitignore_spec.match_file(rel_path):
-                    include_matched = True
+        # Resolving is only needed for exact path lists
+        resolved = None
+        if plan.exact_includes or plan.exact_excludes:
+            resolved = str(file_path.resolve())
 
+        # Check if we have include patterns - if yes, file must match one
+        if plan.exact_includes or plan.include_spec:
+            # Note: rel_path always uses forward slashes
+            include_matched = resolved in plan.exact_includes or (
+                plan.include_spec is not None and plan.include_spec.match_file(rel_path)
+            )
             # If we have include patterns but file doesn't match any, exclude it
             if not include_matched:
                 return False
 
         # Check exact excludes
-        if str(file_path.resolve()) in self.exact_excludes:
+        if resolved is not None and resolved in plan.exact_excludes:
             return False
 
         # Check filename excludes
-        if file_path.name in self.excluded_files:
+        if file_path.name in plan.excluded_files:
             return False
 
         # Check gitignore patterns
-        if self.gitignore_spec:
-            rel_path = get_relative_path(
-                file_path, self._get_base_dir_for_path(file_path)
-            )
-            # Note: get_relative_path already returns forward slashes via as_posix()
-            if self.gitignore_spec.match_file(rel_path):
-                return False
+        if plan.exclude_spec and plan.exclude_spec.match_file(rel_path):
+            return False
 
-        # Check dot files
-        include_dots = self.config.filter.include_dot_paths
-        if (
-            hasattr(self, "_global_include_dot_paths")
-            and self._global_include_dot_paths is not None
-        ):
-            include_dots = include_dots or self._global_include_dot_paths
-        # File-specific override
-        if "include_dot_paths" in file_settings:
-            include_dots = file_settings["include_dot_paths"]
+        # Check dot files (file-specific settings override the plan)
+        include_dots = file_settings.get("include_dot_paths", plan.include_dot_paths)
+        if not include_dots and hidden:
+            return False
 
-        if not explicitly_included and not include_dots:
-            if is_hidden_path(file_path):
-                return False
+        # Check extensions before the binary check, which has to read the file
+        if plan.include_extensions and suffix not in plan.include_extensions:
+            return False
+        if plan.exclude_extensions and suffix in plan.exclude_extensions:
+            return False
 
         # Check binary files
-        include_binary = self.config.filter.include_binary_files
-        if (
-            hasattr(self, "_global_include_binary_files")
-            and self._global_include_binary_files is not None
-        ):
-            include_binary = include_binary or self._global_include_binary_files
-        # File-specific override
-        if "include_binary_files" in file_settings:
-            include_binary = file_settings["include_binary_files"]
-
-        if not include_binary:
-            if is_binary_file(file_path):
-                return False
-
-        # Check extensions
-        # Combine config and global preset include extensions
-        include_exts = set(self.config.filter.include_extensions)
-        if self.global_settings and self.global_settings.include_extensions:
-            include_exts.update(
-                ext.lower() if ext.startswith(".") else f".{ext.lower()}"
-                for ext in self.global_settings.include_extensions
-            )
-
-        if include_exts:
-            if file_path.suffix.lower() not in include_exts:
-                return False
-
-        # Combine config and global preset exclude extensions
-        exclude_exts = set(self.config.filter.exclude_extensions)
-        if self.global_settings and self.global_settings.exclude_extensions:
-            exclude_exts.update(
-                ext.lower() if ext.startswith(".") else f".{ext.lower()}"
-                for ext in self.global_settings.exclude_extensions
-            )
-
-        if exclude_exts:
-            if file_path.suffix.lower() in exclude_exts:
-                return False
+        include_binary = file_settings.get(
+            "include_binary_files", plan.include_binary_files
+        )
+        if not include_binary and binary():
+            return False
 
         # Check symlinks
-        if file_path.is_symlink():
-            include_symlinks = self.config.filter.include_symlinks
-            if (
-                hasattr(self, "_global_include_symlinks")
-                and self._global_include_symlinks is not None
-            ):
-                include_symlinks = include_symlinks or self._global_include_symlinks
-
-            if not include_symlinks:
+        if stat_source.is_symlink():
+            if not plan.include_symlinks:
                 self.logger.debug(
                     f"Excluding symlink {file_path} (include_symlinks=False)"
                 )
@@ -791,25 +1223,15 @@ class FileProcessor:
             self.logger.debug(f"Including symlink {file_path} (include_symlinks=True)")
 
         # Check file size limit
-        max_size = self.config.filter.max_file_size
-        if (
-            hasattr(self, "_global_max_file_size")
-            and self._global_max_file_size is not None
-        ):
-            # Use the smaller of the two limits if both are set
-            if max_size is not None:
-                max_size = min(max_size, self._global_max_file_size)
-            else:
-                max_size = self._global_max_file_size
+        max_size = plan.max_file_size
 
         # File-specific override
         if "max_file_size" in file_settings:
             from .utils import parse_file_size
 
             try:
-                file_max_size = parse_file_size(file_settings["max_file_size"])
                 # If file-specific limit is set, use it (not the minimum)
-                max_size = file_max_size
+                max_size = parse_file_size(file_settings["max_file_size"])
             except ValueError as e:
                 self.logger.warning(
                     f"Invalid file-specific max_file_size for {file_path}: {e}"
@@ -817,7 +1239,7 @@ class FileProcessor:
 
         if max_size is not None:
             try:
-                file_size = file_path.stat().st_size
+                file_size = stat_source.stat().st_size
                 if file_size > max_size:
                     self.logger.info(
                         f"Skipping {file_path.name} due to size limit: "
@@ -0,0 +1,213 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Single-pass file loading shared by the security scan and the output writer,
+and optionally by several runs in one process.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+
+@dataclass
+class LoadedFile:
+    """A file read from disk once: raw bytes plus the stat taken while open."""
+
+    path: Path
+    data: bytes
+    stat: os.stat_result
+
+    @classmethod
+    def read(cls, path: Path) -> "LoadedFile":
+        """Open, stat and read a file with a single open() call.
+
+        Raises the usual OSError subclasses (e.g. PermissionError) on failure.
+        """
+        with open(path, "rb") as f:
+            stat_result = os.fstat(f.fileno())
+            data = f.read()
+        return cls(path=path, data=data, stat=stat_result)
+
+    @property
+    def size(self) -> int:
+        """Size of the buffered bytes."""
+        return len(self.data)
+
+
+@dataclass(frozen=True)
+class FileState:
+    """Size, mtime and checksum of a file as it was read."""
+
+    size: int
+    mtime_ns: int
+    checksum: str  # SHA-256 of the raw bytes
+
+    @classmethod
+    def of(cls, loaded: LoadedFile) -> "FileState":
+        return cls(
+            loaded.size,
+            loaded.stat.st_mtime_ns,
+            hashlib.sha256(loaded.data).hexdigest(),
+        )
+
+
+class LoadedFileCache:
+    """
+    Loaded files shared by several runs in one process.
+
+    The bundles built by m1f-update often include the same files. The first
+    run that reads a file keeps it here and later runs reuse it as long as
+    the file's size, mtime and inode are unchanged. The least recently used
+    files are dropped once ``max_bytes`` is exceeded.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._files: OrderedDict[str, LoadedFile] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: Path) -> Optional[LoadedFile]:
+        """Return the cached file for ``path`` if it is still current."""
+        key = os.path.abspath(path)
+        with self._lock:
+            loaded = self._files.get(key)
+            if loaded is None:
+                self.misses += 1
+                return None
+
+        try:
+            stat_result = os.stat(key)
+        except OSError:
+            stat_result = None
+
+        with self._lock:
+            if (
+                stat_result is None
+                or stat_result.st_size != loaded.stat.st_size
+                or stat_result.st_mtime_ns != loaded.stat.st_mtime_ns
+                or stat_result.st_ino != loaded.stat.st_ino
+            ):
+                if self._files.get(key) is loaded:
+                    del self._files[key]
+                    self._size -= loaded.size
+                self.misses += 1
+                return None
+            if key in self._files:
+                self._files.move_to_end(key)
+            self.hits += 1
+
+        return LoadedFile(path=path, data=loaded.data, stat=loaded.stat)
+
+    def put(self, loaded: LoadedFile) -> None:
+        """Keep a loaded file, dropping the least recently used ones."""
+        if loaded.size > self.max_bytes:
+            return
+        key = os.path.abspath(loaded.path)
+        with self._lock:
+            old = self._files.pop(key, None)
+            if old is not None:
+                self._size -= old.size
+            self._files[key] = loaded
+            self._size += loaded.size
+            while self._size > self.max_bytes:
+                _, dropped = self._files.popitem(last=False)
+                self._size -= dropped.size
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+
+class LoadedFileStore:
+    """
+    Bounded hand-off of loaded files between processing phases.
+
+    The security scan runs before the output is written; files it loads are
+    kept here (up to ``max_bytes``) so the writer doesn't read them again.
+    Files that don't fit are simply read a second time later. With a
+    ``shared`` cache, files read by other runs are reused as well.
+    """
+
+    def __init__(self, max_bytes: int, shared: Optional[LoadedFileCache] = None):
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self._files: Dict[Path, LoadedFile] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        # State of every file read for this run by absolute path, recorded
+        # for the output manifest if set to a dict by core.py
+        self.states: Optional[Dict[str, FileState]] = None
+
+    def _record(self, loaded: LoadedFile) -> None:
+        if self.states is not None:
+            state = FileState.of(loaded)
+            with self._lock:
+                self.states[os.path.abspath(loaded.path)] = state
+
+    def put(self, loaded: LoadedFile) -> bool:
+        """Keep a loaded file for a later phase if it fits in the budget."""
+        with self._lock:
+            if loaded.path in self._files:
+                return True
+            if self._size + loaded.size > self.max_bytes:
+                return False
+            self._files[loaded.path] = loaded
+            self._size += loaded.size
+            return True
+
+    def take(self, path: Path) -> Optional[LoadedFile]:
+        """Remove and return a kept file, or None if it wasn't kept."""
+        with self._lock:
+            loaded = self._files.pop(path, None)
+            if loaded is not None:
+                self._size -= loaded.size
+        if loaded is None and self.shared is not None:
+            loaded = self.shared.get(path)
+            if loaded is not None:
+                self._record(loaded)
+        return loaded
+
+    def read(self, path: Path) -> LoadedFile:
+        """Read a file from disk, offering it to the shared cache if any."""
+        loaded = LoadedFile.read(path)
+        self._record(loaded)
+        if self.shared is not None:
+            self.shared.put(loaded)
+        return loaded
+
+    def load(self, path: Path) -> LoadedFile:
+        """Return the kept file for ``path`` or read it from disk."""
+        loaded = self.take(path)
+        if loaded is None:
+            loaded = self.read(path)
+        return loaded
+
+    def clear(self) -> None:
+        """Drop all kept files."""
+        with self._lock:
+            self._files.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._files)
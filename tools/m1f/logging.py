@@ -46,16 +46,29 @@ except ImportError:
 class LoggerManager(SharedLoggerManager):
     """M1F-specific logger manager that extends the shared LoggerManager."""
 
-    def __init__(self, config: LoggingConfig, output_file_path: Optional[Path] = None):
+    def __init__(
+        self,
+        config: LoggingConfig,
+        output_file_path: Optional[Path] = None,
+        configure_root: bool = True,
+    ):
         """Initialize the M1F logger manager.
 
         Args:
             config: M1F logging configuration
             output_file_path: Optional output file path for log files
+            configure_root: Whether to set up the root logger's level and
+                handlers; off for runs inside another tool that owns them
         """
+        self._configure_root = configure_root
         super().__init__(config, output_file_path)
         self._config = config  # Store m1f config separately
 
+    def _setup(self) -> None:
+        """Set up the root logger, unless another tool owns it."""
+        if self._configure_root:
+            super()._setup()
+
     def _create_file_handler(
         self, file_path: Path, level: int
     ) -> Optional[logging.FileHandler]:
@@ -97,8 +110,10 @@ class LoggerManager(SharedLoggerManager):
 
         # Add file handler if not already present
         quiet = self._get_config_value("quiet", False)
-        if not quiet and not any(
-            isinstance(h, logging.FileHandler) for h in self._handlers
+        if (
+            self._configure_root
+            and not quiet
+            and not any(isinstance(h, logging.FileHandler) for h in self._handlers)
         ):
             file_handler = self._create_file_handler(output_path, logging.DEBUG)
             if file_handler:
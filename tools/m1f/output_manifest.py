@@ -0,0 +1,319 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Sidecar manifest for skipping unchanged m1f runs.
+
+After a run with ``--skip-unchanged`` the gathered files with their size,
+mtime and checksum, the settings and the written files are recorded in a
+small JSON file next to the output (``.<output name>.m1f-manifest.json``).
+The next run compares the freshly gathered files against it and leaves the
+output alone if nothing changed. Files whose size and mtime match are not
+read; touched files with unchanged content are recognized by checksum.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .config import Config
+from .file_cache import compute_fingerprint
+from .loaded_file import FileState
+from .logging import LoggerManager
+from .utils import calculate_file_checksum
+
+# Bump whenever the meaning of a manifest field changes
+MANIFEST_FORMAT_VERSION = 2
+
+
+def manifest_path_for(output_path: Path) -> Path:
+    """Path of the manifest that belongs to an output file."""
+    return output_path.with_name(f".{output_path.name}.m1f-manifest.json")
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize config values json doesn't know, sets in a stable order."""
+    if isinstance(value, (set, frozenset)):
+        return sorted(str(item) for item in value)
+    return str(value)
+
+
+# Settings that don't change what a run writes: where the output goes (or
+# whether it is written at all), how much work runs at once, logging and the
+# per-file cache
+_NON_OUTPUT_SETTINGS = {
+    "output": (
+        "output_file",
+        "skip_output_file",
+        "force_overwrite",
+        "parallel",
+        "concurrency",
+        "max_buffer_size",
+        "workers",
+        "skip_unchanged",
+    ),
+    "archive": ("threads",),
+    "logging": None,
+    "cache": None,
+}
+
+
+def compute_settings_fingerprint(
+    config: Config, extra: Optional[Dict[str, Any]] = None
+) -> str:
+    """Hash the settings that can change the output of a run."""
+    from . import __version__
+
+    config_data = asdict(config)
+    for section, fields in _NON_OUTPUT_SETTINGS.items():
+        if fields is None:
+            config_data.pop(section, None)
+        else:
+            for name in fields:
+                config_data[section].pop(name, None)
+
+    settings = {
+        "version": MANIFEST_FORMAT_VERSION,
+        "m1f": __version__,
+        "config": config_data,
+        # Includes the state of the preset files
+        "file_cache": compute_fingerprint(config, extra),
+    }
+    encoded = json.dumps(settings, sort_keys=True, default=_json_default)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    """A source file as it was when the output was written."""
+
+    path: str
+    rel_path: str
+    size: int
+    mtime_ns: int
+    checksum: str
+
+
+@dataclass
+class ManifestOutput:
+    """A file written by the run, used to detect outputs changed since."""
+
+    path: str
+    size: int
+    mtime_ns: int
+
+
+class OutputManifest:
+    """Record of the inputs and outputs of the last run for one output file."""
+
+    def __init__(
+        self,
+        manifest_path: Path,
+        fingerprint: str,
+        files: List[ManifestEntry],
+        outputs: List[ManifestOutput],
+        result: Dict[str, Any],
+    ):
+        self.manifest_path = manifest_path
+        self.fingerprint = fingerprint
+        self.files = files
+        self.outputs = outputs
+        self.result = result
+        # Set when touched but unchanged files were found by checksum
+        self.dirty = False
+
+    @classmethod
+    def load(
+        cls, manifest_path: Path, logger_manager: LoggerManager
+    ) -> Optional[OutputManifest]:
+        """Load a manifest, returning None if it is missing or unreadable."""
+        logger = logger_manager.get_logger(__name__)
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable manifest {manifest_path}: {e}")
+            return None
+
+        try:
+            if data["version"] != MANIFEST_FORMAT_VERSION:
+                return None
+            return cls(
+                manifest_path,
+                data["fingerprint"],
+                [ManifestEntry(**entry) for entry in data["files"]],
+                [ManifestOutput(**output) for output in data["outputs"]],
+                data["result"],
+            )
+        except (KeyError, TypeError):
+            logger.debug(f"Discarding outdated manifest {manifest_path}")
+            return None
+
+    @classmethod
+    def build(
+        cls,
+        manifest_path: Path,
+        fingerprint: str,
+        files: Sequence[Tuple[Path, str]],
+        outputs: Sequence[Path],
+        result: Dict[str, Any],
+        previous: Optional[OutputManifest] = None,
+        states: Optional[Dict[str, FileState]] = None,
+    ) -> OutputManifest:
+        """Record the state of the sources and the current outputs.
+
+        ``states`` are the sources as the run read them (by absolute path),
+        so that a file changed while the output was written is seen as
+        changed by the next run. Sources the run didn't read, e.g. files
+        skipped by the security check, are recorded as they are now;
+        their checksums are reused from the previous manifest if they are
+        unchanged since.
+
+        Raises:
+            OSError: If a source or output file can't be read
+        """
+        states = states or {}
+        known = {}
+        if previous is not None:
+            known = {entry.path: entry for entry in previous.files}
+
+        entries = []
+        for file_path, rel_path in files:
+            path = os.path.abspath(file_path)
+            state = states.get(path)
+            if state is None:
+                state = cls._current_state(path, known.get(path))
+            entries.append(
+                ManifestEntry(
+                    path, str(rel_path), state.size, state.mtime_ns, state.checksum
+                )
+            )
+
+        written = []
+        for output in outputs:
+            stat_result = os.stat(output)
+            written.append(
+                ManifestOutput(
+                    os.path.abspath(output),
+                    stat_result.st_size,
+                    stat_result.st_mtime_ns,
+                )
+            )
+
+        return cls(manifest_path, fingerprint, entries, written, result)
+
+    @staticmethod
+    def _current_state(path: str, old: Optional[ManifestEntry]) -> FileState:
+        """State of a source on disk, reusing the checksum of ``old``."""
+        stat_result = os.stat(path)
+        if (
+            old is not None
+            and old.size == stat_result.st_size
+            and old.mtime_ns == stat_result.st_mtime_ns
+        ):
+            checksum = old.checksum
+        else:
+            checksum = calculate_file_checksum(Path(path))
+        return FileState(stat_result.st_size, stat_result.st_mtime_ns, checksum)
+
+    def is_current(
+        self,
+        files: Sequence[Tuple[Path, str]],
+        fingerprint: str,
+        mtimes_in_output: bool = True,
+    ) -> bool:
+        """Check if a run with these files and settings would change nothing.
+
+        If the output records mtimes (separators with dates, archives), a
+        file with a new mtime is a change. Otherwise files with a new mtime
+        but the same size are compared by checksum; their new mtime is
+        recorded (see ``dirty``) so they aren't read again.
+        """
+        if fingerprint != self.fingerprint or len(files) != len(self.files):
+            return False
+
+        for output in self.outputs:
+            try:
+                stat_result = os.stat(output.path)
+            except OSError:
+                return False
+            if (
+                stat_result.st_size != output.size
+                or stat_result.st_mtime_ns != output.mtime_ns
+            ):
+                return False
+
+        touched = []
+        for (file_path, rel_path), entry in zip(files, self.files):
+            path = os.path.abspath(file_path)
+            if path != entry.path or str(rel_path) != entry.rel_path:
+                return False
+            try:
+                stat_result = os.stat(path)
+            except OSError:
+                return False
+            if stat_result.st_size != entry.size:
+                return False
+            if stat_result.st_mtime_ns != entry.mtime_ns:
+                if mtimes_in_output:
+                    return False
+                touched.append((entry, stat_result.st_mtime_ns))
+
+        # Only touched files are read, after all cheap checks passed
+        for entry, mtime_ns in touched:
+            try:
+                if calculate_file_checksum(Path(entry.path)) != entry.checksum:
+                    return False
+            except OSError:
+                return False
+            entry.mtime_ns = mtime_ns
+            self.dirty = True
+
+        return True
+
+    def save(self) -> None:
+        """Write the manifest atomically.
+
+        Raises:
+            OSError: If the manifest can't be written
+        """
+        data = {
+            "version": MANIFEST_FORMAT_VERSION,
+            "fingerprint": self.fingerprint,
+            "result": self.result,
+            "outputs": [asdict(output) for output in self.outputs],
+            "files": [asdict(entry) for entry in self.files],
+        }
+
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self.manifest_path.parent, prefix=".tmp_", suffix=".json"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_name, self.manifest_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
@@ -20,26 +20,180 @@ from __future__ import annotations
 
 import asyncio
 import gc
+from contextlib import ExitStack, contextmanager
 import hashlib
+import os
 import sys
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import List, Tuple, Set, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, Set, Optional
 import re
 
+from .bundle_index import remove_index
 from .config import Config, SeparatorStyle
 from .constants import READ_BUFFER_SIZE
-from .encoding_handler import EncodingHandler
+from .encoding_handler import EncodingHandler, EncodingInfo
 from .exceptions import PermissionError, EncodingError
+from .file_cache import CacheEntry, FileCache
+from .loaded_file import LoadedFile, LoadedFileStore
 from .logging import LoggerManager
 from .separator_generator import SeparatorGenerator
-from .utils import calculate_checksum
+from .utils import ContentHash, calculate_checksum
 from .presets import PresetManager
+from .process_pool import ProcessPool
+from .token_counter import count_encoded_tokens, load_encoding
+
+if TYPE_CHECKING:
+    from .archive_creator import ArchiveStream
+    from .security_scanner import SecurityScanner
+    from .token_counter import TokenCounter
 from .file_operations import (
     safe_exists,
     safe_open,
 )
 
 
+@dataclass
+class TransformedFile:
+    """Decoded and preset-processed file content (picklable for worker processes)."""
+
+    content: str
+    encoding_info: EncodingInfo
+    separator_style: SeparatorStyle
+    checksum: Optional[str] = None
+    stat: Optional[os.stat_result] = None
+
+
+@dataclass
+class WrittenSection:
+    """Size and location of a file's section in the written output."""
+
+    rel_path: str
+    size: int  # Bytes in the output file
+    part: int  # Number of the output part (1 if the output isn't split)
+    # Recorded for the bundle index: the section without the spacing after it
+    offset: int = 0  # Byte offset in the output part
+    length: int = 0
+    checksum: Optional[str] = None
+    encoding: Optional[str] = None
+    file_size: Optional[int] = None
+    is_error: bool = False
+
+
+@dataclass
+class _ProcessedFile:
+    """A file that has been read and processed, ready to be written."""
+
+    file_path: Path
+    rel_path: str
+    file_num: int
+    separator: str
+    closing: Optional[str]
+    content: str
+    style: SeparatorStyle
+    dedupe_checksum: Optional[str] = None
+    is_error: bool = False
+    findings: List[Dict[str, Any]] = field(default_factory=list)
+    is_skipped: bool = False  # Withheld by the security check (skip mode)
+    tokens: int = 0  # Tokens of the section, counted with a token budget
+    checksum: Optional[str] = None  # Content checksum, if it was computed
+    raw: Optional[LoadedFile] = None  # Bytes read from disk, kept for the archive
+    encoding: Optional[str] = None  # Original encoding of the file
+    file_size: Optional[int] = None  # Size of the file on disk
+
+    @property
+    def size(self) -> int:
+        """Approximate size of the buffered text (and bytes for the archive)."""
+        size = len(self.separator) + len(self.content)
+        if self.raw is not None:
+            size += self.raw.size
+        return size
+
+
+def part_path(output_path: Path, number: int) -> Path:
+    """Path of a part of a split output file, e.g. bundle_part2.txt."""
+    return output_path.with_name(f"{output_path.stem}_part{number}{output_path.suffix}")
+
+
+def remove_stale_parts(output_path: Path, parts: int, logger) -> None:
+    """Remove part files left over from earlier runs, with their indexes.
+
+    Args:
+        output_path: Unsplit path of the output file
+        parts: Number of parts written by this run (1 if it wasn't split)
+        logger: Logger for debug messages
+    """
+    number = parts + 1 if parts > 1 else 1
+    while safe_exists(part_path(output_path, number)):
+        part_path(output_path, number).unlink()
+        logger.debug(f"Removed stale output part {part_path(output_path, number)}")
+        remove_index(part_path(output_path, number), logger)
+        number += 1
+
+
+class _SplitOutput:
+    """
+    Output file that is continued in a new part when the token budget is reached.
+
+    The first part is written to the output path itself and only renamed to
+    ``<stem>_part1`` once a second part is needed, so output that fits the
+    budget keeps its usual name.
+    """
+
+    def __init__(self, output_path: Path, token_budget: int, open_file, logger):
+        self.output_path = output_path
+        self.token_budget = token_budget
+        self.logger = logger
+        self.parts: List[Path] = [output_path]
+        self._open_file = open_file  # Returns a context manager like safe_open
+        self._part_tokens = 0
+        self._stack = ExitStack()
+        self._file = self._open_part(output_path)
+
+    def start_section(self, tokens: int, rel_path: str) -> bool:
+        """Account for the next section, returning True if a new part was started."""
+        started = False
+        if self._part_tokens and self._part_tokens + tokens > self.token_budget:
+            self._next_part()
+            started = True
+        if tokens > self.token_budget:
+            self.logger.warning(
+                f"{rel_path} alone exceeds the token budget "
+                f"({tokens} > {self.token_budget} tokens)"
+            )
+        self._part_tokens += tokens
+        return started
+
+    def write(self, text: str) -> None:
+        self._file.write(text)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def close(self) -> None:
+        """Close the current part and remove parts left over from earlier runs."""
+        self._stack.close()
+        remove_stale_parts(self.output_path, len(self.parts), self.logger)
+
+    def _open_part(self, path: Path):
+        part_file = self._stack.enter_context(self._open_file(path))
+        if part_file is None:
+            raise PermissionError(f"Permission denied opening '{path}'")
+        return part_file
+
+    def _next_part(self) -> None:
+        self._stack.close()
+        if len(self.parts) == 1:
+            first = part_path(self.output_path, 1)
+            os.replace(self.output_path, first)
+            remove_index(self.output_path, self.logger)
+            self.parts[0] = first
+        path = part_path(self.output_path, len(self.parts) + 1)
+        self._file = self._open_part(path)
+        self.parts.append(path)
+        self._part_tokens = 0
+
+
 class OutputWriter:
     """Handles writing the combined output file."""
 
@@ -69,7 +223,27 @@ class OutputWriter:
         self.separator_generator = SeparatorGenerator(config, logger_manager)
         self._processed_checksums: Set[str] = set()
         self._content_dedupe: bool = config.output.enable_content_deduplication
-        self._checksum_lock = asyncio.Lock()  # Lock for thread-safe checksum operations
+        self.file_cache: Optional[FileCache] = None  # Will be set by core.py if enabled
+        # Set while writing with --workers
+        self.process_pool: Optional[ProcessPool] = None
+        # Files already loaded by the security scan, set by core.py
+        self.loaded_files: Optional[LoadedFileStore] = None
+        # Set by core.py when security scanning runs inside the pipeline
+        self.security_scanner: Optional["SecurityScanner"] = None
+        self.security_findings: List[Dict[str, Any]] = []
+        self._pending_spacing = False
+        self._last_section_key: Optional[str] = None
+        # Counts tokens of the written sections, set by core.py
+        self.token_counter: Optional["TokenCounter"] = None
+        # Sizes of the written sections, recorded if set to a list by core.py
+        self.sections: Optional[List[WrittenSection]] = None
+        # Archive filled with the files as they are written, set by core.py
+        self.archive_stream: Optional["ArchiveStream"] = None
+        # Combined hash of the written files, set by core.py if needed
+        self.content_hash: Optional[ContentHash] = None
+        # Files the output was written to (several with a token budget)
+        self.output_parts: List[Path] = []
+        self._budget_encoding = None
 
     def _apply_global_settings(self, config: Config) -> Config:
         """Apply global preset settings to config if not already set."""
@@ -178,6 +352,43 @@ class OutputWriter:
             security=security_config,
         )
 
+    def _update_cache_entry(
+        self, cache_entry: Optional[CacheEntry], encoding_info: EncodingInfo
+    ) -> Optional[CacheEntry]:
+        """Record the detected encoding in the file cache entry."""
+        # Never cache results derived from a failed or lossy read
+        if cache_entry is None or encoding_info.had_errors:
+            return None
+
+        if not cache_entry.encoding_info:
+            cache_entry.encoding_info = asdict(encoding_info)
+            self.file_cache.mark_dirty()
+
+        return cache_entry
+
+    def _get_checksum(
+        self,
+        content: str,
+        cache_entry: Optional[CacheEntry],
+        checksum: Optional[str] = None,
+    ) -> str:
+        """Get the content checksum, from the file cache when possible.
+
+        A checksum already computed by a worker process can be passed in to
+        avoid hashing the content again.
+        """
+        if cache_entry is not None and cache_entry.checksum is not None:
+            return cache_entry.checksum
+
+        if checksum is None:
+            checksum = calculate_checksum(content)
+
+        if cache_entry is not None:
+            cache_entry.checksum = checksum
+            self.file_cache.mark_dirty()
+
+        return checksum
+
     def _remove_scraped_metadata(self, content: str) -> str:
         """Remove scraped metadata from the end of markdown content."""
         if not self.config.filter.remove_scraped_metadata:
@@ -213,35 +424,73 @@ class OutputWriter:
         total_files = len(files_to_process)
         self.logger.info(f"Processing {total_files} file(s) for inclusion...")
 
+        self.security_findings = []
+        self._pending_spacing = False
+        self._last_section_key = None
+        self.output_parts = []
+        if self.config.output.token_budget:
+            # Sections are counted up front to decide where a new part starts
+            self._budget_encoding = load_encoding()
+
         # Prepare include files if any
         include_files = await self._prepare_include_files()
 
         # Combine include files with regular files
         all_files = include_files + files_to_process
 
-        # Use parallel processing if enabled and have multiple files
-        if self.config.output.parallel and len(all_files) > 1:
-            return await self._write_combined_file_parallel(output_path, all_files)
-        else:
-            return await self._write_combined_file_sequential(output_path, all_files)
+        # Ship CPU-bound per-file work to worker processes if requested
+        workers = self.config.output.workers
+        if workers > 0 and len(all_files) > 1:
+            self.logger.info(f"Using {workers} worker processes for file processing")
+            self.process_pool = ProcessPool(self.config, workers)
+
+        try:
+            # Use parallel processing if enabled and have multiple files
+            if (self.config.output.parallel or self.process_pool) and len(
+                all_files
+            ) > 1:
+                return await self._write_combined_file_parallel(output_path, all_files)
+            else:
+                return await self._write_combined_file_sequential(
+                    output_path, all_files
+                )
+        finally:
+            if self.process_pool is not None:
+                await asyncio.to_thread(self.process_pool.shutdown)
+                self.process_pool = None
+
+    async def hash_combined_file(self, files_to_process: List[Tuple[Path, str]]) -> str:
+        """Compute the content hash of the bundle without writing it.
+
+        Files are processed and deduplicated like write_combined_file() does,
+        so the hash is the same as that of the written bundle.
+        """
+        include_files = await self._prepare_include_files()
+        all_files = include_files + files_to_process
+        seen_checksums: Set[str] = set()
+
+        for i, (file_path, rel_path) in enumerate(all_files, 1):
+            processed = await self._process_file(file_path, rel_path, i, len(all_files))
+            if processed.is_skipped:
+                continue
+            if not processed.is_error and processed.dedupe_checksum is not None:
+                if processed.dedupe_checksum in seen_checksums:
+                    continue
+                seen_checksums.add(processed.dedupe_checksum)
+            self._add_to_content_hash(processed)
+
+        return self.content_hash.hexdigest()
 
     async def _write_combined_file_sequential(
         self, output_path: Path, all_files: List[Tuple[Path, str]]
     ) -> int:
-        """Write all files sequentially (original implementation)."""
+        """Write all files sequentially, one file at a time."""
         try:
             # Open output file
-            output_encoding = self.config.encoding.target_charset or "utf-8"
-
-            with safe_open(
-                output_path,
-                "w",
-                encoding=output_encoding,
-                newline=self.config.output.line_ending.value,
-                logger=self.logger,
-            ) as outfile:
+            with self._open_output(output_path) as outfile:
 
                 files_written = 0
+                total_files = len(all_files)
 
                 for i, (file_path, rel_path) in enumerate(all_files, 1):
                     # Skip if output file itself
@@ -250,9 +499,10 @@ class OutputWriter:
                         continue
 
                     # Process and write file
-                    if await self._write_single_file(
-                        outfile, file_path, rel_path, i, len(all_files)
-                    ):
+                    processed = await self._process_file(
+                        file_path, rel_path, i, total_files
+                    )
+                    if self._write_processed_file(outfile, processed):
                         files_written += 1
 
                 return files_written
@@ -267,95 +517,76 @@ class OutputWriter:
     async def _write_combined_file_parallel(
         self, output_path: Path, all_files: List[Tuple[Path, str]]
     ) -> int:
-        """Write all files using parallel processing for reading."""
-        self.logger.info("Using parallel processing for file reading...")
-
-        try:
-            # Process files in batches to avoid too many concurrent operations
-            batch_size = 10  # Process 10 files concurrently
-
-            # First, read and process all files in parallel
-            processed_files = []
-
-            for batch_start in range(0, len(all_files), batch_size):
-                batch_end = min(batch_start + batch_size, len(all_files))
-                batch = all_files[batch_start:batch_end]
-
-                # Create tasks for parallel processing
-                tasks = []
-                for i, (file_path, rel_path) in enumerate(batch, batch_start + 1):
-                    # Skip if output file itself
-                    if file_path.resolve() == output_path.resolve():
-                        self.logger.warning(f"Skipping output file itself: {file_path}")
-                        continue
-
-                    task = self._process_single_file_parallel(
-                        file_path, rel_path, i, len(all_files)
-                    )
-                    tasks.append(task)
-
-                # Process batch concurrently
-                batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                # Collect successful results
-                for j, result in enumerate(batch_results):
-                    if isinstance(result, Exception):
-                        # Log error but continue
-                        file_path, rel_path = batch[j]
-                        self.logger.error(f"Failed to process {file_path}: {result}")
-                    elif result is not None:
-                        processed_files.append((batch[j], result))
+        """
+        Write all files through an ordered streaming pipeline.
+
+        Up to ``concurrency`` files are read and processed at the same time.
+        Finished files wait in a reorder buffer and are flushed to the output as
+        soon as every earlier file has been written. No new files are started
+        while the buffered content exceeds ``max_buffer_size``, so memory use
+        stays bounded regardless of the bundle size.
+        """
+        concurrency = max(1, self.config.output.concurrency)
+        if self.process_pool is not None:
+            # Keep every worker process busy
+            concurrency = max(concurrency, self.process_pool.workers)
+        max_buffer_size = self.config.output.max_buffer_size
+        self.logger.info(
+            f"Using parallel processing for file reading ({concurrency} workers)..."
+        )
 
-                # Force garbage collection after each batch on Windows to release file handles
-                if sys.platform.startswith("win"):
-                    gc.collect()
+        # Files in output order, with their position in the original list
+        total_files = len(all_files)
+        queue: List[Tuple[int, Path, str]] = []
+        for i, (file_path, rel_path) in enumerate(all_files, 1):
+            # Skip if output file itself
+            if file_path.resolve() == output_path.resolve():
+                self.logger.warning(f"Skipping output file itself: {file_path}")
+                continue
+            queue.append((i, file_path, rel_path))
+
+        semaphore = asyncio.Semaphore(concurrency)
+        in_flight: Dict[int, asyncio.Task] = {}
+        buffered_bytes = 0
+        next_to_start = 0
+
+        async def process(position: int) -> _ProcessedFile:
+            file_num, file_path, rel_path = queue[position]
+            async with semaphore:
+                return await self._process_file(
+                    file_path, rel_path, file_num, total_files
+                )
 
-            # Now write all processed files sequentially to maintain order
-            output_encoding = self.config.encoding.target_charset or "utf-8"
+        def on_done(task: asyncio.Task) -> None:
+            nonlocal buffered_bytes
+            if not task.cancelled() and task.exception() is None:
+                buffered_bytes += task.result().size
 
-            with safe_open(
-                output_path,
-                "w",
-                encoding=output_encoding,
-                newline=self.config.output.line_ending.value,
-                logger=self.logger,
-            ) as outfile:
+        try:
+            with self._open_output(output_path) as outfile:
                 files_written = 0
 
-                for i, ((file_path, rel_path), processed_data) in enumerate(
-                    processed_files
-                ):
-                    if processed_data:
-                        # Write the pre-processed content
-                        separator, content, separator_style = processed_data
-
-                        # Write separator
-                        outfile.write(separator)
-
-                        # Add blank line for some styles (between separator and content)
-                        if separator_style in [
-                            SeparatorStyle.STANDARD,
-                            SeparatorStyle.DETAILED,
-                            SeparatorStyle.MARKDOWN,
-                        ]:
-                            outfile.write(self.config.output.line_ending.value)
-
-                        # Write content
-                        outfile.write(content)
-
-                        # Ensure newline at end if needed
-                        if content and not content.endswith(("\n", "\r")):
-                            outfile.write(self.config.output.line_ending.value)
-
-                        # Write closing separator for Markdown
-                        if separator_style == SeparatorStyle.MARKDOWN:
-                            outfile.write("```")
-                            outfile.write(self.config.output.line_ending.value)
+                for position in range(len(queue)):
+                    # Start more files while the window and the buffer allow it;
+                    # the next file in order is always started
+                    while next_to_start < len(queue) and (
+                        not in_flight
+                        or (
+                            len(in_flight) < concurrency * 2
+                            and buffered_bytes < max_buffer_size
+                        )
+                    ):
+                        task = asyncio.create_task(process(next_to_start))
+                        task.add_done_callback(on_done)
+                        in_flight[next_to_start] = task
+                        next_to_start += 1
 
-                        # Add inter-file spacing if not last file
-                        if i < len(processed_files) - 1:
-                            outfile.write(self.config.output.line_ending.value)
+                    processed = await in_flight.pop(position)
+                    buffered_bytes -= processed.size
 
+                    if await asyncio.to_thread(
+                        self._write_processed_file, outfile, processed
+                    ):
                         files_written += 1
 
             return files_written
@@ -363,113 +594,56 @@ class OutputWriter:
         except IOError as e:
             raise PermissionError(f"Cannot write to output file: {e}")
         finally:
+            # Don't leave workers running if writing failed
+            for task in in_flight.values():
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight.values(), return_exceptions=True)
+
             # Ensure garbage collection to release any remaining file handles on Windows
             if sys.platform.startswith("win"):
                 gc.collect()
 
-    async def _process_single_file_parallel(
-        self, file_path: Path, rel_path: str, file_num: int, total_files: int
-    ) -> Optional[Tuple[str, str]]:
-        """Process a single file for parallel writing, returning separator and content."""
-        try:
-            # Log progress
-            if self.config.logging.verbose:
-                self.logger.debug(
-                    f"Processing file ({file_num}/{total_files}): {file_path.name}"
-                )
-
-            # Read file with encoding handling
-            content, encoding_info = await self.encoding_handler.read_file(file_path)
+    @contextmanager
+    def _open_output(self, output_path: Path):
+        """Open the output file, split into parts if a token budget is set."""
+        output_encoding = self.config.encoding.target_charset or "utf-8"
+        newline = self.config.output.line_ending.value
 
-            # Apply preset processing if available
-            preset = None
-            if self.preset_manager:
-                preset = self.preset_manager.get_preset_for_file(
-                    file_path, self.config.preset.preset_group
-                )
-                if preset:
-                    self.logger.debug(f"Applying preset to {file_path}")
-                    content = self.preset_manager.process_content(
-                        content, preset, file_path
-                    )
-
-            # Remove scraped metadata if requested
-            # Check file-specific override first
-            remove_metadata = self.config.filter.remove_scraped_metadata
-            if (
-                preset
-                and hasattr(preset, "remove_scraped_metadata")
-                and preset.remove_scraped_metadata is not None
-            ):
-                remove_metadata = preset.remove_scraped_metadata
-
-            if remove_metadata:
-                content = self._remove_scraped_metadata(content)
-
-            # Check for content deduplication
-            # Skip deduplication for symlinks when include_symlinks is enabled
-            skip_dedupe = self.config.filter.include_symlinks and file_path.is_symlink()
-
-            if (
-                self._content_dedupe
-                and not rel_path.startswith(("intro:", "include:"))
-                and not skip_dedupe
-            ):
-                content_checksum = calculate_checksum(content)
-
-                async with self._checksum_lock:
-                    if content_checksum in self._processed_checksums:
-                        self.logger.debug(f"Skipping duplicate content: {file_path}")
-                        return None
-
-                    self._processed_checksums.add(content_checksum)
-
-            # Generate separator
-            # Check if preset overrides separator style
-            separator_style = self.config.output.separator_style
-            if self.preset_manager and preset and preset.separator_style:
-                try:
-                    separator_style = SeparatorStyle(preset.separator_style)
-                except ValueError:
-                    self.logger.warning(
-                        f"Invalid separator style in preset: {preset.separator_style}"
-                    )
-
-            # Temporarily override separator style if needed
-            original_style = self.separator_generator.config.output.separator_style
-            if separator_style != original_style:
-                # Create a temporary config with the new style
-                from dataclasses import replace
-
-                temp_output = replace(
-                    self.separator_generator.config.output,
-                    separator_style=separator_style,
-                )
-                temp_config = replace(
-                    self.separator_generator.config, output=temp_output
-                )
-                self.separator_generator.config = temp_config
-
-            separator = await self.separator_generator.generate_separator(
-                file_path=file_path,
-                rel_path=rel_path,
-                encoding_info=encoding_info,
-                file_content=content,
-            )
-
-            # Restore original config if changed
-            if separator_style != original_style:
-                self.separator_generator.config = self.config
-
-            return (separator, content, separator_style)
-
-        except Exception as e:
-            self.logger.error(f"Error processing file {file_path}: {e}")
-            raise
+        if not self.config.output.token_budget:
+            with safe_open(
+                output_path,
+                "w",
+                encoding=output_encoding,
+                newline=newline,
+                logger=self.logger,
+            ) as outfile:
+                yield outfile
+            self.output_parts = [output_path]
+            return
+
+        split_output = _SplitOutput(
+            output_path,
+            self.config.output.token_budget,
+            lambda path: safe_open(
+                path,
+                "w",
+                encoding=output_encoding,
+                newline=newline,
+                logger=self.logger,
+            ),
+            self.logger,
+        )
+        try:
+            yield split_output
         finally:
-            # Force garbage collection on Windows to ensure file handles are released
-            if sys.platform.startswith("win"):
-                gc.collect()
+            split_output.close()
+            self.output_parts = split_output.parts
+        if len(self.output_parts) > 1:
+            self.logger.info(
+                f"Split output into {len(self.output_parts)} parts of at most "
+                f"{self.config.output.token_budget} tokens"
+            )
 
     async def _prepare_include_files(self) -> List[Tuple[Path, str]]:
         """Prepare include files from configuration."""
@@ -493,10 +667,10 @@ class OutputWriter:
 
         return include_files
 
-    async def _write_single_file(
-        self, outfile, file_path: Path, rel_path: str, file_num: int, total_files: int
-    ) -> bool:
-        """Write a single file to the output."""
+    async def _process_file(
+        self, file_path: Path, rel_path: str, file_num: int, total_files: int
+    ) -> _ProcessedFile:
+        """Read and process a single file, returning everything needed to write it."""
         try:
             # Log progress
             if self.config.logging.verbose:
@@ -504,132 +678,137 @@ class OutputWriter:
                     f"Processing file ({file_num}/{total_files}): {file_path.name}"
                 )
 
-            # Read file with encoding handling
-            content, encoding_info = await self.encoding_handler.read_file(file_path)
-
-            # Apply preset processing if available
-            preset = None
-            if self.preset_manager:
-                preset = self.preset_manager.get_preset_for_file(
-                    file_path, self.config.preset.preset_group
+            # Each file is read from disk once: reuse the buffer kept by the
+            # security scan, otherwise open, stat and read it in one go
+            loaded = (
+                self.loaded_files.take(file_path)
+                if self.loaded_files is not None
+                else None
+            )
+            scan = self.security_scanner is not None and not rel_path.startswith(
+                ("intro:", "include:")
+            )
+            # Files are read here when their state is recorded for the
+            # manifest, so that it matches the written content
+            record = (
+                self.loaded_files is not None and self.loaded_files.states is not None
+            )
+            if loaded is None and (self.process_pool is None or scan or record):
+                read = (
+                    LoadedFile.read
+                    if self.loaded_files is None
+                    else self.loaded_files.read
                 )
-                if preset:
-                    self.logger.debug(f"Applying preset to {file_path}")
-                    content = self.preset_manager.process_content(
-                        content, preset, file_path
+                loaded = await asyncio.to_thread(read, file_path)
+
+            # Security scan inside the pipeline; the file is held back until
+            # its verdict is known
+            findings = []
+            if scan:
+                findings = await self.security_scanner.scan_loaded(loaded, rel_path)
+                if findings and self.config.security.security_check.value == "skip":
+                    return _ProcessedFile(
+                        file_path=file_path,
+                        rel_path=rel_path,
+                        file_num=file_num,
+                        separator="",
+                        closing=None,
+                        content="",
+                        style=SeparatorStyle.NONE,
+                        findings=findings,
+                        is_skipped=True,
                     )
 
-            # Remove scraped metadata if requested
-            # Check file-specific override first
-            remove_metadata = self.config.filter.remove_scraped_metadata
-            if (
-                preset
-                and hasattr(preset, "remove_scraped_metadata")
-                and preset.remove_scraped_metadata is not None
-            ):
-                remove_metadata = preset.remove_scraped_metadata
+            cache_entry = (
+                self.file_cache.entry_for(file_path, loaded.stat if loaded else None)
+                if self.file_cache
+                else None
+            )
+            detected_encoding = None
+            if cache_entry is not None and cache_entry.encoding_info:
+                detected_encoding = cache_entry.encoding_info.get("original_encoding")
+
+            if self.process_pool is not None:
+                # Reading, decoding, presets and hashing run in a worker process
+                transformed = await self.process_pool.transform_file(
+                    file_path,
+                    detected_encoding,
+                    want_checksum=cache_entry is None or cache_entry.checksum is None,
+                    loaded=loaded,
+                )
+            else:
+                # Decode with encoding handling
+                content, encoding_info = await self.encoding_handler.read_file(
+                    file_path, detected_encoding=detected_encoding, loaded=loaded
+                )
+                transformed = self._transform_content(file_path, content, encoding_info)
+                transformed.stat = loaded.stat
 
-            if remove_metadata:
-                content = self._remove_scraped_metadata(content)
+            content = transformed.content
+            encoding_info = transformed.encoding_info
+            separator_style = transformed.separator_style
+            cache_entry = self._update_cache_entry(cache_entry, encoding_info)
 
-            # Check for content deduplication
+            # Checksum for content deduplication, checked in output order
             # Skip deduplication for symlinks when include_symlinks is enabled
             skip_dedupe = self.config.filter.include_symlinks and file_path.is_symlink()
 
+            dedupe_checksum = None
             if (
                 self._content_dedupe
                 and not rel_path.startswith(("intro:", "include:"))
                 and not skip_dedupe
             ):
-                content_checksum = calculate_checksum(content)
-
-                async with self._checksum_lock:
-                    if content_checksum in self._processed_checksums:
-                        self.logger.debug(f"Skipping duplicate content: {file_path}")
-                        return False
-
-                    self._processed_checksums.add(content_checksum)
-
-            # Generate separator
-            # Check if preset overrides separator style
-            separator_style = self.config.output.separator_style
-            if self.preset_manager and preset and preset.separator_style:
-                try:
-                    separator_style = SeparatorStyle(preset.separator_style)
-                except ValueError:
-                    self.logger.warning(
-                        f"Invalid separator style in preset: {preset.separator_style}"
-                    )
-
-            # Temporarily override separator style if needed
-            original_style = self.separator_generator.config.output.separator_style
-            if separator_style != original_style:
-                # Create a temporary config with the new style
-                from dataclasses import replace
+                dedupe_checksum = self._get_checksum(
+                    content, cache_entry, transformed.checksum
+                )
 
-                temp_output = replace(
-                    self.separator_generator.config.output,
-                    separator_style=separator_style,
+            # Generate separator, reusing a known checksum
+            separator_checksum = None
+            if separator_style != SeparatorStyle.NONE and (
+                cache_entry is not None or transformed.checksum is not None
+            ):
+                separator_checksum = self._get_checksum(
+                    content, cache_entry, transformed.checksum
                 )
-                temp_config = replace(
-                    self.separator_generator.config, output=temp_output
+
+            # Checksum for the content hash of the bundle
+            checksum = dedupe_checksum or separator_checksum
+            if checksum is None and self.content_hash is not None:
+                checksum = self._get_checksum(
+                    content, cache_entry, transformed.checksum
                 )
-                self.separator_generator.config = temp_config
 
-            separator = await self.separator_generator.generate_separator(
+            separator, closing = await self._generate_separators(
+                file_path,
+                rel_path,
+                encoding_info,
+                content,
+                separator_style,
+                separator_checksum,
+                transformed.stat,
+            )
+
+            processed = _ProcessedFile(
                 file_path=file_path,
                 rel_path=rel_path,
-                encoding_info=encoding_info,
-                file_content=content,
+                file_num=file_num,
+                separator=separator,
+                closing=closing,
+                content=content,
+                style=separator_style,
+                dedupe_checksum=dedupe_checksum,
+                findings=findings,
+                checksum=checksum,
+                raw=loaded if self._archives(rel_path) else None,
+                encoding=encoding_info.original_encoding,
+                file_size=transformed.stat.st_size if transformed.stat else None,
             )
-
-            # Restore original config if changed
-            if separator_style != original_style:
-                self.separator_generator.config = self.config
-
-            # Write separator
-            if separator:
-                outfile.write(separator)
-
-                # For Markdown, ensure separator ends with newline before adding blank line
-                if self.config.output.separator_style == SeparatorStyle.MARKDOWN:
-                    if not separator.endswith(("\n", "\r\n", "\r")):
-                        outfile.write(self.config.output.line_ending.value)
-
-                # Add blank line for some styles
-                if self.config.output.separator_style in [
-                    SeparatorStyle.STANDARD,
-                    SeparatorStyle.DETAILED,
-                    SeparatorStyle.MARKDOWN,
-                ]:
-                    outfile.write(self.config.output.line_ending.value)
-
-            # Write content
-            outfile.write(content)
-
-            # Ensure newline at end if needed
-            if (
-                content
-                and not content.endswith(("\n", "\r"))
-                and self.config.output.separator_style
-                != SeparatorStyle.MACHINE_READABLE
-            ):
-                outfile.write(self.config.output.line_ending.value)
-
-            # Write closing separator
-            closing = await self.separator_generator.generate_closing_separator()
-            if closing:
-                outfile.write(closing)
-                outfile.write(self.config.output.line_ending.value)
-
-            # Add inter-file spacing
-            if (
-                file_num < total_files
-                and self.config.output.separator_style != SeparatorStyle.NONE
-            ):
-                outfile.write(self.config.output.line_ending.value)
-
-            return True
+            if self._budget_encoding is not None:
+                processed.tokens = await asyncio.to_thread(
+                    self._count_section_tokens, processed
+                )
+            return processed
 
         except Exception as e:
             self.logger.error(f"Error processing file {file_path}: {e}")
@@ -638,12 +817,274 @@ class OutputWriter:
                 raise EncodingError(f"Failed to process {file_path}: {e}")
 
             # Write error placeholder
-            error_msg = f"[ERROR: Unable to read file '{file_path}'. Reason: {e}]"
-            outfile.write(error_msg)
-            outfile.write(self.config.output.line_ending.value)
-
-            return True
+            processed = _ProcessedFile(
+                file_path=file_path,
+                rel_path=rel_path,
+                file_num=file_num,
+                separator="",
+                closing=None,
+                content=f"[ERROR: Unable to read file '{file_path}'. Reason: {e}]",
+                style=SeparatorStyle.NONE,
+                is_error=True,
+            )
+            if self._budget_encoding is not None:
+                processed.tokens = self._count_section_tokens(processed)
+            return processed
         finally:
             # Force garbage collection on Windows to ensure file handles are released
             if sys.platform.startswith("win"):
                 gc.collect()
+
+    def transform_file(
+        self,
+        file_path: Path,
+        detected_encoding: Optional[str] = None,
+        want_checksum: bool = False,
+        loaded: Optional[LoadedFile] = None,
+    ) -> TransformedFile:
+        """Read and transform a file synchronously (used by worker processes)."""
+        if loaded is None:
+            loaded = LoadedFile.read(file_path)
+        content, encoding_info = self.encoding_handler.read_file_sync(
+            file_path, detected_encoding=detected_encoding, loaded=loaded
+        )
+        transformed = self._transform_content(
+            file_path, content, encoding_info, want_checksum
+        )
+        transformed.stat = loaded.stat
+        return transformed
+
+    def _transform_content(
+        self,
+        file_path: Path,
+        content: str,
+        encoding_info: EncodingInfo,
+        want_checksum: bool = False,
+    ) -> TransformedFile:
+        """Apply presets and metadata removal to decoded file content."""
+        # Apply preset processing if available
+        preset = None
+        if self.preset_manager:
+            preset = self.preset_manager.get_preset_for_file(
+                file_path, self.config.preset.preset_group
+            )
+            if preset:
+                self.logger.debug(f"Applying preset to {file_path}")
+                content = self.preset_manager.process_content(
+                    content, preset, file_path
+                )
+
+        # Remove scraped metadata if requested
+        # Check file-specific override first
+        remove_metadata = self.config.filter.remove_scraped_metadata
+        if (
+            preset
+            and hasattr(preset, "remove_scraped_metadata")
+            and preset.remove_scraped_metadata is not None
+        ):
+            remove_metadata = preset.remove_scraped_metadata
+
+        if remove_metadata:
+            content = self._remove_scraped_metadata(content)
+
+        # Check if preset overrides separator style
+        separator_style = self.config.output.separator_style
+        if self.preset_manager and preset and preset.separator_style:
+            try:
+                separator_style = SeparatorStyle(preset.separator_style)
+            except ValueError:
+                self.logger.warning(
+                    f"Invalid separator style in preset: {preset.separator_style}"
+                )
+
+        return TransformedFile(
+            content=content,
+            encoding_info=encoding_info,
+            separator_style=separator_style,
+            checksum=calculate_checksum(content) if want_checksum else None,
+        )
+
+    async def _generate_separators(
+        self,
+        file_path: Path,
+        rel_path: str,
+        encoding_info: EncodingInfo,
+        content: str,
+        separator_style: SeparatorStyle,
+        checksum: Optional[str],
+        stat_result: Optional[os.stat_result] = None,
+    ) -> Tuple[str, Optional[str]]:
+        """Generate the opening and closing separator in the given style."""
+        # Temporarily override separator style if needed. Both separators are
+        # generated without yielding, so concurrent workers can't interleave.
+        original_config = self.separator_generator.config
+        if separator_style != original_config.output.separator_style:
+            from dataclasses import replace
+
+            temp_output = replace(
+                original_config.output, separator_style=separator_style
+            )
+            self.separator_generator.config = replace(
+                original_config, output=temp_output
+            )
+
+        try:
+            separator = await self.separator_generator.generate_separator(
+                file_path=file_path,
+                rel_path=rel_path,
+                encoding_info=encoding_info,
+                file_content=content,
+                checksum=checksum,
+                stat_result=stat_result,
+            )
+            closing = await self.separator_generator.generate_closing_separator()
+        finally:
+            # Restore original config if changed
+            self.separator_generator.config = original_config
+
+        return separator, closing
+
+    def _archives(self, rel_path: str) -> bool:
+        """Check if a file goes into the archive (intro files don't)."""
+        return self.archive_stream is not None and not rel_path.startswith(
+            ("intro:", "include:")
+        )
+
+    def _write_processed_file(self, outfile, processed: _ProcessedFile) -> bool:
+        """Write a processed file to the output, returning False if skipped."""
+        # Findings are collected in output order
+        self.security_findings.extend(processed.findings)
+        if processed.is_skipped:
+            self.logger.debug(f"Skipping flagged file: {processed.file_path}")
+            return False
+
+        # Archived in output order, duplicates and unreadable files included
+        if self._archives(processed.rel_path):
+            self.archive_stream.add(
+                processed.file_path, processed.rel_path, processed.raw
+            )
+            processed.raw = None
+
+        if processed.is_error:
+            self._write_parts(outfile, processed, self._section_parts(processed))
+            return True
+
+        # Check for content deduplication in output order
+        if processed.dedupe_checksum is not None:
+            if processed.dedupe_checksum in self._processed_checksums:
+                self.logger.debug(f"Skipping duplicate content: {processed.file_path}")
+                return False
+            self._processed_checksums.add(processed.dedupe_checksum)
+
+        parts = self._section_parts(processed)
+        self._write_parts(outfile, processed, parts)
+
+        # Inter-file spacing is written before the next file, so files that
+        # end up skipped don't leave a trailing blank line. Files without
+        # separators are kept apart by it too.
+        self._pending_spacing = True
+
+        return True
+
+    def _section_parts(self, processed: _ProcessedFile) -> List[str]:
+        """Return the texts that make up a file's section in the output."""
+        linesep = self.config.output.line_ending.value
+        if processed.is_error:
+            return [processed.content, linesep]
+
+        style = processed.style
+        parts = []
+
+        # Separator
+        if processed.separator:
+            parts.append(processed.separator)
+
+            # End the separator line (MachineReadable separators already do)
+            if style in [
+                SeparatorStyle.STANDARD,
+                SeparatorStyle.DETAILED,
+                SeparatorStyle.MARKDOWN,
+            ] and not processed.separator.endswith(("\n", "\r")):
+                parts.append(linesep)
+
+        # Content
+        parts.append(processed.content)
+
+        # Ensure newline at end if needed
+        if (
+            processed.content
+            and not processed.content.endswith(("\n", "\r"))
+            and style != SeparatorStyle.MACHINE_READABLE
+        ):
+            parts.append(linesep)
+
+        # Closing separator
+        if processed.closing:
+            parts.append(processed.closing)
+            parts.append(linesep)
+
+        return parts
+
+    def _add_to_content_hash(self, processed: _ProcessedFile) -> None:
+        """Add a file that ends up in the bundle to its content hash."""
+        self.content_hash.add(
+            processed.rel_path,
+            processed.checksum or calculate_checksum(processed.content),
+        )
+
+    def _count_section_tokens(self, processed: _ProcessedFile) -> int:
+        """Count the tokens of a section, including the spacing after it."""
+        parts = self._section_parts(processed)
+        parts.append(self.config.output.line_ending.value)
+        return count_encoded_tokens(self._budget_encoding, parts)
+
+    def _write_parts(
+        self, outfile, processed: _ProcessedFile, parts: List[str]
+    ) -> None:
+        """Write the parts of a file's section and queue them for token counting."""
+        part_number = 1
+        if isinstance(outfile, _SplitOutput):
+            if outfile.start_section(processed.tokens, processed.rel_path):
+                # A new part starts without spacing
+                self._pending_spacing = False
+            part_number = len(outfile.parts)
+
+        record = self.sections is not None
+        start = outfile.tell() if record else 0
+        if self._pending_spacing:
+            # The spacing ends the previous section
+            spacing = self.config.output.line_ending.value
+            outfile.write(spacing)
+            if self.token_counter is not None:
+                self.token_counter.add(spacing, self._last_section_key)
+            if record and self.sections:
+                end = outfile.tell()
+                self.sections[-1].size += end - start
+                start = end
+            self._pending_spacing = False
+
+        for part in parts:
+            outfile.write(part)
+        if self.token_counter is not None:
+            self.token_counter.add(parts, processed.rel_path)
+        if self.content_hash is not None:
+            self._add_to_content_hash(processed)
+        self._last_section_key = processed.rel_path
+
+        if record:
+            end = outfile.tell()
+            section = WrittenSection(
+                rel_path=processed.rel_path,
+                size=end - start,
+                part=part_number,
+                offset=start,
+                length=end - start,
+                is_error=processed.is_error,
+            )
+            if self.config.output.write_index and not processed.is_error:
+                section.checksum = processed.checksum or calculate_checksum(
+                    processed.content
+                )
+                section.encoding = processed.encoding
+                section.file_size = processed.file_size
+            self.sections.append(section)
@@ -19,12 +19,15 @@ This module provides a flexible preset system that allows different processing
 rules for different file types within the same m1f bundle.
 """
 
+from __future__ import annotations
+
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
-import yaml
+from typing import Dict, List, Optional, Any, Tuple, Union
 import fnmatch
 import logging
+import os
+import re
 from enum import Enum
 from .file_operations import (
     safe_open,
@@ -115,7 +118,7 @@ class GlobalSettings:
 
     # Archive settings
     create_archive: Optional[bool] = None  # Create backup archive
-    archive_type: Optional[str] = None  # 'zip' or 'tar.gz'
+    archive_type: Optional[str] = None  # 'zip', 'tar.gz', 'tar.xz' or 'tar.zst'
 
     # Runtime behavior
     verbose: Optional[bool] = None  # Enable verbose output
@@ -150,6 +153,60 @@ class GlobalSettings:
     extension_settings: Dict[str, FilePreset] = field(default_factory=dict)
 
 
+def _normalize_extension(ext: str) -> str:
+    """Lowercase an extension and add the leading dot if it is missing."""
+    return ext.lower() if ext.startswith(".") else f".{ext.lower()}"
+
+
+class _PresetIndex:
+    """Lookup tables compiled from the file presets of a group.
+
+    Extensions map to the first preset listing them. All patterns are
+    translated into one regex with a named alternative per preset, in
+    definition order, so the first alternative that matches is the first
+    preset whose patterns match.
+    """
+
+    def __init__(self, presets: List[Tuple[str, FilePreset]]):
+        self.presets = presets
+        self.by_extension: Dict[str, int] = {}
+        # Merged presets by (preset position or None for default, extension)
+        self.merged: Dict[Tuple[Optional[int], str], FilePreset] = {}
+        self.first_pattern: Optional[int] = None
+
+        alternatives = []
+        for position, (_, preset) in enumerate(presets):
+            for ext in preset.extensions or []:
+                self.by_extension.setdefault(_normalize_extension(ext), position)
+            if preset.patterns:
+                if self.first_pattern is None:
+                    self.first_pattern = position
+                # fnmatch.fnmatch() normalizes case the same way
+                translated = "|".join(
+                    fnmatch.translate(os.path.normcase(pattern))
+                    for pattern in preset.patterns
+                )
+                alternatives.append(f"(?P<p{position}>{translated})")
+        self.patterns = re.compile("|".join(alternatives)) if alternatives else None
+
+    def match(self, ext: str, file_path: Path) -> Optional[int]:
+        """Position of the first preset matching a file, or None."""
+        position = self.by_extension.get(ext)
+        if self.patterns is None or (
+            position is not None and position < self.first_pattern
+        ):
+            return position
+
+        match = self.patterns.match(os.path.normcase(str(file_path)))
+        if match is None:
+            return position
+        # The outermost group closes last
+        pattern_position = int(match.lastgroup[1:])
+        if position is None or pattern_position < position:
+            return pattern_position
+        return position
+
+
 @dataclass
 class PresetGroup:
     """A group of presets with shared configuration."""
@@ -171,50 +228,50 @@ class PresetGroup:
     # Global settings for this group
     global_settings: Optional[GlobalSettings] = None
 
+    # Lookup tables, built on first use (see clear_index())
+    _index: Optional[_PresetIndex] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def clear_index(self) -> None:
+        """Forget the lookup tables, needed after presets were changed."""
+        self._index = None
+
     def get_preset_for_file(self, file_path: Path) -> Optional[FilePreset]:
-        """Get the appropriate preset for a file, merging with global settings."""
+        """Get the appropriate preset for a file, merging with global settings.
+
+        The first preset (in definition order) whose extensions or patterns
+        match wins; unmatched files get the default preset.
+        """
         if not self.enabled:
             return None
 
-        # First, check for specific preset match
-        matched_preset = None
-
-        # Check each preset's patterns
-        for preset_name, preset in self.file_presets.items():
-            # Check extensions
-            if preset.extensions:
-                if file_path.suffix.lower() in [
-                    ext.lower() if ext.startswith(".") else f".{ext.lower()}"
-                    for ext in preset.extensions
-                ]:
-                    logger.debug(
-                        f"File {file_path} matched extension in preset {preset_name}"
-                    )
-                    matched_preset = preset
-                    break
-
-            # Check patterns
-            if preset.patterns:
-                for pattern in preset.patterns:
-                    if fnmatch.fnmatch(str(file_path), pattern):
-                        logger.debug(
-                            f"File {file_path} matched pattern '{pattern}' in preset {preset_name}"
-                        )
-                        matched_preset = preset
-                        break
+        index = self._index
+        if index is None:
+            index = self._index = _PresetIndex(list(self.file_presets.items()))
 
-            if matched_preset:
-                break
-
-        # If no specific match, use default
-        if not matched_preset:
+        ext = file_path.suffix.lower()
+        position = index.match(ext, file_path)
+        if position is not None:
+            matched_preset = index.presets[position][1]
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"File {file_path} matched preset {index.presets[position][0]}"
+                )
+        else:
+            # If no specific match, use default
             matched_preset = self.default_preset
-            if matched_preset:
+            if matched_preset and logger.isEnabledFor(logging.DEBUG):
                 logger.debug(f"Using default preset for {file_path}")
 
         # Now merge with global settings if available
         if matched_preset and self.global_settings:
-            return self._merge_with_globals(matched_preset, file_path)
+            key = (position, ext)
+            merged = index.merged.get(key)
+            if merged is None:
+                merged = self._merge_with_globals(matched_preset, file_path)
+                index.merged[key] = merged
+            return merged
 
         return matched_preset
 
@@ -269,11 +326,13 @@ class PresetManager:
         self.groups: Dict[str, PresetGroup] = {}
         self._builtin_processors = self._register_builtin_processors()
         self._merged_global_settings: Optional[GlobalSettings] = None
+        self._sorted_groups: Optional[List[PresetGroup]] = None
 
     def load_preset_file(self, preset_path: Path) -> None:
         """Load presets from a YAML file."""
         # Reset cached merged settings when loading new files
         self._merged_global_settings = None
+        self._sorted_groups = None
 
         # Check file size limit (10MB max for preset files)
         MAX_PRESET_SIZE = 10 * 1024 * 1024  # 10MB
@@ -285,6 +344,8 @@ class PresetManager:
                 f"Maximum size is {MAX_PRESET_SIZE / 1024 / 1024}MB"
             )
 
+        import yaml
+
         try:
             with safe_open(preset_path, "r", encoding="utf-8", logger=logger) as f:
                 data = yaml.safe_load(f)
@@ -438,8 +499,7 @@ class PresetManager:
             # Parse extension-specific settings
             if "extensions" in global_data:
                 for ext, preset_data in global_data["extensions"].items():
-                    # Normalize extension
-                    ext = ext.lower() if ext.startswith(".") else f".{ext.lower()}"
+                    ext = _normalize_extension(ext)
                     group.global_settings.extension_settings[ext] = (
                         FilePreset.from_dict(preset_data)
                     )
@@ -467,11 +527,12 @@ class PresetManager:
                 return None
 
         # Check all groups by priority
-        sorted_groups = sorted(
-            self.groups.values(), key=lambda g: g.priority, reverse=True
-        )
+        if self._sorted_groups is None:
+            self._sorted_groups = sorted(
+                self.groups.values(), key=lambda g: g.priority, reverse=True
+            )
 
-        for group in sorted_groups:
+        for group in self._sorted_groups:
             preset = group.get_preset_for_file(file_path)
             if preset:
                 return preset
@@ -0,0 +1,114 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Process pool backend for CPU-bound per-file work.
+
+Encoding detection, preset processing (minify, strip_tags, strip_comments, ...)
+and SHA-256 checksums are pure Python and serialize on the GIL when run in
+threads. With ``--workers N`` they are shipped to a pool of worker processes,
+each of which holds its own OutputWriter built from the same configuration.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from .config import Config
+from .logging import LoggerManager
+
+if TYPE_CHECKING:
+    from .loaded_file import LoadedFile
+    from .output_writer import OutputWriter, TransformedFile
+
+
+# Writer owned by the current worker process, created by the pool initializer
+_worker_writer: Optional["OutputWriter"] = None
+
+
+def _init_worker(config: Config) -> None:
+    """Set up the per-process writer (presets are loaded once per worker)."""
+    global _worker_writer
+
+    from .output_writer import OutputWriter
+
+    _worker_writer = OutputWriter(config, LoggerManager(config.logging))
+
+
+def _start_method() -> str:
+    """Start method for the workers.
+
+    Workers start on the first submit, when the pipeline's threads already
+    run; a forked worker could inherit a lock one of them holds. The
+    initializer rebuilds all state from the config, so nothing is lost by
+    not forking the current process.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return "forkserver"
+    return "spawn"
+
+
+def _transform_file(
+    file_path: Path,
+    detected_encoding: Optional[str],
+    want_checksum: bool,
+    loaded: Optional["LoadedFile"],
+) -> "TransformedFile":
+    """Read and transform a single file inside a worker process."""
+    return _worker_writer.transform_file(
+        file_path, detected_encoding, want_checksum, loaded
+    )
+
+
+class ProcessPool:
+    """Runs per-file transforms in a pool of worker processes."""
+
+    def __init__(self, config: Config, workers: int):
+        self.workers = workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(_start_method()),
+            initializer=_init_worker,
+            initargs=(config,),
+        )
+
+    async def transform_file(
+        self,
+        file_path: Path,
+        detected_encoding: Optional[str] = None,
+        want_checksum: bool = False,
+        loaded: Optional["LoadedFile"] = None,
+    ) -> "TransformedFile":
+        """Read, decode and preset-process a file in a worker process.
+
+        Files already loaded by an earlier phase are sent along instead of
+        being read again by the worker.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            _transform_file,
+            file_path,
+            detected_encoding,
+            want_checksum,
+            loaded,
+        )
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -19,64 +19,201 @@ Security scanner module for detecting sensitive information in files.
 from __future__ import annotations
 
 import asyncio
+import functools
+import importlib.util
+import io
+import locale
 import re
+import threading
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 
 from .config import Config
+from .file_cache import CacheEntry
+from .loaded_file import LoadedFile, LoadedFileStore
 from .logging import LoggerManager
-from .file_operations import (
-    safe_open,
+
+# detect-secrets takes long to import, so it is only imported once the first
+# file is scanned
+DETECT_SECRETS_AVAILABLE = importlib.util.find_spec("detect_secrets") is not None
+
+# detect-secrets keeps its settings process-global, so every scanner shares
+# this lock and only one thread scans with it at a time
+_DETECT_SECRETS_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _detect_secrets_buffer_scan() -> bool:
+    """Whether already loaded buffers can be scanned with detect-secrets.
+
+    This relies on detect-secrets internals; if they are missing we fall back
+    to scan_file(), which reads the file again.
+    """
+    try:
+        from detect_secrets.core.scan import (  # noqa: F401
+            _is_filtered_out,
+            _process_line_based_plugins,
+            get_plugins,
+        )
+        from detect_secrets.transformers import get_transformed_file  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+def _decode_lines_text(data: bytes, encoding: str, errors: str = "strict") -> str:
+    """Decode bytes with the newline translation of text-mode reads."""
+    text = data.decode(encoding, errors=errors)
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _scan_buffer_with_detect_secrets(loaded: LoadedFile):
+    """Same as detect-secrets' scan_file(), but on the already loaded bytes."""
+    from detect_secrets.core.scan import (
+        _is_filtered_out,
+        _process_line_based_plugins,
+        get_plugins,
+    )
+    from detect_secrets.transformers import get_transformed_file
+
+    filename = str(loaded.path)
+
+    if not get_plugins():
+        return
+    if _is_filtered_out(required_filter_parameters=["filename"], filename=filename):
+        return
+
+    # scan_file() opens the file with the default encoding and skips files
+    # that can't be decoded
+    try:
+        text = _decode_lines_text(loaded.data, locale.getpreferredencoding(False))
+    except UnicodeDecodeError:
+        return
+
+    stream = io.StringIO(text)
+    stream.name = filename
+
+    # Try the regular transformers first, then the eager ones if nothing is found
+    for use_eager in (False, True):
+        stream.seek(0)
+        lines = get_transformed_file(stream, use_eager_transformers=use_eager)
+        if not lines:
+            if use_eager:
+                return
+            lines = stream.readlines()
+
+        has_secret = False
+        for secret in _process_line_based_plugins(
+            lines=list(enumerate(lines, start=1)), filename=filename
+        ):
+            has_secret = True
+            yield secret
+
+        if has_secret:
+            return
+
+
+# Regex fallback: every pattern is a keyword followed by an assignment, so all
+# of them are compiled into one alternation with a named group per secret type.
+# At the same position the first alternative wins, hence the most specific
+# keywords come first.
+_SECRET_KEYWORDS = (
+    (
+        "aws",
+        "AWS Credential",
+        r"aws[_-]?access[_-]?key[_-]?id|aws[_-]?secret[_-]?access[_-]?key",
+    ),
+    ("password", "Password", r"password|passwd|pwd"),
+    ("secret_key", "Secret Key", r"secret[_-]?key"),
+    ("api_key", "API Key", r"api[_-]?key|apikey"),
+    ("private_key", "Private Key", r"private[_-]?key"),
+    ("auth_token", "Auth Token", r"(?:auth|access)[_-]?token|token"),
 )
+# Every keyword starts with one of these; used as a lookahead guard so the
+# alternation is only tried where a keyword can start
+_SECRET_KEYWORD_STARTS = (
+    "pass",
+    "pwd",
+    "secret",
+    "api",
+    "private",
+    "auth",
+    "access",
+    "token",
+    "aws",
+)
+# Every match contains one of these; files without any of them are skipped
+_SECRET_PREFILTER = ("pass", "pwd", "secret", "api", "private", "token", "aws")
+# The assigned value must be on the same line as the keyword
+_SECRET_VALUE = r"""[^\S\n]*[=:][^\S\n]*["']?[\w\-\.]+["']?"""
+
+_SECRET_REGEX = (
+    f"(?=[{''.join(sorted({start[0] for start in _SECRET_KEYWORD_STARTS}))}])"
+    f"(?={'|'.join(_SECRET_KEYWORD_STARTS)})"
+    "(?:"
+    + "|".join(f"(?P<{name}>{keyword})" for name, _, keyword in _SECRET_KEYWORDS)
+    + ")"
+    + _SECRET_VALUE
+)
+# Matched against lowercased text, which is much faster than IGNORECASE
+SECRET_PATTERN = re.compile(_SECRET_REGEX)
+_SECRET_PATTERN_IGNORECASE = re.compile(_SECRET_REGEX, re.IGNORECASE)
+_SECRET_TYPES = {name: secret_type for name, secret_type, _ in _SECRET_KEYWORDS}
+
+
+def find_secrets(text: str) -> List[Tuple[int, str]]:
+    """Find likely secrets in text with the regex fallback.
+
+    The whole text is scanned at once and match offsets are mapped back to
+    line numbers; at most one secret is reported per line.
+
+    Returns:
+        List of (line number, secret type) tuples
+    """
+    lowered = text.lower()
+    if not any(keyword in lowered for keyword in _SECRET_PREFILTER):
+        return []
+
+    # A few characters lowercase to more than one character, which would
+    # shift offsets; scan the original text case-insensitively then
+    if len(lowered) == len(text):
+        matches = SECRET_PATTERN.finditer(lowered)
+    else:
+        matches = _SECRET_PATTERN_IGNORECASE.finditer(text)
+
+    results = []
+    line_num = 1
+    offset = 0
+    for match in matches:
+        # Matches come in order, so counting newlines since the previous
+        # match keeps the line mapping linear in the size of the text
+        line_num += match.string.count("\n", offset, match.start())
+        offset = match.start()
 
-# Try to import detect_secrets
-try:
-    from detect_secrets.core.scan import scan_file
-    from detect_secrets.settings import get_settings, default_settings
-    import detect_secrets.plugins
+        if results and results[-1][0] == line_num:
+            continue  # Only report once per line
 
-    DETECT_SECRETS_AVAILABLE = True
-except Exception:
-    DETECT_SECRETS_AVAILABLE = False
+        results.append((line_num, _SECRET_TYPES[match.lastgroup]))
+
+    return results
 
 
 class SecurityScanner:
     """Handles security scanning for sensitive information."""
 
-    # Regex patterns for fallback detection
-    SENSITIVE_PATTERNS = [
-        re.compile(r'password\s*[=:]\s*["\']?[\w\-\.]+["\']?', re.IGNORECASE),
-        re.compile(r'passwd\s*[=:]\s*["\']?[\w\-\.]+["\']?', re.IGNORECASE),
-        re.compile(r'pwd\s*[=:]\s*["\']?[\w\-\.]+["\']?', re.IGNORECASE),
-        re.compile(r'secret[_-]?key\s*[=:]\s*["\']?[\w\-\.]+["\']?', re.IGNORECASE),
-        re.compile(r'api[_-]?key\s*[=:]\s*["\']?[\w\-\.]+["\']?', re.IGNORECASE),
-        re.compile(r'apikey\s*[=:]\s*["\']?[\w\-\.]+["\']?', re.IGNORECASE),
-        re.compile(r'token\s*[=:]\s*["\']?[\w\-\.]+["\']?', re.IGNORECASE),
-        re.compile(r'auth[_-]?token\s*[=:]\s*["\']?[\w\-\.]+["\']?', re.IGNORECASE),
-        re.compile(r'access[_-]?token\s*[=:]\s*["\']?[\w\-\.]+["\']?', re.IGNORECASE),
-        re.compile(r'private[_-]?key\s*[=:]\s*["\']?[\w\-\.]+["\']?', re.IGNORECASE),
-        re.compile(
-            r'aws[_-]?access[_-]?key[_-]?id\s*[=:]\s*["\']?[\w\-\.]+["\']?',
-            re.IGNORECASE,
-        ),
-        re.compile(
-            r'aws[_-]?secret[_-]?access[_-]?key\s*[=:]\s*["\']?[\w\-\.]+["\']?',
-            re.IGNORECASE,
-        ),
-    ]
-
     def __init__(self, config: Config, logger_manager: LoggerManager):
         self.config = config
         self.logger = logger_manager.get_logger(__name__)
         self.preset_manager = None  # Will be set by core.py if available
+        self.file_cache = None  # Will be set by core.py if enabled
+        self.loaded_files: Optional[LoadedFileStore] = None  # Set by core.py
+        # Whether detect-secrets could be imported, None until the first scan
+        self._detect_secrets_loaded: Optional[bool] = None
 
         if DETECT_SECRETS_AVAILABLE:
             self.logger.info("Security scanning will use 'detect-secrets' library")
-            # Initialize detect-secrets
-            try:
-                get_settings()
-            except Exception as e:
-                self.logger.warning(f"Failed to initialize detect-secrets: {e}")
         else:
             self.logger.info(
                 "'detect-secrets' not available. Using regex-based scanning"
@@ -85,31 +222,80 @@ class SecurityScanner:
     async def scan_files(
         self, files_to_process: List[Tuple[Path, str]]
     ) -> List[Dict[str, any]]:
-        """Scan files for sensitive information."""
+        """Scan files for sensitive information.
+
+        Up to ``concurrency`` files are read and scanned at the same time;
+        findings are returned in file order.
+        """
         if not self.config.security.security_check:
             return []
 
         self.logger.info("Starting security scan...")
 
-        findings = []
+        results: List[List[Dict[str, any]]] = [[] for _ in files_to_process]
+        pending = iter(enumerate(files_to_process))
+
+        async def worker() -> None:
+            for index, (file_path, rel_path) in pending:
+                results[index] = await self._scan_single_file(file_path, rel_path)
 
-        for file_path, rel_path in files_to_process:
-            file_findings = await self._scan_single_file(file_path, rel_path)
-            findings.extend(file_findings)
+        concurrency = max(1, self.config.output.concurrency)
+        await asyncio.gather(
+            *(worker() for _ in range(min(concurrency, len(files_to_process))))
+        )
 
+        findings = [finding for result in results for finding in result]
+        self.log_summary(findings)
+        return findings
+
+    def log_summary(self, findings: List[Dict[str, any]]) -> None:
+        """Log the outcome of a security scan."""
         if findings:
             self.logger.warning(f"Security scan found {len(findings)} potential issues")
         else:
             self.logger.info("Security scan completed. No issues found")
 
+    async def scan_loaded(
+        self, loaded: LoadedFile, rel_path: str
+    ) -> List[Dict[str, any]]:
+        """Scan an already loaded file for sensitive information."""
+        findings, cache_entry = self._lookup(loaded.path, rel_path, loaded.stat)
+        if findings is not None:
+            return findings
+
+        # Scanning is CPU-bound and runs off the event loop
+        findings = await asyncio.to_thread(self._scan_content, loaded, rel_path)
+        self._remember(cache_entry, findings)
         return findings
 
     async def _scan_single_file(
         self, file_path: Path, rel_path: str
     ) -> List[Dict[str, any]]:
         """Scan a single file for sensitive information."""
-        findings = []
+        # Avoid reading the file if the verdict is already known
+        findings, _ = self._lookup(file_path, rel_path)
+        if findings is not None:
+            return findings
+
+        # Read the file once; the writer reuses the buffer if it's kept
+        load = LoadedFile.read if self.loaded_files is None else self.loaded_files.load
+        try:
+            loaded = await asyncio.to_thread(load, file_path)
+        except OSError as e:
+            self.logger.warning(f"Could not scan {file_path} for security: {e}")
+            return []
 
+        findings = await self.scan_loaded(loaded, rel_path)
+
+        if self.loaded_files is not None:
+            self.loaded_files.put(loaded)
+
+        return findings
+
+    def _lookup(
+        self, file_path: Path, rel_path: str, stat_result=None
+    ) -> Tuple[Optional[List[Dict[str, any]]], Optional[CacheEntry]]:
+        """Return known findings (preset opt-out or file cache) and the cache entry."""
         # Check if file has specific security_check override
         if self.preset_manager:
             file_settings = self.preset_manager.get_file_specific_settings(file_path)
@@ -120,83 +306,109 @@ class SecurityScanner:
                     self.logger.debug(
                         f"Security check disabled for {file_path} by preset"
                     )
-                    return []
+                    return [], None
                 # Note: We could also handle file-specific abort/skip/warn here if needed
 
+        # Reuse findings from a previous run if the file is unchanged
+        cache_entry = (
+            self.file_cache.entry_for(file_path, stat_result)
+            if self.file_cache
+            else None
+        )
+        if cache_entry is not None and cache_entry.findings is not None:
+            return [
+                dict(finding, path=rel_path) for finding in cache_entry.findings
+            ], cache_entry
+
+        return None, cache_entry
+
+    def _remember(
+        self, cache_entry: Optional[CacheEntry], findings: List[Dict[str, any]]
+    ) -> None:
+        """Store findings in the file cache."""
+        if cache_entry is None:
+            return
+
+        cache_entry.findings = [
+            {key: value for key, value in finding.items() if key != "path"}
+            for finding in findings
+        ]
+        self.file_cache.mark_dirty()
+
+    def _scan_content(self, loaded: LoadedFile, rel_path: str) -> List[Dict[str, any]]:
+        """Scan loaded file content with detect-secrets or the regex fallback."""
         if DETECT_SECRETS_AVAILABLE:
             # Use detect-secrets
             try:
-                with default_settings():
-                    secrets_collection = scan_file(str(file_path))
-
-                    for secret in secrets_collection:
-                        findings.append(
-                            {
-                                "path": rel_path,
-                                "type": secret.type,
-                                "line": secret.line_number,
-                                "message": f"Detected '{secret.type}' on line {secret.line_number}",
-                            }
-                        )
-
+                with _DETECT_SECRETS_LOCK:
+                    if self._load_detect_secrets():
+                        return self._detect_secrets_scan(loaded, rel_path)
             except Exception as e:
-                self.logger.warning(f"detect-secrets failed on {file_path}: {e}")
+                self.logger.warning(f"detect-secrets failed on {loaded.path}: {e}")
                 # Fall back to regex scanning
-                findings.extend(await self._regex_scan_file(file_path, rel_path))
-        else:
-            # Use regex-based scanning
-            findings.extend(await self._regex_scan_file(file_path, rel_path))
 
-        return findings
+        # Use regex-based scanning
+        return self._regex_scan(loaded, rel_path)
 
-    async def _regex_scan_file(
-        self, file_path: Path, rel_path: str
+    def _load_detect_secrets(self) -> bool:
+        """Import and initialize detect-secrets before the first scan.
+
+        Returns False if it can't be imported. Must be called with the
+        detect-secrets lock held.
+        """
+        if self._detect_secrets_loaded is None:
+            try:
+                import detect_secrets.plugins  # noqa: F401
+                from detect_secrets.settings import get_settings
+            except Exception as e:
+                self.logger.warning(
+                    f"Failed to import detect-secrets, using regex-based scanning: {e}"
+                )
+                self._detect_secrets_loaded = False
+                return False
+
+            self._detect_secrets_loaded = True
+            try:
+                get_settings()
+            except Exception as e:
+                self.logger.warning(f"Failed to initialize detect-secrets: {e}")
+        return self._detect_secrets_loaded
+
+    def _detect_secrets_scan(
+        self, loaded: LoadedFile, rel_path: str
     ) -> List[Dict[str, any]]:
-        """Scan a file using regex patterns."""
-        findings = []
+        """Scan loaded file content with detect-secrets."""
+        from detect_secrets.core.scan import scan_file
+        from detect_secrets.settings import default_settings
 
-        try:
-            with safe_open(
-                file_path, "r", encoding="utf-8", errors="ignore", logger=self.logger
-            ) as f:
-                lines = f.readlines()
-
-            for line_num, line in enumerate(lines, 1):
-                for pattern in self.SENSITIVE_PATTERNS:
-                    if pattern.search(line):
-                        # Try to determine the type of secret
-                        secret_type = self._determine_secret_type(line)
-
-                        findings.append(
-                            {
-                                "path": rel_path,
-                                "type": secret_type,
-                                "line": line_num,
-                                "message": f"Potential {secret_type} detected on line {line_num}",
-                            }
-                        )
-                        break  # Only report once per line
-
-        except Exception as e:
-            self.logger.warning(f"Could not scan {file_path} for security: {e}")
+        findings = []
+        with default_settings():
+            if _detect_secrets_buffer_scan():
+                secrets_collection = _scan_buffer_with_detect_secrets(loaded)
+            else:
+                secrets_collection = scan_file(str(loaded.path))
 
+            for secret in secrets_collection:
+                findings.append(
+                    {
+                        "path": rel_path,
+                        "type": secret.type,
+                        "line": secret.line_number,
+                        "message": f"Detected '{secret.type}' on line {secret.line_number}",
+                    }
+                )
         return findings
 
-    def _determine_secret_type(self, line: str) -> str:
-        """Determine the type of secret based on the line content."""
-        line_lower = line.lower()
-
-        if any(word in line_lower for word in ["password", "passwd", "pwd"]):
-            return "Password"
-        elif "api" in line_lower and "key" in line_lower:
-            return "API Key"
-        elif "secret" in line_lower and "key" in line_lower:
-            return "Secret Key"
-        elif "token" in line_lower:
-            return "Auth Token"
-        elif "private" in line_lower and "key" in line_lower:
-            return "Private Key"
-        elif "aws" in line_lower:
-            return "AWS Credential"
-        else:
-            return "Secret"
+    def _regex_scan(self, loaded: LoadedFile, rel_path: str) -> List[Dict[str, any]]:
+        """Scan loaded file content using the compiled regex patterns."""
+        text = _decode_lines_text(loaded.data, "utf-8", errors="ignore")
+
+        return [
+            {
+                "path": rel_path,
+                "type": secret_type,
+                "line": line_num,
+                "message": f"Potential {secret_type} detected on line {line_num}",
+            }
+            for line_num, secret_type in find_secrets(text)
+        ]
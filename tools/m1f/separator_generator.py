@@ -19,6 +19,7 @@ Separator generator module for creating file separators in various styles.
 from __future__ import annotations
 
 import json
+import os
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
@@ -45,8 +46,15 @@ class SeparatorGenerator:
         rel_path: str,
         encoding_info: EncodingInfo,
         file_content: str,
+        checksum: Optional[str] = None,
+        stat_result: Optional[os.stat_result] = None,
     ) -> str:
-        """Generate a file separator based on the configured style."""
+        """Generate a file separator based on the configured style.
+
+        A precomputed content checksum (e.g. from the file cache) can be
+        passed to avoid hashing the content again, and the stat taken when
+        the file was read to avoid another stat call.
+        """
         style = self.config.output.separator_style
         linesep = self.config.output.line_ending.value
 
@@ -54,17 +62,20 @@ class SeparatorGenerator:
             return ""
 
         # Gather file metadata
-        metadata = self._gather_metadata(file_path, rel_path, encoding_info)
+        metadata = self._gather_metadata(
+            file_path, rel_path, encoding_info, stat_result
+        )
 
         # Calculate checksum if needed
-        checksum = ""
-        if style in [
-            SeparatorStyle.STANDARD,
-            SeparatorStyle.DETAILED,
-            SeparatorStyle.MARKDOWN,
-            SeparatorStyle.MACHINE_READABLE,
-        ]:
-            checksum = calculate_checksum(file_content)
+        if checksum is None:
+            checksum = ""
+            if style in [
+                SeparatorStyle.STANDARD,
+                SeparatorStyle.DETAILED,
+                SeparatorStyle.MARKDOWN,
+                SeparatorStyle.MACHINE_READABLE,
+            ]:
+                checksum = calculate_checksum(file_content)
 
         # Generate separator based on style
         if style == SeparatorStyle.STANDARD:
@@ -92,11 +103,15 @@ class SeparatorGenerator:
         return None
 
     def _gather_metadata(
-        self, file_path: Path, rel_path: str, encoding_info: EncodingInfo
+        self,
+        file_path: Path,
+        rel_path: str,
+        encoding_info: EncodingInfo,
+        stat_result: Optional[os.stat_result] = None,
     ) -> dict:
         """Gather metadata about the file."""
         try:
-            stat_info = file_path.stat()
+            stat_info = stat_result if stat_result is not None else file_path.stat()
             mod_time = datetime.fromtimestamp(stat_info.st_mtime, tz=timezone.utc)
 
             return {
@@ -0,0 +1,309 @@
+# Copyright 2025 Franz und Franz GmbH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Streaming token counting with tiktoken.
+
+Text is fed to a TokenCounter piece by piece (e.g. file by file while the
+bundle is written). It is cut into chunks at boundaries where the tiktoken
+pre-tokenizer splits anyway, so the chunk counts add up to the count of the
+whole text. Chunks are collected into batches that are encoded with
+tiktoken's batch encoding on a background thread while more text arrives.
+At most two batches are held in memory, regardless of the input size.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import PurePosixPath
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .constants import TOKEN_ENCODING_NAME
+
+# tiktoken is slow to import, so it is only imported when an encoding is loaded
+TIKTOKEN_AVAILABLE = importlib.util.find_spec("tiktoken") is not None
+
+# Maximum number of characters encoded in one call
+CHUNK_SIZE = 256 * 1024
+
+# Number of characters collected before a batch is encoded
+BATCH_SIZE = 8 * 1024 * 1024
+
+
+def _find_safe_cut(text: str, start: int, end: int) -> int:
+    """Find a position in ``(start, end]`` where ``text`` can be cut.
+
+    The tiktoken pre-tokenizers (cl100k, o200k, p50k, r50k) never join a
+    newline with a following non-whitespace character, nor a word with the
+    space in front of the next word. Cutting after such a newline (preferred)
+    or before such a space doesn't change the token count. Text without
+    either is cut hard at ``end``.
+    """
+    last = len(text) - 1
+    pos = text.rfind("\n", start, end)
+    while pos >= start:
+        if pos == last or not text[pos + 1].isspace():
+            return pos + 1
+        pos = text.rfind("\n", start, pos)
+
+    pos = text.rfind(" ", start + 1, end)
+    while pos > start:
+        if not text[pos - 1].isspace() and (pos == last or not text[pos + 1].isspace()):
+            return pos
+        pos = text.rfind(" ", start + 1, pos)
+
+    return end
+
+
+def iter_chunks(parts: Iterable[str], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Regroup text parts into chunks of about ``chunk_size`` characters.
+
+    The ends of the parts are not treated as boundaries: small parts are
+    joined, large parts are cut at safe boundaries. Large parts are sliced
+    rather than concatenated, so no copy of a whole part is made. A chunk
+    that joins the rest of one part with the start of a large part can be up
+    to twice ``chunk_size`` long.
+    """
+    carry = ""
+    for part in parts:
+        if not part:
+            continue
+        start = 0
+        if carry:
+            if len(part) <= chunk_size:
+                part = carry + part
+            else:
+                start = _find_safe_cut(part, 0, chunk_size)
+                yield carry + part[:start]
+            carry = ""
+        while len(part) - start > chunk_size:
+            cut = _find_safe_cut(part, start, start + chunk_size)
+            yield part[start:cut]
+            start = cut
+        carry = part[start:]
+    if carry:
+        yield carry
+
+
+def load_encoding(encoding_name: str = TOKEN_ENCODING_NAME):
+    """Load a tiktoken encoding, raising ImportError without tiktoken."""
+    if not TIKTOKEN_AVAILABLE:
+        raise ImportError("tiktoken is required for token counting")
+    import tiktoken
+
+    return tiktoken.get_encoding(encoding_name)
+
+
+def count_encoded_tokens(
+    encoding, text: Union[str, Iterable[str]], chunk_size: int = CHUNK_SIZE
+) -> int:
+    """Count the tokens of a text on the calling thread."""
+    parts = (text,) if isinstance(text, str) else text
+    return sum(
+        len(encoding.encode_ordinary(chunk)) for chunk in iter_chunks(parts, chunk_size)
+    )
+
+
+class TokenCounter:
+    """Counts tokens of streamed text, in total and per key (e.g. file)."""
+
+    def __init__(
+        self,
+        encoding_name: str = TOKEN_ENCODING_NAME,
+        threads: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE,
+        batch_size: int = BATCH_SIZE,
+    ):
+        self.encoding = load_encoding(encoding_name)
+        self.threads = threads or min(8, os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+
+        self.total = 0
+        self.counts: Dict[str, int] = {}
+
+        self._batch: List[str] = []
+        self._batch_keys: List[Optional[str]] = []
+        self._batch_chars = 0
+        self._pending: Optional[Future] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def add(self, text: Union[str, Iterable[str]], key: Optional[str] = None) -> None:
+        """Queue text for counting.
+
+        Consecutive calls with the same key are counted as one continuous
+        text.
+
+        Args:
+            text: A string or an iterable of strings that form one text
+            key: Name under which the tokens are also counted (e.g. the
+                relative path of a file), or None for the total only
+        """
+        parts = (text,) if isinstance(text, str) else text
+        if key is not None:
+            self.counts.setdefault(key, 0)
+
+        # Text added under the same key as the previous text continues it, so
+        # the first chunk is joined with the last one (which is never
+        # submitted before the next add)
+        continues = bool(self._batch) and self._batch_keys[-1] == key
+        for chunk in iter_chunks(parts, self.chunk_size):
+            if continues:
+                self._batch[-1] += chunk
+                self._batch_chars += len(chunk)
+                continues = False
+                continue
+            if self._batch_chars >= self.batch_size:
+                self._submit()
+            self._batch.append(chunk)
+            self._batch_keys.append(key)
+            self._batch_chars += len(chunk)
+
+    def finish(self) -> int:
+        """Count all queued text and return the total number of tokens."""
+        try:
+            if self._batch:
+                self._submit()
+            self._collect()
+        finally:
+            self.close()
+        return self.total
+
+    def close(self) -> None:
+        """Stop the background thread without counting queued text."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _submit(self) -> None:
+        """Hand the current batch to the background thread."""
+        batch, keys = self._batch, self._batch_keys
+        self._batch, self._batch_keys, self._batch_chars = [], [], 0
+
+        # Only one batch is encoded at a time, which bounds memory use
+        self._collect()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="m1f-tokens"
+            )
+        self._pending = self._executor.submit(self._encode_batch, batch, keys)
+
+    def _collect(self) -> None:
+        """Wait for the batch in flight and add up its counts."""
+        if self._pending is None:
+            return
+        pending, self._pending = self._pending, None
+        for key, count in pending.result():
+            self.total += count
+            if key is not None:
+                self.counts[key] += count
+
+    def _encode_batch(
+        self, batch: List[str], keys: List[Optional[str]]
+    ) -> List[Tuple[Optional[str], int]]:
+        """Encode a batch of chunks, returning (key, token count) pairs."""
+        # Special token strings in the content are counted as plain text
+        if self.threads > 1 and len(batch) > 1:
+            tokens = self.encoding.encode_ordinary_batch(
+                batch, num_threads=self.threads
+            )
+        else:
+            tokens = [self.encoding.encode_ordinary(chunk) for chunk in batch]
+        return [(key, len(encoded)) for key, encoded in zip(keys, tokens)]
+
+
+def count_tokens(
+    text: Union[str, Iterable[str]],
+    encoding_name: str = TOKEN_ENCODING_NAME,
+    threads: Optional[int] = None,
+) -> int:
+    """Count the tokens of a string or of a stream of strings."""
+    counter = TokenCounter(encoding_name, threads=threads)
+    counter.add(text)
+    return counter.finish()
+
+
+def build_token_report(
+    file_tokens: Dict[str, int],
+    sections: Sequence[Any],
+    parts: Sequence[Any],
+    encoding_name: str = TOKEN_ENCODING_NAME,
+    token_budget: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Build the per-file, per-directory and per-part token report.
+
+    Args:
+        file_tokens: Tokens per relative path, as counted by a TokenCounter
+        sections: Written sections in output order, with ``rel_path``,
+            ``size`` (bytes) and ``part`` (1-based part number) attributes
+        parts: Paths of the output parts
+        encoding_name: Name of the encoding the tokens were counted with
+        token_budget: Token budget the output was split with, if any
+
+    Returns:
+        A JSON-serializable report. Directory totals include all files below
+        the directory; included intro files are only counted in the total.
+    """
+    files = []
+    directories: Dict[str, Dict[str, int]] = {}
+    part_totals = [{"tokens": 0, "bytes": 0, "files": 0} for _ in parts]
+    for section in sections:
+        tokens = file_tokens.get(section.rel_path, 0)
+        files.append(
+            {
+                "path": section.rel_path,
+                "tokens": tokens,
+                "bytes": section.size,
+                "part": section.part,
+            }
+        )
+        if 0 < section.part <= len(part_totals):
+            totals = part_totals[section.part - 1]
+            totals["tokens"] += tokens
+            totals["bytes"] += section.size
+            totals["files"] += 1
+
+        if section.rel_path.startswith(("intro:", "include:")):
+            continue
+        for directory in PurePosixPath(section.rel_path.replace("\\", "/")).parents:
+            if str(directory) == ".":
+                continue
+            totals = directories.setdefault(
+                str(directory), {"tokens": 0, "bytes": 0, "files": 0}
+            )
+            totals["tokens"] += tokens
+            totals["bytes"] += section.size
+            totals["files"] += 1
+
+    return {
+        "encoding": encoding_name,
+        "token_budget": token_budget,
+        "total": {
+            "tokens": sum(entry["tokens"] for entry in files),
+            "bytes": sum(entry["bytes"] for entry in files),
+            "files": len(files),
+        },
+        "parts": [
+            {"path": str(path), **totals} for path, totals in zip(parts, part_totals)
+        ],
+        "directories": [
+            {"path": path, **totals}
+            for path, totals in sorted(
+                directories.items(), key=lambda item: (-item[1]["tokens"], item[0])
+            )
+        ],
+        "files": files,
+    }
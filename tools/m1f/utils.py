@@ -23,6 +23,7 @@ import re
 from pathlib import Path
 from typing import List, Tuple
 
+from .binary_classifier import is_binary_file
 from .constants import DOCUMENTATION_EXTENSIONS
 from .file_operations import (
     handle_permission_errors,
@@ -71,122 +72,39 @@ def calculate_checksum(content: str) -> str:
     return hashlib.sha256(content.encode("utf-8")).hexdigest()
 
 
-def is_binary_file(file_path: Path) -> bool:
-    """Check if a file is likely binary based on its content."""
-    # Common binary extensions
-    binary_extensions = {
-        # Images
-        ".jpg",
-        ".jpeg",
-        ".png",
-        ".gif",
-        ".bmp",
-        ".tiff",
-        ".tif",
-        ".ico",
-        ".webp",
-        ".svgz",
-        # Audio
-        ".mp3",
-        ".wav",
-        ".ogg",
-        ".flac",
-        ".aac",
-        ".wma",
-        ".m4a",
-        # Video
-        ".mp4",
-        ".avi",
-        ".mkv",
-        ".mov",
-        ".wmv",
-        ".flv",
-        ".webm",
-        ".mpeg",
-        ".mpg",
-        # Archives
-        ".zip",
-        ".rar",
-        ".7z",
-        ".tar",
-        ".gz",
-        ".bz2",
-        ".xz",
-        ".jar",
-        ".war",
-        ".ear",
-        # Executables
-        ".exe",
-        ".dll",
-        ".so",
-        ".dylib",
-        ".bin",
-        ".msi",
-        ".pdb",
-        ".lib",
-        ".o",
-        ".obj",
-        ".pyc",
-        ".pyo",
-        ".class",
-        # Documents
-        ".pdf",
-        ".doc",
-        ".ppt",
-        ".xls",
-        # Databases
-        ".db",
-        ".sqlite",
-        ".mdb",
-        ".accdb",
-        ".dbf",
-        ".dat",
-        # Fonts
-        ".ttf",
-        ".otf",
-        ".woff",
-        ".woff2",
-        ".eot",
-        # Others
-        ".iso",
-        ".img",
-        ".vhd",
-        ".vhdx",
-        ".vmdk",
-        ".bak",
-        ".tmp",
-        ".lock",
-        ".swo",
-        ".swp",
-    }
+def calculate_file_checksum(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Calculate SHA-256 checksum of a file's raw bytes, reading it in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-    # Check by extension first
-    if file_path.suffix.lower() in binary_extensions:
-        return True
 
-    # Try reading first few bytes
-    try:
-        chunk = None
-        with safe_open(file_path, "rb") as f:
-            # Read first 1024 bytes
-            chunk = f.read(1024)
-        # Explicitly ensure file handle is released
-        f = None
-
-        # Check for null bytes
-        if b"\0" in chunk:
-            return True
+class ContentHash:
+    """
+    Merkle-style hash of a bundle's content.
+
+    Every file contributes a leaf hash of its relative path and content
+    checksum; the leaves are combined in output order. The result only
+    depends on what ends up in the bundle, not on file metadata like mtimes.
+    The settings the bundle is written with (separator style, line endings,
+    presets, ...) are part of the hash through ``settings``.
+    """
+
+    def __init__(self, settings: str = ""):
+        self._root = hashlib.sha256(settings.encode("utf-8"))
+        self.files = 0
 
-            # Try to decode as UTF-8
-            try:
-                chunk.decode("utf-8")
-                return False
-            except UnicodeDecodeError:
-                return True
+    def add(self, rel_path: str, checksum: str) -> None:
+        """Add a file by its relative path and content checksum."""
+        leaf = hashlib.sha256(f"{rel_path}\0{checksum}".encode("utf-8"))
+        self._root.update(leaf.digest())
+        self.files += 1
 
-    except Exception:
-        # If we can't read the file, assume it's binary
-        return True
+    def hexdigest(self) -> str:
+        """Return the combined hash."""
+        return self._root.hexdigest()
 
 
 def normalize_path(path: str | Path) -> Path:
@@ -15,14 +15,12 @@
 """Command-line interface for s1f."""
 
 import argparse
-import asyncio
 import sys
 from pathlib import Path
 from typing import Optional, Sequence
 
 from . import __version__, __project__
 from .config import Config
-from .core import FileSplitter
 from .logging import setup_logging
 from .exceptions import ConfigurationError
 
@@ -102,6 +100,8 @@ Perfect for:
   %(prog)s --list archive.m1f.txt
   %(prog)s archive.m1f.txt ./output/ --respect-encoding
   %(prog)s bundle.txt ./extracted/ --force
+  %(prog)s huge-bundle.txt ./extracted/ --stream
+  %(prog)s bundle.txt ./extracted/ --only 'src/*.py'
   
 For more information, see the documentation.
 Project home: {__project__}"""
@@ -161,6 +161,33 @@ Project home: {__project__}"""
         action="store_true",
         help="Skip checksum verification during extraction",
     )
+    extract_group.add_argument(
+        "--stream",
+        action="store_true",
+        help="Memory-map the bundle and extract one file at a time "
+        "(for bundles too large to load into memory)",
+    )
+    extract_group.add_argument(
+        "--durable",
+        action="store_true",
+        help="Sync the extracted files and directories to disk after writing "
+        "them (slower, but safe against power loss)",
+    )
+    extract_group.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        metavar="N",
+        help="Number of files written at the same time (default: 10)",
+    )
+    extract_group.add_argument(
+        "--only",
+        action="append",
+        metavar="PATTERN",
+        help="Extract or list only the files whose path matches the glob "
+        "PATTERN (e.g. 'src/*.py'); can be repeated. Uses the bundle's index "
+        "(m1f --index) to read just those files",
+    )
 
     # Encoding options group
     encoding_group = parser.add_argument_group("Encoding Options")
@@ -203,6 +230,9 @@ def validate_args(args: argparse.Namespace) -> None:
     if not safe_is_file(args.input_file):
         raise ConfigurationError(f"Input path is not a file: {args.input_file}")
 
+    if args.jobs is not None and args.jobs < 1:
+        raise ConfigurationError("--jobs must be at least 1")
+
     # Validate encoding options
     if args.target_encoding and args.respect_encoding:
         raise ConfigurationError(
@@ -218,11 +248,9 @@ def validate_args(args: argparse.Namespace) -> None:
             raise ConfigurationError(f"Unknown encoding: {args.target_encoding}")
 
 
-async def async_main(argv: Optional[Sequence[str]] = None) -> int:
+async def async_main(args: argparse.Namespace) -> int:
     """Async main entry point."""
-    # Parse arguments
-    parser = create_argument_parser()
-    args = parser.parse_args(argv)
+    from .core import FileSplitter
 
     try:
         # Validate arguments
@@ -265,7 +293,14 @@ async def async_main(argv: Optional[Sequence[str]] = None) -> int:
 
 def main(argv: Optional[Sequence[str]] = None) -> int:
     """Main entry point."""
-    return asyncio.run(async_main(argv))
+    # The arguments are parsed before asyncio and the extraction code are
+    # imported, so that --help and invalid arguments return right away
+    parser = create_argument_parser()
+    args = parser.parse_args(argv)
+
+    import asyncio
+
+    return asyncio.run(async_main(args))
 
 
 if __name__ == "__main__":
@@ -14,9 +14,9 @@
 
 """Configuration for s1f."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from argparse import Namespace
 
 
@@ -32,6 +32,14 @@ class Config:
     ignore_checksum: bool = False
     respect_encoding: bool = False
     target_encoding: Optional[str] = None
+    # Memory-map the input and extract files one at a time
+    stream: bool = False
+    # Sync the extracted files to disk once all are written
+    durable: bool = False
+    # Files written at the same time (None for the default)
+    jobs: Optional[int] = None
+    # Glob patterns of the paths to extract (all files if empty)
+    only: List[str] = field(default_factory=list)
 
     def __post_init__(self):
         """Validate configuration after initialization."""
@@ -44,6 +52,9 @@ class Config:
         if self.timestamp_mode not in ["original", "current"]:
             raise ValueError(f"Invalid timestamp_mode: {self.timestamp_mode}")
 
+        if self.jobs is not None and self.jobs < 1:
+            raise ValueError(f"Invalid jobs: {self.jobs}")
+
     @classmethod
     def from_args(cls, args: Namespace) -> "Config":
         """Create configuration from command line arguments."""
@@ -58,6 +69,10 @@ class Config:
             ignore_checksum=args.ignore_checksum,
             respect_encoding=args.respect_encoding,
             target_encoding=args.target_encoding,
+            stream=getattr(args, "stream", False),
+            durable=getattr(args, "durable", False),
+            jobs=getattr(args, "jobs", None),
+            only=getattr(args, "only", None) or [],
         )
 
     @property
@@ -14,11 +14,29 @@
 
 """Core file splitter functionality for s1f."""
 
+import codecs
+import fnmatch
+import importlib.util
+import itertools
+import mmap
+import os
+import re
 import time
+from contextlib import asynccontextmanager, contextmanager
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import (
+    IO,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 import logging
 
+from m1f.bundle_index import BundleIndex, IndexEntry, index_path_for
 from m1f.file_operations import (
     safe_exists,
     safe_is_file,
@@ -27,15 +45,11 @@ from m1f.file_operations import (
     safe_stat,
 )
 
-try:
-    import aiofiles
-
-    AIOFILES_AVAILABLE = True
-except ImportError:
-    AIOFILES_AVAILABLE = False
+# aiofiles is imported when the whole bundle is read
+AIOFILES_AVAILABLE = importlib.util.find_spec("aiofiles") is not None
 
 from .config import Config
-from .models import ExtractedFile, ExtractionResult
+from .models import ExtractedFile, ExtractionResult, FileMetadata
 
 from shared.colors import info
 
@@ -46,6 +60,9 @@ from .utils import format_size, is_binary_content
 from .exceptions import FileParsingError, S1FError
 from .logging import LoggerManager
 
+# Bytes decoded at a time when checking that a mapped bundle is UTF-8
+DECODE_CHUNK_SIZE = 1024 * 1024
+
 
 class FileSplitter:
     """Main class for splitting combined files back into individual files."""
@@ -66,54 +83,8 @@ class FileSplitter:
         start_time = time.time()
 
         try:
-            # Read the input file
-            content = await self._read_input_file()
-
-            # Parse the content
-            self.logger.info("Parsing combined file...")
-            extracted_files = self.parser.parse(content)
-
-            if not extracted_files:
-                self.logger.error("No files found in the combined file.")
-                return ExtractionResult(), 2
-
-            # Display file list
-            info(
-                f"\nFound {len(extracted_files)} file(s) in {self.config.input_file}:\n"
-            )
-
-            total_size = 0
-            for i, file in enumerate(extracted_files, 1):
-                meta = file.metadata
-                # Build info line
-                info_parts = [f"{i:4d}. {meta.path}"]
-
-                # Only add size if available
-                if meta.size_bytes:
-                    size_str = format_size(meta.size_bytes)
-                    info_parts.append(f"[{size_str}]")
-
-                if meta.encoding:
-                    info_parts.append(f"Encoding: {meta.encoding}")
-
-                if meta.type:
-                    info_parts.append(f"Type: {meta.type}")
-
-                info("  ".join(info_parts))
-
-                if meta.size_bytes:
-                    total_size += meta.size_bytes
-
-            info(f"\nTotal size: {format_size(total_size)}")
-
-            result = ExtractionResult(
-                files_created=0,
-                files_overwritten=0,
-                files_failed=0,
-                execution_time=time.time() - start_time,
-            )
-
-            return result, 0
+            async with self._extracted_files(listing=True) as extracted_files:
+                return self._list_extracted_files(extracted_files, start_time)
 
         except S1FError as e:
             self.logger.error(f"Error: {e}")
@@ -132,6 +103,56 @@ class FileSplitter:
                 self.logger.debug(traceback.format_exc())
             return ExtractionResult(execution_time=time.time() - start_time), 1
 
+    def _list_extracted_files(
+        self, extracted_files: Iterable[ExtractedFile], start_time: float
+    ) -> Tuple[ExtractionResult, int]:
+        """Display the files of the combined file."""
+        extracted_files = _peek(extracted_files)
+        if extracted_files is None:
+            self.logger.error("No files found in the combined file.")
+            return ExtractionResult(), 2
+
+        # Display file list
+        if isinstance(extracted_files, list):
+            info(
+                f"\nFound {len(extracted_files)} file(s) in {self.config.input_file}:\n"
+            )
+        else:
+            info(f"\nFiles in {self.config.input_file}:\n")
+
+        total_size = 0
+        for i, file in enumerate(extracted_files, 1):
+            meta = file.metadata
+            # Build info line
+            info_parts = [f"{i:4d}. {meta.path}"]
+
+            # Only add size if available
+            if meta.size_bytes:
+                size_str = format_size(meta.size_bytes)
+                info_parts.append(f"[{size_str}]")
+
+            if meta.encoding:
+                info_parts.append(f"Encoding: {meta.encoding}")
+
+            if meta.type:
+                info_parts.append(f"Type: {meta.type}")
+
+            info("  ".join(info_parts))
+
+            if meta.size_bytes:
+                total_size += meta.size_bytes
+
+        info(f"\nTotal size: {format_size(total_size)}")
+
+        result = ExtractionResult(
+            files_created=0,
+            files_overwritten=0,
+            files_failed=0,
+            execution_time=time.time() - start_time,
+        )
+
+        return result, 0
+
     async def split_file(self) -> Tuple[ExtractionResult, int]:
         """Split the combined file into individual files.
 
@@ -141,33 +162,29 @@ class FileSplitter:
         start_time = time.time()
 
         try:
-            # Read the input file
-            content = await self._read_input_file()
-
-            # Parse the content
-            self.logger.info("Parsing combined file...")
-            extracted_files = self.parser.parse(content)
-
-            if not extracted_files:
-                self.logger.error("No files found in the combined file.")
-                return ExtractionResult(), 2
-
-            self.logger.info(f"Found {len(extracted_files)} file(s) to extract")
-
-            # Ensure destination directory exists
-            if not safe_mkdir(
-                self.config.destination_directory,
-                logger=self.logger,
-                parents=True,
-                exist_ok=True,
-            ):
-                self.logger.error(
-                    f"Failed to create destination directory '{self.config.destination_directory}': Permission denied"
-                )
-                return ExtractionResult(execution_time=time.time() - start_time), 1
+            async with self._extracted_files() as extracted_files:
+                extracted_files = _peek(extracted_files)
+                if extracted_files is None:
+                    self.logger.error("No files found in the combined file.")
+                    return ExtractionResult(), 2
+
+                if isinstance(extracted_files, list):
+                    self.logger.info(f"Found {len(extracted_files)} file(s) to extract")
+
+                # Ensure destination directory exists
+                if not safe_mkdir(
+                    self.config.destination_directory,
+                    logger=self.logger,
+                    parents=True,
+                    exist_ok=True,
+                ):
+                    self.logger.error(
+                        f"Failed to create destination directory '{self.config.destination_directory}': Permission denied"
+                    )
+                    return ExtractionResult(execution_time=time.time() - start_time), 1
 
-            # Write the files
-            result = await self.writer.write_files(extracted_files)
+                # Write the files
+                result = await self.writer.write_files(extracted_files)
 
             # Set execution time
             result.execution_time = time.time() - start_time
@@ -200,6 +217,142 @@ class FileSplitter:
                 self.logger.debug(traceback.format_exc())
             return ExtractionResult(execution_time=time.time() - start_time), 1
 
+    @asynccontextmanager
+    async def _extracted_files(
+        self, listing: bool = False
+    ) -> AsyncIterator[Iterable[ExtractedFile]]:
+        """Parse the input file.
+
+        Yields a list of all files, or an iterator that extracts them one
+        at a time. When listing or selecting files (``--only``), the bundle's
+        index is used if it has one: only the selected sections are read,
+        and nothing at all for listing. Otherwise selected files and files
+        in stream mode are extracted from the memory-mapped input file.
+        """
+        include = self._is_selected if self.config.only else None
+        index = None
+        if listing or include is not None:
+            index = BundleIndex.load(self.config.input_file, self.logger)
+
+        if index is not None:
+            self.logger.info(f"Using index {index_path_for(self.config.input_file)}")
+            entries = [
+                entry
+                for entry in index.entries
+                if include is None or include(entry.path)
+            ]
+            if listing:
+                yield [_listed_file(entry) for entry in entries]
+            else:
+                with self._open_input_file() as f:
+                    yield self._read_indexed_files(f, index, entries)
+        elif self.config.stream or include is not None:
+            with self._map_input_file() as (data, encoding):
+                self.logger.info("Scanning combined file...")
+                yield self.parser.iter_parse(data, encoding, include)
+        else:
+            content = await self._read_input_file()
+            self.logger.info("Parsing combined file...")
+            yield self.parser.parse(content)
+
+    @contextmanager
+    def _map_input_file(self) -> Iterator[Tuple[mmap.mmap, str]]:
+        """Memory-map the input file and detect its encoding.
+
+        Checks the same conditions as _read_input_file() without loading
+        the file: it must exist, not be binary or empty, and is decoded as
+        UTF-8 if possible, latin-1 otherwise.
+        """
+        input_file = self.config.input_file
+        with self._open_input_file() as f:
+            file_size = os.fstat(f.fileno()).st_size
+            # Empty files can't be mapped
+            if file_size == 0:
+                raise FileParsingError(
+                    f"Input file '{input_file}' is empty.", str(input_file)
+                )
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError) as e:
+                raise FileParsingError(
+                    f"Failed to map input file '{input_file}': {e}", str(input_file)
+                )
+
+            with data:
+                if is_binary_content(data[:8192]):
+                    raise FileParsingError(
+                        f"Input file '{input_file}' appears to be binary.",
+                        str(input_file),
+                    )
+                if re.search(rb"\S", data) is None:
+                    raise FileParsingError(
+                        f"Input file '{input_file}' is empty.", str(input_file)
+                    )
+
+                encoding = "utf-8"
+                if not _is_utf8(data):
+                    self.logger.warning(
+                        f"Failed to decode '{input_file}' as UTF-8, "
+                        f"using latin-1 encoding..."
+                    )
+                    encoding = "latin-1"
+
+                self.logger.info(
+                    f"Mapped input file '{input_file}' ({format_size(file_size)})"
+                )
+                yield data, encoding
+
+    def _open_input_file(self) -> IO[bytes]:
+        """Open the input file for reading its bytes."""
+        input_file = self.config.input_file
+        if not safe_exists(input_file, logger=self.logger):
+            raise FileParsingError(
+                f"Input file '{input_file}' does not exist.", str(input_file)
+            )
+
+        try:
+            return open(input_file, "rb")
+        except PermissionError as e:
+            raise FileParsingError(
+                f"Permission denied reading input file '{input_file}': {e}",
+                str(input_file),
+            )
+        except OSError as e:
+            raise FileParsingError(
+                f"Failed to read input file '{input_file}': {e}", str(input_file)
+            )
+
+    def _is_selected(self, path: str) -> bool:
+        """Check if a path matches one of the --only patterns."""
+        return any(fnmatch.fnmatchcase(path, pattern) for pattern in self.config.only)
+
+    def _read_indexed_files(
+        self, f: IO[bytes], index: BundleIndex, entries: Sequence[IndexEntry]
+    ) -> Iterator[ExtractedFile]:
+        """Extract files by reading just their sections of the bundle.
+
+        Each section is read up to where the next one starts, so the spacing
+        between files ends up in the files as it does when the whole bundle
+        is parsed.
+        """
+        starts = sorted(entry.offset for entry in index.entries)
+        next_starts = dict(zip(starts, starts[1:]))
+        for entry in entries:
+            end = next_starts.get(entry.offset, index.bundle_size)
+            f.seek(entry.offset)
+            section = f.read(end - entry.offset)
+            extracted = None
+            if len(section) == end - entry.offset >= entry.length:
+                extracted = self.parser.parse_section(
+                    section, index.encoding, followed=entry.offset in next_starts
+                )
+            if extracted is None:
+                raise FileParsingError(
+                    f"The index doesn't match the bundle at '{entry.path}'",
+                    str(self.config.input_file),
+                )
+            yield extracted
+
     async def _read_input_file(self) -> str:
         """Read the input file content."""
         if not safe_exists(self.config.input_file, logger=self.logger):
@@ -210,6 +363,8 @@ class FileSplitter:
 
         try:
             if AIOFILES_AVAILABLE:
+                import aiofiles
+
                 # Use async I/O
                 # First, try to detect if the file is binary
                 try:
@@ -337,5 +492,42 @@ class FileSplitter:
             )
 
 
+def _listed_file(entry: IndexEntry) -> ExtractedFile:
+    """A file as listed by the index, without its content."""
+    return ExtractedFile(
+        metadata=FileMetadata(
+            path=entry.path,
+            checksum_sha256=entry.checksum,
+            size_bytes=entry.size,
+            encoding=entry.encoding,
+            type=Path(entry.path).suffix or None,
+        ),
+        content="",
+    )
+
+
+def _peek(items: Iterable[ExtractedFile]) -> Optional[Iterable[ExtractedFile]]:
+    """Return None if there are no items, else the items (lists unchanged)."""
+    if isinstance(items, list):
+        return items or None
+    items = iter(items)
+    first = next(items, None)
+    if first is None:
+        return None
+    return itertools.chain([first], items)
+
+
+def _is_utf8(data: mmap.mmap) -> bool:
+    """Check if a mapped file decodes as UTF-8, a chunk at a time."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        for offset in range(0, len(data), DECODE_CHUNK_SIZE):
+            decoder.decode(data[offset : offset + DECODE_CHUNK_SIZE])
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
 # Alias for backward compatibility with tests
 S1FExtractor = FileSplitter
@@ -14,10 +14,23 @@
 
 """Parsers for different separator formats."""
 
+import bisect
 import json
+import math
 import re
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any, Pattern, Tuple
+from dataclasses import replace
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Tuple,
+    Union,
+)
 from datetime import datetime
 import logging
 
@@ -29,6 +42,15 @@ from .exceptions import FileParsingError
 class SeparatorParser(ABC):
     """Abstract base class for separator parsers."""
 
+    # Regex for the beginning of a separator. Every match of ``pattern``
+    # starts with a match of it; used to find the separators of all styles
+    # in one pass.
+    START = ""
+
+    # Regex for the end of a section, if the style closes its sections. A
+    # separator of another style only starts a new file after the end of one.
+    END = ""
+
     def __init__(self, logger: logging.Logger):
         self.logger = logger
 
@@ -65,6 +87,8 @@ class SeparatorParser(ABC):
 class PYMK1FParser(SeparatorParser):
     """Parser for PYMK1F format with UUID-based separators."""
 
+    START = r"--- PYMK1F_BEGIN_FILE_METADATA_BLOCK_"
+
     PATTERN = re.compile(
         r"--- PYMK1F_BEGIN_FILE_METADATA_BLOCK_([a-f0-9-]+) ---\r?\n"
         r"METADATA_JSON:\r?\n"
@@ -220,6 +244,8 @@ class PYMK1FParser(SeparatorParser):
 class MachineReadableParser(SeparatorParser):
     """Parser for legacy MachineReadable format."""
 
+    START = r"# PYM1F-BOUNDARY-99C5F740A78D4ABC82E3F9882D5A281E\r?\n# FILE: "
+
     PATTERN = re.compile(
         r"# PYM1F-BOUNDARY-99C5F740A78D4ABC82E3F9882D5A281E\r?\n"
         r"# FILE: (.*?)\r?\n"
@@ -341,6 +367,10 @@ class MachineReadableParser(SeparatorParser):
 class MarkdownParser(SeparatorParser):
     """Parser for Markdown format."""
 
+    START = r"^## "
+
+    END = r"```\r?\n\r?\n"
+
     PATTERN = re.compile(
         r"^(## (.*?)$\r?\n"
         r"(?:\*\*Date Modified:\*\* .*? \| \*\*Size:\*\* .*? \| \*\*Type:\*\* .*?"
@@ -422,6 +452,8 @@ class MarkdownParser(SeparatorParser):
 class DetailedParser(SeparatorParser):
     """Parser for Detailed format."""
 
+    START = r"^={88}\r?\n== FILE: "
+
     PATTERN = re.compile(
         r"^(={88}\r?\n"
         r"== FILE: (.*?)\r?\n"
@@ -504,6 +536,8 @@ class DetailedParser(SeparatorParser):
 class StandardParser(DetailedParser):
     """Parser for Standard format."""
 
+    START = r"======= "
+
     PATTERN = re.compile(
         r"======= (.*?)(?:\s*\|\s*CHECKSUM_SHA256:\s*([0-9a-fA-F]{64}))?\s*======",
         re.MULTILINE,
@@ -552,9 +586,31 @@ class CombinedFileParser:
             DetailedParser(logger),
             StandardParser(logger),
         ]
+        # Finds the beginning of a separator of any style
+        self._start_pattern = re.compile(
+            "|".join(f"(?:{parser.START})" for parser in self.parsers),
+            re.MULTILINE,
+        )
+        # Matches the end of a section right before a separator
+        self._end_patterns = [
+            re.compile(f"(?:{parser.END})\\Z") if parser.END else None
+            for parser in self.parsers
+        ]
+        # The same patterns for searching undecoded bytes (see iter_parse())
+        self._byte_patterns = [
+            _to_bytes_pattern(parser.pattern) for parser in self.parsers
+        ]
+        self._byte_start_pattern = _to_bytes_pattern(self._start_pattern)
+        self._byte_end_patterns = [
+            _to_bytes_pattern(pattern) if pattern else None
+            for pattern in self._end_patterns
+        ]
+        self._byte_end_marker = _to_bytes_pattern(
+            MachineReadableParser.END_MARKER_PATTERN
+        )
 
     def _find_code_blocks(self, content: str) -> List[Tuple[int, int]]:
-        """Find all code block regions in the content."""
+        """Find all code block regions in the content, in order."""
         code_blocks = []
 
         # Find triple backtick code blocks
@@ -568,34 +624,77 @@ class CombinedFileParser:
         self, position: int, code_blocks: List[Tuple[int, int]]
     ) -> bool:
         """Check if a position is inside a code block."""
-        for start, end in code_blocks:
-            if start <= position < end:
-                return True
-        return False
+        # The last block starting at or before the position
+        index = bisect.bisect_right(code_blocks, (position, math.inf)) - 1
+        return index >= 0 and position < code_blocks[index][1]
+
+    def _iter_matches(
+        self,
+        content: Union[str, bytes],
+        start_pattern: Pattern,
+        patterns: List[Pattern],
+        end_patterns: List[Optional[Pattern]],
+        in_code_block: Callable[[int], bool],
+    ) -> Iterator[Tuple[int, re.Match]]:
+        """Find the separators of all styles in one pass, in order.
+
+        Yields the index of each separator's parser and the match of its
+        pattern. Every separator is parsed by the parser of its own style,
+        as presets can give files different styles within one bundle.
+        Separators inside code blocks are skipped, and so are separators of
+        another style inside a section that isn't closed before them.
+        """
+        position = 0
+        previous: Optional[Tuple[int, re.Match]] = None
+        while True:
+            candidate = start_pattern.search(content, position)
+            if candidate is None:
+                return
+            position = candidate.start() + 1
+            if in_code_block(candidate.start()):
+                self.logger.debug(
+                    f"Skipping separator inside code block at position {candidate.start()}"
+                )
+                continue
+            for index, pattern in enumerate(patterns):
+                match = pattern.match(content, candidate.start())
+                if match:
+                    if previous is not None and previous[0] != index:
+                        end_pattern = end_patterns[previous[0]]
+                        if end_pattern and not end_pattern.search(
+                            content, previous[1].end(), match.start()
+                        ):
+                            self.logger.debug(
+                                f"Skipping separator inside {self.parsers[previous[0]].name} "
+                                f"section at position {match.start()}"
+                            )
+                            break
+                    yield index, match
+                    previous = (index, match)
+                    position = max(position, match.end())
+                    break
 
     def parse(self, content: str) -> List[ExtractedFile]:
         """Parse the combined file content and extract individual files."""
         # Find all code blocks first
         code_blocks = self._find_code_blocks(content)
 
-        # Find all matches from all parsers
-        matches: List[SeparatorMatch] = []
-
-        for parser in self.parsers:
-            for match in parser.pattern.finditer(content):
-                # Skip matches inside code blocks
-                if self._is_in_code_block(match.start(), code_blocks):
-                    self.logger.debug(
-                        f"Skipping separator inside code block at position {match.start()}"
-                    )
-                    continue
-
-                separator_match = parser.parse_match(match, content, len(matches))
-                if separator_match:
-                    matches.append(separator_match)
-
-        # Sort by position in file
-        matches.sort(key=lambda m: m.start_index)
+        def in_code_block(position: int) -> bool:
+            return self._is_in_code_block(position, code_blocks)
+
+        # Find all separators with the parser of their style
+        matches: List[Tuple[SeparatorParser, SeparatorMatch]] = []
+        for index, match in self._iter_matches(
+            content,
+            self._start_pattern,
+            [parser.pattern for parser in self.parsers],
+            self._end_patterns,
+            in_code_block,
+        ):
+            parser = self.parsers[index]
+            separator_match = parser.parse_match(match, content, len(matches))
+            if separator_match:
+                matches.append((parser, separator_match))
 
         if not matches:
             self.logger.warning("No recognizable file separators found")
@@ -604,14 +703,9 @@ class CombinedFileParser:
         # Extract files
         extracted_files: List[ExtractedFile] = []
 
-        for i, current_match in enumerate(matches):
-            # Find the appropriate parser
-            parser = next(
-                p for p in self.parsers if p.name == current_match.separator_type
-            )
-
+        for i, (parser, current_match) in enumerate(matches):
             # Get next match if available
-            next_match = matches[i + 1] if i + 1 < len(matches) else None
+            next_match = matches[i + 1][1] if i + 1 < len(matches) else None
 
             # Extract content
             file_content = parser.extract_content(content, current_match, next_match)
@@ -637,3 +731,164 @@ class CombinedFileParser:
             )
 
         return extracted_files
+
+    def iter_parse(
+        self,
+        data: bytes,
+        encoding: str = "utf-8",
+        include: Optional[Callable[[str], bool]] = None,
+    ) -> Iterator[ExtractedFile]:
+        """Parse a combined file that was not decoded, yielding files lazily.
+
+        ``data`` is any bytes-like object, usually a memory-mapped bundle.
+        Separators are searched directly in the bytes; only the separator
+        headers and the content of one file at a time are decoded. Line
+        endings are translated like a file read in text mode, so the files
+        are the same as parse() returns for the decoded content.
+
+        Args:
+            data: The combined file
+            encoding: Encoding the whole file decodes with
+            include: Called with each file's path; files it rejects are
+                skipped without decoding their content
+        """
+        current = None
+        for parser, match in self._iter_separators(data, encoding):
+            if current is not None and _included(current[1], include):
+                yield self._extract_mapped(data, encoding, *current, match)
+            current = (parser, match)
+
+        if current is None:
+            self.logger.warning("No recognizable file separators found")
+            return
+        if _included(current[1], include):
+            yield self._extract_mapped(data, encoding, *current, None)
+
+    def parse_section(
+        self, data: bytes, encoding: str = "utf-8", followed: bool = False
+    ) -> Optional[ExtractedFile]:
+        """Extract the file of one section of a combined file.
+
+        ``data`` is the section up to where the next one starts. Its file is
+        extracted the same way iter_parse() extracts it from the whole
+        combined file; ``followed`` tells whether another section comes
+        after it there. Returns None if the section has no separator.
+        """
+        parser, current = next(self._iter_separators(data, encoding), (None, None))
+        if current is None:
+            return None
+
+        next_match = None
+        if followed:
+            next_match = replace(current, start_index=len(data), end_index=len(data))
+        return self._extract_mapped(data, encoding, parser, current, next_match)
+
+    def _iter_separators(
+        self, data: bytes, encoding: str
+    ) -> Iterator[Tuple[SeparatorParser, SeparatorMatch]]:
+        """Find the separators in undecoded bytes, in order."""
+        for index, byte_match in self._iter_matches(
+            data,
+            self._byte_start_pattern,
+            self._byte_patterns,
+            self._byte_end_patterns,
+            _CodeBlockScanner(data).contains,
+        ):
+            parser = self.parsers[index]
+            header = _decode_text(byte_match.group(0), encoding)
+            match = parser.pattern.match(header)
+            if match is None:
+                continue
+            separator_match = parser.parse_match(match, header, 0)
+            if separator_match:
+                # Positions refer to the bytes from here on
+                separator_match.start_index = byte_match.start()
+                separator_match.end_index = byte_match.end()
+                yield parser, separator_match
+
+    def _extract_mapped(
+        self,
+        data: bytes,
+        encoding: str,
+        parser: SeparatorParser,
+        current_match: SeparatorMatch,
+        next_match: Optional[SeparatorMatch],
+    ) -> ExtractedFile:
+        """Decode one file's content and extract it like parse() does."""
+        end = next_match.start_index if next_match else len(data)
+        # parse() ends the content at the end marker even if the file has a
+        # line that looks like a separator before it
+        marker_end = self._find_end_marker(data, parser, current_match)
+        if marker_end is not None:
+            end = marker_end
+        content = _decode_text(data[current_match.end_index : end], encoding)
+
+        # Offsets into the decoded content
+        local_match = replace(current_match, start_index=0, end_index=0)
+        local_next = None
+        if next_match:
+            local_next = replace(
+                next_match, start_index=len(content), end_index=len(content)
+            )
+
+        file_content = parser.extract_content(content, local_match, local_next)
+        metadata = FileMetadata(
+            path=current_match.metadata["path"],
+            checksum_sha256=current_match.metadata.get("checksum_sha256"),
+            size_bytes=current_match.metadata.get("size_bytes"),
+            modified=current_match.metadata.get("modified"),
+            encoding=current_match.metadata.get("encoding"),
+            line_endings=current_match.metadata.get("line_endings"),
+            type=current_match.metadata.get("type"),
+        )
+
+        self.logger.debug(
+            f"Identified file: '{metadata.path}', type: {current_match.separator_type}, "
+            f"content length: {len(file_content)}"
+        )
+        return ExtractedFile(metadata=metadata, content=file_content)
+
+    def _find_end_marker(
+        self, data: bytes, parser: SeparatorParser, match: SeparatorMatch
+    ) -> Optional[int]:
+        """Find where the end marker of a section ends in undecoded bytes."""
+        if isinstance(parser, MachineReadableParser):
+            marker = self._byte_end_marker.search(data, match.end_index)
+            return marker.end() if marker else None
+        if isinstance(parser, PYMK1FParser) and match.uuid:
+            marker = parser.END_MARKER_PATTERN.format(uuid=match.uuid).encode("ascii")
+            position = data.find(marker, match.end_index)
+            return position + len(marker) if position != -1 else None
+        return None
+
+
+def _included(match: SeparatorMatch, include: Optional[Callable[[str], bool]]) -> bool:
+    """Check if the file of a separator is to be extracted."""
+    return include is None or include(match.metadata["path"])
+
+
+class _CodeBlockScanner:
+    """Finds code blocks in order, for positions checked in increasing order."""
+
+    def __init__(self, data: bytes):
+        self._blocks = re.compile(rb"```[\s\S]*?```").finditer(data)
+        self._block = next(self._blocks, None)
+
+    def contains(self, position: int) -> bool:
+        """Check if a position is inside a code block."""
+        while self._block is not None and self._block.end() <= position:
+            self._block = next(self._blocks, None)
+        return self._block is not None and self._block.start() <= position
+
+
+def _to_bytes_pattern(pattern: Pattern) -> Pattern:
+    """Compile an ASCII-only str pattern for searching bytes."""
+    return re.compile(pattern.pattern.encode("ascii"), pattern.flags & ~re.UNICODE)
+
+
+def _decode_text(data: bytes, encoding: str) -> str:
+    """Decode bytes with the line ending translation of text mode."""
+    text = data.decode(encoding)
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
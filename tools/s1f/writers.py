@@ -15,10 +15,13 @@
 """File writers for s1f."""
 
 import asyncio
+import hashlib
 import os
+from collections.abc import Sized
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Iterable, List, Optional, Set, Tuple
 import threading
+from concurrent.futures import ThreadPoolExecutor
 import logging
 from datetime import datetime
 
@@ -41,12 +44,10 @@ from m1f.file_operations import (
     safe_read_text,
 )
 
-try:
-    import aiofiles
+# Files written at the same time by default
+MAX_CONCURRENT_WRITES = 10
 
-    AIOFILES_AVAILABLE = True
-except ImportError:
-    AIOFILES_AVAILABLE = False
+_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
 
 
 class FileWriter:
@@ -56,116 +57,81 @@ class FileWriter:
         self.config = config
         self.logger = logger
         self._counter_lock = asyncio.Lock()  # For thread-safe counter updates
-        self._write_semaphore = asyncio.Semaphore(
-            10
-        )  # Limit concurrent writes to prevent "too many open files"
+        # Writer workers and threads; bounds open files and queued contents
+        self.jobs = config.jobs or MAX_CONCURRENT_WRITES
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Directories known to exist, so each is created only once
+        self._directories: Set[Path] = set()
+        # Files written in durable mode, synced at the end
+        self._written: List[Path] = []
 
     async def write_files(
-        self, extracted_files: List[ExtractedFile]
+        self, extracted_files: Iterable[ExtractedFile]
     ) -> ExtractionResult:
-        """Write all extracted files to the destination directory."""
+        """Write all extracted files to the destination directory.
+
+        ``extracted_files`` may be an iterator that extracts files lazily.
+        Files are taken from it into a queue of ``jobs`` files, which the
+        same number of workers write in their own threads, so at most twice
+        ``jobs`` extracted files are held at a time. Without force_overwrite
+        a single worker writes them, so overwrite prompts come one at a time.
+        """
         result = ExtractionResult()
 
-        self.logger.info(
-            f"Writing {len(extracted_files)} extracted file(s) to '{self.config.destination_directory}'..."
+        if isinstance(extracted_files, Sized):
+            self.logger.info(
+                f"Writing {len(extracted_files)} extracted file(s) to '{self.config.destination_directory}'..."
+            )
+        else:
+            self.logger.info(
+                f"Writing extracted files to '{self.config.destination_directory}'..."
+            )
+
+        jobs = self.jobs if self.config.force_overwrite else 1
+        self._executor = ThreadPoolExecutor(
+            max_workers=jobs, thread_name_prefix="s1f-writer"
         )
+        try:
+            await self._write_queued(extracted_files, result, jobs)
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
 
-        # Create tasks for concurrent file writing if async is available
-        if AIOFILES_AVAILABLE:
-            tasks = [
-                self._write_file_async(file_data, result)
-                for file_data in extracted_files
-            ]
-            # Gather results and handle exceptions properly
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # Check for exceptions in results
-            for i, result_or_exc in enumerate(results):
-                if isinstance(result_or_exc, Exception):
-                    # An exception occurred during file writing
-                    file_data = extracted_files[i]
-                    async with self._counter_lock:
-                        result.files_failed += 1
-                    logger.error(
-                        f"Failed to write file {file_data.relative_path}: {result_or_exc}"
-                    )
-        else:
-            # Fallback to synchronous writing
-            for file_data in extracted_files:
-                await self._write_file_sync(file_data, result)
+        if self.config.durable and self._written:
+            result.files_failed += await asyncio.to_thread(self._sync_written_files)
 
         return result
 
-    async def _write_file_async(
-        self, file_data: ExtractedFile, result: ExtractionResult
+    async def _write_queued(
+        self,
+        extracted_files: Iterable[ExtractedFile],
+        result: ExtractionResult,
+        jobs: int,
     ):
-        """Write a single file asynchronously."""
-        async with self._write_semaphore:  # Limit concurrent file operations
-            try:
-                output_path = await self._prepare_output_path(file_data)
-                if output_path is None:
-                    async with self._counter_lock:
-                        result.files_failed += 1
-                    return
-
-                # Check if file exists
-                is_overwrite = safe_exists(output_path, logger=self.logger)
+        """Feed the extracted files through a bounded queue to the workers."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=jobs)
 
-                if is_overwrite and not self.config.force_overwrite:
-                    if not await self._confirm_overwrite_async(output_path):
-                        self.logger.info(f"Skipping existing file '{output_path}'")
-                        return
-
-                # Determine encoding
-                encoding = self._determine_encoding(file_data)
-
-                # Write the file
-                content_bytes = await self._encode_content(
-                    file_data.content, encoding, file_data.path
-                )
-
-                # Use safe_open for the aiofiles case
-                # Note: We need to handle this differently since safe_open doesn't support async
-                # For now, keep the aiofiles.open but add error handling
-                try:
-                    async with aiofiles.open(output_path, "wb") as f:
-                        await f.write(content_bytes)
-                except PermissionError as e:
-                    self.logger.warning(
-                        f"Permission denied writing to '{output_path}': {e}"
-                    )
-                    async with self._counter_lock:
-                        result.files_failed += 1
+        async def worker():
+            while True:
+                file_data = await queue.get()
+                if file_data is None:
                     return
+                await self._write_file(file_data, result)
 
-                # Update result with thread-safe counter increment
-                async with self._counter_lock:
-                    if is_overwrite:
-                        result.files_overwritten += 1
-                        self.logger.debug(f"Overwrote file: {output_path}")
-                    else:
-                        result.files_created += 1
-                        self.logger.debug(f"Created file: {output_path}")
-
-                # Set file timestamp
-                await self._set_file_timestamp(output_path, file_data)
-
-                # Verify checksum if needed
-                if (
-                    not self.config.ignore_checksum
-                    and file_data.metadata.checksum_sha256
-                ):
-                    await self._verify_checksum_async(output_path, file_data)
-
-            except Exception as e:
-                self.logger.error(f"Failed to write file '{file_data.path}': {e}")
-                async with self._counter_lock:
-                    result.files_failed += 1
-
-    async def _write_file_sync(
-        self, file_data: ExtractedFile, result: ExtractionResult
-    ):
-        """Write a single file synchronously (fallback when aiofiles not available)."""
+        workers = [asyncio.create_task(worker()) for _ in range(jobs)]
+        try:
+            for file_data in extracted_files:
+                await queue.put(file_data)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            # Stop the workers if extracting failed
+            for task in workers:
+                task.cancel()
+
+    async def _write_file(self, file_data: ExtractedFile, result: ExtractionResult):
+        """Write a single file in a writer thread."""
         try:
             output_path = await self._prepare_output_path(file_data)
             if output_path is None:
@@ -177,7 +143,7 @@ class FileWriter:
             is_overwrite = safe_exists(output_path, logger=self.logger)
 
             if is_overwrite and not self.config.force_overwrite:
-                if not self._confirm_overwrite_sync(output_path):
+                if not self._confirm_overwrite(output_path):
                     self.logger.info(f"Skipping existing file '{output_path}'")
                     return
 
@@ -188,9 +154,16 @@ class FileWriter:
             content_bytes = await self._encode_content(
                 file_data.content, encoding, file_data.path
             )
-            # Use safe file operations for sync write
+
+            # Write, hash and set the timestamp in one trip to a thread
             try:
-                output_path.write_bytes(content_bytes)
+                checksum = await asyncio.get_running_loop().run_in_executor(
+                    self._executor,
+                    self._write_bytes,
+                    output_path,
+                    content_bytes,
+                    file_data,
+                )
             except PermissionError as e:
                 self.logger.warning(
                     f"Permission denied writing to '{output_path}': {e}"
@@ -208,12 +181,7 @@ class FileWriter:
                     result.files_created += 1
                     self.logger.debug(f"Created file: {output_path}")
 
-            # Set file timestamp
-            await self._set_file_timestamp(output_path, file_data)
-
-            # Verify checksum if needed
-            if not self.config.ignore_checksum and file_data.metadata.checksum_sha256:
-                self._verify_checksum_sync(output_path, file_data)
+            self._verify_checksum(output_path, file_data, checksum)
 
         except Exception as e:
             self.logger.error(f"Failed to write file '{file_data.path}': {e}")
@@ -234,13 +202,15 @@ class FileWriter:
         output_path = self.config.destination_directory / relative_path
 
         # Create parent directories
-        if not safe_mkdir(
-            output_path.parent, logger=self.logger, parents=True, exist_ok=True
-        ):
-            self.logger.error(
-                f"Failed to create directory for '{file_data.path}': Permission denied"
-            )
-            return None
+        if output_path.parent not in self._directories:
+            if not safe_mkdir(
+                output_path.parent, logger=self.logger, parents=True, exist_ok=True
+            ):
+                self.logger.error(
+                    f"Failed to create directory for '{file_data.path}': Permission denied"
+                )
+                return None
+            self._directories.add(output_path.parent)
 
         self.logger.debug(f"Preparing to write: {output_path}")
         return output_path
@@ -281,132 +251,118 @@ class FileWriter:
             )
             return content.encode(encoding, errors="replace")
 
-    async def _confirm_overwrite_async(self, path: Path) -> bool:
-        """Asynchronously confirm file overwrite (returns True for now)."""
-        # In async mode, we can't easily do interactive input
-        # So we follow the force_overwrite setting
-        return self.config.force_overwrite
-
-    def _confirm_overwrite_sync(self, path: Path) -> bool:
-        """Synchronously confirm file overwrite."""
+    def _confirm_overwrite(self, path: Path) -> bool:
+        """Ask whether an existing file may be overwritten."""
         if self.config.force_overwrite:
             return True
 
         try:
             response = input(f"Output file '{path}' already exists. Overwrite? (y/N): ")
             return response.lower() == "y"
+        except EOFError:
+            # No one to ask, keep the existing file
+            return False
         except KeyboardInterrupt:
             self.logger.info("\nOperation cancelled by user (Ctrl+C).")
             raise
 
-    async def _set_file_timestamp(self, path: Path, file_data: ExtractedFile):
-        """Set file modification timestamp if configured."""
+    def _file_times(self, file_data: ExtractedFile) -> Optional[Tuple[float, float]]:
+        """Return the access and modification time to set on a file, if any."""
         if (
             self.config.timestamp_mode == "original"
             and file_data.metadata.modified is not None
         ):
-            try:
-                # Convert datetime to timestamp
-                mod_time = file_data.metadata.modified.timestamp()
-                access_time = mod_time
-
-                # Use asyncio to run in executor for non-blocking
-                loop = asyncio.get_running_loop()
-                await loop.run_in_executor(
-                    None, os.utime, path, (access_time, mod_time)
-                )
-
-                self.logger.debug(
-                    f"Set original modification time for '{path}' to "
-                    f"{file_data.metadata.modified}"
-                )
-            except Exception as e:
-                self.logger.warning(
-                    f"Could not set original modification time for '{path}': {e}"
-                )
-
-    async def _verify_checksum_async(self, path: Path, file_data: ExtractedFile):
-        """Verify file checksum asynchronously."""
+            mod_time = file_data.metadata.modified.timestamp()
+            return mod_time, mod_time
+        return None
+
+    def _write_bytes(
+        self, path: Path, content_bytes: bytes, file_data: ExtractedFile
+    ) -> Optional[str]:
+        """Write a file and set its timestamp.
+
+        Returns the SHA256 of the written bytes if it is to be verified. The
+        bytes are hashed here instead of reading the file back afterwards.
+        """
+        checksum = None
+        if not self.config.ignore_checksum and file_data.metadata.checksum_sha256:
+            checksum = hashlib.sha256(content_bytes).hexdigest()
+
+        fd = os.open(path, _OPEN_FLAGS, 0o666)
         try:
-            # Calculate checksum using chunks to avoid loading entire file into memory
-            import hashlib
-
-            sha256_hash = hashlib.sha256()
-
-            # Use aiofiles but add permission error handling
-            try:
-                async with aiofiles.open(path, "rb") as f:
-                    while chunk := await f.read(8192):  # Read in 8KB chunks
-                        sha256_hash.update(chunk)
-            except PermissionError as e:
-                self.logger.warning(
-                    f"Permission denied reading '{path}' for checksum verification: {e}"
-                )
-                return
-
-            calculated_checksum = sha256_hash.hexdigest()
-            expected_checksum = file_data.metadata.checksum_sha256
-
-            if calculated_checksum != expected_checksum:
-                # Check if difference is due to line endings
-                await self._check_line_ending_difference(
-                    path, file_data, calculated_checksum, expected_checksum
-                )
-            else:
-                self.logger.debug(f"Checksum VERIFIED for file '{path}'")
-
-        except Exception as e:
-            self.logger.warning(f"Error during checksum verification for '{path}': {e}")
+            view = memoryview(content_bytes)
+            while view:
+                view = view[os.write(fd, view) :]
 
-    def _verify_checksum_sync(self, path: Path, file_data: ExtractedFile):
-        """Verify file checksum synchronously."""
+            times = self._file_times(file_data)
+            if times is not None:
+                try:
+                    if os.utime in os.supports_fd:
+                        os.utime(fd, times)
+                    else:
+                        os.utime(path, times)
+                    self.logger.debug(
+                        f"Set original modification time for '{path}' to "
+                        f"{file_data.metadata.modified}"
+                    )
+                except OSError as e:
+                    self.logger.warning(
+                        f"Could not set original modification time for '{path}': {e}"
+                    )
+        finally:
+            os.close(fd)
+
+        if self.config.durable:
+            self._written.append(path)
+        return checksum
+
+    def _sync_written_files(self) -> int:
+        """Flush the written files and their directories to disk (durable mode).
+
+        Returns the number of files that couldn't be synced.
+        """
+        self.logger.debug(f"Syncing {len(self._written)} written file(s) to disk")
+        failed = 0
+        directories = {self.config.destination_directory}
+        for path in self._written:
+            if not self._fsync_path(path, os.O_RDONLY):
+                failed += 1
+            # New directories must be synced up to the destination
+            parent = path.parent
+            while parent not in directories:
+                directories.add(parent)
+                parent = parent.parent
+        if hasattr(os, "O_DIRECTORY"):
+            for directory in directories:
+                self._fsync_path(directory, os.O_RDONLY | os.O_DIRECTORY)
+        self._written.clear()
+        return failed
+
+    def _fsync_path(self, path: Path, flags: int) -> bool:
+        """Flush a file or directory to disk."""
         try:
-            # Use safe file operations for reading
+            fd = os.open(path, flags)
             try:
-                content_bytes = path.read_bytes()
-            except PermissionError as e:
-                self.logger.warning(f"Permission denied reading '{path}': {e}")
-                return
-            calculated_checksum = calculate_sha256(content_bytes)
-            expected_checksum = file_data.metadata.checksum_sha256
-
-            if calculated_checksum != expected_checksum:
-                # Check if difference is due to line endings
-                self._check_line_ending_difference_sync(
-                    path, file_data, calculated_checksum, expected_checksum
-                )
-            else:
-                self.logger.debug(f"Checksum VERIFIED for file '{path}'")
-
-        except Exception as e:
-            self.logger.warning(f"Error during checksum verification for '{path}': {e}")
-
-    async def _check_line_ending_difference(
-        self, path: Path, file_data: ExtractedFile, calculated: str, expected: str
-    ):
-        """Check if checksum difference is due to line endings."""
-        # Normalize line endings and recalculate
-        normalized_content = normalize_line_endings(file_data.content, "\n")
-        normalized_bytes = normalized_content.encode("utf-8")
-        normalized_checksum = calculate_sha256(normalized_bytes)
-
-        if normalized_checksum == expected:
-            self.logger.debug(
-                f"Checksum difference for '{path}' appears to be due to "
-                f"line ending normalization"
-            )
-        else:
-            self.logger.warning(
-                f"CHECKSUM MISMATCH for file '{path}'. "
-                f"Expected: {expected}, Calculated: {calculated}. "
-                f"The file content may be corrupted or was altered."
-            )
-
-    def _check_line_ending_difference_sync(
-        self, path: Path, file_data: ExtractedFile, calculated: str, expected: str
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            self.logger.error(f"Failed to sync '{path}' to disk: {e}")
+            return False
+        return True
+
+    def _verify_checksum(
+        self, path: Path, file_data: ExtractedFile, calculated: Optional[str]
     ):
-        """Check if checksum difference is due to line endings (sync version)."""
-        # Same logic as async version
+        """Compare the checksum of the written bytes with the bundle's."""
+        if calculated is None:
+            return
+        expected = file_data.metadata.checksum_sha256
+        if calculated == expected:
+            self.logger.debug(f"Checksum VERIFIED for file '{path}'")
+            return
+
+        # Check if difference is due to line endings
         normalized_content = normalize_line_endings(file_data.content, "\n")
         normalized_bytes = normalized_content.encode("utf-8")
         normalized_checksum = calculate_sha256(normalized_bytes)
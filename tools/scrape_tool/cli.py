@@ -61,8 +61,6 @@ except ImportError:
 
 
 from . import __version__
-from .config import Config, ScraperBackend
-from .crawlers import WebCrawler
 
 
 def cleanup_orphaned_sessions(db_path: Path) -> None:
@@ -1035,6 +1033,10 @@ def main() -> None:
     parser = create_parser()
     args = parser.parse_args()
 
+    # Imported after parsing, so that --help doesn't load the scrapers
+    from .config import Config, ScraperBackend
+    from .crawlers import WebCrawler
+
     # Create configuration
     config = Config()
     config.crawler.max_depth = args.max_depth
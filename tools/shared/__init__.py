@@ -8,25 +8,7 @@ This module contains common functionality used across multiple m1f tools:
 - Unified colorama support
 """
 
-# Import existing modules with error handling
-try:
-    from .prompts.loader import PromptLoader, load_prompt, format_prompt
-except ImportError:
-    PromptLoader = None
-    load_prompt = None
-    format_prompt = None
-
-try:
-    from .config.loader import load_config_file, save_config_file
-except ImportError:
-    load_config_file = None
-    save_config_file = None
-
-try:
-    from .utils.paths import ensure_path, get_project_root
-except ImportError:
-    ensure_path = None
-    get_project_root = None
+import importlib
 
 # Import colors module
 from .colors import (
@@ -41,30 +23,47 @@ from .colors import (
     header,
 )
 
-# Import CLI utilities
-try:
-    from .cli import CustomArgumentParser, ArgumentBuilder, BaseCLI, SubcommandCLI
-except ImportError:
-    CustomArgumentParser = None
-    ArgumentBuilder = None
-    BaseCLI = None
-    SubcommandCLI = None
+# The other exports are imported on first access, so that a tool importing
+# shared.colors doesn't load all of them. Exports whose module can't be
+# imported are None.
+_LAZY_EXPORTS = {
+    # Prompt loading
+    "PromptLoader": ".prompts.loader",
+    "load_prompt": ".prompts.loader",
+    "format_prompt": ".prompts.loader",
+    # Configuration utilities
+    "load_config_file": ".config.loader",
+    "save_config_file": ".config.loader",
+    # Path utilities
+    "ensure_path": ".utils.paths",
+    "get_project_root": ".utils.paths",
+    # CLI utilities
+    "CustomArgumentParser": ".cli",
+    "ArgumentBuilder": ".cli",
+    "BaseCLI": ".cli",
+    "SubcommandCLI": ".cli",
+    # Logging utilities
+    "LoggingConfig": ".logging",
+    "LoggerManager": ".logging",
+    "setup_logging": ".logging",
+    "get_logger": ".logging",
+    "configure_logging": ".logging",
+}
+
+
+def __getattr__(name):
+    """Import the exports in _LAZY_EXPORTS when they are first accessed."""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    try:
+        value = getattr(importlib.import_module(module_name, __name__), name)
+    except ImportError:
+        value = None
+    globals()[name] = value
+    return value
 
-# Import logging utilities
-try:
-    from .logging import (
-        LoggingConfig,
-        LoggerManager,
-        setup_logging,
-        get_logger,
-        configure_logging,
-    )
-except ImportError:
-    LoggingConfig = None
-    LoggerManager = None
-    setup_logging = None
-    get_logger = None
-    configure_logging = None
 
 __all__ = [
     # Colors module exports
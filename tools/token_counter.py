@@ -13,7 +13,6 @@
 # limitations under the License.
 
 import argparse
-import tiktoken
 import os
 import sys
 
@@ -21,21 +20,32 @@ import sys
 try:
     from .shared.colors import Colors, ColoredHelpFormatter, success, error, info
     from .m1f.file_operations import safe_exists, safe_open
+    from .m1f.token_counter import TokenCounter
 except ImportError:
     # Try direct import if running as script
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from shared.colors import Colors, ColoredHelpFormatter, success, error, info
     from m1f.file_operations import safe_exists, safe_open
+    from m1f.token_counter import TokenCounter
 
+# Number of characters read from the file at a time
+READ_CHUNK_SIZE = 4 * 1024 * 1024
 
-def count_tokens_in_file(file_path: str, encoding_name: str = "cl100k_base") -> int:
+
+def count_tokens_in_file(
+    file_path: str, encoding_name: str = "cl100k_base", threads: int = None
+) -> int:
     """
     Reads a file and counts the number of tokens using a specified tiktoken encoding.
 
+    The file is read and encoded in chunks, so memory use doesn't grow with
+    the file size.
+
     Args:
         file_path (str): The path to the file.
         encoding_name (str): The name of the encoding to use (e.g., "cl100k_base", "p50k_base").
                              "cl100k_base" is the encoding used by gpt-4, gpt-3.5-turbo, text-embedding-ada-002.
+        threads (int): Number of threads used for encoding (defaults to the number of CPUs, at most 8).
 
     Returns:
         int: The number of tokens in the file.
@@ -48,28 +58,25 @@ def count_tokens_in_file(file_path: str, encoding_name: str = "cl100k_base") ->
         raise FileNotFoundError(f"Error: File not found at {file_path}")
 
     try:
-        with safe_open(file_path, "r", encoding="utf-8") as f:
-            if f is None:
-                raise Exception(f"Permission denied accessing file {file_path}")
-            text_content = f.read()
-    except UnicodeDecodeError:
-        # Fallback to reading as bytes if UTF-8 fails, then decode with replacement
-        with safe_open(file_path, "rb") as f:
+        counter = TokenCounter(encoding_name, threads=threads)
+    except Exception as e:
+        raise Exception(
+            f"Error using tiktoken: {e}. Ensure tiktoken is installed and encoding_name is valid."
+        )
+
+    try:
+        # Invalid UTF-8 sequences are decoded with replacement characters
+        with safe_open(file_path, "r", encoding="utf-8", errors="replace") as f:
             if f is None:
                 raise Exception(f"Permission denied accessing file {file_path}")
-            byte_content = f.read()
-        text_content = byte_content.decode("utf-8", errors="replace")
+            counter.add(iter(lambda: f.read(READ_CHUNK_SIZE), ""))
     except Exception as e:
+        counter.close()
         raise Exception(f"Error reading file {file_path}: {e}")
 
     try:
-        encoding = tiktoken.get_encoding(encoding_name)
-        tokens = encoding.encode(text_content)
-        return len(tokens)
+        return counter.finish()
     except Exception as e:
-        # Fallback or error message if tiktoken fails
-        # For simplicity, we'll raise an error here.
-        # A more robust solution might try a simpler word count or character count.
         raise Exception(
             f"Error using tiktoken: {e}. Ensure tiktoken is installed and encoding_name is valid."
         )
@@ -109,11 +116,18 @@ def main():
         default="cl100k_base",
         help='The tiktoken encoding to use. Defaults to "cl100k_base" (used by gpt-4, gpt-3.5-turbo).',
     )
+    parser.add_argument(
+        "-t",
+        "--threads",
+        type=int,
+        default=None,
+        help="Number of threads used for encoding (default: number of CPUs, at most 8).",
+    )
 
     args = parser.parse_args()
 
     try:
-        token_count = count_tokens_in_file(args.file_path, args.encoding)
+        token_count = count_tokens_in_file(args.file_path, args.encoding, args.threads)
         success(
             f"The file '{args.file_path}' contains approximately {token_count} tokens (using '{args.encoding}' encoding)."
         )